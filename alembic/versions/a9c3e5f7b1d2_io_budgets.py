@@ -0,0 +1,36 @@
+"""Per-path I/O budgets
+
+Revision ID: a9c3e5f7b1d2
+Revises: f4b8d1c6e9a3
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c3e5f7b1d2'
+down_revision: Union[str, None] = 'f4b8d1c6e9a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {col["name"] for col in inspector.get_columns("monitored_paths")}
+    if "io_max_stats_per_second" not in columns:
+        op.add_column("monitored_paths", sa.Column("io_max_stats_per_second", sa.Integer(), nullable=True))
+    if "io_max_read_mb_per_second" not in columns:
+        op.add_column("monitored_paths", sa.Column("io_max_read_mb_per_second", sa.Float(), nullable=True))
+    if "io_max_concurrent_operations" not in columns:
+        op.add_column("monitored_paths", sa.Column("io_max_concurrent_operations", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("monitored_paths") as batch_op:
+        batch_op.drop_column("io_max_concurrent_operations")
+        batch_op.drop_column("io_max_read_mb_per_second")
+        batch_op.drop_column("io_max_stats_per_second")
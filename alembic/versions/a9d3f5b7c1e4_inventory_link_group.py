@@ -0,0 +1,38 @@
+"""Hard link group for file_inventory
+
+Revision ID: a9d3f5b7c1e4
+Revises: f7c2e4a6b8d0
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3f5b7c1e4'
+down_revision: Union[str, None] = 'f7c2e4a6b8d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {col["name"] for col in inspector.get_columns("file_inventory")}
+    # Existing rows get their group on the next scan
+    if "link_group" not in columns:
+        op.add_column("file_inventory", sa.Column("link_group", sa.String(), nullable=True))
+    if "idx_inventory_link_group" not in {
+        ix["name"] for ix in inspector.get_indexes("file_inventory")
+    }:
+        op.create_index(
+            "idx_inventory_link_group", "file_inventory", ["path_id", "link_group"]
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_inventory_link_group", table_name="file_inventory")
+    with op.batch_alter_table("file_inventory") as batch_op:
+        batch_op.drop_column("link_group")
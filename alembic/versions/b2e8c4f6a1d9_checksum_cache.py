@@ -0,0 +1,39 @@
+"""Persistent checksum cache
+
+Revision ID: b2e8c4f6a1d9
+Revises: a9d3f5b7c1e4
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e8c4f6a1d9'
+down_revision: Union[str, None] = 'a9d3f5b7c1e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "checksum_cache" in inspector.get_table_names():
+        return
+    op.create_table(
+        "checksum_cache",
+        sa.Column("file_dev", sa.Integer(), primary_key=True),
+        sa.Column("file_inode", sa.Integer(), primary_key=True),
+        sa.Column("algorithm", sa.String(), primary_key=True),
+        sa.Column("file_size", sa.Integer(), nullable=False),
+        sa.Column("file_mtime_ns", sa.Integer(), nullable=False),
+        sa.Column("checksum", sa.String(), nullable=False),
+        sa.Column("last_used", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_checksum_cache_last_used", "checksum_cache", ["last_used"])
+
+
+def downgrade() -> None:
+    op.drop_table("checksum_cache")
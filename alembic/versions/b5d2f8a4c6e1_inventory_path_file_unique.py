@@ -0,0 +1,62 @@
+"""Unique (path_id, file_path) index on file_inventory
+
+Revision ID: b5d2f8a4c6e1
+Revises: a9c3e5f7b1d2
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2f8a4c6e1'
+down_revision: Union[str, None] = 'a9c3e5f7b1d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Duplicate rows of a (path_id, file_path) pair and the row each one is merged into
+_KEPT_ID = """
+    (SELECT MIN(k.id) FROM file_inventory k
+     JOIN file_inventory d ON d.path_id = k.path_id AND d.file_path = k.file_path
+     WHERE d.id = {column})
+"""
+_DUPLICATE_IDS = """
+    SELECT id FROM file_inventory
+    WHERE id NOT IN (SELECT MIN(id) FROM file_inventory GROUP BY path_id, file_path)
+"""
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "idx_inventory_path_file" in {ix["name"] for ix in inspector.get_indexes("file_inventory")}:
+        return
+
+    # Merge duplicates into the oldest row of each pair, keeping their history and tags
+    tables = set(inspector.get_table_names())
+    for table, column in (
+        ("file_transaction_history", "file_id"),
+        ("remote_transfer_jobs", "file_inventory_id"),
+    ):
+        if table in tables:
+            op.execute(
+                f"UPDATE {table} SET {column} = {_KEPT_ID.format(column=column)} "
+                f"WHERE {column} IN ({_DUPLICATE_IDS})"
+            )
+    if "file_tags" in tables:
+        op.execute(
+            f"UPDATE OR IGNORE file_tags SET file_id = {_KEPT_ID.format(column='file_id')} "
+            f"WHERE file_id IN ({_DUPLICATE_IDS})"
+        )
+        op.execute(f"DELETE FROM file_tags WHERE file_id IN ({_DUPLICATE_IDS})")
+    op.execute(f"DELETE FROM file_inventory WHERE id IN ({_DUPLICATE_IDS})")
+
+    op.create_index(
+        "idx_inventory_path_file", "file_inventory", ["path_id", "file_path"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_inventory_path_file", table_name="file_inventory")
@@ -0,0 +1,67 @@
+"""Incremental scan directory snapshots
+
+Revision ID: b7c41e2a9d10
+Revises: 726412e8862d
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c41e2a9d10'
+down_revision: Union[str, None] = '726412e8862d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table: str) -> set:
+    return {col["name"] for col in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    existing = _columns("monitored_paths")
+    if "incremental_scan" not in existing:
+        op.add_column(
+            "monitored_paths",
+            sa.Column("incremental_scan", sa.Boolean(), nullable=False, server_default=sa.false()),
+        )
+    if "full_scan_interval_hours" not in existing:
+        op.add_column(
+            "monitored_paths",
+            sa.Column("full_scan_interval_hours", sa.Integer(), nullable=False, server_default="24"),
+        )
+    if "last_full_scan_at" not in existing:
+        op.add_column(
+            "monitored_paths", sa.Column("last_full_scan_at", sa.DateTime(timezone=True), nullable=True)
+        )
+
+    if "directory_snapshots" not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            "directory_snapshots",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("path_id", sa.Integer(), sa.ForeignKey("monitored_paths.id"), nullable=False),
+            sa.Column("dir_path", sa.String(), nullable=False),
+            sa.Column("parent_path", sa.String(), nullable=True),
+            sa.Column("st_ino", sa.Integer(), nullable=False),
+            sa.Column("mtime_ns", sa.Integer(), nullable=False),
+            sa.Column("entry_count", sa.Integer(), nullable=False),
+            sa.Column("scanned_at_ns", sa.Integer(), nullable=False),
+        )
+        op.create_index("ix_directory_snapshots_id", "directory_snapshots", ["id"])
+        op.create_index("ix_directory_snapshots_path_id", "directory_snapshots", ["path_id"])
+        op.create_index(
+            "idx_dir_snapshot_path_dir", "directory_snapshots", ["path_id", "dir_path"], unique=True
+        )
+        op.create_index("idx_dir_snapshot_parent", "directory_snapshots", ["path_id", "parent_path"])
+
+
+def downgrade() -> None:
+    op.drop_table("directory_snapshots")
+    with op.batch_alter_table("monitored_paths") as batch_op:
+        batch_op.drop_column("last_full_scan_at")
+        batch_op.drop_column("full_scan_interval_hours")
+        batch_op.drop_column("incremental_scan")
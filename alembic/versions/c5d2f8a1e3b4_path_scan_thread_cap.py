@@ -0,0 +1,29 @@
+"""Per-path scan thread cap
+
+Revision ID: c5d2f8a1e3b4
+Revises: b7c41e2a9d10
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d2f8a1e3b4'
+down_revision: Union[str, None] = 'b7c41e2a9d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = {col["name"] for col in sa.inspect(op.get_bind()).get_columns("monitored_paths")}
+    if "max_scan_threads" not in columns:
+        op.add_column("monitored_paths", sa.Column("max_scan_threads", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("monitored_paths") as batch_op:
+        batch_op.drop_column("max_scan_threads")
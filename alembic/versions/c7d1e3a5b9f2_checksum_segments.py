@@ -0,0 +1,36 @@
+"""Segment digests of tree checksums
+
+Revision ID: c7d1e3a5b9f2
+Revises: b2e8c4f6a1d9
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d1e3a5b9f2'
+down_revision: Union[str, None] = 'b2e8c4f6a1d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "checksum_segments" in inspector.get_table_names():
+        return
+    op.create_table(
+        "checksum_segments",
+        sa.Column("checksum", sa.String(), primary_key=True),
+        sa.Column("segment_size", sa.Integer(), nullable=False),
+        sa.Column("digests", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_checksum_segments_created_at", "checksum_segments", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("checksum_segments")
@@ -0,0 +1,46 @@
+"""Scan-generation liveness for file_inventory
+
+Revision ID: c8e1f3a5d7b9
+Revises: b5d2f8a4c6e1
+Create Date: 2026-10-16 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1f3a5d7b9'
+down_revision: Union[str, None] = 'b5d2f8a4c6e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {col["name"] for col in inspector.get_columns("file_inventory")}
+    if "seen_generation" not in columns:
+        op.add_column("file_inventory", sa.Column("seen_generation", sa.Integer(), nullable=True))
+
+    if "scan_seen_ranges" not in inspector.get_table_names():
+        op.create_table(
+            "scan_seen_ranges",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("path_id", sa.Integer(), sa.ForeignKey("monitored_paths.id"), nullable=False),
+            sa.Column("scan_generation", sa.Integer(), nullable=False),
+            sa.Column("first_id", sa.Integer(), nullable=False),
+            sa.Column("last_id", sa.Integer(), nullable=False),
+        )
+        op.create_index(
+            "idx_seen_range_lookup",
+            "scan_seen_ranges",
+            ["path_id", "scan_generation", "first_id"],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("scan_seen_ranges")
+    with op.batch_alter_table("file_inventory") as batch_op:
+        batch_op.drop_column("seen_generation")
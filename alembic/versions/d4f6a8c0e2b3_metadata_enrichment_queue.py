@@ -0,0 +1,59 @@
+"""Background metadata enrichment queue
+
+Revision ID: d4f6a8c0e2b3
+Revises: c8e1f3a5d7b9
+Create Date: 2026-10-16 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f6a8c0e2b3'
+down_revision: Union[str, None] = 'c8e1f3a5d7b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Largest file hashed in the background (matches METADATA_ENRICHMENT_MAX_FILE_SIZE_MB)
+_MAX_HASHED_BYTES = 1024 * 1024 * 1024
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "metadata_enrichment_queue" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "metadata_enrichment_queue",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "inventory_id",
+            sa.Integer(),
+            sa.ForeignKey("file_inventory.id"),
+            nullable=False,
+            unique=True,
+        ),
+        sa.Column("priority", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "enqueued_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.String(), nullable=True),
+    )
+    op.create_index(
+        "idx_enrichment_queue_order", "metadata_enrichment_queue", ["priority", "id"]
+    )
+
+    # Rows synced before the queue existed and still without a checksum
+    op.execute(
+        "INSERT INTO metadata_enrichment_queue (inventory_id, priority, attempts) "
+        "SELECT id, 0, 0 FROM file_inventory "
+        f"WHERE checksum IS NULL AND file_size < {_MAX_HASHED_BYTES} AND status = 'ACTIVE'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("metadata_enrichment_queue")
@@ -0,0 +1,32 @@
+"""Per-path exclude patterns
+
+Revision ID: d8e4a6b2c7f1
+Revises: c5d2f8a1e3b4
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e4a6b2c7f1'
+down_revision: Union[str, None] = 'c5d2f8a1e3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = {col["name"] for col in sa.inspect(op.get_bind()).get_columns("monitored_paths")}
+    if "exclude_patterns" not in columns:
+        op.add_column(
+            "monitored_paths",
+            sa.Column("exclude_patterns", sa.JSON(), nullable=False, server_default="[]"),
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("monitored_paths") as batch_op:
+        batch_op.drop_column("exclude_patterns")
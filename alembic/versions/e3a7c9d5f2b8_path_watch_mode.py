@@ -0,0 +1,37 @@
+"""Per-path filesystem watch mode
+
+Revision ID: e3a7c9d5f2b8
+Revises: d8e4a6b2c7f1
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7c9d5f2b8'
+down_revision: Union[str, None] = 'd8e4a6b2c7f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = {col["name"] for col in sa.inspect(op.get_bind()).get_columns("monitored_paths")}
+    if "watch_mode" not in columns:
+        op.add_column(
+            "monitored_paths",
+            sa.Column(
+                "watch_mode",
+                sa.Enum("OFF", "INOTIFY", "FANOTIFY", name="watchmode"),
+                nullable=False,
+                server_default="OFF",
+            ),
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("monitored_paths") as batch_op:
+        batch_op.drop_column("watch_mode")
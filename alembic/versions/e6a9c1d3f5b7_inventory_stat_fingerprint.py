@@ -0,0 +1,35 @@
+"""Stat fingerprint (dev, inode, mtime_ns) for file_inventory
+
+Revision ID: e6a9c1d3f5b7
+Revises: d4f6a8c0e2b3
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a9c1d3f5b7'
+down_revision: Union[str, None] = 'd4f6a8c0e2b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FINGERPRINT_COLUMNS = ("file_dev", "file_inode", "file_mtime_ns")
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {col["name"] for col in inspector.get_columns("file_inventory")}
+    # Existing rows get their fingerprint on the next scan
+    for name in FINGERPRINT_COLUMNS:
+        if name not in columns:
+            op.add_column("file_inventory", sa.Column(name, sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("file_inventory") as batch_op:
+        for name in FINGERPRINT_COLUMNS:
+            batch_op.drop_column(name)
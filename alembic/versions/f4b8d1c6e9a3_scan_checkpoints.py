@@ -0,0 +1,50 @@
+"""Resumable scan checkpoints
+
+Revision ID: f4b8d1c6e9a3
+Revises: e3a7c9d5f2b8
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b8d1c6e9a3'
+down_revision: Union[str, None] = 'e3a7c9d5f2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {col["name"] for col in inspector.get_columns("monitored_paths")}
+    if "scan_generation" not in columns:
+        op.add_column(
+            "monitored_paths",
+            sa.Column("scan_generation", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+    if "scan_checkpoints" not in inspector.get_table_names():
+        op.create_table(
+            "scan_checkpoints",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("path_id", sa.Integer(), sa.ForeignKey("monitored_paths.id"), nullable=False),
+            sa.Column("scan_generation", sa.Integer(), nullable=False),
+            sa.Column("tier", sa.Enum("HOT", "COLD", name="storagetype"), nullable=False),
+            sa.Column("cursor", sa.JSON(), nullable=False),
+            sa.Column("entries_synced", sa.Integer(), nullable=False),
+            sa.Column("scan_started_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("checkpointed_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("resume_count", sa.Integer(), nullable=False),
+        )
+        op.create_index("ix_scan_checkpoints_id", "scan_checkpoints", ["id"])
+        op.create_index("ix_scan_checkpoints_path_id", "scan_checkpoints", ["path_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("scan_checkpoints")
+    with op.batch_alter_table("monitored_paths") as batch_op:
+        batch_op.drop_column("scan_generation")
@@ -0,0 +1,38 @@
+"""Unique (file_id, tag_id) index on file_tags
+
+Revision ID: f7c2e4a6b8d0
+Revises: e6a9c1d3f5b7
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c2e4a6b8d0'
+down_revision: Union[str, None] = 'e6a9c1d3f5b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "file_tags" not in set(inspector.get_table_names()):
+        return
+    if "idx_file_tag_unique" in {ix["name"] for ix in inspector.get_indexes("file_tags")}:
+        return
+
+    # Automatic tagging inserts with OR IGNORE, which relies on this index; keep the oldest
+    # of any duplicate pairs
+    op.execute(
+        "DELETE FROM file_tags WHERE id NOT IN "
+        "(SELECT MIN(id) FROM file_tags GROUP BY file_id, tag_id)"
+    )
+    op.create_index("idx_file_tag_unique", "file_tags", ["file_id", "tag_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_file_tag_unique", table_name="file_tags")
@@ -84,6 +84,109 @@ class Settings(BaseSettings):
     # FileRecord entries older than this will be automatically deleted
     stats_retention_days: int = 30
 
+    # Scanning
+    # Number of directories listed concurrently while walking a monitored path
+    # 1 walks sequentially; values of 4-16 hide round-trip latency on NFS/SMB mounts
+    # Per-path max_scan_threads caps this further for a single share
+    # Override via SCAN_WALKER_THREADS environment variable
+    scan_walker_threads: int = 1
+
+    # Watch mode (paths with watch_mode inotify/fanotify)
+    # Seconds a file must stay quiet before its changes are processed
+    # Override via WATCH_DEBOUNCE_SECONDS environment variable
+    watch_debounce_seconds: float = 2.0
+
+    # Longest a continuously changing file is held back before it is processed anyway
+    # Override via WATCH_MAX_DELAY_SECONDS environment variable
+    watch_max_delay_seconds: float = 30.0
+
+    # Pending changes above which the queue is dropped in favour of a full scan
+    # Override via WATCH_MAX_PENDING_CHANGES environment variable
+    watch_max_pending_changes: int = 100000
+
+    # I/O budgets shared by all paths on one device (0 = unlimited)
+    # Stats and directory listings per second issued by scans
+    # Override via IO_DEVICE_MAX_STATS_PER_SECOND environment variable
+    io_device_max_stats_per_second: float = 0
+
+    # MB per second read while hashing and copying files
+    # Override via IO_DEVICE_MAX_READ_MB_PER_SECOND environment variable
+    io_device_max_read_mb_per_second: float = 0
+
+    # Move operations running at once
+    # Override via IO_DEVICE_MAX_CONCURRENT_OPERATIONS environment variable
+    io_device_max_concurrent_operations: int = 0
+
+    # Slow down scans and moves when stat latency rises (the volume is busy with user I/O)
+    # Override via IO_ADAPTIVE_BACKOFF environment variable
+    io_adaptive_backoff: bool = True
+
+    # Stat latency below which adaptive back-off never engages
+    # Override via IO_BACKOFF_LATENCY_THRESHOLD_MS environment variable
+    io_backoff_latency_threshold_ms: float = 2.0
+
+    # Longest delay added to a single stat or read chunk while backing off
+    # Override via IO_MAX_BACKOFF_MS environment variable
+    io_max_backoff_ms: float = 50.0
+
+    # Scheduling priority of background scan and move threads
+    # "idle" or "best-effort" sets the Linux I/O class (ioprio_set); "none" leaves it alone
+    # Override via BACKGROUND_IO_PRIORITY environment variable
+    background_io_priority: str = "none"
+
+    # Niceness added to background scan and move threads (0 = unchanged)
+    # Override via BACKGROUND_NICE environment variable
+    background_nice: int = 0
+
+    # Re-read each copy made by a freeze or thaw to check it against the checksum taken
+    # while copying; disable to trust the write and read every byte only once
+    # Override via VERIFY_COPY_READ_BACK environment variable
+    verify_copy_read_back: bool = True
+
+    # Algorithm for new file checksums: sha256, blake2b, blake3 or xxh3 (the last two need
+    # the blake3 / xxhash packages; xxh3 is not cryptographic). Each checksum records its
+    # algorithm, and checks re-hash with that one, so it can be changed at any time
+    # Override via CHECKSUM_ALGORITHM environment variable
+    checksum_algorithm: str = "sha256"
+
+    # Files of at least this size get tree checksums (<algorithm>-tree): hashed as 64 MiB
+    # segments in parallel, with the segment digests kept to locate corruption and to
+    # verify resumed transfers. Peers must run a version that knows tree checksums.
+    # 0 disables
+    # Override via CHECKSUM_TREE_MIN_SIZE_MB environment variable
+    checksum_tree_min_size_mb: int = 0
+
+    # Threads hashing the segments of one tree checksum
+    # Override via CHECKSUM_TREE_WORKERS environment variable
+    checksum_tree_workers: int = 4
+
+    # Persistent cache of file checksums keyed by inode, size and mtime, so unchanged files
+    # are not hashed again by scans, freezes and remote transfers
+    # Override via CHECKSUM_CACHE_ENABLED environment variable
+    checksum_cache_enabled: bool = True
+
+    # Days after which cache entries that were not used are pruned
+    # Override via CHECKSUM_CACHE_MAX_AGE_DAYS environment variable
+    checksum_cache_max_age_days: int = 90
+
+    # Resumable scans
+    # Seconds between checkpoints of a running scan; 0 disables checkpointing
+    # Override via SCAN_CHECKPOINT_INTERVAL_SECONDS environment variable
+    scan_checkpoint_interval_seconds: float = 60.0
+
+    # Checkpoints older than this are discarded and the scan starts over
+    # Override via SCAN_CHECKPOINT_MAX_AGE_HOURS environment variable
+    scan_checkpoint_max_age_hours: float = 24.0
+
+    # Metadata enrichment
+    # Threads computing checksums of newly scanned files in the background; 0 disables them
+    # Override via METADATA_ENRICHMENT_WORKERS environment variable
+    metadata_enrichment_workers: int = 2
+
+    # Files of this size or larger are never hashed in the background
+    # Override via METADATA_ENRICHMENT_MAX_FILE_SIZE_MB environment variable
+    metadata_enrichment_max_file_size_mb: int = 1024
+
     # Remote Transfers
     # Timeout (in seconds) for establishing a connection to a remote instance
     # Override via REMOTE_TRANSFER_CONNECT_TIMEOUT environment variable
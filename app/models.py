@@ -12,6 +12,7 @@ from sqlalchemy import (
     Boolean,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -197,6 +198,14 @@ class ScanStatus(str, enum.Enum):
     PENDING = "pending"
 
 
+class WatchMode(str, enum.Enum):
+    """Change notification backends for monitored paths."""
+
+    OFF = "off"  # Scheduled scans only
+    INOTIFY = "inotify"  # Per-directory watches
+    FANOTIFY = "fanotify"  # Mount-wide mark; needs CAP_SYS_ADMIN, falls back to inotify
+
+
 class EncryptionStatus(str, enum.Enum):
     """Encryption status for cold storage locations."""
 
@@ -264,6 +273,37 @@ class MonitoredPath(Base):
         SQLEnum(ScanStatus), nullable=True
     )  # Status of the last scan (SUCCESS, FAILURE, PENDING)
     last_scan_error_log = Column(Text, nullable=True)  # Full error log from the last scan
+    incremental_scan = Column(
+        Boolean, default=False, nullable=False
+    )  # Only re-list directories whose snapshot changed since the last scan
+    full_scan_interval_hours = Column(
+        Integer, default=24, nullable=False
+    )  # Safety-net full scan interval when incremental scanning is enabled
+    last_full_scan_at = Column(DateTime(timezone=True), nullable=True)  # Last non-incremental scan
+    max_scan_threads = Column(
+        Integer, nullable=True
+    )  # Cap on concurrent directory listings for this path (None = global default)
+    exclude_patterns = Column(
+        JSON, nullable=False, server_default="[]"
+    )  # Gitignore-style patterns for files/directories the scan skips
+    io_max_stats_per_second = Column(
+        Integer, nullable=True
+    )  # Stats and directory listings per second for this path (None = unlimited)
+    io_max_read_mb_per_second = Column(
+        Float, nullable=True
+    )  # MB per second read while hashing and copying (None = unlimited)
+    io_max_concurrent_operations = Column(
+        Integer, nullable=True
+    )  # Move operations running at once for this path (None = unlimited)
+    watch_mode = Column(
+        SQLEnum(WatchMode),
+        default=WatchMode.OFF,
+        nullable=False,
+        server_default=sa.text("'OFF'"),
+    )  # React to filesystem events; scheduled scans become reconciliation
+    scan_generation = Column(
+        Integer, default=0, nullable=False, server_default="0"
+    )  # Incremented by every scan that starts from scratch (resumed scans keep theirs)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -275,6 +315,15 @@ class MonitoredPath(Base):
     storage_locations = relationship(
         "ColdStorageLocation", secondary=path_storage_location_association, back_populates="paths"
     )
+    directory_snapshots = relationship(
+        "DirectorySnapshot", back_populates="path", cascade="all, delete-orphan"
+    )
+    scan_checkpoint = relationship(
+        "ScanCheckpoint", back_populates="path", cascade="all, delete-orphan", uselist=False
+    )
+    scan_seen_ranges = relationship(
+        "ScanSeenRange", back_populates="path", cascade="all, delete-orphan"
+    )
 
     @property
     def cold_storage_path(self) -> str:
@@ -376,6 +425,13 @@ class FileInventory(Base):
     file_mtime = Column(DateTime(timezone=True), nullable=False, index=True)  # Indexed for sorting
     file_atime = Column(DateTime(timezone=True), nullable=True, index=True)  # Indexed for sorting
     file_ctime = Column(DateTime(timezone=True), nullable=True)  # File change/creation time
+    # Stat fingerprint (with file_size): a checksum stays valid while these are unchanged
+    file_dev = Column(Integer, nullable=True)
+    file_inode = Column(Integer, nullable=True)
+    file_mtime_ns = Column(Integer, nullable=True)
+    # "dev:inode" of a file scanned with several hard links; kept across freeze and thaw so
+    # the other links of the group can be recreated next to it
+    link_group = Column(String, nullable=True)
     checksum = Column(
         String, nullable=True, index=True
     )  # SHA256 hash for deduplication and verification
@@ -384,7 +440,10 @@ class FileInventory(Base):
     status = Column(SQLEnum(FileStatus), default=FileStatus.ACTIVE, index=True)
     last_seen = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True
-    )
+    )  # Last time the row was written; unchanged files are not rewritten by scans
+    seen_generation = Column(
+        Integer, nullable=True
+    )  # Scan generation that last wrote this row (see ScanSeenRange for unchanged rows)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     cold_storage_location_id = Column(
         Integer, ForeignKey("cold_storage_locations.id"), nullable=True, index=True
@@ -399,6 +458,10 @@ class FileInventory(Base):
         Index("idx_inventory_storage_status_lastseen", "storage_type", "status", "last_seen"),
         # Index for searching by file extension
         Index("idx_inventory_extension", "file_extension"),
+        # One row per file and path; also the conflict target of the scan upsert
+        Index("idx_inventory_path_file", "path_id", "file_path", unique=True),
+        # Finding the other links of a hard link group
+        Index("idx_inventory_link_group", "path_id", "link_group"),
         {"sqlite_autoincrement": True},  # For SQLite
     )
 
@@ -463,6 +526,127 @@ class FileTransactionHistory(Base):
     )
 
 
+class DirectorySnapshot(Base):
+    """Stat snapshot of a scanned directory, used to skip unchanged directories."""
+
+    __tablename__ = "directory_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    path_id = Column(Integer, ForeignKey("monitored_paths.id"), nullable=False, index=True)
+    dir_path = Column(String, nullable=False)  # Absolute path to the directory
+    parent_path = Column(String, nullable=True)  # None for scan roots
+    st_ino = Column(Integer, nullable=False)
+    mtime_ns = Column(Integer, nullable=False)
+    entry_count = Column(Integer, nullable=False, default=0)  # Entries seen when last listed
+    scanned_at_ns = Column(Integer, nullable=False)  # When the directory was last listed
+
+    __table_args__ = (
+        Index("idx_dir_snapshot_path_dir", "path_id", "dir_path", unique=True),
+        Index("idx_dir_snapshot_parent", "path_id", "parent_path"),
+    )
+
+    path = relationship("MonitoredPath", back_populates="directory_snapshots")
+
+
+class ScanCheckpoint(Base):
+    """Progress of an unfinished scan, so a restarted scan can continue where it stopped."""
+
+    __tablename__ = "scan_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    path_id = Column(
+        Integer, ForeignKey("monitored_paths.id"), nullable=False, unique=True, index=True
+    )
+    scan_generation = Column(Integer, nullable=False)  # Generation of the interrupted scan
+    tier = Column(SQLEnum(StorageType), nullable=False)  # Tier being walked
+    cursor = Column(JSON, nullable=False)  # {"pending": [...], "partial": [...]} directories
+    entries_synced = Column(Integer, nullable=False, default=0)  # Inventory entries synced
+    scan_started_at = Column(DateTime(timezone=True), nullable=False)
+    checkpointed_at = Column(DateTime(timezone=True), nullable=False)
+    resume_count = Column(Integer, nullable=False, default=0)  # Times the scan was resumed
+
+    path = relationship("MonitoredPath", back_populates="scan_checkpoint")
+
+
+class ScanSeenRange(Base):
+    """Run of consecutive inventory ids a scan found unchanged.
+
+    Scans do not rewrite unchanged rows; they record them here as id ranges instead, so
+    a file is live for a scan generation if its row carries that generation or its id
+    falls in one of the generation's ranges.
+    """
+
+    __tablename__ = "scan_seen_ranges"
+
+    id = Column(Integer, primary_key=True)
+    path_id = Column(Integer, ForeignKey("monitored_paths.id"), nullable=False)
+    scan_generation = Column(Integer, nullable=False)
+    first_id = Column(Integer, nullable=False)  # First file_inventory id of the run
+    last_id = Column(Integer, nullable=False)  # Last file_inventory id of the run (inclusive)
+
+    __table_args__ = (
+        # Finds the range that could contain an id with a single index seek
+        Index("idx_seen_range_lookup", "path_id", "scan_generation", "first_id"),
+    )
+
+    path = relationship("MonitoredPath", back_populates="scan_seen_ranges")
+
+
+class MetadataEnrichmentTask(Base):
+    """Inventory row waiting for its checksum to be computed in the background."""
+
+    __tablename__ = "metadata_enrichment_queue"
+
+    id = Column(Integer, primary_key=True)
+    inventory_id = Column(
+        Integer, ForeignKey(FILE_INVENTORY_ID_FK), nullable=False, unique=True
+    )  # One entry per inventory row
+    priority = Column(Integer, nullable=False, default=0)  # Higher values are hashed first
+    enqueued_at = Column(DateTime(timezone=True), server_default=func.now())
+    attempts = Column(Integer, nullable=False, default=0)  # Failed hashing attempts
+    last_error = Column(String, nullable=True)
+
+    __table_args__ = (
+        # Order in which workers claim entries
+        Index("idx_enrichment_queue_order", "priority", "id"),
+    )
+
+
+class ChecksumCacheEntry(Base):
+    """Checksum of a file's content, keyed by inode, shared by everything that hashes files.
+
+    One entry per inode and algorithm; it is only valid while the file still has the size
+    and mtime recorded here (see app.services.checksum_cache).
+    """
+
+    __tablename__ = "checksum_cache"
+
+    # Folded like FileInventory.file_dev/file_inode (see scan_records.stat_fingerprint)
+    file_dev = Column(Integer, primary_key=True)
+    file_inode = Column(Integer, primary_key=True)
+    algorithm = Column(String, primary_key=True)
+    file_size = Column(Integer, nullable=False)
+    file_mtime_ns = Column(Integer, nullable=False)
+    checksum = Column(String, nullable=False)  # Stored form, see hash_algorithms
+    last_used = Column(DateTime(timezone=True), nullable=False, index=True)  # For pruning
+
+
+class ChecksumSegments(Base):
+    """Segment digests of a tree checksum (see app.services.tree_hash).
+
+    Keyed by the checksum, so every file with that content shares the entry; used to name
+    the corrupt segments of a file that fails verification and to check the segments a
+    resumed transfer already sent.
+    """
+
+    __tablename__ = "checksum_segments"
+
+    checksum = Column(String, primary_key=True)  # Stored form, e.g. "sha256-tree:<root>"
+    segment_size = Column(Integer, nullable=False)
+    digests = Column(JSON, nullable=False)  # Hex digest of each segment, in file order
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)  # For pruning
+
+
 class PinnedFile(Base):
     """Files that are pinned (excluded from future scans)."""
 
@@ -10,7 +10,8 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import Criteria, CriterionType, MonitoredPath
 from app.schemas import Criteria as CriteriaSchema
-from app.schemas import CriteriaCreate, CriteriaUpdate
+from app.schemas import CriteriaCreate, CriteriaPreview, CriteriaPreviewRequest, CriteriaUpdate
+from app.services.criteria_preview import preview_criteria
 from app.utils.network_detection import check_atime_availability
 
 logger = logging.getLogger(__name__)
@@ -60,6 +61,26 @@ def create_criteria(path_id: int, criteria: CriteriaCreate, db: Session = Depend
     return db_criteria
 
 
+@router.post("/path/{path_id}/preview", response_model=CriteriaPreview)
+def preview_path_criteria(
+    path_id: int, preview: CriteriaPreviewRequest, db: Session = Depends(get_db)
+):
+    """
+    Preview what a candidate criteria set would freeze and thaw on a path.
+
+    Evaluated against the file inventory only, so nothing on disk is read; the result is as
+    current as the path's last scan.
+    """
+    path = db.query(MonitoredPath).filter(MonitoredPath.id == path_id).first()
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Path with id {path_id} not found"
+        )
+    # Transient criteria, never added to the session
+    candidates = [Criteria(**criterion.model_dump()) for criterion in preview.criteria]
+    return preview_criteria(db, path, candidates, sample_size=preview.sample_size)
+
+
 @router.get("/{criteria_id}", response_model=CriteriaSchema)
 def get_criteria(criteria_id: int, db: Session = Depends(get_db)):
     """Get a specific criterion."""
@@ -977,6 +977,14 @@ def backfill_metadata(
     return {"success": True, "message": "Metadata backfill completed", **result}
 
 
+@router.get("/metadata/queue")
+def get_metadata_queue_status(db: Session = Depends(get_db)):
+    """Depth of the background metadata enrichment queue and recent hash throughput."""
+    from app.services.metadata_enrichment import metadata_enrichment_queue
+
+    return metadata_enrichment_queue.status(db)
+
+
 # Bulk Operations Endpoints
 
 
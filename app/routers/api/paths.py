@@ -4,6 +4,7 @@
 import logging
 import os
 import shutil
+from datetime import timezone
 from pathlib import Path
 from typing import List, Optional, Tuple
 
@@ -14,7 +15,8 @@ from sqlalchemy.orm import Session, selectinload
 from app import schemas
 from app.database import get_db
 from app.models import ColdStorageLocation, CriterionType, FileInventory, MonitoredPath
-from app.services.scan_progress import scan_progress_manager
+from app.services.path_watcher import path_watch_manager
+from app.services.scan_progress import checkpoint_summary, scan_progress_manager
 from app.services.scheduler import scheduler_service
 from app.utils.indexing import IndexingManager
 from app.utils.network_detection import check_atime_availability
@@ -591,7 +593,7 @@ def get_scan_progress(path_id: int, db: Session = Depends(get_db)):
 
     if progress is None:
         # No active or recent scan - return idle state with path context
-        return {
+        idle = {
             "scan_id": None,
             "path_id": path_id,
             "path_name": path.name,
@@ -607,7 +609,24 @@ def get_scan_progress(path_id: int, db: Session = Depends(get_db)):
             },
             "current_operations": [],
             "errors": [],
+            "checkpoint": None,
         }
+        # An interrupted scan leaves a checkpoint that the next scan resumes from
+        checkpoint = path.scan_checkpoint
+        if checkpoint is not None:
+            checkpointed_at = checkpoint.checkpointed_at
+            if checkpointed_at.tzinfo is None:
+                checkpointed_at = checkpointed_at.replace(tzinfo=timezone.utc)
+            idle["checkpoint"] = {
+                **checkpoint_summary(
+                    checkpoint.scan_generation,
+                    checkpoint.resume_count,
+                    checkpointed_at.isoformat(),
+                ),
+                "tier": checkpoint.tier.value,
+                "entries_synced": checkpoint.entries_synced,
+            }
+        return idle
 
     # Add path name to progress response for better UX
     if isinstance(progress, dict):
@@ -616,6 +635,31 @@ def get_scan_progress(path_id: int, db: Session = Depends(get_db)):
     return progress
 
 
+@router.get("/{path_id}/watch")
+def get_watch_status(path_id: int, db: Session = Depends(get_db)):
+    """
+    Get the filesystem watch state of a path.
+
+    Returns the configured watch_mode and, while the path is watched, the active backend,
+    number of watches, subtrees left to scheduled scans because of the watch limit,
+    pending changes and event counters.
+    """
+    path = db.query(MonitoredPath).filter(MonitoredPath.id == path_id).first()
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Path with id {path_id} not found"
+        )
+
+    watch_status = path_watch_manager.status(path_id)
+    return {
+        "path_id": path_id,
+        "path_name": path.name,
+        "watch_mode": path.watch_mode.value if path.watch_mode else None,
+        "watching": watch_status is not None,
+        "status": watch_status,
+    }
+
+
 @router.get("/{path_id}/scan-errors", response_model=schemas.PathScanErrors)
 def get_scan_errors(path_id: int, db: Session = Depends(get_db)):
     """
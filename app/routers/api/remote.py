@@ -2,6 +2,7 @@
 import base64
 import json
 import logging
+import os
 from pathlib import Path
 from typing import List, Optional
 
@@ -53,6 +54,8 @@ from app.schemas import RemoteConnection as RemoteConnectionSchema
 from app.schemas import RemoteTransferJob as RemoteTransferJobSchema
 from app.schemas import StorageType as StorageTypeSchema
 from app.security import PermissionChecker, get_current_user
+from app.services import tree_hash
+from app.services.hash_algorithms import inner_algorithm, is_available, is_tree_algorithm
 from app.services.identity_service import identity_service
 from app.services.instance_config_service import instance_config_service
 from app.services.remote_connection_service import remote_connection_service
@@ -779,8 +782,10 @@ class ReceiveHeader:
         x_timestamp: str = Header(..., alias="X-Timestamp"),
         x_nonce: str = Header(..., alias="X-Nonce"),
         x_signature: str = Header(..., alias="X-Signature"),
+        x_chunk_offset: Optional[int] = Header(None, alias="X-Chunk-Offset"),
     ):
         self.chunk_index = x_chunk_index
+        self.chunk_offset = x_chunk_offset
         self.relative_path = x_relative_path
         self.remote_path_id = x_remote_path_id
         self.storage_type = x_storage_type
@@ -794,6 +799,25 @@ class ReceiveHeader:
         self.signature = x_signature
 
 
+def _write_chunk_at(path: Path, offset: int, data: bytes) -> bool:
+    """Write a chunk at offset, dropping anything past it; False if the file is shorter."""
+    if offset == 0:
+        with open(path, "wb") as f:
+            f.write(data)
+        return True
+    try:
+        f = open(path, "r+b")
+    except FileNotFoundError:
+        return False
+    with f:
+        if os.fstat(f.fileno()).st_size < offset:
+            return False
+        f.seek(offset)
+        f.truncate()
+        f.write(data)
+    return True
+
+
 @router.post("/receive", tags=["Remote Connections"])
 async def receive_chunk(
     request: Request,
@@ -890,9 +914,17 @@ async def receive_chunk(
         logger.error(f"Decompression failed for chunk {headers.chunk_index}: {e}")
         raise
 
-    mode = "ab" if headers.chunk_index > 0 else "wb"
-    async with aiofiles.open(tmp_path, mode) as f:
-        await f.write(decompressed_chunk)
+    if headers.chunk_offset is None:
+        mode = "ab" if headers.chunk_index > 0 else "wb"
+        async with aiofiles.open(tmp_path, mode) as f:
+            await f.write(decompressed_chunk)
+    # Senders name the offset, so a resume can overwrite a tail whose segments did not verify
+    elif not await anyio.to_thread.run_sync(
+        _write_chunk_at, tmp_path, headers.chunk_offset, decompressed_chunk
+    ):
+        raise HTTPException(
+            status_code=409, detail=f"Partial file does not reach offset {headers.chunk_offset}"
+        )
 
     logger.info(
         f"Successfully received chunk {headers.chunk_index} for job {headers.job_id} "
@@ -922,14 +954,22 @@ async def verify_transfer(
         # especially important for MOVE operations.
         logger.info(f"Verifying checksum for {found_tmp}...")
 
+        # Re-hash with the algorithm the sender recorded
+        from app.services.file_metadata import file_metadata_extractor
+        from app.services.hash_algorithms import checksum_algorithm
+
+        algorithm = checksum_algorithm(checksum)
+        if not is_available(algorithm):
+            raise HTTPException(
+                status_code=422, detail=f"Unsupported checksum algorithm: {algorithm}"
+            )
+
         # We rename it first so we hash the final file
         await anyio.to_thread.run_sync(found_tmp.rename, final_path)
 
         # Calculate local hash
-        from app.services.file_metadata import file_metadata_extractor
-
         local_hash = await anyio.to_thread.run_sync(
-            file_metadata_extractor.compute_sha256, final_path
+            file_metadata_extractor.compute_checksum, final_path, algorithm
         )
 
         if local_hash != checksum:
@@ -952,10 +992,16 @@ async def get_transfer_status(
     relative_path: str,
     remote_path_id: int,
     storage_type: str,
+    checksum_algorithm: Optional[str] = None,
     db: Session = Depends(get_db),
     remote_conn: RemoteConnection = Depends(verify_remote_signature),
 ):
-    """Check the status of a file transfer on the remote instance."""
+    """
+    Check the status of a file transfer on the remote instance.
+
+    With a tree checksum_algorithm, a partial transfer also reports the digests of its
+    complete segments, so the sender can resume after the last one it sent intact.
+    """
     _ = remote_conn
     path = db.query(MonitoredPath).filter(MonitoredPath.id == remote_path_id).first()
     if not path:
@@ -971,7 +1017,20 @@ async def get_transfer_status(
     tmp_path = final_path.with_suffix(final_path.suffix + ".fftmp")
     if await anyio.to_thread.run_sync(tmp_path.exists):
         stat = await anyio.to_thread.run_sync(tmp_path.stat)
-        return {"size": stat.st_size, "status": "partial"}
+        status = {"size": stat.st_size, "status": "partial"}
+        complete = stat.st_size // tree_hash.SEGMENT_SIZE
+        if (
+            complete
+            and checksum_algorithm
+            and is_tree_algorithm(checksum_algorithm)
+            and is_available(checksum_algorithm)
+        ):
+            _, status["segments"] = await anyio.to_thread.run_sync(
+                lambda: tree_hash.hash_segments(
+                    tmp_path, inner_algorithm(checksum_algorithm), range(complete)
+                )
+            )
+        return status
 
     return {"size": 0, "status": "not_found"}
 
@@ -1,9 +1,9 @@
 # ruff: noqa: B008
 """API routes for tag rule management."""
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -11,6 +11,7 @@ from app.models import Tag
 from app.models import TagRule as TagRuleModel
 from app.schemas import TagRule as TagRuleSchema
 from app.schemas import TagRuleCreate, TagRuleUpdate
+from app.services.tag_rule_jobs import RuleSpec, tag_rule_jobs
 
 router = APIRouter(prefix="/api/v1/tag-rules", tags=["tag-rules"])
 
@@ -45,9 +46,35 @@ def create_tag_rule(rule: TagRuleCreate, db: Session = Depends(get_db)):
     db.add(new_rule)
     db.commit()
     db.refresh(new_rule)
+
+    # Tag existing files in the background
+    tag_rule_jobs.submit_rule_change("create", None, RuleSpec.of(new_rule))
     return new_rule
 
 
+@router.get("/jobs")
+def list_retag_jobs(
+    rule_id: Optional[int] = Query(None, description="Only jobs for this rule"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """List recent re-tagging jobs with their progress, newest first."""
+    jobs = tag_rule_jobs.get_recent_jobs(limit=100)
+    if rule_id is not None:
+        jobs = [job for job in jobs if job["rule_id"] == rule_id]
+    return jobs[:limit]
+
+
+@router.get("/jobs/{job_id}")
+def get_retag_job(job_id: str):
+    """Get the progress of a re-tagging job."""
+    job = tag_rule_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Re-tagging job {job_id} not found"
+        )
+    return job
+
+
 @router.get("/{rule_id}", response_model=TagRuleSchema)
 def get_tag_rule(rule_id: int, db: Session = Depends(get_db)):
     """Get a specific tag rule by ID."""
@@ -68,12 +95,16 @@ def update_tag_rule(rule_id: int, rule_update: TagRuleUpdate, db: Session = Depe
             status_code=status.HTTP_404_NOT_FOUND, detail=f"Tag rule with ID {rule_id} not found"
         )
 
+    before = RuleSpec.of(rule)
     update_data = rule_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(rule, field, value)
 
     db.commit()
     db.refresh(rule)
+
+    # Re-tag only the files whose tags this edit changes, in the background
+    tag_rule_jobs.submit_rule_change("update", before, RuleSpec.of(rule))
     return rule
 
 
@@ -86,14 +117,24 @@ def delete_tag_rule(rule_id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND, detail=f"Tag rule with ID {rule_id} not found"
         )
 
+    before = RuleSpec.of(rule)
     db.delete(rule)
     db.commit()
 
+    # Remove the tags only this rule justified, in the background
+    tag_rule_jobs.submit_rule_change("delete", before, None)
+
 
 @router.post("/apply", status_code=status.HTTP_200_OK)
-def apply_tag_rules(db: Session = Depends(get_db)):
+def apply_tag_rules(
+    background: bool = Query(False, description="Run as a background job and return it"),
+    db: Session = Depends(get_db),
+):
     """Apply all enabled tag rules to all files in inventory."""
     from app.services.tag_rule_service import TagRuleService
 
+    if background:
+        return tag_rule_jobs.get_job(tag_rule_jobs.submit_apply_all())
+
     service = TagRuleService(db)
     return service.apply_all_rules()
@@ -24,6 +24,7 @@ from app.models import (
     TransferDirection,
     TransferMode,
     TransferStatus,
+    WatchMode,
 )
 
 
@@ -60,6 +61,56 @@ class Criteria(CriteriaBase):
         from_attributes = True
 
 
+class CriteriaPreviewRequest(BaseModel):
+    """Schema for previewing a candidate criteria set on a path."""
+
+    criteria: List[CriteriaCreate]
+    sample_size: int = Field(20, ge=0, le=500, description="Largest files listed per direction")
+
+
+class CriteriaPreviewExtension(BaseModel):
+    """Files and bytes that would move, for one file extension."""
+
+    extension: Optional[str] = None
+    file_count: int
+    total_bytes: int
+
+
+class CriteriaPreviewSample(BaseModel):
+    """A file that would move."""
+
+    file_path: str
+    file_size: int
+    file_mtime: Optional[datetime] = None
+
+
+class CriteriaPreviewGroup(BaseModel):
+    """Files that would move in one direction."""
+
+    file_count: int
+    total_bytes: int
+    by_extension: List[CriteriaPreviewExtension]
+    samples: List[CriteriaPreviewSample]
+
+
+class CriteriaPreview(BaseModel):
+    """Schema for a criteria preview computed from the inventory."""
+
+    path_id: int
+    evaluated_at: datetime
+    hot_file_count: int
+    hot_total_bytes: int
+    to_cold: CriteriaPreviewGroup
+    to_hot: CriteriaPreviewGroup
+    criteria_in_sql: int
+    criteria_streamed: int
+    rows_streamed: int
+    unevaluated_criteria: List[CriteriaBase] = Field(
+        default_factory=list, description="Criteria that need the files and were not applied"
+    )
+    elapsed_ms: float
+
+
 class ColdStorageLocationBase(BaseModel):
     """Base cold storage location schema."""
 
@@ -119,6 +170,14 @@ class ColdStorageLocationWithStats(ColdStorageLocation):
     path_count: int
 
 
+def _validate_exclude_patterns(patterns: List[str]) -> List[str]:
+    """Compile exclude patterns once so invalid rules are rejected up front."""
+    from app.services.exclude_rules import ExcludeMatcher
+
+    ExcludeMatcher(patterns)
+    return [p for p in (p.strip() for p in patterns) if p]
+
+
 class MonitoredPathBase(BaseModel):
     """Base monitored path schema."""
 
@@ -133,6 +192,21 @@ class MonitoredPathBase(BaseModel):
     error_message: Optional[str] = None  # Error state message
     last_scan_at: Optional[datetime] = None  # When the last scan finished
     last_scan_status: Optional[ScanStatus] = None  # Status of the last scan
+    incremental_scan: bool = False  # Skip directories unchanged since the last scan
+    full_scan_interval_hours: int = Field(24, ge=1)  # Safety-net full scan interval
+    last_full_scan_at: Optional[datetime] = None  # When the last full scan ran
+    max_scan_threads: Optional[int] = Field(None, ge=1)  # Cap on concurrent directory listings
+    exclude_patterns: List[str] = []  # Gitignore-style patterns skipped by scans
+    io_max_stats_per_second: Optional[int] = Field(None, ge=1)  # Scan stats/sec budget
+    io_max_read_mb_per_second: Optional[float] = Field(None, gt=0)  # Hash/copy read budget
+    io_max_concurrent_operations: Optional[int] = Field(None, ge=1)  # Concurrent moves
+    watch_mode: WatchMode = WatchMode.OFF  # React to filesystem events between scans
+
+    @validator("exclude_patterns")
+    @classmethod
+    def validate_exclude_patterns(cls, v):
+        """Ensure exclude patterns compile."""
+        return _validate_exclude_patterns(v)
 
 
 class MonitoredPathCreate(MonitoredPathBase):
@@ -152,10 +226,24 @@ class MonitoredPathUpdate(BaseModel):
     check_interval_seconds: Optional[int] = Field(None, ge=60)
     enabled: Optional[bool] = None
     prevent_indexing: Optional[bool] = None
+    incremental_scan: Optional[bool] = None
+    full_scan_interval_hours: Optional[int] = Field(None, ge=1)
+    max_scan_threads: Optional[int] = Field(None, ge=1)
+    exclude_patterns: Optional[List[str]] = None
+    io_max_stats_per_second: Optional[int] = Field(None, ge=1)
+    io_max_read_mb_per_second: Optional[float] = Field(None, gt=0)
+    io_max_concurrent_operations: Optional[int] = Field(None, ge=1)
+    watch_mode: Optional[WatchMode] = None
     storage_location_ids: Optional[List[int]] = Field(
         None, min_items=1, description="List of cold storage location IDs"
     )
 
+    @validator("exclude_patterns")
+    @classmethod
+    def validate_exclude_patterns(cls, v):
+        """Ensure exclude patterns compile."""
+        return _validate_exclude_patterns(v) if v is not None else v
+
 
 class MonitoredPath(MonitoredPathBase):
     """Schema for monitored path response."""
@@ -114,8 +114,19 @@ class AuditTrailService:
         success: bool = True,
         error_message: Optional[str] = None,
         initiated_by: Optional[str] = None,
+        copy_strategy: Optional[str] = None,
     ) -> FileTransactionHistory:
-        """Convenience method to log a freeze operation (hot → cold)."""
+        """Convenience method to log a freeze operation (hot → cold).
+
+        ``copy_strategy`` names how the data was copied (see copy_engine), if it was.
+        """
+        operation_metadata = {
+            "source_path": str(source_path),
+            "dest_path": str(dest_path),
+            "storage_location_id": storage_location_id,
+        }
+        if copy_strategy:
+            operation_metadata["copy_strategy"] = copy_strategy
         return AuditTrailService.log_transaction(
             db=db,
             file=file,
@@ -127,11 +138,7 @@ class AuditTrailService:
             new_storage_location_id=storage_location_id,
             checksum_before=checksum_before,
             checksum_after=checksum_after,
-            operation_metadata={
-                "source_path": str(source_path),
-                "dest_path": str(dest_path),
-                "storage_location_id": storage_location_id,
-            },
+            operation_metadata=operation_metadata,
             success=success,
             error_message=error_message,
             initiated_by=initiated_by,
@@ -148,8 +155,18 @@ class AuditTrailService:
         success: bool = True,
         error_message: Optional[str] = None,
         initiated_by: Optional[str] = None,
+        copy_strategy: Optional[str] = None,
     ) -> FileTransactionHistory:
-        """Convenience method to log a thaw operation (cold → hot)."""
+        """Convenience method to log a thaw operation (cold → hot).
+
+        ``copy_strategy`` names how the data was copied (see copy_engine), if it was.
+        """
+        operation_metadata = {
+            "source_path": str(source_path),
+            "dest_path": str(dest_path),
+        }
+        if copy_strategy:
+            operation_metadata["copy_strategy"] = copy_strategy
         return AuditTrailService.log_transaction(
             db=db,
             file=file,
@@ -160,10 +177,7 @@ class AuditTrailService:
             new_path=str(dest_path),
             checksum_before=checksum_before,
             checksum_after=checksum_after,
-            operation_metadata={
-                "source_path": str(source_path),
-                "dest_path": str(dest_path),
-            },
+            operation_metadata=operation_metadata,
             success=success,
             error_message=error_message,
             initiated_by=initiated_by,
@@ -0,0 +1,214 @@
+"""Persistent checksum cache keyed by file identity: inode, size, mtime and algorithm."""
+
+import logging
+import os
+import stat
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import engine
+from app.models import ChecksumCacheEntry
+from app.services.scan_records import stat_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Separate session factory: lookups happen on hashing threads, outside any request
+CacheSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class ChecksumCache:
+    """
+    Checksums of file content, kept across restarts in the checksum_cache table.
+
+    Metadata enrichment, freeze verification, remote transfer jobs and the receiving end of
+    a transfer all hash files; a file whose device, inode, size and mtime are unchanged is
+    hashed once per algorithm and then served from here. An entry whose file changed is
+    deleted when it is next looked up, and entries not used for CHECKSUM_CACHE_MAX_AGE_DAYS
+    are pruned by the daily cleanup. The cache is best effort: database errors count as
+    misses and are never raised to the hashing caller.
+    Use the module-level `checksum_cache` instance.
+    """
+
+    # Smaller files are cheaper to hash than to look up
+    MIN_FILE_SIZE = 64 * 1024
+    # A hit refreshes the entry's last_used at most this often
+    TOUCH_INTERVAL = timedelta(days=1)
+
+    def __init__(self, session_factory: Callable[[], Session] = CacheSessionLocal):
+        """
+        Args:
+            session_factory: Creates the sessions used for lookups and stores
+        """
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0  # Entries dropped because their file changed
+        self.stored = 0
+        self.errors = 0
+
+    @staticmethod
+    def enabled() -> bool:
+        return settings.checksum_cache_enabled
+
+    def _count(self, **counts: int) -> None:
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def lookup(self, stat_result: os.stat_result, algorithm: str) -> Optional[str]:
+        """The cached checksum of the file stat_result describes, if it is still valid."""
+        dev, ino, size, mtime_ns = stat_fingerprint(stat_result)
+        now = datetime.now(timezone.utc)
+        checksum = None
+        stale = False
+        db = self.session_factory()
+        try:
+            entry = db.get(ChecksumCacheEntry, (dev, ino, algorithm))
+            if entry is not None and (entry.file_size, entry.file_mtime_ns) != (size, mtime_ns):
+                db.delete(entry)
+                db.commit()
+                stale = True
+            elif entry is not None:
+                checksum = entry.checksum
+                if _utc(entry.last_used) < now - self.TOUCH_INTERVAL:
+                    entry.last_used = now
+                    db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.debug(f"Checksum cache lookup failed: {e}")
+            self._count(errors=1, misses=1)
+            return None
+        finally:
+            db.close()
+        if checksum is None:
+            self._count(misses=1, invalidated=int(stale))
+        else:
+            self._count(hits=1)
+        return checksum
+
+    def store(self, stat_result: os.stat_result, algorithm: str, checksum: str) -> None:
+        """Record the checksum of the file stat_result describes."""
+        dev, ino, size, mtime_ns = stat_fingerprint(stat_result)
+        stmt = sqlite_insert(ChecksumCacheEntry).values(
+            file_dev=dev,
+            file_inode=ino,
+            algorithm=algorithm,
+            file_size=size,
+            file_mtime_ns=mtime_ns,
+            checksum=checksum,
+            last_used=datetime.now(timezone.utc),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["file_dev", "file_inode", "algorithm"],
+            set_={
+                "file_size": stmt.excluded.file_size,
+                "file_mtime_ns": stmt.excluded.file_mtime_ns,
+                "checksum": stmt.excluded.checksum,
+                "last_used": stmt.excluded.last_used,
+            },
+        )
+        db = self.session_factory()
+        try:
+            db.execute(stmt)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.debug(f"Checksum cache store failed: {e}")
+            self._count(errors=1)
+            return
+        finally:
+            db.close()
+        self._count(stored=1)
+
+    def store_path(self, file_path: Path, algorithm: str, checksum: str) -> None:
+        """Record the checksum of a file just verified, e.g. a finished copy."""
+        if not self.enabled():
+            return
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return
+        if stat.S_ISREG(stat_result.st_mode) and stat_result.st_size >= self.MIN_FILE_SIZE:
+            self.store(stat_result, algorithm, checksum)
+
+    def get_or_compute(
+        self,
+        file_path: Path,
+        algorithm: str,
+        compute: Callable[[], Optional[str]],
+    ) -> Optional[str]:
+        """
+        The checksum of file_path: from the cache, or from compute() and then cached.
+
+        A computed checksum is only cached if the file's fingerprint did not change while
+        it was being read.
+        """
+        if not self.enabled():
+            return compute()
+        try:
+            before = os.stat(file_path)
+        except OSError:
+            return compute()
+        if not stat.S_ISREG(before.st_mode) or before.st_size < self.MIN_FILE_SIZE:
+            return compute()
+
+        cached = self.lookup(before, algorithm)
+        if cached is not None:
+            return cached
+        checksum = compute()
+        if checksum is not None:
+            try:
+                after = os.stat(file_path)
+            except OSError:
+                return checksum
+            if stat_fingerprint(after) == stat_fingerprint(before):
+                self.store(after, algorithm, checksum)
+        return checksum
+
+    def prune(self, db: Session, max_age_days: Optional[int] = None) -> int:
+        """Delete entries not used for max_age_days (CHECKSUM_CACHE_MAX_AGE_DAYS)."""
+        if max_age_days is None:
+            max_age_days = settings.checksum_cache_max_age_days
+        cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+        deleted = (
+            db.query(ChecksumCacheEntry)
+            .filter(ChecksumCacheEntry.last_used < cutoff)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+    def stats(self, db: Optional[Session] = None) -> dict:
+        """Hit rate and counters since startup, plus the number of entries if db is given."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            result = {
+                "enabled": self.enabled(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidated": self.invalidated,
+                "stored": self.stored,
+                "errors": self.errors,
+            }
+        if db is not None:
+            result["entries"] = db.query(func.count()).select_from(ChecksumCacheEntry).scalar()
+        return result
+
+
+# Global singleton instance
+checksum_cache = ChecksumCache()
@@ -1,12 +1,22 @@
 """Checksum verification service - calculates and verifies file checksums."""
 
-import hashlib
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from app.config import settings
+from app.services import tree_hash
+from app.services.checksum_cache import checksum_cache
+from app.services.hash_algorithms import (
+    algorithm_for_size,
+    checksum_algorithm,
+    configured_algorithm,
+    format_checksum,
+    is_tree_algorithm,
+    new_hash,
+)
+from app.services.io_budget import current_budget
 
 logger = logging.getLogger(__name__)
 
@@ -15,32 +25,69 @@ class ChecksumVerifier:
     """Service for calculating and verifying file checksums."""
 
     @staticmethod
-    def calculate_checksum(file_path: Path, algorithm: str = "sha256") -> Optional[str]:
+    def calculate_checksum(
+        file_path: Path, algorithm: Optional[str] = None, use_cache: bool = True
+    ) -> Optional[str]:
         """
-        Calculate SHA256 checksum of a file.
+        Calculate checksum of a file.
 
         Args:
             file_path: Path to the file
-            algorithm: Hash algorithm to use (sha256, sha512, md5)
+            algorithm: Hash algorithm to use (sha256, blake2b, blake3, xxh3, ...);
+                defaults to CHECKSUM_ALGORITHM, in tree form for files of at least
+                CHECKSUM_TREE_MIN_SIZE_MB
+            use_cache: Take the checksum of an unchanged file from the checksum cache;
+                False always reads the file (for checks of the stored bytes)
 
         Returns:
-            Hex-encoded checksum as string, or None if calculation fails
+            Checksum in stored form (see hash_algorithms), or None if calculation fails
         """
-        try:
-            hash_func = hashlib.new(algorithm)
-            chunk_size = 65536  # 64KB chunks for memory efficiency
+        algorithm = algorithm or ChecksumVerifier._default_algorithm(file_path)
+        if not use_cache:
+            return ChecksumVerifier._hash_file(file_path, algorithm)
+        return checksum_cache.get_or_compute(
+            Path(file_path), algorithm, lambda: ChecksumVerifier._hash_file(file_path, algorithm)
+        )
 
-            with Path(file_path).open("rb") as f:
-                while chunk := f.read(chunk_size):
-                    hash_func.update(chunk)
+    @staticmethod
+    def _default_algorithm(file_path: Path) -> str:
+        try:
+            return algorithm_for_size(Path(file_path).stat().st_size)
+        except OSError:
+            return configured_algorithm()
 
-            checksum = hash_func.hexdigest()
+    @staticmethod
+    def _hash_file(file_path: Path, algorithm: str) -> Optional[str]:
+        try:
+            budget = current_budget()
+
+            if is_tree_algorithm(algorithm):
+                # Segments are hashed on worker threads, which do not see the context's budget
+                checksum, digests = tree_hash.hash_file(
+                    Path(file_path), algorithm, budget.read if budget is not None else None
+                )
+                tree_hash.segment_store.save(checksum, digests)
+            else:
+                hash_func = new_hash(algorithm)
+                chunk_size = 65536  # 64KB chunks for memory efficiency
+
+                with Path(file_path).open("rb") as f:
+                    while chunk := f.read(chunk_size):
+                        if budget is not None:
+                            budget.read(len(chunk))
+                        hash_func.update(chunk)
+
+                checksum = format_checksum(algorithm, hash_func.hexdigest())
             logger.debug(f"Calculated {algorithm} checksum for {file_path}: {checksum[:16]}...")
             return checksum
 
         except OSError as e:
             logger.warning(f"Failed to calculate checksum for {file_path}: {e}")
             return None
+        except ValueError as e:
+            # Unknown algorithm or missing optional package
+            logger.error(f"Cannot calculate checksum for {file_path}: {e}")
+            return None
         except Exception as e:
             logger.error(
                 f"Unexpected error calculating checksum for {file_path}: {e}", exc_info=True
@@ -48,19 +95,26 @@ class ChecksumVerifier:
             return None
 
     @staticmethod
-    def verify_checksum(file_path: Path, expected_checksum: str, algorithm: str = "sha256") -> bool:
+    def verify_checksum(
+        file_path: Path, expected_checksum: str, algorithm: Optional[str] = None
+    ) -> bool:
         """
-        Verify file checksum matches expected value.
+        Verify file checksum matches expected value. The file is always read; the
+        checksum cache is not consulted.
 
         Args:
             file_path: Path to the file
             expected_checksum: Expected checksum value
-            algorithm: Hash algorithm to use
+            algorithm: Hash algorithm to use; defaults to the one the expected checksum
+                records
 
         Returns:
             True if checksums match, False otherwise
         """
-        actual_checksum = ChecksumVerifier.calculate_checksum(file_path, algorithm)
+        algorithm = algorithm or checksum_algorithm(expected_checksum)
+        actual_checksum = ChecksumVerifier.calculate_checksum(
+            file_path, algorithm, use_cache=False
+        )
         if actual_checksum is None:
             return False
 
@@ -69,15 +123,40 @@ class ChecksumVerifier:
             logger.warning(
                 f"Checksum mismatch for {file_path}: expected {expected_checksum[:16]}..., got {actual_checksum[:16]}..."
             )
+            corrupt = ChecksumVerifier.find_corrupt_segments(file_path, expected_checksum)
+            if corrupt:
+                logger.warning(
+                    f"Corrupt segments of {file_path} ({tree_hash.SEGMENT_SIZE} bytes each): "
+                    f"{corrupt}"
+                )
         else:
             logger.debug(f"Checksum verified for {file_path}: {actual_checksum[:16]}...")
 
         return matches
 
+    @staticmethod
+    def find_corrupt_segments(file_path: Path, expected_checksum: str) -> Optional[List[int]]:
+        """
+        Indices of the segments of a file that differ from a tree checksum's.
+
+        Args:
+            file_path: Path to the file
+            expected_checksum: Tree checksum the file should have
+
+        Returns:
+            Segment indices, or None if the checksum is not a tree checksum, its segment
+            digests are not stored, or the file cannot be read
+        """
+        try:
+            return tree_hash.corrupt_segments(Path(file_path), expected_checksum)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to check segments of {file_path}: {e}")
+            return None
+
     @staticmethod
     def verify_file_integrity(source_path: Path, dest_path: Path) -> bool:
         """
-        Verify source and destination files have identical checksums.
+        Verify source and destination files have identical checksums, reading both.
 
         Args:
             source_path: Source file path
@@ -86,12 +165,14 @@ class ChecksumVerifier:
         Returns:
             True if checksums match, False otherwise
         """
-        source_checksum = ChecksumVerifier.calculate_checksum(source_path)
+        source_checksum = ChecksumVerifier.calculate_checksum(source_path, use_cache=False)
         if source_checksum is None:
             logger.error(f"Failed to calculate source checksum for {source_path}")
             return False
 
-        dest_checksum = ChecksumVerifier.calculate_checksum(dest_path)
+        dest_checksum = ChecksumVerifier.calculate_checksum(
+            dest_path, checksum_algorithm(source_checksum), use_cache=False
+        )
         if dest_checksum is None:
             logger.error(f"Failed to calculate destination checksum for {dest_path}")
             return False
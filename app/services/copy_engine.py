@@ -0,0 +1,236 @@
+"""Copy strategies for file data: reflink, copy_file_range, sendfile and a read loop."""
+
+import contextlib
+import errno
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+REFLINK = "reflink"
+COPY_FILE_RANGE = "copy_file_range"
+SENDFILE = "sendfile"
+READ_LOOP = "read_loop"
+
+# Fastest first; each one that is unsupported for a pair of files hands over to the next
+STRATEGIES = (REFLINK, COPY_FILE_RANGE, SENDFILE, READ_LOOP)
+
+# ioctl(2) request cloning a whole file on btrfs, XFS and other reflink filesystems
+FICLONE = 0x40049409
+
+# Bytes per kernel copy call, and so per progress report and I/O budget charge
+KERNEL_CHUNK_SIZE = 8 * 1024 * 1024
+# Buffer of the read loop
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Errors meaning "this strategy does not work for these files", not "the copy failed"
+_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EBADF,
+    errno.EPERM,
+}
+
+_thread_state = threading.local()
+
+
+@dataclass
+class CopyRecord:
+    """Strategy and size of the copies made while a record is active."""
+
+    strategy: Optional[str] = None
+    bytes_copied: int = 0
+
+
+class CopyStrategyStats:
+    """Files and bytes copied per strategy since startup."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files: Dict[str, int] = {}
+        self._bytes: Dict[str, int] = {}
+
+    def add(self, strategy: str, nbytes: int) -> None:
+        with self._lock:
+            self._files[strategy] = self._files.get(strategy, 0) + 1
+            self._bytes[strategy] = self._bytes.get(strategy, 0) + nbytes
+
+    def as_dict(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                name: {"files": self._files[name], "bytes": self._bytes[name]}
+                for name in self._files
+            }
+
+
+copy_strategy_stats = CopyStrategyStats()
+
+
+@contextlib.contextmanager
+def recording_copies() -> Iterator[CopyRecord]:
+    """Record the strategy of copies made on this thread inside the block."""
+    record = CopyRecord()
+    previous = getattr(_thread_state, "record", None)
+    _thread_state.record = record
+    try:
+        yield record
+    finally:
+        _thread_state.record = previous
+
+
+def note_copy(strategy: str, nbytes: int) -> None:
+    """Count a finished copy and record its strategy on the active record, if any."""
+    copy_strategy_stats.add(strategy, nbytes)
+    record = getattr(_thread_state, "record", None)
+    if record is not None:
+        record.strategy = strategy
+        record.bytes_copied += nbytes
+
+
+def available_strategies() -> Sequence[str]:
+    """Strategies this platform can attempt at all."""
+    names = []
+    if fcntl is not None and sys.platform.startswith("linux"):
+        names.append(REFLINK)
+    if hasattr(os, "copy_file_range"):
+        names.append(COPY_FILE_RANGE)
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        names.append(SENDFILE)
+    names.append(READ_LOOP)
+    return names
+
+
+def _reflink(src: BinaryIO, dst: BinaryIO, offset: int, size: int) -> Iterator[int]:
+    if offset or fcntl is None:
+        raise OSError(errno.EINVAL, "Reflink copies whole files only")
+    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    yield size
+
+
+def _copy_file_range(src: BinaryIO, dst: BinaryIO, offset: int, size: int) -> Iterator[int]:
+    while offset < size:
+        n = os.copy_file_range(
+            src.fileno(), dst.fileno(), min(KERNEL_CHUNK_SIZE, size - offset), offset, offset
+        )
+        if n == 0:
+            return
+        offset += n
+        yield n
+
+
+def _sendfile(src: BinaryIO, dst: BinaryIO, offset: int, size: int) -> Iterator[int]:
+    # sendfile writes at the destination's file position
+    os.lseek(dst.fileno(), offset, os.SEEK_SET)
+    while offset < size:
+        n = os.sendfile(dst.fileno(), src.fileno(), offset, min(KERNEL_CHUNK_SIZE, size - offset))
+        if n == 0:
+            return
+        offset += n
+        yield n
+
+
+def _read_loop(
+    src: BinaryIO,
+    dst: BinaryIO,
+    offset: int,
+    size: int,
+    hash_update: Optional[Callable[[memoryview], None]] = None,
+) -> Iterator[int]:
+    buffer = bytearray(READ_BUFFER_SIZE)
+    view = memoryview(buffer)
+    src.seek(offset)
+    dst.seek(offset)
+    while True:
+        n = src.readinto(buffer)
+        if not n:
+            return
+        chunk = view[:n]
+        if hash_update is not None:
+            hash_update(chunk)
+        written = 0
+        while written < n:
+            written += dst.write(chunk[written:])
+        yield n
+
+
+_COPIERS = {
+    REFLINK: _reflink,
+    COPY_FILE_RANGE: _copy_file_range,
+    SENDFILE: _sendfile,
+}
+
+
+def copy_file_data(
+    src: BinaryIO,
+    dst: BinaryIO,
+    size: int,
+    on_read: Optional[Callable[[int], None]] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+    hash_update: Optional[Callable[[memoryview], None]] = None,
+    strategies: Optional[Sequence[str]] = None,
+) -> str:
+    """
+    Copy ``size`` bytes between two unbuffered files with the fastest strategy that works.
+
+    Strategies are tried in order. One that turns out unsupported for these files, or
+    stops short, hands over to the next at the offset reached. The read loop comes last
+    and always finishes the copy. Returns the name of the strategy that copied the data.
+
+    ``on_read(n)`` is called for every chunk the copy reads from the source (for I/O
+    budgets); a reflink reads nothing. ``on_progress(total)`` reports the bytes copied so
+    far. ``hash_update`` receives the source data: kernel copies never pass it through
+    userspace, so with it the data is either reflinked and then read once for the hash,
+    or copied by the read loop.
+    """
+    names = list(strategies or available_strategies())
+    if hash_update is not None:
+        names = [n for n in names if n in (REFLINK, READ_LOOP)]
+    if READ_LOOP not in names:
+        names.append(READ_LOOP)
+
+    offset = 0
+    for name in names:
+        if name == READ_LOOP:
+            chunks = _read_loop(src, dst, offset, size, hash_update)
+        else:
+            chunks = _COPIERS[name](src, dst, offset, size)
+        try:
+            for n in chunks:
+                offset += n
+                if on_read is not None and name != REFLINK:
+                    on_read(n)
+                if on_progress is not None:
+                    on_progress(offset)
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+            continue
+        if name == READ_LOOP or offset >= size:
+            if name == REFLINK and hash_update is not None:
+                _hash_source(src, size, on_read, hash_update)
+            return name
+    return READ_LOOP  # pragma: no cover - the read loop always returns above
+
+
+def _hash_source(
+    src: BinaryIO,
+    size: int,
+    on_read: Optional[Callable[[int], None]],
+    hash_update: Callable[[memoryview], None],
+) -> None:
+    buffer = bytearray(READ_BUFFER_SIZE)
+    view = memoryview(buffer)
+    src.seek(0)
+    while n := src.readinto(buffer):
+        if on_read is not None:
+            on_read(n)
+        hash_update(view[:n])
@@ -0,0 +1,455 @@
+"""Criteria compiler - turns a path's criteria into one predicate per scan."""
+
+import fnmatch
+import logging
+import operator as op
+import os
+import platform
+import re
+import stat
+import time
+from array import array
+from itertools import compress, repeat
+from pathlib import Path
+from typing import Callable, ClassVar, Dict, Iterable, List, Optional, Sequence
+
+from app.models import Criteria, CriterionType, Operator
+from app.services.criteria_matcher import CriteriaMatcher
+
+logger = logging.getLogger(__name__)
+
+# Test for one criterion: (file_path, stat_info) -> bool
+CriterionTest = Callable[[Path, os.stat_result], bool]
+# Column test for one criterion: column values -> mask (iterable of bools)
+ColumnTest = Callable[[Iterable], Iterable[bool]]
+
+_COMPARISONS = {
+    Operator.GT: op.gt,
+    Operator.LT: op.lt,
+    Operator.EQ: op.eq,
+    Operator.GTE: op.ge,
+    Operator.LTE: op.le,
+}
+
+# Relative cost of evaluating a criterion; cheaper tests run first
+COST_STAT = 0  # arithmetic on the stat result
+COST_NAME = 1  # string comparison on the file name
+COST_PATTERN = 2  # glob or regex on the file name
+COST_SYSCALL = 3  # extra filesystem call (TYPE)
+COST_SUBPROCESS = 4  # macOS Last Open lookup (ATIME on Darwin)
+
+
+def _never(file_path: Path, stat_info: os.stat_result) -> bool:
+    return False
+
+
+def _never_column(values: Iterable) -> Iterable[bool]:
+    return repeat(False)
+
+
+class StatBatch:
+    """
+    Stat results of a batch of files, with the numeric fields as columns.
+
+    Columns are built on first use, as ``array`` columns: ``st_size`` as signed 64-bit
+    integers and the timestamps as doubles, which hold the stat values exactly.
+    """
+
+    _TYPECODES: ClassVar[Dict[str, str]] = {"st_size": "q", "st_mtime": "d", "st_atime": "d", "st_ctime": "d"}
+
+    def __init__(self, file_paths: Sequence[Path], stats: Sequence[os.stat_result]):
+        """
+        Build a batch.
+
+        Args:
+            file_paths: Paths the criteria see (name criteria match these)
+            stats: Stat result for each path, in the same order
+        """
+        if len(file_paths) != len(stats):
+            msg = "file_paths and stats must have the same length"
+            raise ValueError(msg)
+        self.file_paths = file_paths
+        self.stats = stats
+        self._columns = {}
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    def column(self, field: str) -> array:
+        """Column of one stat field (st_size, st_mtime, st_atime or st_ctime)."""
+        values = self._columns.get(field)
+        if values is None:
+            values = array(self._TYPECODES[field], map(op.attrgetter(field), self.stats))
+            self._columns[field] = values
+        return values
+
+
+class _CompiledCriterion:
+    """One criterion with its resolved test, cost and observed rejection rate."""
+
+    __slots__ = (
+        "criterion_id",
+        "position",
+        "cost",
+        "test",
+        "field",
+        "column_test",
+        "evaluated",
+        "rejected",
+    )
+
+    def __init__(self, criterion_id: int, position: int, cost: int, test: CriterionTest):
+        self.criterion_id = criterion_id
+        self.position = position
+        self.cost = cost
+        self.test = test
+        # Stat field and column test, for criteria that batches evaluate column-wise
+        self.field: Optional[str] = None
+        self.column_test: Optional[ColumnTest] = None
+        self.evaluated = 0
+        self.rejected = 0
+
+    def order_key(self):
+        # Cheapest first; within a cost class, the test that rejects most files first
+        rejection_rate = self.rejected / self.evaluated if self.evaluated else 0.0
+        return (self.cost, -rejection_rate, self.position)
+
+
+class CompiledCriteria:
+    """
+    A path's enabled criteria compiled for one scan.
+
+    Values are parsed once: sizes and minutes become numbers, name patterns are compiled,
+    user and group names are resolved to ids, and "now" is frozen when the plan is built.
+    Criteria run cheapest first. The first ``CALIBRATION_FILES`` files also count how often
+    each criterion rejects; after that the order within each cost class is fixed to the
+    most selective first. Results match ``CriteriaMatcher.match_file``, including the order
+    of the matched criteria ids.
+
+    ``match_batch`` evaluates a whole ``StatBatch`` at once: time and size criteria become
+    masks over the stat columns, computed with ``map`` over the ``operator`` functions so
+    the loop runs in C, and the remaining criteria run per file on the files that are left.
+    """
+
+    # Files evaluated with rejection counting before the criteria order is fixed
+    CALIBRATION_FILES = 2048
+
+    def __init__(self, criteria: Sequence[Criteria], now: Optional[float] = None):
+        """
+        Compile criteria.
+
+        Args:
+            criteria: Criteria of the path; disabled ones are ignored
+            now: Unix time that file ages are measured against (default: time.time())
+        """
+        self.now = time.time() if now is None else now
+        enabled = [c for c in criteria if c.enabled]
+        self.matched_ids: List[int] = [c.id for c in enabled]
+        is_darwin = platform.system() == "Darwin"
+        self._compiled = []
+        for position, c in enumerate(enabled):
+            entry = _CompiledCriterion(c.id, position, *self._compile(c, self.now, is_darwin))
+            column = self._compile_column(c, self.now, is_darwin)
+            if column is not None:
+                entry.field, entry.column_test = column
+            self._compiled.append(entry)
+        self._compiled.sort(key=_CompiledCriterion.order_key)
+        self._tests = [entry.test for entry in self._compiled]
+        self._calibrating = len(self._compiled) > 1
+        self._files_seen = 0
+
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+    def order(self) -> List[int]:
+        """Criteria ids in evaluation order."""
+        return [entry.criterion_id for entry in self._compiled]
+
+    def matches(self, file_path: Path, stat_info: os.stat_result) -> bool:
+        """Whether all criteria match the file."""
+        if self._calibrating:
+            return self._matches_calibrating(file_path, stat_info)
+        for test in self._tests:
+            if not test(file_path, stat_info):
+                return False
+        return True
+
+    def match_file(
+        self,
+        file_path: Path,
+        actual_file_path: Optional[Path] = None,
+        stat_info: Optional[os.stat_result] = None,
+    ) -> tuple[bool, List[int]]:
+        """Compiled equivalent of ``CriteriaMatcher.match_file`` for these criteria."""
+        if not self._compiled:
+            return True, []
+        try:
+            if stat_info is None:
+                stat_info = (actual_file_path or file_path).stat()
+        except OSError as e:
+            logger.debug(f"File {file_path}: Cannot stat - {e}")
+            return False, []
+        if self.matches(file_path, stat_info):
+            return True, list(self.matched_ids)
+        return False, []
+
+    def match_batch(self, batch: StatBatch) -> List[bool]:
+        """
+        Evaluate every file of a batch.
+
+        Returns:
+            Whether each file of the batch matches, in batch order. A matching file's
+            ``match_file`` result is ``(True, matched_ids)``, any other file's ``(False, [])``.
+        """
+        if not self._compiled:
+            return [True] * len(batch)
+
+        candidates = range(len(batch))
+        # Column-wise criteria narrow the candidates before any per-file test runs
+        for entry in self._compiled:
+            if entry.column_test is None:
+                continue
+            values = batch.column(entry.field)
+            if len(candidates) < len(values):
+                values = [values[i] for i in candidates]
+            candidates = list(compress(candidates, entry.column_test(values)))
+            if not candidates:
+                break
+
+        file_paths = batch.file_paths
+        stats = batch.stats
+        for entry in self._compiled:
+            if entry.column_test is not None or not candidates:
+                continue
+            test = entry.test
+            candidates = [i for i in candidates if test(file_paths[i], stats[i])]
+
+        mask = [False] * len(batch)
+        for i in candidates:
+            mask[i] = True
+        return mask
+
+    def _matches_calibrating(self, file_path: Path, stat_info: os.stat_result) -> bool:
+        result = True
+        for entry in self._compiled:
+            entry.evaluated += 1
+            if not entry.test(file_path, stat_info):
+                entry.rejected += 1
+                result = False
+                break
+        self._files_seen += 1
+        if self._files_seen >= self.CALIBRATION_FILES:
+            self._compiled.sort(key=_CompiledCriterion.order_key)
+            self._tests = [entry.test for entry in self._compiled]
+            self._calibrating = False
+            logger.debug(f"Criteria order after calibration: {self.order()}")
+        return result
+
+    @staticmethod
+    def _compile(criterion: Criteria, now: float, is_darwin: bool) -> tuple[int, CriterionTest]:
+        """Resolve one criterion into (cost, test)."""
+        criterion_type = criterion.criterion_type
+        value = criterion.value
+
+        if criterion_type in (CriterionType.MTIME, CriterionType.CTIME, CriterionType.ATIME):
+            try:
+                minutes = float(value)
+            except (ValueError, TypeError):
+                return COST_STAT, _never
+            if criterion_type == CriterionType.ATIME and is_darwin:
+                return COST_SUBPROCESS, CompiledCriteria._macos_atime_test(
+                    criterion.operator, minutes, now
+                )
+            field = {
+                CriterionType.MTIME: "st_mtime",
+                CriterionType.CTIME: "st_ctime",
+                CriterionType.ATIME: "st_atime",
+            }[criterion_type]
+            return COST_STAT, CompiledCriteria._time_test(field, criterion.operator, minutes, now)
+
+        if criterion_type == CriterionType.SIZE:
+            compare = _COMPARISONS.get(criterion.operator)
+            try:
+                target_size = CriteriaMatcher._parse_size(value)
+            except (ValueError, TypeError, AttributeError):
+                return COST_STAT, _never
+            if compare is None:
+                return COST_STAT, _never
+            return COST_STAT, lambda file_path, st: compare(st.st_size, target_size)
+
+        if criterion_type in (CriterionType.NAME, CriterionType.INAME):
+            return CompiledCriteria._name_test(
+                criterion.operator, value, case_sensitive=criterion_type == CriterionType.NAME
+            )
+
+        if criterion_type == CriterionType.TYPE:
+            if value in {"f", "file"}:
+                return COST_SYSCALL, lambda file_path, st: file_path.is_file()
+            if value in {"d", "directory"}:
+                return COST_SYSCALL, lambda file_path, st: file_path.is_dir()
+            if value in {"l", "link"}:
+                return COST_SYSCALL, lambda file_path, st: file_path.is_symlink()
+            return COST_STAT, _never
+
+        if criterion_type == CriterionType.PERM:
+            return COST_STAT, CompiledCriteria._perm_test(value)
+
+        if criterion_type in (CriterionType.USER, CriterionType.GROUP):
+            is_user = criterion_type == CriterionType.USER
+            target_id = CompiledCriteria._resolve_owner(value, is_user)
+            if target_id is None:
+                return COST_STAT, _never
+            if is_user:
+                return COST_STAT, lambda file_path, st: st.st_uid == target_id
+            return COST_STAT, lambda file_path, st: st.st_gid == target_id
+
+        return COST_STAT, _never
+
+    @staticmethod
+    def _compile_column(
+        criterion: Criteria, now: float, is_darwin: bool
+    ) -> Optional[tuple[str, ColumnTest]]:
+        """Resolve a time or size criterion into (stat field, column test), else None."""
+        criterion_type = criterion.criterion_type
+        value = criterion.value
+
+        if criterion_type in (CriterionType.MTIME, CriterionType.CTIME, CriterionType.ATIME):
+            if criterion_type == CriterionType.ATIME and is_darwin:
+                return None
+            field = {
+                CriterionType.MTIME: "st_mtime",
+                CriterionType.CTIME: "st_ctime",
+                CriterionType.ATIME: "st_atime",
+            }[criterion_type]
+            try:
+                minutes = float(value)
+            except (ValueError, TypeError):
+                return field, _never_column
+            return field, CompiledCriteria._age_column_test(criterion.operator, minutes, now)
+
+        if criterion_type == CriterionType.SIZE:
+            compare = _COMPARISONS.get(criterion.operator)
+            try:
+                target_size = CriteriaMatcher._parse_size(value)
+            except (ValueError, TypeError, AttributeError):
+                return "st_size", _never_column
+            if compare is None:
+                return "st_size", _never_column
+            return "st_size", lambda values: map(compare, values, repeat(target_size))
+
+        return None
+
+    @staticmethod
+    def _age_column_test(operator: Operator, minutes: float, now: float) -> ColumnTest:
+        """Column form of _age_check; the arithmetic is identical so results match exactly."""
+
+        def ages(values: Iterable[float]) -> Iterable[float]:
+            return map(op.truediv, map(op.sub, repeat(now), values), repeat(60.0))
+
+        if operator == Operator.EQ:
+            return lambda values: map(
+                op.gt, repeat(0.5), map(abs, map(op.sub, ages(values), repeat(minutes)))
+            )
+        compare = _COMPARISONS.get(operator)
+        if compare is None:
+            return _never_column
+        return lambda values: map(compare, ages(values), repeat(minutes))
+
+    @staticmethod
+    def _age_check(operator: Operator, minutes: float, now: float) -> Callable[[float], bool]:
+        """Age comparison for a timestamp, with the arithmetic of CriteriaMatcher._match_time."""
+        if operator == Operator.EQ:
+            # Small tolerance for exact time matching (0.5 minutes = 30 seconds)
+            return lambda timestamp: abs((now - timestamp) / 60.0 - minutes) < 0.5
+        compare = _COMPARISONS.get(operator)
+        if compare is None:
+            return lambda timestamp: False
+        return lambda timestamp: compare((now - timestamp) / 60.0, minutes)
+
+    @staticmethod
+    def _time_test(field: str, operator: Operator, minutes: float, now: float) -> CriterionTest:
+        check = CompiledCriteria._age_check(operator, minutes, now)
+        read = op.attrgetter(field)
+        return lambda file_path, st: check(read(st))
+
+    @staticmethod
+    def _macos_atime_test(operator: Operator, minutes: float, now: float) -> CriterionTest:
+        check = CompiledCriteria._age_check(operator, minutes, now)
+
+        def test(file_path: Path, st: os.stat_result) -> bool:
+            # Most recent of atime and Finder's Last Open; never opened counts as epoch
+            last_open_time = CriteriaMatcher._get_macos_last_open_time(file_path)
+            if last_open_time is None:
+                return check(0.0)
+            return check(max(st.st_atime, last_open_time))
+
+        return test
+
+    @staticmethod
+    def _name_test(operator: Operator, value: str, case_sensitive: bool) -> tuple[int, CriterionTest]:
+        if not isinstance(value, str):
+            return COST_NAME, _never
+        if not case_sensitive:
+            value = value.lower()
+
+        def name_of(file_path: Path) -> str:
+            return file_path.name if case_sensitive else file_path.name.lower()
+
+        if operator == Operator.EQ:
+            return COST_NAME, lambda file_path, st: name_of(file_path) == value
+        if operator == Operator.CONTAINS:
+            return COST_NAME, lambda file_path, st: value in name_of(file_path)
+        if operator == Operator.MATCHES:
+            # fnmatch.fnmatch normalizes case per platform before matching
+            pattern = re.compile(fnmatch.translate(os.path.normcase(value)))
+            return COST_PATTERN, lambda file_path, st: (
+                pattern.match(os.path.normcase(name_of(file_path))) is not None
+            )
+        if operator == Operator.REGEX:
+            try:
+                pattern = re.compile(value)
+            except re.error:
+                return COST_PATTERN, _never
+            return COST_PATTERN, lambda file_path, st: pattern.search(name_of(file_path)) is not None
+        return COST_NAME, _never
+
+    @staticmethod
+    def _perm_test(value: str) -> CriterionTest:
+        if not isinstance(value, str):
+            return _never
+        if value.isdigit():
+            try:
+                target_perm = int(value, 8)
+            except ValueError:
+                return _never
+            return lambda file_path, st: (st.st_mode & 0o777) == target_perm
+        required = 0
+        if "r" in value:
+            required |= stat.S_IRUSR
+        if "w" in value:
+            required |= stat.S_IWUSR
+        if "x" in value:
+            required |= stat.S_IXUSR
+        return lambda file_path, st: (st.st_mode & required) == required
+
+    @staticmethod
+    def _resolve_owner(value: str, is_user: bool) -> Optional[int]:
+        """uid/gid for a user or group name (or numeric id), looked up once per scan."""
+        try:
+            if is_user:
+                import pwd
+
+                return pwd.getpwnam(value).pw_uid
+            import grp
+
+            return grp.getgrnam(value).gr_gid
+        except (KeyError, ValueError, TypeError, ImportError):
+            try:
+                return int(value)
+            except (ValueError, TypeError):
+                return None
+
+
+def compile_criteria(criteria: Sequence[Criteria], now: Optional[float] = None) -> CompiledCriteria:
+    """Compile a path's criteria for one scan; see CompiledCriteria."""
+    return CompiledCriteria(criteria, now=now)
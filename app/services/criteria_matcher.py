@@ -22,7 +22,10 @@ class CriteriaMatcher:
 
     @staticmethod
     def match_file(
-        file_path: Path, criteria: List[Criteria], actual_file_path: Optional[Path] = None
+        file_path: Path,
+        criteria: List[Criteria],
+        actual_file_path: Optional[Path] = None,
+        stat_info: Optional[os.stat_result] = None,
     ) -> tuple[bool, List[int]]:
         """
         Evaluates if a file matches the criteria (is ACTIVE and should be kept in HOT storage).
@@ -30,6 +33,9 @@ class CriteriaMatcher:
         Criteria define what files should be KEPT in hot storage, not what to move to cold.
         Example: "atime < 3" means "keep files accessed in last 3 minutes in hot storage"
 
+        Scanners that already hold the target's stat result pass it as ``stat_info`` to
+        avoid stat'ing the file a second time.
+
         Returns:
             (True, IDs) if ALL criteria match - file is ACTIVE and should be in HOT storage
             (False, []) if ANY criterion doesn't match - file is INACTIVE and should be in COLD storage
@@ -48,7 +54,8 @@ class CriteriaMatcher:
 
         try:
             # We follow symlinks to get the actual target's metadata
-            stat_info = stat_path.stat()
+            if stat_info is None:
+                stat_info = stat_path.stat()
 
             # Simple, direct criteria evaluation
             return CriteriaMatcher._check_criteria(file_path, stat_info, enabled_criteria, "file")
@@ -73,22 +80,30 @@ class CriteriaMatcher:
             (matches: bool, matched_criteria_ids: List[int])
         """
         matched_ids = []
-        logger.debug(f"File {file_path}: Evaluating {len(criteria)} enabled criteria ({context})")
+        # Formatting the per-criterion messages costs more than matching; skip it unless needed
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(
+                f"File {file_path}: Evaluating {len(criteria)} enabled criteria ({context})"
+            )
 
         for criterion in criteria:
             matches = CriteriaMatcher._match_criterion(file_path, stat_info, criterion)
             if matches:
-                logger.debug(
-                    f"File {file_path}: ✓ Criterion {criterion.id} ({criterion.criterion_type.value} {criterion.operator.value} {criterion.value}) MATCHED ({context})"
-                )
+                if debug:
+                    logger.debug(
+                        f"File {file_path}: ✓ Criterion {criterion.id} ({criterion.criterion_type.value} {criterion.operator.value} {criterion.value}) MATCHED ({context})"
+                    )
                 matched_ids.append(criterion.id)
             else:
-                logger.debug(
-                    f"File {file_path}: ✗ Criterion {criterion.id} ({criterion.criterion_type.value} {criterion.operator.value} {criterion.value}) NOT MATCHED ({context})"
-                )
+                if debug:
+                    logger.debug(
+                        f"File {file_path}: ✗ Criterion {criterion.id} ({criterion.criterion_type.value} {criterion.operator.value} {criterion.value}) NOT MATCHED ({context})"
+                    )
                 return False, []
 
-        logger.debug(f"File {file_path}: All {len(criteria)} criteria matched ({context})")
+        if debug:
+            logger.debug(f"File {file_path}: All {len(criteria)} criteria matched ({context})")
         return True, matched_ids
 
     @staticmethod
@@ -130,14 +145,15 @@ class CriteriaMatcher:
                     logger.debug(
                         f"File {file_path}: macOS Last Open time not available (never opened), treating as very old (epoch time) instead of using atime ({datetime.fromtimestamp(original_atime, tz=timezone.utc)})"
                     )
-            else:
+            elif logger.isEnabledFor(logging.DEBUG):
                 logger.debug(
                     f"File {file_path}: Non-macOS system, using atime ({datetime.fromtimestamp(original_atime, tz=timezone.utc)})"
                 )
 
-            logger.debug(
-                f"File {file_path}: Final atime for criteria check: {datetime.fromtimestamp(atime, tz=timezone.utc)} (source: {used_source})"
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"File {file_path}: Final atime for criteria check: {datetime.fromtimestamp(atime, tz=timezone.utc)} (source: {used_source})"
+                )
             return CriteriaMatcher._match_time(atime, operator, value, "atime")
         if criterion_type == CriterionType.CTIME:
             return CriteriaMatcher._match_time(stat_info.st_ctime, operator, value, "ctime")
@@ -195,24 +211,7 @@ class CriteriaMatcher:
     def _match_size(size: int, operator: Operator, value: str) -> bool:
         """Match file size criteria."""
         try:
-            # Parse size value (supports suffixes: c, k, M, G)
-            value_lower = value.lower().strip()
-            multiplier = 1
-
-            if value_lower.endswith("c"):
-                multiplier = 1
-                value_lower = value_lower[:-1]
-            elif value_lower.endswith("k"):
-                multiplier = 1024
-                value_lower = value_lower[:-1]
-            elif value_lower.endswith("m"):
-                multiplier = 1024 * 1024
-                value_lower = value_lower[:-1]
-            elif value_lower.endswith("g"):
-                multiplier = 1024 * 1024 * 1024
-                value_lower = value_lower[:-1]
-
-            target_size = int(float(value_lower) * multiplier)
+            target_size = CriteriaMatcher._parse_size(value)
 
             if operator == Operator.GT:
                 return size > target_size
@@ -228,6 +227,27 @@ class CriteriaMatcher:
             return False
         return False
 
+    @staticmethod
+    def _parse_size(value: str) -> int:
+        """Parse a size value in bytes (supports suffixes: c, k, M, G)."""
+        value_lower = value.lower().strip()
+        multiplier = 1
+
+        if value_lower.endswith("c"):
+            multiplier = 1
+            value_lower = value_lower[:-1]
+        elif value_lower.endswith("k"):
+            multiplier = 1024
+            value_lower = value_lower[:-1]
+        elif value_lower.endswith("m"):
+            multiplier = 1024 * 1024
+            value_lower = value_lower[:-1]
+        elif value_lower.endswith("g"):
+            multiplier = 1024 * 1024 * 1024
+            value_lower = value_lower[:-1]
+
+        return int(float(value_lower) * multiplier)
+
     @staticmethod
     def _match_name(
         filename: str, operator: Operator, value: str, case_sensitive: bool = True
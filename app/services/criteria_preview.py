@@ -0,0 +1,336 @@
+"""Criteria preview - what a criteria set would freeze and thaw, from the inventory alone."""
+
+import heapq
+import logging
+import platform
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, false, func, not_, or_, select, true
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Criteria,
+    CriterionType,
+    FileInventory,
+    FileStatus,
+    MonitoredPath,
+    Operator,
+    PinnedFile,
+    StorageType,
+)
+from app.services.criteria_compiler import CompiledCriteria, CriterionTest
+from app.services.criteria_matcher import CriteriaMatcher
+
+logger = logging.getLogger(__name__)
+
+# Glob of the form "*.ext" (or "*.tar.gz"), which the file_extension index can narrow down
+_EXTENSION_GLOB = re.compile(r"^\*(\.[^*?\[\]]+)$")
+
+# Rows fetched per round trip when streaming rows for criteria evaluated in Python
+_STREAM_BATCH = 1000
+
+
+class _Group:
+    """Running totals for the files that would move in one direction."""
+
+    def __init__(self, sample_size: int):
+        self.sample_size = sample_size
+        self.file_count = 0
+        self.total_bytes = 0
+        self.by_extension: Dict[Optional[str], List[int]] = {}
+        self.samples: List[tuple] = []
+
+    def add_totals(self, extension: Optional[str], file_count: int, total_bytes: int):
+        self.file_count += file_count
+        self.total_bytes += total_bytes
+        totals = self.by_extension.setdefault(extension, [0, 0])
+        totals[0] += file_count
+        totals[1] += total_bytes
+
+    def add_samples(self, rows):
+        # Largest files first; the id keeps the order stable for equal sizes
+        self.samples = heapq.nlargest(
+            self.sample_size,
+            self.samples + [(row.file_size, -row.id, row) for row in rows],
+            key=lambda item: item[:2],
+        )
+
+    def as_dict(self, max_extensions: int) -> dict:
+        extensions = sorted(
+            self.by_extension.items(), key=lambda item: (-item[1][1], item[0] or "")
+        )
+        return {
+            "file_count": self.file_count,
+            "total_bytes": self.total_bytes,
+            "by_extension": [
+                {"extension": extension, "file_count": count, "total_bytes": size}
+                for extension, (count, size) in extensions[:max_extensions]
+            ],
+            "samples": [
+                {
+                    "file_path": row.file_path,
+                    "file_size": row.file_size,
+                    "file_mtime": row.file_mtime,
+                }
+                for _, _, row in self.samples
+            ],
+        }
+
+
+class CriteriaPreview:
+    """
+    Estimates what a criteria set would freeze and thaw on a path without touching disk.
+
+    Criteria say what stays hot, so HOT inventory rows that fail any criterion would be
+    frozen and COLD rows that match all of them would be thawed. Time and size criteria
+    become SQL predicates on the indexed inventory columns. Name criteria are checked in
+    Python on the rows the SQL predicates leave, streamed from the database; "*.ext" globs
+    are narrowed down with the file_extension index first. Type, permission and owner
+    criteria (and atime on macOS, which reads Finder metadata) need the files themselves
+    and are reported as unevaluated; the preview treats them as matching.
+
+    The inventory is only as fresh as the last scan, so ages are those of the recorded
+    timestamps measured against now.
+    """
+
+    # Extensions listed per direction
+    MAX_EXTENSIONS = 20
+
+    def __init__(
+        self,
+        criteria: Sequence[Criteria],
+        now: Optional[float] = None,
+        sample_size: int = 20,
+    ):
+        """
+        Translate criteria for preview.
+
+        Args:
+            criteria: Candidate criteria; disabled ones are ignored
+            now: Unix time ages are measured against (default: time.time())
+            sample_size: Largest files listed per direction
+        """
+        self.now = time.time() if now is None else now
+        self.sample_size = sample_size
+        self.sql_predicates = []
+        self.python_tests: List[CriterionTest] = []
+        self.unevaluated: List[Criteria] = []
+        is_darwin = platform.system() == "Darwin"
+
+        for criterion in criteria:
+            if not criterion.enabled:
+                continue
+            predicate = self._sql_predicate(criterion, self.now, is_darwin)
+            if predicate is not None:
+                self.sql_predicates.append(predicate)
+                continue
+            if criterion.criterion_type in (CriterionType.NAME, CriterionType.INAME):
+                prefilter = self._extension_prefilter(criterion)
+                if prefilter is not None:
+                    self.sql_predicates.append(prefilter)
+                _, test = CompiledCriteria._name_test(
+                    criterion.operator,
+                    criterion.value,
+                    case_sensitive=criterion.criterion_type == CriterionType.NAME,
+                )
+                self.python_tests.append(test)
+                continue
+            self.unevaluated.append(criterion)
+
+    def run(self, db: Session, path: MonitoredPath) -> dict:
+        """Preview the criteria on a path; see the class docstring."""
+        started = time.perf_counter()
+        inventory = FileInventory.__table__
+        pinned = select(PinnedFile.file_path).where(PinnedFile.path_id == path.id)
+
+        def rows_of(storage_type: StorageType):
+            return and_(
+                inventory.c.path_id == path.id,
+                inventory.c.storage_type == storage_type,
+                inventory.c.status == FileStatus.ACTIVE,
+                inventory.c.file_path.not_in(pinned),
+            )
+
+        # Never NULL: every predicate handles missing values itself
+        kept = and_(true(), *self.sql_predicates)
+        to_cold = _Group(self.sample_size)
+        to_hot = _Group(self.sample_size)
+
+        # Hot rows failing a SQL predicate freeze whatever the Python criteria say
+        self._aggregate(db, and_(rows_of(StorageType.HOT), not_(kept)), to_cold)
+        rows_streamed = 0
+        if self.python_tests:
+            # Rows passing the SQL predicates are decided by the remaining criteria
+            for storage_type, group, freeze in (
+                (StorageType.HOT, to_cold, True),
+                (StorageType.COLD, to_hot, False),
+            ):
+                for rows in self._stream(db, and_(rows_of(storage_type), kept)):
+                    rows_streamed += len(rows)
+                    moving = [row for row in rows if self._passes(row) != freeze]
+                    for row in moving:
+                        group.add_totals(row.file_extension, 1, row.file_size)
+                    group.add_samples(moving)
+        else:
+            self._aggregate(db, and_(rows_of(StorageType.COLD), kept), to_hot)
+
+        hot_files, hot_bytes = db.execute(
+            select(func.count(), func.coalesce(func.sum(inventory.c.file_size), 0)).where(
+                rows_of(StorageType.HOT)
+            )
+        ).one()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.debug(
+            f"Criteria preview for path {path.id}: {to_cold.file_count} to freeze, "
+            f"{to_hot.file_count} to thaw, {rows_streamed} rows streamed in {elapsed_ms:.1f}ms"
+        )
+        return {
+            "path_id": path.id,
+            "evaluated_at": datetime.fromtimestamp(self.now, tz=timezone.utc),
+            "hot_file_count": hot_files,
+            "hot_total_bytes": hot_bytes,
+            "to_cold": to_cold.as_dict(self.MAX_EXTENSIONS),
+            "to_hot": to_hot.as_dict(self.MAX_EXTENSIONS),
+            "criteria_in_sql": len(self.sql_predicates),
+            "criteria_streamed": len(self.python_tests),
+            "rows_streamed": rows_streamed,
+            "unevaluated_criteria": [
+                {
+                    "criterion_type": c.criterion_type,
+                    "operator": c.operator,
+                    "value": c.value,
+                }
+                for c in self.unevaluated
+            ],
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+
+    def _passes(self, row) -> bool:
+        file_path = Path(row.file_path)
+        return all(test(file_path, None) for test in self.python_tests)
+
+    def _aggregate(self, db: Session, where, group: _Group):
+        inventory = FileInventory.__table__
+        totals = db.execute(
+            select(
+                inventory.c.file_extension,
+                func.count(),
+                func.coalesce(func.sum(inventory.c.file_size), 0),
+            )
+            .where(where)
+            .group_by(inventory.c.file_extension)
+        ).all()
+        for extension, file_count, total_bytes in totals:
+            group.add_totals(extension, file_count, total_bytes)
+        if group.sample_size > 0:
+            group.add_samples(
+                db.execute(
+                    self._columns()
+                    .where(where)
+                    .order_by(inventory.c.file_size.desc(), inventory.c.id)
+                    .limit(group.sample_size)
+                ).all()
+            )
+
+    def _stream(self, db: Session, where):
+        result = db.execute(
+            self._columns().where(where).execution_options(yield_per=_STREAM_BATCH)
+        )
+        yield from result.partitions()
+
+    @staticmethod
+    def _columns():
+        inventory = FileInventory.__table__
+        return select(
+            inventory.c.id,
+            inventory.c.file_path,
+            inventory.c.file_size,
+            inventory.c.file_mtime,
+            inventory.c.file_extension,
+        )
+
+    @staticmethod
+    def _sql_predicate(criterion: Criteria, now: float, is_darwin: bool):
+        """SQL equivalent of a time or size criterion, or None if it has none."""
+        inventory = FileInventory.__table__
+        criterion_type = criterion.criterion_type
+        operator = criterion.operator
+
+        if criterion_type in (CriterionType.MTIME, CriterionType.CTIME, CriterionType.ATIME):
+            if criterion_type == CriterionType.ATIME and is_darwin:
+                return None
+            column = {
+                CriterionType.MTIME: inventory.c.file_mtime,
+                CriterionType.CTIME: inventory.c.file_ctime,
+                CriterionType.ATIME: inventory.c.file_atime,
+            }[criterion_type]
+            try:
+                minutes = float(criterion.value)
+            except (ValueError, TypeError):
+                return false()
+            # age > minutes  <=>  timestamp < now - minutes
+            cutoff = datetime.fromtimestamp(now, tz=timezone.utc) - timedelta(minutes=minutes)
+            if operator == Operator.GT:
+                condition = column < cutoff
+            elif operator == Operator.GTE:
+                condition = column <= cutoff
+            elif operator == Operator.LT:
+                condition = column > cutoff
+            elif operator == Operator.LTE:
+                condition = column >= cutoff
+            elif operator == Operator.EQ:
+                # Same 30 second tolerance as CriteriaMatcher._match_time
+                tolerance = timedelta(seconds=30)
+                condition = and_(column > cutoff - tolerance, column < cutoff + tolerance)
+            else:
+                return false()
+            return and_(column.is_not(None), condition)
+
+        if criterion_type == CriterionType.SIZE:
+            try:
+                target_size = CriteriaMatcher._parse_size(criterion.value)
+            except (ValueError, TypeError, AttributeError):
+                return false()
+            column = inventory.c.file_size
+            comparisons = {
+                Operator.GT: column > target_size,
+                Operator.GTE: column >= target_size,
+                Operator.LT: column < target_size,
+                Operator.LTE: column <= target_size,
+                Operator.EQ: column == target_size,
+            }
+            return comparisons.get(operator, false())
+
+        return None
+
+    @staticmethod
+    def _extension_prefilter(criterion: Criteria):
+        """
+        Index-backed superset of the rows a "*.ext" name glob can match, or None.
+
+        file_extension is the lowercased last suffix, and None for names without one
+        (".bashrc" matches "*.bashrc" but has no suffix), so those rows are kept too.
+        """
+        if criterion.operator != Operator.MATCHES or not isinstance(criterion.value, str):
+            return None
+        match = _EXTENSION_GLOB.match(criterion.value)
+        if match is None:
+            return None
+        extension = "." + match.group(1).rsplit(".", 1)[-1].lower()
+        column = FileInventory.__table__.c.file_extension
+        return or_(column == extension, column.is_(None))
+
+
+def preview_criteria(
+    db: Session,
+    path: MonitoredPath,
+    criteria: Sequence[Criteria],
+    now: Optional[float] = None,
+    sample_size: int = 20,
+) -> dict:
+    """Preview what a criteria set would freeze and thaw on a path; see CriteriaPreview."""
+    return CriteriaPreview(criteria, now=now, sample_size=sample_size).run(db, path)
@@ -0,0 +1,242 @@
+"""Directory snapshot tracking for incremental scans."""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import DirectorySnapshot, MonitoredPath
+from app.services.scan_syscalls import SyscallCounter
+
+logger = logging.getLogger(__name__)
+
+
+class _Snapshot(NamedTuple):
+    """Detached copy of a DirectorySnapshot row, safe to read from worker threads."""
+
+    id: int
+    parent_path: Optional[str]
+    st_ino: int
+    mtime_ns: int
+    entry_count: int
+    scanned_at_ns: int
+
+
+class DirectorySnapshotTracker:
+    """
+    Tracks per-directory stat snapshots so incremental scans can skip unchanged directories.
+
+    A directory is listed again only when its inode or mtime_ns differs from the snapshot
+    recorded the last time it was listed. Unchanged directories are not listed, but their
+    known subdirectories are still visited, because a change deep in the tree does not
+    update the mtime of its ancestors.
+
+    Note that a directory's mtime only changes when entries are added, removed or renamed.
+    Files rewritten in place inside an unchanged directory are picked up by the periodic
+    full scan.
+
+    The directory callbacks are thread-safe so the tracker can be shared by the workers of
+    a parallel walk.
+    """
+
+    # A directory modified within this window of being listed may have changed again in the
+    # same timestamp tick, so its snapshot is not trusted (same idea as git's "racy" entries)
+    RACY_WINDOW_NS = 2_000_000_000
+
+    def __init__(
+        self,
+        path_id: int,
+        snapshots: Optional[List[DirectorySnapshot]] = None,
+        full_scan: bool = True,
+        persist: bool = False,
+        syscalls: Optional[SyscallCounter] = None,
+    ):
+        """
+        Initialize the tracker.
+
+        Args:
+            path_id: Monitored path the snapshots belong to
+            snapshots: Snapshots recorded by the previous scan
+            full_scan: If True, every directory is listed regardless of its snapshot
+            persist: If True, snapshots are written back by save()
+            syscalls: Optional counter for the directory stats issued by the tracker
+        """
+        self.path_id = path_id
+        self.syscalls = syscalls
+        self.full_scan = full_scan
+        self.persist = persist
+        self.dirs_walked = 0
+        self.dirs_skipped = 0
+        self.skipped_dirs: Set[str] = set()
+
+        self._previous: Dict[str, _Snapshot] = {}
+        self._children: Dict[str, List[str]] = defaultdict(list)
+        for snapshot in snapshots or []:
+            self._previous[snapshot.dir_path] = _Snapshot(
+                snapshot.id,
+                snapshot.parent_path,
+                snapshot.st_ino,
+                snapshot.mtime_ns,
+                snapshot.entry_count,
+                snapshot.scanned_at_ns,
+            )
+            if snapshot.parent_path is not None:
+                self._children[snapshot.parent_path].append(snapshot.dir_path)
+
+        # dir_path -> (parent_path, st_ino, mtime_ns, entry_count, scanned_at_ns)
+        self._current: Dict[str, Tuple[Optional[str], int, int, int, int]] = {}
+        self._pending_stats: Dict[str, os.stat_result] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_path(
+        cls, path: MonitoredPath, db: Session, syscalls: Optional[SyscallCounter] = None
+    ) -> "DirectorySnapshotTracker":
+        """Build a tracker for a path, deciding whether this scan must be a full scan."""
+        if not path.incremental_scan:
+            return cls(path.id, full_scan=True, persist=False, syscalls=syscalls)
+
+        full_scan = True
+        if path.last_full_scan_at is not None:
+            last_full = path.last_full_scan_at
+            if last_full.tzinfo is None:
+                last_full = last_full.replace(tzinfo=timezone.utc)
+            interval = timedelta(hours=path.full_scan_interval_hours or 24)
+            full_scan = datetime.now(tz=timezone.utc) - last_full >= interval
+
+        # Loaded even for full scans so save() can update rows in place
+        snapshots = db.query(DirectorySnapshot).filter(DirectorySnapshot.path_id == path.id).all()
+        # Without any snapshots there is nothing to compare against
+        full_scan = full_scan or not snapshots
+
+        return cls(
+            path.id, snapshots=snapshots, full_scan=full_scan, persist=True, syscalls=syscalls
+        )
+
+    def begin_directory(self, dir_path: str) -> bool:
+        """
+        Decide whether a directory needs to be listed.
+
+        Returns:
+            True if the directory should be listed, False if it can be skipped
+        """
+        if not self.persist:
+            return True
+
+        if self.syscalls is not None:
+            self.syscalls.add("stat")
+        try:
+            dir_stat = os.stat(dir_path)
+        except OSError:
+            # Let the listing itself surface the error
+            return True
+
+        with self._lock:
+            self._pending_stats[dir_path] = dir_stat
+        if self.full_scan:
+            return True
+
+        previous = self._previous.get(dir_path)
+        if previous is None:
+            return True
+        if previous.st_ino != dir_stat.st_ino or previous.mtime_ns != dir_stat.st_mtime_ns:
+            return True
+        return dir_stat.st_mtime_ns >= previous.scanned_at_ns - self.RACY_WINDOW_NS
+
+    def skip_directory(self, dir_path: str, parent_path: Optional[str]) -> List[str]:
+        """
+        Record a skipped directory and return its known subdirectories.
+
+        The previous snapshot is carried over unchanged.
+        """
+        previous = self._previous[dir_path]
+        with self._lock:
+            self.dirs_skipped += 1
+            self.skipped_dirs.add(dir_path)
+            self._pending_stats.pop(dir_path, None)
+            self._current[dir_path] = (
+                parent_path,
+                previous.st_ino,
+                previous.mtime_ns,
+                previous.entry_count,
+                previous.scanned_at_ns,
+            )
+        return list(self._children.get(dir_path, []))
+
+    def finish_directory(self, dir_path: str, parent_path: Optional[str], entry_count: int):
+        """Record a directory that was listed successfully."""
+        with self._lock:
+            self.dirs_walked += 1
+            dir_stat = self._pending_stats.pop(dir_path, None)
+            if dir_stat is None:
+                return
+
+            self._current[dir_path] = (
+                parent_path,
+                dir_stat.st_ino,
+                dir_stat.st_mtime_ns,
+                entry_count,
+                time.time_ns(),
+            )
+
+    def save(self, db: Session, scopes: Optional[Iterable[str]] = None) -> None:
+        """
+        Persist snapshots for listed directories and drop those no longer present.
+
+        Args:
+            db: Database session
+            scopes: Subtrees the walk was limited to; snapshots outside them are kept.
+                None means the whole path was walked.
+        """
+        if not self.persist:
+            return
+
+        new_rows = []
+        updated_rows = []
+        for dir_path, (parent, st_ino, mtime_ns, entry_count, scanned_at_ns) in self._current.items():
+            values = {
+                "path_id": self.path_id,
+                "dir_path": dir_path,
+                "parent_path": parent,
+                "st_ino": st_ino,
+                "mtime_ns": mtime_ns,
+                "entry_count": entry_count,
+                "scanned_at_ns": scanned_at_ns,
+            }
+            previous = self._previous.get(dir_path)
+            if previous is None:
+                new_rows.append(values)
+            elif previous.scanned_at_ns != scanned_at_ns or previous.parent_path != parent:
+                values["id"] = previous.id
+                updated_rows.append(values)
+
+        scope_list = None if scopes is None else list(scopes)
+        removed_ids = [
+            snapshot.id
+            for dir_path, snapshot in self._previous.items()
+            if dir_path not in self._current
+            and (
+                scope_list is None
+                or any(dir_path == s or dir_path.startswith(s + os.sep) for s in scope_list)
+            )
+        ]
+
+        if new_rows:
+            db.bulk_insert_mappings(DirectorySnapshot, new_rows)
+        if updated_rows:
+            db.bulk_update_mappings(DirectorySnapshot, updated_rows)
+        for i in range(0, len(removed_ids), 500):
+            db.query(DirectorySnapshot).filter(
+                DirectorySnapshot.id.in_(removed_ids[i : i + 500])
+            ).delete(synchronize_session=False)
+        db.commit()
+
+        logger.debug(
+            f"Saved directory snapshots for path {self.path_id}: "
+            f"{len(new_rows)} new, {len(updated_rows)} updated, {len(removed_ids)} removed"
+        )
@@ -0,0 +1,162 @@
+"""Gitignore-style exclude rules for directory scans."""
+
+import re
+from typing import Iterable, List, Optional, Pattern
+
+_GLOB_CHARS = set("*?[\\")
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translate one gitignore-style glob into a regex matched against a relative path."""
+    out = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**/", i):
+                # Zero or more leading directories
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern.startswith("**", i):
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                content = pattern[i + 1 : end].replace("\\", "\\\\")
+                if content.startswith("!"):
+                    content = "^" + content[1:]
+                out.append(f"[{content}]")
+                i = end + 1
+                continue
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def _combine(parts: List[str]) -> Optional[Pattern]:
+    if not parts:
+        return None
+    return re.compile("|".join(f"(?:{p})" for p in parts))
+
+
+class ExcludeMatcher:
+    """
+    Compiled set of gitignore-style exclude patterns.
+
+    Supported syntax:
+        - ``name`` / ``*.tmp``: matches an entry with that name at any depth
+        - ``dir/``: trailing slash matches directories only
+        - ``/build`` or ``docs/tmp``: a slash anchors the pattern to the scan root
+        - ``*``, ``?`` and ``[...]`` do not cross ``/``; ``**`` matches across directories
+        - ``cache/**``: excludes everything inside ``cache``, so the directory is pruned
+        - blank lines and ``#`` comments are ignored
+
+    Negation (``!pattern``) is not supported, since rules are merged into a single regex
+    and evaluated without ordering.
+
+    Plain names go into set lookups; every other pattern is merged into one combined
+    regex for files and directories and one for directories only, so each entry costs at
+    most two regex matches regardless of the number of rules.
+    """
+
+    def __init__(self, patterns: Iterable[str] = (), skip_hidden: bool = True):
+        """
+        Compile patterns.
+
+        Args:
+            patterns: Gitignore-style patterns, one per item
+            skip_hidden: If True, entries starting with "." are always excluded
+
+        Raises:
+            ValueError: If a pattern is negated or cannot be compiled
+        """
+        self.skip_hidden = skip_hidden
+        self._names = set()
+        self._dir_names = set()
+        any_parts: List[str] = []
+        dir_parts: List[str] = []
+
+        for raw in patterns:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("!"):
+                raise ValueError(f"Negated exclude patterns are not supported: {raw!r}")
+
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if line.endswith("/**"):
+                # Everything inside the directory is excluded, so prune the directory itself
+                line = line[:-3]
+                dir_only = True
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if not line:
+                continue
+            if skip_hidden and not anchored and line.startswith("."):
+                # Already covered by the hidden-entry check
+                continue
+
+            if not anchored and not _GLOB_CHARS.intersection(line):
+                (self._dir_names if dir_only else self._names).add(line)
+                continue
+
+            body = _glob_to_regex(line)
+            if not anchored:
+                body = "(?:.*/)?" + body
+            (dir_parts if dir_only else any_parts).append(body)
+
+        try:
+            self._any_re = _combine(any_parts)
+            self._dir_re = _combine(dir_parts)
+        except re.error as e:
+            raise ValueError(f"Invalid exclude pattern: {e}") from e
+
+    @property
+    def needs_path(self) -> bool:
+        """True if any rule depends on the relative path rather than just the entry name."""
+        return self._any_re is not None or self._dir_re is not None
+
+    def excludes(self, name: str, rel_path: str, is_dir: bool) -> bool:
+        """
+        Check whether an entry is excluded.
+
+        Args:
+            name: Entry name
+            rel_path: Path relative to the scan root, "/"-separated (may be empty when
+                needs_path is False)
+            is_dir: Whether the entry is a directory (not following symlinks)
+        """
+        if self.skip_hidden and name.startswith("."):
+            return True
+        if name in self._names or (is_dir and name in self._dir_names):
+            return True
+        if self._any_re is not None and self._any_re.fullmatch(rel_path):
+            return True
+        return is_dir and self._dir_re is not None and self._dir_re.fullmatch(rel_path) is not None
+
+    def excludes_path(self, rel_path: str, is_dir: bool) -> bool:
+        """
+        Check whether an entry or any of its parent directories is excluded.
+
+        Used for paths that did not come from a pruned walk, such as change events.
+        """
+        parts = rel_path.split("/")
+        for i, name in enumerate(parts[:-1]):
+            if self.excludes(name, "/".join(parts[: i + 1]), True):
+                return True
+        return self.excludes(parts[-1], rel_path, is_dir)
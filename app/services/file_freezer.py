@@ -18,7 +18,9 @@ from app.models import (
 )
 from app.services.audit_trail_service import audit_trail_service
 from app.services.checksum_verifier import checksum_verifier
+from app.services.copy_engine import recording_copies
 from app.services.file_mover import preserve_directory_structure
+from app.services.scan_records import set_fingerprint, stored_checksum
 
 logger = logging.getLogger(__name__)
 
@@ -89,14 +91,21 @@ class FileFreezer:
             if destination_path.exists():
                 return False, f"Destination already exists: {destination_path}", None
 
-            # Calculate checksum before move for verification
-            checksum_before = checksum_verifier.calculate_checksum(source_path)
+            # Reuse the stored checksum while it is valid for the file's current fingerprint.
+            # Otherwise a plain move hashes the file as it copies it; only encryption, which
+            # changes the bytes, needs it hashed up front
+            checksum_before = (
+                stored_checksum(locked_file, source_path.stat()) if source_path.exists() else None
+            )
+            if checksum_before is None and encrypt_file:
+                checksum_before = checksum_verifier.calculate_checksum(source_path)
 
             # Mark file as MIGRATING
             old_status = locked_file.status
             locked_file.status = FileStatus.MIGRATING
             db.commit()
 
+            copy_strategy = None
             try:
                 # Handle encryption or regular move
                 if encrypt_file:
@@ -118,18 +127,22 @@ class FileFreezer:
                     # Move file using the path's operation type with rollback
                     from app.services.file_mover import move_with_rollback
 
-                    success, error, checksum_after = move_with_rollback(
-                        source_path,
-                        destination_path,
-                        monitored_path.operation_type,
-                        verify_checksum=True,
-                    )
+                    with recording_copies() as copy_record:
+                        success, error, checksum_after = move_with_rollback(
+                            source_path,
+                            destination_path,
+                            monitored_path.operation_type,
+                            verify_checksum=True,
+                            source_checksum=checksum_before,
+                        )
+                    copy_strategy = copy_record.strategy
 
                     if not success:
                         # Rollback status change
                         locked_file.status = old_status
                         db.commit()
                         return False, f"Failed to move file: {error}", None
+                    checksum_before = checksum_before or checksum_after
 
                 # Create FileRecord entry
                 file_record = FileRecord(
@@ -154,6 +167,11 @@ class FileFreezer:
                 if monitored_path.operation_type != OperationType.SYMLINK:
                     locked_file.file_path = str(destination_path)
 
+                # The verified checksum stays valid for the moved file
+                if not encrypt_file and checksum_after:
+                    set_fingerprint(locked_file, destination_path.stat())
+                    locked_file.checksum = checksum_after
+
                 # If pinning, add to pinned files
                 if pin:
                     # Use the cold storage path for pinning (so it won't be auto-thawed)
@@ -178,6 +196,7 @@ class FileFreezer:
                     checksum_after=checksum_after,
                     success=True,
                     initiated_by=initiated_by or "manual",
+                    copy_strategy=copy_strategy,
                 )
 
                 logger.info(
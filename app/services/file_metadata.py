@@ -1,11 +1,20 @@
 """File metadata extraction utilities."""
 
-import hashlib
 import logging
 import mimetypes
 from pathlib import Path
 from typing import Optional, Tuple
 
+from app.services import tree_hash
+from app.services.checksum_cache import checksum_cache
+from app.services.hash_algorithms import (
+    SHA256,
+    algorithm_for_size,
+    format_checksum,
+    is_tree_algorithm,
+    new_hash,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,31 +22,82 @@ class FileMetadataExtractor:
     """Service for extracting file metadata."""
 
     @staticmethod
-    def compute_sha256(file_path: Path, chunk_size: int = 8192) -> Optional[str]:
+    def compute_checksum(
+        file_path: Path, algorithm: Optional[str] = None, chunk_size: int = 8192
+    ) -> Optional[str]:
         """
-        Compute SHA256 hash of a file.
+        Compute the checksum of a file; an unchanged file is served from the checksum cache.
 
         Args:
             file_path: Path to the file
+            algorithm: Hash algorithm (see hash_algorithms); defaults to CHECKSUM_ALGORITHM,
+                in tree form for files of at least CHECKSUM_TREE_MIN_SIZE_MB
             chunk_size: Size of chunks to read (default 8KB)
 
         Returns:
-            SHA256 hash as hex string, or None if error
+            Checksum in stored form, or None if error
         """
+        if algorithm is None:
+            try:
+                algorithm = algorithm_for_size(file_path.stat().st_size)
+            except OSError:
+                return None
+        return checksum_cache.get_or_compute(
+            file_path,
+            algorithm,
+            lambda: FileMetadataExtractor._hash_file(file_path, algorithm, chunk_size),
+        )
+
+    @staticmethod
+    def _hash_file(file_path: Path, algorithm: str, chunk_size: int) -> Optional[str]:
         try:
             if not file_path.exists() or not file_path.is_file():
                 return None
 
-            sha256_hash = hashlib.sha256()
+            if is_tree_algorithm(algorithm):
+                checksum, digests = tree_hash.hash_file(file_path, algorithm)
+                tree_hash.segment_store.save(checksum, digests)
+                return checksum
+
+            file_hash = new_hash(algorithm)
             with open(file_path, "rb") as f:
                 for chunk in iter(lambda: f.read(chunk_size), b""):
-                    sha256_hash.update(chunk)
+                    file_hash.update(chunk)
 
-            return sha256_hash.hexdigest()
+            return format_checksum(algorithm, file_hash.hexdigest())
         except Exception:
             logger.exception(f"Error computing hash for {file_path}")
             return None
 
+    @staticmethod
+    def compute_sha256(file_path: Path, chunk_size: int = 8192) -> Optional[str]:
+        """
+        Compute SHA256 hash of a file.
+
+        Args:
+            file_path: Path to the file
+            chunk_size: Size of chunks to read (default 8KB)
+
+        Returns:
+            SHA256 hash as hex string, or None if error
+        """
+        return FileMetadataExtractor.compute_checksum(file_path, SHA256, chunk_size)
+
+    @staticmethod
+    def extract_name_metadata(file_path: Path) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Derive file extension and MIME type from the file name alone (no I/O).
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Tuple of (file_extension, mime_type)
+        """
+        file_extension = file_path.suffix.lower() if file_path.suffix else None
+        mime_type, _ = mimetypes.guess_type(str(file_path))
+        return (file_extension, mime_type)
+
     @staticmethod
     def extract_metadata(file_path: Path) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         """
@@ -50,11 +110,7 @@ class FileMetadataExtractor:
             Tuple of (file_extension, mime_type, checksum)
         """
         try:
-            # Get file extension
-            file_extension = file_path.suffix.lower() if file_path.suffix else None
-
-            # Get MIME type
-            mime_type, _ = mimetypes.guess_type(str(file_path))
+            file_extension, mime_type = FileMetadataExtractor.extract_name_metadata(file_path)
 
             # Compute checksum (optional - can be slow for large files)
             # Only compute for files smaller than 1GB to avoid performance issues
@@ -63,7 +119,7 @@ class FileMetadataExtractor:
                 file_size = file_path.stat().st_size
                 # Compute hash for files smaller than 1GB
                 if file_size < 1024 * 1024 * 1024:
-                    checksum = FileMetadataExtractor.compute_sha256(file_path)
+                    checksum = FileMetadataExtractor.compute_checksum(file_path)
 
             return (file_extension, mime_type, checksum)
 
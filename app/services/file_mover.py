@@ -8,9 +8,20 @@ import shutil
 from pathlib import Path
 from typing import Callable, Optional
 
-from app.config import translate_path_for_symlink
+from app.config import settings, translate_path_for_symlink
 from app.models import MonitoredPath, OperationType
+from app.services import copy_engine, tree_hash
+from app.services.checksum_cache import checksum_cache
 from app.services.checksum_verifier import checksum_verifier  # Moved to module level
+from app.services.hash_algorithms import (
+    algorithm_for_size,
+    checksum_algorithm,
+    configured_algorithm,
+    format_checksum,
+    is_tree_algorithm,
+    new_hash,
+)
+from app.services.io_budget import current_budget
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +30,87 @@ PROGRESS_THRESHOLD_MB = 10
 PROGRESS_UPDATE_BYTES = 1024 * 1024
 
 
+class ChecksumMismatchError(OSError):
+    """A copy did not match the checksum of its source."""
+
+
+class CopyChecksum:
+    """
+    Checksum of a source taken while a copy streams it, and the check of the copy.
+
+    Passed down to _copy_with_progress, which hashes every chunk it writes and calls
+    :meth:`verify` before the caller removes the source, so a bad copy never costs the
+    original. ``expected`` is a checksum already known for the source; ``read_back``
+    re-reads the destination rather than trusting the write (defaults to the
+    VERIFY_COPY_READ_BACK setting). Either way each byte is read at most twice.
+
+    The source is hashed with the algorithm ``expected`` records, or else the configured
+    one (in tree form if ``size`` reaches CHECKSUM_TREE_MIN_SIZE_MB); constructing it
+    raises ValueError if that algorithm is not available. With a tree checksum, a source
+    that does not match ``expected`` is reported with its differing segments.
+    """
+
+    def __init__(
+        self,
+        expected: Optional[str] = None,
+        read_back: Optional[bool] = None,
+        algorithm: Optional[str] = None,
+        size: Optional[int] = None,
+    ):
+        self.expected = expected
+        self.read_back = settings.verify_copy_read_back if read_back is None else read_back
+        if algorithm is None and expected:
+            algorithm = checksum_algorithm(expected)
+        elif algorithm is None:
+            algorithm = configured_algorithm() if size is None else algorithm_for_size(size)
+        self.algorithm = algorithm
+        self.checksum: Optional[str] = None  # Set once a copy was verified
+        self._hash = new_hash(algorithm)
+
+    def update(self, chunk) -> None:
+        self._hash.update(chunk)
+
+    def verify(self, destination: Path) -> str:
+        """Check the finished copy; raises ChecksumMismatchError if it does not match."""
+        checksum = format_checksum(self.algorithm, self._hash.hexdigest())
+        if self.expected and checksum != self.expected:
+            raise ChecksumMismatchError(
+                f"Checksum verification failed: source read as {checksum[:16]}..., "
+                f"expected {self.expected[:16]}...{self._corrupt_segments()}"
+            )
+        if self.read_back:
+            written = checksum_verifier.calculate_checksum(
+                destination, self.algorithm, use_cache=False
+            )
+            if written != checksum:
+                raise ChecksumMismatchError(
+                    f"Checksum verification failed: copy read back as "
+                    f"{(written or 'None')[:16]}..., expected {checksum[:16]}..."
+                )
+        self.checksum = checksum
+        # Later scans and transfers of the copy need not hash it again
+        checksum_cache.store_path(destination, self.algorithm, checksum)
+        if is_tree_algorithm(self.algorithm):
+            tree_hash.segment_store.save(checksum, self._hash.segment_digests)
+        return checksum
+
+    def _corrupt_segments(self) -> str:
+        if not is_tree_algorithm(self.algorithm):
+            return ""
+        expected = tree_hash.segment_store.load(self.expected)
+        if expected is None:
+            return ""
+        corrupt = tree_hash.mismatched_segments(expected, self._hash.segment_digests)
+        return f" (segments {corrupt} of {tree_hash.SEGMENT_SIZE} bytes differ)"
+
+
+def _source_size(source: Path) -> Optional[int]:
+    try:
+        return source.stat().st_size
+    except OSError:
+        return None
+
+
 def move_file(
     source: Path,
     destination: Path,
@@ -82,12 +174,15 @@ def move_file(
 
 
 def _move(
-    source: Path, destination: Path, progress_callback: Optional[Callable[[int], None]] = None
+    source: Path,
+    destination: Path,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    copy_check: Optional[CopyChecksum] = None,
 ) -> tuple[bool, Optional[str]]:
-    """Move file (atomic if same filesystem, otherwise copy+delete)."""
+    """Move file (atomic if same filesystem, otherwise copy+verify+delete)."""
     try:
         if source.is_symlink():
-            return _move_symlink(source, destination, progress_callback)
+            return _move_symlink(source, destination, progress_callback, copy_check)
 
         # Try atomic rename first (same filesystem)
         try:
@@ -95,7 +190,7 @@ def _move(
             return True, None
         except OSError:
             # Cross-filesystem move
-            _copy_with_progress(source, destination, progress_callback)
+            _copy_with_progress(source, destination, progress_callback, copy_check)
             source.unlink()
             return True, None
     except Exception as e:
@@ -103,7 +198,10 @@ def _move(
 
 
 def _move_symlink(
-    source: Path, destination: Path, progress_callback: Optional[Callable[[int], None]] = None
+    source: Path,
+    destination: Path,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    copy_check: Optional[CopyChecksum] = None,
 ) -> tuple[bool, Optional[str]]:
     """Handle moving a symlink."""
     try:
@@ -127,7 +225,7 @@ def _move_symlink(
         try:
             actual_file.rename(destination)
         except OSError:
-            _copy_with_progress(actual_file, destination, progress_callback)
+            _copy_with_progress(actual_file, destination, progress_callback, copy_check)
             actual_file.unlink()
 
         source.unlink()
@@ -137,50 +235,75 @@ def _move_symlink(
 
 
 def _copy(
-    source: Path, destination: Path, progress_callback: Optional[Callable[[int], None]] = None
+    source: Path,
+    destination: Path,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    copy_check: Optional[CopyChecksum] = None,
 ) -> tuple[bool, Optional[str]]:
     """Copy file preserving metadata."""
     try:
-        _copy_with_progress(source, destination, progress_callback)
+        _copy_with_progress(source, destination, progress_callback, copy_check)
         return True, None
     except Exception as e:
         return False, f"Copy failed: {e!s}"
 
 
 def _copy_with_progress(
-    source: Path, destination: Path, progress_callback: Optional[Callable[[int], None]] = None
+    source: Path,
+    destination: Path,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    copy_check: Optional[CopyChecksum] = None,
 ) -> None:
-    """Copy file with optional progress tracking and timestamp preservation."""
+    """Copy file with optional progress tracking and timestamp preservation.
+
+    The data is copied by the fastest strategy of :mod:`app.services.copy_engine` that
+    works for the two files (reflink, copy_file_range, sendfile, then a read loop), and
+    the strategy used is recorded. Reads are charged to the I/O budget of the current
+    move operation, if any. With a ``copy_check`` the source is hashed as it is copied
+    and the finished copy is verified; a copy that fails verification is removed and
+    ChecksumMismatchError raised.
+    """
     stat_info = source.stat()
     file_size = stat_info.st_size
     should_report_progress = progress_callback and file_size > (PROGRESS_THRESHOLD_MB * 1024 * 1024)
+    budget = current_budget()
+    last_report = 0
 
-    if should_report_progress:
-        bytes_transferred = 0
-        last_report = 0
-
-        with open(source, "rb") as fsrc, open(destination, "wb") as fdst:
-            while True:
-                chunk = fsrc.read(64 * 1024)
-                if not chunk:
-                    break
-                fdst.write(chunk)
-                bytes_transferred += len(chunk)
-
-                if bytes_transferred - last_report >= PROGRESS_UPDATE_BYTES:
-                    progress_callback(bytes_transferred)
-                    last_report = bytes_transferred
-
-        if bytes_transferred > last_report:
+    def report(bytes_transferred: int) -> None:
+        nonlocal last_report
+        if bytes_transferred - last_report >= PROGRESS_UPDATE_BYTES:
             progress_callback(bytes_transferred)
-
-        shutil.copystat(str(source), str(destination))
-    else:
-        shutil.copy2(str(source), str(destination))
+            last_report = bytes_transferred
+
+    with open(source, "rb", buffering=0) as fsrc, open(destination, "wb", buffering=0) as fdst:
+        strategy = copy_engine.copy_file_data(
+            fsrc,
+            fdst,
+            file_size,
+            on_read=budget.read if budget is not None else None,
+            on_progress=report if should_report_progress else None,
+            hash_update=copy_check.update if copy_check is not None else None,
+        )
+        bytes_transferred = fdst.seek(0, os.SEEK_END)
+
+    if should_report_progress and bytes_transferred > last_report:
+        progress_callback(bytes_transferred)
+    copy_engine.note_copy(strategy, bytes_transferred)
+    logger.debug(f"Copied {source} -> {destination} ({bytes_transferred} bytes, {strategy})")
+
+    shutil.copystat(str(source), str(destination))
 
     # Preserve original timestamps
     os.utime(str(destination), ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns))
 
+    if copy_check is not None:
+        try:
+            copy_check.verify(destination)
+        except ChecksumMismatchError:
+            with contextlib.suppress(OSError):
+                destination.unlink()
+            raise
+
 
 def move_with_rollback(
     source: Path,
@@ -188,6 +311,7 @@ def move_with_rollback(
     operation_type,
     verify_checksum: bool = True,
     progress_callback: Optional[Callable[[int], None]] = None,
+    source_checksum: Optional[str] = None,
 ) -> tuple[bool, Optional[str], Optional[str]]:
     """
     Move/copy file with rollback on failure.
@@ -195,57 +319,72 @@ def move_with_rollback(
     This ensures atomic-like behavior: if verification fails, the destination
     is deleted to avoid leaving files in an inconsistent state.
 
+    The source is not hashed up front. A copy hashes it while streaming and is checked
+    before the source is removed (see CopyChecksum); a rename within one filesystem is
+    hashed once at the destination, since its bytes did not move; if that hash differs from
+    ``source_checksum``, the stored checksum was stale and the new one is returned. Either
+    way each byte is read at most twice.
+
     Args:
         source: Source file path
         destination: Destination file path
         operation_type: Type of operation (MOVE, COPY, SYMLINK)
         verify_checksum: Whether to verify checksum after move
         progress_callback: Optional progress callback
+        source_checksum: Already known checksum of source, checked against the data moved
 
     Returns:
         (success, error_message, checksum) tuple
     """
-    # Calculate source checksum for verification
-    source_checksum = None
-    if verify_checksum:
-        source_checksum = checksum_verifier.calculate_checksum(source)
+    if not verify_checksum:
+        source_checksum = None
+    copy_check = (
+        CopyChecksum(expected=source_checksum, size=_source_size(source))
+        if verify_checksum
+        else None
+    )
 
     # Perform the move operation
     if operation_type == OperationType.MOVE:
-        success, error = _move(source, destination, progress_callback)
+        success, error = _move(source, destination, progress_callback, copy_check)
     elif operation_type == OperationType.COPY:
-        success, error = _copy(source, destination, progress_callback)
+        success, error = _copy(source, destination, progress_callback, copy_check)
     elif operation_type == OperationType.SYMLINK:
-        success, error = _move_and_symlink(source, destination, progress_callback)
+        success, error = _move_and_symlink(source, destination, progress_callback, copy_check)
     else:
         return False, f"Unknown operation type: {operation_type}", None
 
     if not success:
         return False, error, None
 
-    # Verify checksum if requested and source checksum was calculated
-    if verify_checksum and source_checksum:
-        dest_checksum = checksum_verifier.calculate_checksum(destination)
-
-        if dest_checksum != source_checksum:
-            logger.error(
-                f"Checksum mismatch after move: {source_checksum[:16] if source_checksum else 'None'}... != {dest_checksum[:16] if dest_checksum else 'None'}..."
-            )
-            # Rollback: delete destination to avoid inconsistent state
-            try:
-                if destination.exists():
-                    destination.unlink()
-                logger.info(f"Rolled back move by deleting destination: {destination}")
-            except Exception as e:
-                logger.error(f"Failed to rollback: {e}")
-
-            return False, "Checksum verification failed", source_checksum
-
-    return True, None, source_checksum
+    if copy_check is None:
+        return True, None, None
+    if copy_check.checksum is not None:
+        # Copied: hashed while streaming and verified before the source was removed
+        return True, None, copy_check.checksum
+    if source_checksum is None:
+        # Renamed: one read gives the checksum of both sides
+        return True, None, checksum_verifier.calculate_checksum(destination)
+
+    # Renamed with a known checksum: a rename moves no bytes, so a different hash means
+    # the file changed since it was recorded. Never delete the destination here; it is
+    # the only copy now.
+    dest_checksum = checksum_verifier.calculate_checksum(
+        destination, checksum_algorithm(source_checksum)
+    )
+    if dest_checksum != source_checksum:
+        logger.warning(
+            f"Stored checksum of {source} is stale, using the checksum of the moved file: "
+            f"{source_checksum[:16]}... != {dest_checksum[:16] if dest_checksum else 'None'}..."
+        )
+    return True, None, dest_checksum
 
 
 def _move_and_symlink(
-    source: Path, destination: Path, progress_callback: Optional[Callable[[int], None]] = None
+    source: Path,
+    destination: Path,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    copy_check: Optional[CopyChecksum] = None,
 ) -> tuple[bool, Optional[str]]:
     """Move file and create symlink at original location."""
     try:
@@ -265,11 +404,11 @@ def _move_and_symlink(
             # Move the actual file to new destination
             actual_file = source.resolve(strict=True)
             source.unlink()
-            success, error = _move(actual_file, destination, progress_callback)
+            success, error = _move(actual_file, destination, progress_callback, copy_check)
             if not success:
                 return False, error
         else:
-            success, error = _move(source, destination, progress_callback)
+            success, error = _move(source, destination, progress_callback, copy_check)
             if not success:
                 return False, error
 
@@ -287,6 +426,68 @@ def _move_and_symlink(
         return False, f"Move and symlink failed: {e!s}"
 
 
+def move_verified(
+    source: Path,
+    destination: Path,
+    expected_checksum: Optional[str] = None,
+    progress_callback: Optional[Callable[[int], None]] = None,
+) -> Optional[str]:
+    """
+    Move a regular file and return the checksum of the moved data.
+
+    Renames when possible and hashes the result once. Otherwise the source is hashed as
+    it is copied and the copy is verified (see CopyChecksum) before the source is
+    removed; a failed verification raises ChecksumMismatchError and keeps the source.
+    After a rename, comparing the result with ``expected_checksum`` is up to the caller.
+    """
+    try:
+        source.rename(destination)
+    except OSError:
+        copy_check = CopyChecksum(expected=expected_checksum, size=_source_size(source))
+        _copy_with_progress(source, destination, progress_callback, copy_check)
+        source.unlink()
+        return copy_check.checksum
+    return checksum_verifier.calculate_checksum(
+        destination, checksum_algorithm(expected_checksum) if expected_checksum else None
+    )
+
+
+def link_file(
+    source: Path, existing: Path, destination: Path, operation_type: OperationType
+) -> tuple[bool, Optional[str]]:
+    """
+    Place a file as a hard link to an existing copy of it instead of copying its data.
+
+    ``existing`` must already hold the content of ``source``. The source is removed
+    afterwards, or replaced by a symlink for SYMLINK operations.
+
+    Returns:
+        (success: bool, error_message: Optional[str])
+    """
+    try:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.link(existing, destination)
+    except OSError as e:
+        return False, f"Hard link failed: {e!s}"
+
+    try:
+        source.unlink()
+    except OSError as e:
+        with contextlib.suppress(OSError):
+            destination.unlink()
+        return False, f"Could not remove source after linking: {e!s}"
+
+    if operation_type == OperationType.SYMLINK:
+        try:
+            source.symlink_to(translate_path_for_symlink(str(destination)))
+        except OSError as e:
+            # Try to restore the source link on symlink failure
+            with contextlib.suppress(builtins.BaseException):
+                destination.rename(source)
+            return False, f"Symlink creation failed: {e!s}"
+    return True, None
+
+
 def preserve_directory_structure(
     source_path: Path, base_source: Path, base_destination: Path
 ) -> Path:
@@ -307,4 +508,6 @@ class FileMover:
     _move = staticmethod(_move)
     _copy = staticmethod(_copy)
     _move_and_symlink = staticmethod(_move_and_symlink)
+    link_file = staticmethod(link_file)
+    move_verified = staticmethod(move_verified)
     move_with_rollback = staticmethod(move_with_rollback)
@@ -1,8 +1,6 @@
 """File thawing service - move files back from cold storage."""
 
 import logging
-import os
-import shutil
 from pathlib import Path
 from typing import Optional, Tuple
 
@@ -11,6 +9,10 @@ from sqlalchemy.orm import Session
 from app.models import FileRecord, FileStatus, PinnedFile, StorageType
 from app.services.audit_trail_service import audit_trail_service
 from app.services.checksum_verifier import checksum_verifier
+from app.services.copy_engine import recording_copies
+from app.services.file_mover import move_verified
+from app.services.hash_algorithms import checksum_algorithm
+from app.services.scan_records import set_fingerprint, stored_checksum
 
 logger = logging.getLogger(__name__)
 
@@ -57,88 +59,119 @@ class FileThawer:
 
             is_encrypted = file_inventory.is_encrypted if file_inventory else False
 
-            # Calculate checksum before move for verification
-            checksum_before = checksum_verifier.calculate_checksum(cold_path)
+            # Reuse the stored checksum while it is valid for the file's current fingerprint.
+            # Otherwise a plain move hashes the file as it moves it; encrypted files are
+            # hashed up front since decryption changes the bytes
+            checksum_before = stored_checksum(file_inventory, cold_path.stat())
+            if checksum_before is None and is_encrypted:
+                checksum_before = checksum_verifier.calculate_checksum(cold_path)
+            moved_checksum = None
 
-            # Decrypt if encrypted, otherwise standard move
-            if is_encrypted:
-                from app.services.encryption_service import file_encryption_service
+            with recording_copies() as copy_record:
+                # Decrypt if encrypted, otherwise standard move
+                if is_encrypted:
+                    from app.services.encryption_service import file_encryption_service
 
-                try:
-                    # For COPY operations where the original file still exists,
-                    # skip decryption (don't overwrite) and just remove the cold storage copy
-                    if file_record.operation_type.value == "copy" and original_path.exists():
-                        cold_path.unlink()
-                    else:
-                        # Ensure destination directory exists
-                        original_path.parent.mkdir(parents=True, exist_ok=True)
-
-                        # If original is a symlink, remove it first
-                        if original_path.exists() and original_path.is_symlink():
-                            original_path.unlink()
-
-                        # Decrypt to temporary file first for atomic replacement
-                        # This avoids following symlinks at original_path and ensures atomicity
-                        target_path = original_path.with_suffix(original_path.suffix + ".tmp")
+                    try:
+                        # For COPY operations where the original file still exists,
+                        # skip decryption (don't overwrite) and just remove the cold storage copy
+                        if file_record.operation_type.value == "copy" and original_path.exists():
+                            cold_path.unlink()
+                        else:
+                            # Ensure destination directory exists
+                            original_path.parent.mkdir(parents=True, exist_ok=True)
+
+                            # If original is a symlink, remove it first
+                            if original_path.exists() and original_path.is_symlink():
+                                original_path.unlink()
+
+                            # Decrypt to temporary file first for atomic replacement
+                            # This avoids following symlinks at original_path and ensures atomicity
+                            target_path = original_path.with_suffix(original_path.suffix + ".tmp")
+
+                            try:
+                                # Decrypt to temp file
+                                file_encryption_service.decrypt_file(db, cold_path, target_path)
+
+                                # Atomically move it to final destination
+                                # (replaces existing file/symlink)
+                                target_path.replace(original_path)
+
+                            except Exception:
+                                # Clean up temp file if decryption failed
+                                if target_path.exists():
+                                    target_path.unlink()
+                                raise
+
+                            # Remove encrypted file from cold storage
+                            cold_path.unlink()
 
-                        try:
-                            # Decrypt to temp file
-                            file_encryption_service.decrypt_file(db, cold_path, target_path)
-
-                            # Atomically move it to final destination (replaces existing file/symlink)
-                            target_path.replace(original_path)
-
-                        except Exception:
-                            # Clean up temp file if decryption failed
-                            if target_path.exists():
-                                target_path.unlink()
-                            raise
-
-                        # Remove encrypted file from cold storage
-                        cold_path.unlink()
-
-                except Exception as e:
-                    return False, f"Failed to decrypt/thaw file: {e}"
-
-            # If original was a symlink, we need to handle it differently (and not encrypted)
-            elif file_record.operation_type.value == "symlink":
-                # Remove the symlink at original location if it exists
-                if original_path.exists() and original_path.is_symlink():
-                    original_path.unlink()
-                # Move file back from cold storage, preserving timestamps
-                try:
-                    FileThawer._move_preserving_timestamps(cold_path, original_path)
-                except Exception as e:
-                    return False, f"Failed to move file back: {e!s}"
-            elif file_record.operation_type.value == "copy":
-                # For copy, file is still in original location, just remove from cold storage
-                # Actually, if it was copied, the original should still exist
-                # But if we're thawing, we might want to ensure it's in hot storage
-                if not original_path.exists():
-                    # Original doesn't exist, move from cold storage, preserving timestamps
+                    except Exception as e:
+                        return False, f"Failed to decrypt/thaw file: {e}"
+
+                # If original was a symlink, we need to handle it differently (and not encrypted)
+                elif file_record.operation_type.value == "symlink":
+                    # Remove the symlink at original location if it exists
+                    if original_path.exists() and original_path.is_symlink():
+                        original_path.unlink()
+                    # Move file back from cold storage, preserving timestamps
                     try:
-                        FileThawer._move_preserving_timestamps(cold_path, original_path)
+                        moved_checksum = FileThawer._move_preserving_timestamps(
+                            cold_path, original_path, checksum_before
+                        )
                     except Exception as e:
                         return False, f"Failed to move file back: {e!s}"
-                else:
-                    # Original exists, just remove from cold storage
+                elif file_record.operation_type.value == "copy":
+                    # For copy, file is still in original location, just remove from cold storage
+                    # Actually, if it was copied, the original should still exist
+                    # But if we're thawing, we might want to ensure it's in hot storage
+                    if not original_path.exists():
+                        # Original doesn't exist, move from cold storage, preserving timestamps
+                        try:
+                            moved_checksum = FileThawer._move_preserving_timestamps(
+                                cold_path, original_path, checksum_before
+                            )
+                        except Exception as e:
+                            return False, f"Failed to move file back: {e!s}"
+                    else:
+                        # Original exists, just remove from cold storage
+                        try:
+                            cold_path.unlink()
+                        except Exception as e:
+                            return False, f"Failed to remove from cold storage: {e!s}"
+                else:  # MOVE
+                    # Move file back from cold storage to original location, preserving timestamps
                     try:
-                        cold_path.unlink()
+                        # Ensure destination directory exists
+                        original_path.parent.mkdir(parents=True, exist_ok=True)
+                        moved_checksum = FileThawer._move_preserving_timestamps(
+                            cold_path, original_path, checksum_before
+                        )
                     except Exception as e:
-                        return False, f"Failed to remove from cold storage: {e!s}"
-            else:  # MOVE
-                # Move file back from cold storage to original location, preserving timestamps
-                try:
-                    # Ensure destination directory exists
-                    original_path.parent.mkdir(parents=True, exist_ok=True)
-                    FileThawer._move_preserving_timestamps(cold_path, original_path)
-                except Exception as e:
-                    return False, f"Failed to move file back: {e!s}"
+                        return False, f"Failed to move file back: {e!s}"
 
             # Verify checksum after move (skip for encrypted files as checksum changes)
             checksum_after = None
             if original_path.exists():
-                checksum_after = checksum_verifier.calculate_checksum(original_path)
+                # Re-hash with the algorithm the checksum being checked was recorded with
+                algorithm = (
+                    checksum_algorithm(checksum_before)
+                    if checksum_before and not is_encrypted
+                    else None
+                )
+                checksum_after = moved_checksum or checksum_verifier.calculate_checksum(
+                    original_path, algorithm
+                )
+                if moved_checksum is not None:
+                    if checksum_before and moved_checksum != checksum_before:
+                        # move_verified raises on a failed copy and keeps the cold file, so
+                        # this was a rename of a file that changed since it was hashed
+                        logger.warning(
+                            f"Stored checksum of {cold_path} is stale, using the checksum of "
+                            f"the thawed file: {checksum_before[:16]}... != "
+                            f"{moved_checksum[:16]}..."
+                        )
+                    checksum_before = moved_checksum
                 if not is_encrypted and checksum_before and checksum_after != checksum_before:
                     logger.error(
                         f"Checksum mismatch after thaw: {checksum_before[:16]}... != {checksum_after[:16]}..."
@@ -168,6 +201,9 @@ class FileThawer:
                 file_inventory.status = FileStatus.ACTIVE
                 file_inventory.is_encrypted = False
                 file_inventory.file_path = str(original_path)  # Ensure path is updated to hot path
+                if checksum_after and original_path.exists():
+                    set_fingerprint(file_inventory, original_path.stat())
+                    file_inventory.checksum = checksum_after
 
                 # Log to audit trail
                 audit_trail_service.log_thaw_operation(
@@ -179,6 +215,7 @@ class FileThawer:
                     checksum_after=checksum_after,
                     success=True,
                     initiated_by=initiated_by or "manual",
+                    copy_strategy=copy_record.strategy,
                 )
 
                 db.commit()
@@ -193,22 +230,12 @@ class FileThawer:
             return False, str(e)
 
     @staticmethod
-    def _move_preserving_timestamps(source: Path, destination: Path) -> None:
-        """Move file while preserving all timestamps (mtime, atime)."""
-        # Get original timestamps before moving
-        stat_info = source.stat()
+    def _move_preserving_timestamps(
+        source: Path, destination: Path, expected_checksum: Optional[str] = None
+    ) -> Optional[str]:
+        """Move file while preserving all timestamps (mtime, atime).
 
-        # Try atomic rename first (same filesystem - preserves all timestamps)
-        try:
-            source.rename(destination)
-        except OSError:
-            # Cross-filesystem move - copy with timestamp preservation
-            # Copy file with metadata (preserves mtime and atime)
-            shutil.copy2(str(source), str(destination))
-
-            # Explicitly set atime and mtime to original values to ensure preservation
-            # Note: ctime cannot be set directly as it's managed by the filesystem
-            os.utime(str(destination), ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns))
-
-            # Remove original file
-            source.unlink()
+        Returns the checksum of the moved data; a cross-filesystem move hashes it while
+        copying (see file_mover.move_verified).
+        """
+        return move_verified(source, destination, expected_checksum)
@@ -1,36 +1,52 @@
 """Unified file workflow service - scanning, moving, and inventory management."""
 
-import fnmatch
 import json
 import logging
 import os
+import queue
 import shutil
+import stat
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import ClassVar, Dict, Iterator, List, Optional, Set
+from typing import Callable, ClassVar, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
+from sqlalchemy import and_, case, func, insert, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.config import settings
 from app.database import engine
 from app.models import (
+    ColdStorageLocation,
     CriterionType,
     FileInventory,
     FileRecord,
     FileStatus,
     MonitoredPath,
     PinnedFile,
+    ScanSeenRange,
     ScanStatus,
     StorageType,
 )
 from app.services.audit_trail_service import audit_trail_service
-from app.services.checksum_verifier import checksum_verifier
-from app.services.criteria_matcher import CriteriaMatcher
+from app.services.copy_engine import recording_copies
+from app.services.criteria_compiler import StatBatch, compile_criteria
+from app.services.directory_snapshot import DirectorySnapshotTracker
+from app.services.exclude_rules import ExcludeMatcher
 from app.services.file_cleanup import FileCleanup
 from app.services.file_mover import FileMover
 from app.services.file_reconciliation import FileReconciliation
+from app.services.hardlinks import hardlink_registry, inode_key
+from app.services.io_budget import IOBudget, apply_background_priority, io_budget_manager
+from app.services.metadata_enrichment import PRIORITY_FREEZE, metadata_enrichment_queue
+from app.services.parallel_walker import ParallelDirectoryWalker
+from app.services.scan_checkpoint import ScanCheckpointer, WalkCursor
 from app.services.scan_progress import scan_progress_manager
+from app.services.scan_records import ScanRecord, set_fingerprint, stored_checksum
+from app.services.scan_syscalls import SyscallCounter
 from app.services.storage_routing_service import storage_routing_service
 from app.utils.network_detection import check_atime_availability
 
@@ -40,6 +56,246 @@ logger = logging.getLogger(__name__)
 SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def _id_runs(ids: Iterable[int]) -> List[Tuple[int, int]]:
+    """Collapse ids into sorted ``(first, last)`` runs of consecutive integers."""
+    runs: List[Tuple[int, int]] = []
+    for row_id in sorted(set(ids)):
+        if runs and runs[-1][1] == row_id - 1:
+            runs[-1] = (runs[-1][0], row_id)
+        else:
+            runs.append((row_id, row_id))
+    return runs
+
+
+class _MoveDispatcher:
+    """Feeds freeze/thaw jobs to worker pools while a scan is still walking.
+
+    At most ``max_pending`` jobs are outstanding; when the limit is reached the caller
+    blocks until a job finishes. Results are collected on the calling thread only, so
+    ``results`` needs no locking. Jobs get the path's id, not the MonitoredPath: that
+    object belongs to the scan's session, which keeps committing while the jobs run, so
+    each job loads the path in its own session.
+    """
+
+    def __init__(
+        self,
+        service: "FileWorkflowService",
+        path: MonitoredPath,
+        freeze_executor: ThreadPoolExecutor,
+        thaw_executor: ThreadPoolExecutor,
+        results: dict,
+        max_pending: int,
+        budget: Optional[IOBudget] = None,
+    ):
+        self.service = service
+        self.path_id = path.id
+        self.freeze_executor = freeze_executor
+        self.thaw_executor = thaw_executor
+        self.results = results
+        self.max_pending = max(1, max_pending)
+        self.budget = budget
+        self.queued = 0
+        self._pending: Dict[Future, str] = {}
+
+    def freeze(self, file_path: Path, matched_ids: list):
+        """Queue a file to be moved to cold storage."""
+        self._wait_for_slot()
+        future = self.freeze_executor.submit(
+            self._run, self.service._process_single_file, file_path, matched_ids, self.path_id
+        )
+        self._track(future, f"Exception processing {file_path}")
+
+    def thaw(self, symlink_path: Path, cold_path: Path):
+        """Queue a file to be moved back to hot storage."""
+        self._wait_for_slot()
+        future = self.thaw_executor.submit(
+            self._run, self.service._thaw_single_file, symlink_path, cold_path, self.path_id
+        )
+        self._track(future, f"Exception thawing {cold_path}")
+
+    def _run(self, job, *args):
+        # Runs on a worker thread: the budget's concurrency limit and read budget apply to
+        # the whole move, including hashing and copying
+        if self.budget is None:
+            return job(*args)
+        with self.budget.operation():
+            return job(*args)
+
+    def drain(self):
+        """Wait for every queued job and collect its result."""
+        for future in as_completed(list(self._pending)):
+            self._collect(future)
+
+    def _track(self, future: Future, error_prefix: str):
+        self._pending[future] = error_prefix
+        self.queued += 1
+        scan_progress_manager.update_total_files(self.path_id, self.queued)
+
+    def _wait_for_slot(self):
+        for future in [f for f in self._pending if f.done()]:
+            self._collect(future)
+        while len(self._pending) >= self.max_pending:
+            done, _ = wait(list(self._pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                self._collect(future)
+
+    def _collect(self, future: Future):
+        error_prefix = self._pending.pop(future)
+        try:
+            result = future.result()
+            if result["success"]:
+                self.results["files_moved"] += 1
+            else:
+                self.results["errors"].append(result["error"])
+        except Exception as e:
+            self.results["errors"].append(f"{error_prefix}: {e!s}")
+
+
+class _LocationWalk:
+    """One cold storage location walked on its own thread for _ConcurrentLocationWalks.
+
+    Also serves as the walk's cursor: listing progress goes straight to the shared cursor,
+    but ``consumed`` is queued behind the entries it covers, so the scan thread applies it
+    only once it has processed them.
+    """
+
+    BATCH_SIZE = 256
+
+    def __init__(
+        self,
+        location: ColdStorageLocation,
+        root: str,
+        owner: "_ConcurrentLocationWalks",
+    ):
+        self.location = location
+        self.root = root
+        self.owner = owner
+        self.files = 0
+        self.seconds = 0.0
+        self.error: Optional[str] = None
+        self.exception: Optional[BaseException] = None
+        self._buffer: List[os.DirEntry] = []
+
+    def start_points(self, root: str) -> List[Tuple[str, bool]]:
+        return self.owner.cursor.start_points(root)
+
+    def add_batch(self, dir_path: str):
+        self.owner.cursor.add_batch(dir_path)
+
+    def listed(self, dir_path: str, subdirs: Iterable[str] = ()):
+        self.owner.cursor.listed(dir_path, subdirs)
+
+    def consumed(self, dir_path: str):
+        self._flush()
+        self.owner.put(("consumed", dir_path, self))
+
+    def run(self):
+        apply_background_priority()
+        started = time.monotonic()
+        walk = None
+        try:
+            walk = self.owner.walk_factory(
+                self.root, self if self.owner.cursor is not None else None
+            )
+            for entry in walk:
+                self._buffer.append(entry)
+                if len(self._buffer) >= self.BATCH_SIZE:
+                    self._flush()
+                if self.owner.stop.is_set():
+                    break
+            self._flush()
+        except Exception as e:
+            self.error = str(e)
+            self.exception = e
+            logger.warning(f"Error walking cold storage {self.root}: {e}")
+        finally:
+            if hasattr(walk, "close"):
+                walk.close()
+            self.seconds = time.monotonic() - started
+            self.owner.put(("done", None, self))
+
+    def _flush(self):
+        if self._buffer:
+            self.files += len(self._buffer)
+            self.owner.put(("entries", self._buffer, self))
+            self._buffer = []
+
+    def timing(self) -> dict:
+        return {
+            "location_id": self.location.id,
+            "name": self.location.name,
+            "path": self.root,
+            "files": self.files,
+            "seconds": round(self.seconds, 3),
+            "error": self.error,
+        }
+
+
+class _ConcurrentLocationWalks:
+    """Walks several cold storage locations at once and merges their entries.
+
+    Each location is walked on its own thread (with its own walker pool and device
+    budget), so a slow location does not hold up the others. Entries are yielded on the
+    calling thread as ``(location_walk, entry)`` pairs in arrival order; the bounded queue
+    keeps memory flat when the consumer falls behind. If a walk fails, the error is raised
+    once all walks have finished.
+    """
+
+    def __init__(
+        self,
+        locations: List[Tuple[ColdStorageLocation, str]],
+        walk_factory: Callable[[str, Optional["_LocationWalk"]], Iterable[os.DirEntry]],
+        cursor: Optional[WalkCursor] = None,
+        max_pending_batches: int = 64,
+    ):
+        self.walk_factory = walk_factory
+        self.cursor = cursor
+        self.stop = threading.Event()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending_batches)
+        self.walks = [_LocationWalk(location, root, self) for location, root in locations]
+
+    def put(self, item) -> bool:
+        while not self.stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __iter__(self) -> Iterator[Tuple[_LocationWalk, os.DirEntry]]:
+        threads = [
+            threading.Thread(
+                target=walk.run, name=f"cold-walk-{walk.location.id}", daemon=True
+            )
+            for walk in self.walks
+        ]
+        for thread in threads:
+            thread.start()
+        remaining = len(threads)
+        try:
+            while remaining:
+                kind, payload, walk = self._queue.get()
+                if kind == "entries":
+                    for entry in payload:
+                        yield walk, entry
+                elif kind == "consumed":
+                    self.cursor.consumed(payload)
+                else:
+                    remaining -= 1
+            # A location that failed part-way must not look like a location whose files are gone
+            for walk in self.walks:
+                if walk.exception is not None:
+                    raise walk.exception
+        finally:
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+
+    def timings(self) -> List[dict]:
+        return [walk.timing() for walk in self.walks]
+
+
 class FileWorkflowService:
     """Unified service for file scanning, movement, and inventory management."""
 
@@ -55,6 +311,22 @@ class FileWorkflowService:
         "thumbs.db",
     }
 
+    # Entries walked between inventory syncs; bounds scan memory regardless of tree size
+    INVENTORY_CHUNK_SIZE: ClassVar[int] = 1000
+
+    # Rows per set-based inventory upsert (one fingerprint select plus one executemany)
+    INVENTORY_UPSERT_BATCH_SIZE: ClassVar[int] = 5000
+
+    # Move jobs allowed to wait in the worker queues before the walk pauses
+    MAX_PENDING_MOVES: ClassVar[int] = 500
+
+    # Hot relative paths kept in memory for the cold walk's counterpart check; beyond
+    # this the cold walk falls back to checking hot storage directly
+    HOT_INDEX_MAX_ENTRIES: ClassVar[int] = 1_000_000
+
+    def __init__(self):
+        self._default_excludes = ExcludeMatcher(self.IGNORED_PATTERNS)
+
     def process_path(self, path: MonitoredPath, db: Session) -> dict:
         """
         Process a monitored path: scan, match, and move files.
@@ -134,65 +406,40 @@ class FileWorkflowService:
                 logger.warning(f"Error during cleanup for path {path.id}: {e!s}")
 
             try:
-                # Scan phase
-                scan_results = self._scan_path(path, db)
-                matching_files = scan_results["to_cold"]
-                files_to_thaw = scan_results["to_hot"]
-                results["files_found"] = len(matching_files)
+                # Scan phase - moves are dispatched as the walk finds them
+                with self._move_pool(2) as thaw_executor, self._move_pool(3) as freeze_executor:
+                    dispatcher = _MoveDispatcher(
+                        self,
+                        path,
+                        freeze_executor,
+                        thaw_executor,
+                        results,
+                        self.MAX_PENDING_MOVES,
+                        io_budget_manager.for_path(path),
+                    )
+                    try:
+                        scan_results = self._scan_path(path, db, dispatcher=dispatcher)
+
+                        # Candidates returned rather than dispatched during the walk
+                        for symlink_path, cold_path in scan_results["to_hot"]:
+                            dispatcher.thaw(symlink_path, cold_path)
+                        for file_path, matched_ids in scan_results["to_cold"]:
+                            dispatcher.freeze(file_path, matched_ids)
+                    finally:
+                        dispatcher.drain()
+
+                results["files_found"] = scan_results.get(
+                    "files_found", len(scan_results["to_cold"])
+                )
                 results["files_skipped"] = scan_results.get("skipped_hot", 0) + scan_results.get(
                     "skipped_cold", 0
                 )
                 results["total_scanned"] = scan_results.get("total_scanned", 0)
-
-                total_files_to_process = len(matching_files) + len(files_to_thaw)
-                scan_progress_manager.update_total_files(path.id, total_files_to_process)
-
-                # Process thawing
-                if files_to_thaw:
-                    logger.info(f"Processing {len(files_to_thaw)} files to thaw")
-                    max_workers = min(2, len(files_to_thaw))
-                    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                        future_to_thaw = {
-                            executor.submit(
-                                self._thaw_single_file, symlink_path, cold_path, path
-                            ): (
-                                symlink_path,
-                                cold_path,
-                            )
-                            for symlink_path, cold_path in files_to_thaw
-                        }
-                        for future in as_completed(future_to_thaw):
-                            _symlink_path, cold_path = future_to_thaw[future]
-                            try:
-                                thaw_result = future.result()
-                                if thaw_result["success"]:
-                                    results["files_moved"] += 1
-                                else:
-                                    results["errors"].append(thaw_result["error"])
-                            except Exception as e:
-                                results["errors"].append(f"Exception thawing {cold_path}: {e!s}")
-
-                # Process moves to cold storage
-                if matching_files:
-                    logger.info(f"Processing {len(matching_files)} files to cold storage")
-                    max_workers = min(3, len(matching_files))
-                    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                        future_to_file = {
-                            executor.submit(
-                                self._process_single_file, file_path, matched_ids, path
-                            ): (file_path, matched_ids)
-                            for file_path, matched_ids in matching_files
-                        }
-                        for future in as_completed(future_to_file):
-                            file_path, _ = future_to_file[future]
-                            try:
-                                file_result = future.result()
-                                if file_result["success"]:
-                                    results["files_moved"] += 1
-                                else:
-                                    results["errors"].append(file_result["error"])
-                            except Exception as e:
-                                results["errors"].append(f"Exception processing {file_path}: {e!s}")
+                results["full_scan"] = scan_results.get("full_scan", True)
+                results["dirs_walked"] = scan_results.get("dirs_walked", 0)
+                results["dirs_skipped"] = scan_results.get("dirs_skipped", 0)
+                results["syscalls"] = scan_results.get("syscalls", {})
+                results["cold_locations"] = scan_results.get("cold_locations", [])
 
                 # Reconciliation phase
                 try:
@@ -252,18 +499,290 @@ class FileWorkflowService:
                 "errors": [error_log],
             }
 
-    def _scan_path(self, path: MonitoredPath, db: Session) -> dict:
-        """Scan a monitored path for files matching criteria."""
+    def process_changes(
+        self,
+        path: MonitoredPath,
+        db: Session,
+        changed_paths: Iterable[str] = (),
+        rescan_dirs: Iterable[str] = (),
+    ) -> dict:
+        """
+        Re-evaluate only the hot files a watcher reported as changed.
+
+        ``changed_paths`` are entries under the source path that were created, modified,
+        deleted or renamed. ``rescan_dirs`` are subtrees whose contents are unknown (new or
+        renamed directories, or directories the watcher could not watch); they are walked,
+        incrementally when the path has incremental scanning enabled. Inventory is synced
+        for these entries only and moves are dispatched as in a full scan.
+
+        Returns:
+            dict with results, including scan_skipped if a scan was already running
+        """
+        _, scan_started = scan_progress_manager.start_scan(path.id, total_files=0)
+        if not scan_started:
+            logger.debug(f"Scan already running for path {path.id}, deferring watched changes")
+            return {
+                "path_id": path.id,
+                "files_found": 0,
+                "files_moved": 0,
+                "errors": [],
+                "scan_skipped": True,
+                "scan_skipped_reason": "A scan is already running for this path",
+            }
+
+        results = {
+            "path_id": path.id,
+            "files_found": 0,
+            "files_moved": 0,
+            "files_removed": 0,
+            "total_scanned": 0,
+            "errors": [],
+        }
+        try:
+            with self._move_pool(2) as thaw_executor, self._move_pool(3) as freeze_executor:
+                dispatcher = _MoveDispatcher(
+                    self,
+                    path,
+                    freeze_executor,
+                    thaw_executor,
+                    results,
+                    self.MAX_PENDING_MOVES,
+                    io_budget_manager.for_path(path),
+                )
+                try:
+                    scan_results = self._scan_changes(
+                        path, db, changed_paths, rescan_dirs, dispatcher
+                    )
+                finally:
+                    dispatcher.drain()
+
+            results["files_found"] = scan_results["files_found"]
+            results["files_removed"] = scan_results["files_removed"]
+            results["total_scanned"] = scan_results["total_scanned"]
+            results["dirs_walked"] = scan_results["dirs_walked"]
+            results["syscalls"] = scan_results["syscalls"]
+            scan_progress_manager.finish_scan(path.id, status="completed")
+        except Exception as e:
+            logger.error(f"Error processing changes for path {path.id}: {e!s}", exc_info=True)
+            results["errors"].append(f"Error processing changes for path {path.id}: {e!s}")
+            scan_progress_manager.finish_scan(path.id, status="failed")
+        return results
+
+    def _scan_changes(
+        self,
+        path: MonitoredPath,
+        db: Session,
+        changed_paths: Iterable[str],
+        rescan_dirs: Iterable[str],
+        dispatcher: Optional["_MoveDispatcher"] = None,
+    ) -> dict:
+        """Evaluate changed hot entries and walk the given subtrees; see process_changes."""
         scan_start_time = datetime.now(tz=timezone.utc)
+        source_path = Path(path.source_path)
+        source_prefix = str(source_path) + os.sep
+        summary = {
+            "files_found": 0,
+            "thaws_found": 0,
+            "files_removed": 0,
+            "total_scanned": 0,
+            "dirs_walked": 0,
+            "syscalls": {},
+        }
+        if not source_path.is_dir():
+            logger.warning(f"Path {path.name}: Source path unreachable: {source_path}")
+            return summary
+
+        syscalls = SyscallCounter()
+        budget = io_budget_manager.for_path(path)
+        storage_roots = self._storage_roots(path)
+        excludes = self._excludes_for(path)
+        pinned = db.query(PinnedFile).filter(PinnedFile.path_id == path.id).all()
+        pinned_paths = {Path(p.file_path) for p in pinned}
+        criteria = compile_criteria(path.criteria)
+
+        records: List[ScanRecord] = []
+        to_cold: List = []
+        to_hot: List = []
+        gone: List[str] = []
+
+        def evaluate(file_path: str, stat_info: os.stat_result, is_symlink: bool):
+            summary["total_scanned"] += 1
+            if not is_symlink:
+                records.append(ScanRecord.from_stat(file_path, stat_info))
+
+            actual_file_path = None
+            is_symlink_to_cold = False
+            if is_symlink:
+                try:
+                    target, target_root = self._resolve_symlink(
+                        file_path, storage_roots, syscalls
+                    )
+                    syscalls.add("stat")
+                    stat_info = os.stat(target)
+                except (OSError, RuntimeError):
+                    return
+                actual_file_path = Path(target)
+                is_symlink_to_cold = target_root is not None
+
+            hot_path = Path(file_path)
+            if hot_path in pinned_paths:
+                return
+            try:
+                is_active, matched_ids = criteria.match_file(
+                    hot_path, actual_file_path, stat_info=stat_info
+                )
+            except (OSError, PermissionError) as e:
+                logger.debug(f"Access error for {hot_path}: {e}")
+                return
+            if is_active:
+                if is_symlink_to_cold and actual_file_path:
+                    to_hot.append((hot_path, actual_file_path))
+            elif not is_symlink_to_cold:
+                to_cold.append((hot_path, matched_ids))
+
+        # Single entries: one lstat each, directories are turned into subtree walks
+        dirs = set()
+        for raw_dir in rescan_dirs:
+            dir_path = os.path.normpath(raw_dir)
+            if dir_path == str(source_path) or dir_path.startswith(source_prefix):
+                dirs.add(dir_path)
+        for raw_path in changed_paths:
+            file_path = os.path.normpath(raw_path)
+            if not file_path.startswith(source_prefix):
+                continue
+            syscalls.add("lstat")
+            try:
+                stat_info = os.lstat(file_path)
+            except FileNotFoundError:
+                gone.append(file_path)
+                continue
+            except OSError:
+                continue
+            is_dir = stat.S_ISDIR(stat_info.st_mode)
+            if excludes.excludes_path(file_path[len(source_prefix) :], is_dir):
+                continue
+            if is_dir:
+                dirs.add(file_path)
+            else:
+                evaluate(file_path, stat_info, stat.S_ISLNK(stat_info.st_mode))
+
+        # Subtrees, outermost only
+        walked_dirs: List[str] = []
+        tracker = None
+        if dirs:
+            tracker = DirectorySnapshotTracker.for_path(path, db, syscalls)
+        for dir_path in sorted(dirs):
+            if walked_dirs and dir_path.startswith(walked_dirs[-1] + os.sep):
+                continue
+            walked_dirs.append(dir_path)
+            rel_prefix = ""
+            parent_path = None
+            if dir_path != str(source_path):
+                parent_path = os.path.dirname(dir_path)
+                rel_dir = dir_path[len(source_prefix) :]
+                if excludes.excludes_path(rel_dir, True):
+                    continue
+                rel_prefix = rel_dir + "/"
+            for entry in self._recursive_scandir(
+                Path(dir_path),
+                tracker,
+                parent_path,
+                syscalls,
+                excludes,
+                rel_prefix,
+                budget,
+            ):
+                try:
+                    stat_info = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                evaluate(entry.path, stat_info, entry.is_symlink())
+
+        # Inventory for the touched entries only
+        if records:
+            self._update_db_entries_batch(path, records, StorageType.HOT, db, mark_seen=False)
+        removed = 0
+        for i in range(0, len(gone), 500):
+            removed += (
+                db.query(FileInventory)
+                .filter(
+                    FileInventory.path_id == path.id,
+                    FileInventory.storage_type == StorageType.HOT,
+                    FileInventory.status == FileStatus.ACTIVE,
+                    FileInventory.file_path.in_(gone[i : i + 500]),
+                )
+                .delete(synchronize_session=False)
+            )
+        if walked_dirs:
+            skipped_dirs = tracker.skipped_dirs if tracker is not None else set()
+            walked_paths = {record.path for record in records}
+            missing_ids = []
+            for dir_path in walked_dirs:
+                missing_query = db.query(FileInventory.id, FileInventory.file_path).filter(
+                    FileInventory.path_id == path.id,
+                    FileInventory.storage_type == StorageType.HOT,
+                    FileInventory.status == FileStatus.ACTIVE,
+                    FileInventory.last_seen < scan_start_time,
+                    FileInventory.file_path.startswith(dir_path + os.sep, autoescape=True),
+                )
+                # Unchanged rows are not rewritten, so the walked records tell what is live
+                missing_ids.extend(
+                    entry_id
+                    for entry_id, file_path in missing_query.yield_per(5000)
+                    if file_path not in walked_paths
+                    and os.path.dirname(file_path) not in skipped_dirs
+                )
+            for i in range(0, len(missing_ids), 500):
+                removed += (
+                    db.query(FileInventory)
+                    .filter(FileInventory.id.in_(missing_ids[i : i + 500]))
+                    .delete(synchronize_session=False)
+                )
+            tracker.save(db, scopes=walked_dirs)
+            summary["dirs_walked"] = tracker.dirs_walked
+        if removed:
+            db.commit()
+
+        if dispatcher is not None:
+            for symlink_path, cold_path in to_hot:
+                dispatcher.thaw(symlink_path, cold_path)
+            for file_path, matched_ids in to_cold:
+                dispatcher.freeze(file_path, matched_ids)
+
+        summary["files_found"] = len(to_cold)
+        summary["thaws_found"] = len(to_hot)
+        summary["files_removed"] = removed
+        summary["syscalls"] = syscalls.as_dict()
+        summary["to_cold"] = to_cold
+        summary["to_hot"] = to_hot
+        logger.debug(
+            f"Path {path.name}: processed {summary['total_scanned']} changed files and "
+            f"{len(walked_dirs)} subtrees, {removed} removed, {len(to_cold)} to freeze, "
+            f"{len(to_hot)} to thaw"
+        )
+        return summary
+
+    def _scan_path(
+        self, path: MonitoredPath, db: Session, dispatcher: Optional["_MoveDispatcher"] = None
+    ) -> dict:
+        """Scan a monitored path for files matching criteria.
+
+        The walk is streamed: inventory is synced every INVENTORY_CHUNK_SIZE entries and the
+        freeze/thaw candidates found in that chunk are handed to ``dispatcher`` right after,
+        so memory stays flat and moves start while the walk is still running. Without a
+        dispatcher, candidates are collected and returned in ``to_cold``/``to_hot``.
+
+        Progress is checkpointed after synced chunks, so a scan that is interrupted continues
+        from its last checkpoint the next time the path is scanned.
+        """
         matching_files = []
         files_to_thaw = []
         files_skipped_hot = 0
         files_skipped_cold = 0
-        hot_files_metadata = []
-        cold_files_metadata = []
+        files_found = 0
+        thaws_found = 0
 
         source_path = Path(path.source_path)
-        dest_base = Path(path.cold_storage_path)
 
         if not source_path.exists() or not source_path.is_dir():
             logger.warning(f"Path {path.name}: Source path unreachable: {source_path}")
@@ -298,12 +817,163 @@ class FileWorkflowService:
         # Load pinned files
         pinned = db.query(PinnedFile).filter(PinnedFile.path_id == path.id).all()
         pinned_paths = {Path(p.file_path) for p in pinned}
+        # Criteria are parsed once and file ages measured against the start of the scan
+        criteria = compile_criteria(path.criteria)
+
+        # Resume an interrupted scan, keeping its start time so rows it synced before the
+        # interruption count as seen
+        checkpointer = ScanCheckpointer(path, db)
+        resumed = checkpointer.begin()
+        scan_start_time = checkpointer.scan_started_at
+
+        # Directory snapshots let incremental scans skip unchanged directories
+        syscalls = SyscallCounter()
+        tracker = DirectorySnapshotTracker.for_path(path, db, syscalls)
+        if resumed:
+            tracker.full_scan = checkpointer.full_scan
+        else:
+            checkpointer.full_scan = tracker.full_scan
+        storage_roots = self._storage_roots(path)
+        excludes = self._excludes_for(path)
+        source_prefix = str(source_path) + os.sep
+        # Every attached cold location, longest root first so nested roots match correctly
+        cold_locations = sorted(
+            ((location, os.path.normpath(location.path)) for location in path.storage_locations),
+            key=lambda item: len(item[1]),
+            reverse=True,
+        )
+        cold_prefixes = [(root + os.sep, location.id) for location, root in cold_locations]
+
+        def cold_relative(file_path: str) -> Optional[str]:
+            for prefix, _ in cold_prefixes:
+                if file_path.startswith(prefix):
+                    return file_path[len(prefix) :]
+            return None
+
+        # Relative paths of hot files seen by this walk, so the cold walk can answer
+        # "does the hot counterpart exist" without touching hot storage
+        hot_index: Set[str] = set()
+        # Files walked before an interruption are not in the index
+        hot_index_complete = not resumed
+
+        # Hot files with several hard links, counted per (dev, inode) for the scan results
+        hot_links: Dict[Tuple[int, int], int] = {}
+
+        # Relative paths already dispatched to a mover that relocates them; the cold walk
+        # must not record inventory for these while the move may be in progress
+        relocating: Set[str] = set()
+        relocates_on_freeze = path.operation_type in ["move", "symlink"]
+
+        # Current chunk: inventory metadata plus the moves found alongside it
+        chunk_metadata: List[ScanRecord] = []
+        chunk_to_cold: List = []
+        chunk_to_hot: List = []
+        chunk_entries = 0
+        inventory_updated = 0
+        entries_synced = 0
+
+        # Hot entries after the last hot flush, held back until the final inventory update
+        hot_remainder: List[ScanRecord] = []
+        hot_remainder_to_cold: List = []
+        hot_remainder_to_hot: List = []
+
+        def dispatch_chunk():
+            nonlocal chunk_to_cold, chunk_to_hot
+            if dispatcher is None:
+                # Freezes run after the scan; let the enrichment workers hash these files
+                # ahead of the backlog meanwhile (concurrent movers hash them right away)
+                if chunk_to_cold:
+                    metadata_enrichment_queue.enqueue_paths(
+                        db, path.id, [str(f) for f, _ in chunk_to_cold], PRIORITY_FREEZE
+                    )
+                    db.commit()
+                    metadata_enrichment_queue.notify()
+                matching_files.extend(chunk_to_cold)
+                files_to_thaw.extend(chunk_to_hot)
+            else:
+                for symlink_path, cold_path in chunk_to_hot:
+                    dispatcher.thaw(symlink_path, cold_path)
+                    relative_path = cold_relative(str(cold_path))
+                    if relative_path is not None:
+                        relocating.add(relative_path)
+                for file_path, matched_ids in chunk_to_cold:
+                    dispatcher.freeze(file_path, matched_ids)
+                    if relocates_on_freeze:
+                        relocating.add(str(file_path)[len(source_prefix) :])
+            chunk_to_cold = []
+            chunk_to_hot = []
+
+        # Hot files awaiting criteria evaluation: (file_path, actual_file_path, stat_info,
+        # is_symlink_to_cold). They are evaluated as one batch per chunk.
+        pending: List[tuple] = []
+
+        def evaluate_pending():
+            nonlocal files_found, thaws_found, files_skipped_hot, files_skipped_cold
+            if not pending:
+                return
+            batch = StatBatch([p[0] for p in pending], [p[2] for p in pending])
+            for (file_path, actual_file_path, _, is_symlink_to_cold), is_active in zip(
+                pending, criteria.match_batch(batch)
+            ):
+                if is_active:
+                    if is_symlink_to_cold and actual_file_path:
+                        chunk_to_hot.append((file_path, actual_file_path))
+                        thaws_found += 1
+                    else:
+                        files_skipped_hot += 1
+                elif not is_symlink_to_cold:
+                    # Files that do not match have no matched criteria
+                    chunk_to_cold.append((file_path, []))
+                    files_found += 1
+                else:
+                    files_skipped_cold += 1
+            pending.clear()
+
+        def flush_chunk(tier: StorageType, cursor: WalkCursor):
+            # Inventory rows must exist before the movers look them up
+            nonlocal chunk_metadata, chunk_entries, inventory_updated, entries_synced
+            nonlocal chunk_to_cold, chunk_to_hot, hot_remainder
+            evaluate_pending()
+            if tier == StorageType.COLD and hot_remainder:
+                # A cold checkpoint implies the whole hot walk is synced
+                inventory_updated += self._update_db_entries_batch(
+                    path, hot_remainder, StorageType.HOT, db
+                )
+                entries_synced += len(hot_remainder)
+                hot_remainder = []
+                chunk_to_cold = hot_remainder_to_cold + chunk_to_cold
+                chunk_to_hot = hot_remainder_to_hot + chunk_to_hot
+                hot_remainder_to_cold.clear()
+                hot_remainder_to_hot.clear()
+            if chunk_metadata:
+                inventory_updated += self._update_db_entries_batch(
+                    path, chunk_metadata, tier, db, cold_prefixes
+                )
+            entries_synced += chunk_entries
+            chunk_metadata = []
+            chunk_entries = 0
+            checkpointer.maybe_save(tier, cursor, entries_synced)
+            dispatch_chunk()
 
         # Scan hot storage
         file_count = 0
-        for entry in self._recursive_scandir(source_path):
+        scan_threads = self._scan_threads(path)
+        hot_cursor = checkpointer.cursor_for(StorageType.HOT)
+        hot_budget = io_budget_manager.for_path(path)
+        hot_entries = (
+            self._walk(
+                source_path, scan_threads, tracker, syscalls, excludes, hot_cursor, hot_budget
+            )
+            if hot_cursor is not None
+            else ()
+        )
+        for entry in hot_entries:
+            if chunk_entries >= self.INVENTORY_CHUNK_SIZE:
+                flush_chunk(StorageType.HOT, hot_cursor)
+
             file_path = Path(entry.path)
             file_count += 1
+            chunk_entries += 1
 
             stat_info = None
             try:
@@ -314,56 +984,84 @@ class FileWorkflowService:
             # Collect metadata for inventory sync
             is_symlink = entry.is_symlink()
             if not is_symlink:
-                hot_files_metadata.append(
-                    {
-                        "path": entry.path,
-                        "size": stat_info.st_size,
-                        "mtime": datetime.fromtimestamp(stat_info.st_mtime, tz=timezone.utc),
-                        "atime": datetime.fromtimestamp(stat_info.st_atime, tz=timezone.utc),
-                        "ctime": datetime.fromtimestamp(stat_info.st_ctime, tz=timezone.utc),
-                    }
-                )
-
-            if file_path in pinned_paths:
-                continue
+                chunk_metadata.append(ScanRecord.from_stat(entry.path, stat_info))
+                if stat_info.st_nlink > 1:
+                    inode = (stat_info.st_dev, stat_info.st_ino)
+                    hot_links[inode] = hot_links.get(inode, 0) + 1
 
             actual_file_path = None
             is_symlink_to_cold = False
 
             if is_symlink:
                 try:
-                    resolved = file_path.resolve(strict=True)
-                    actual_file_path = resolved
-                    try:
-                        resolved.relative_to(dest_base)
-                        is_symlink_to_cold = True
-                    except ValueError:
-                        pass
+                    target, target_root = self._resolve_symlink(
+                        entry.path, storage_roots, syscalls
+                    )
+                    # Criteria are evaluated against the target, which must exist
+                    syscalls.add("stat")
+                    stat_info = os.stat(target)
                 except (OSError, RuntimeError):
                     continue
+                actual_file_path = Path(target)
+                is_symlink_to_cold = target_root is not None
 
-            try:
-                is_active, matched_ids = CriteriaMatcher.match_file(
-                    file_path, path.criteria, actual_file_path
-                )
-                if is_active:
-                    if is_symlink_to_cold and actual_file_path:
-                        files_to_thaw.append((file_path, actual_file_path))
-                    else:
-                        files_skipped_hot += 1
-                elif not is_symlink_to_cold:
-                    matching_files.append((file_path, matched_ids))
+            if hot_index_complete:
+                if len(hot_index) < self.HOT_INDEX_MAX_ENTRIES:
+                    hot_index.add(entry.path[len(source_prefix) :])
                 else:
-                    files_skipped_cold += 1
-            except (OSError, PermissionError) as e:
-                logger.debug(f"Access error for {file_path}: {e}")
+                    hot_index_complete = False
+
+            if file_path in pinned_paths:
                 continue
 
-        # Scan cold storage directly (for MOVE operations)
-        if dest_base.exists() and dest_base.is_dir():
-            for entry in self._recursive_scandir(dest_base):
+            pending.append((file_path, actual_file_path, stat_info, is_symlink_to_cold))
+
+        evaluate_pending()
+        # The hot remainder is synced with the final inventory update below, so small
+        # trees keep all database writes ahead of the first move
+        hot_remainder = chunk_metadata
+        hot_remainder_to_cold.extend(chunk_to_cold)
+        hot_remainder_to_hot.extend(chunk_to_hot)
+        chunk_metadata = []
+        chunk_to_cold = []
+        chunk_to_hot = []
+        chunk_entries = 0
+
+        # Scan every cold storage location directly (for MOVE operations), concurrently
+        cold_walks = None
+        reachable = [(loc, root) for loc, root in cold_locations if os.path.isdir(root)]
+        for location, root in cold_locations:
+            if (location, root) not in reachable:
+                logger.warning(f"Path {path.name}: cold storage unreachable: {root}")
+        # Relative paths already scheduled for thaw, so a file present in several
+        # locations is thawed once
+        thawing: Set[str] = set()
+        if reachable:
+            cold_cursor = checkpointer.cursor_for(StorageType.COLD)
+
+            # Built here: the walks run on their own threads, which must not read the scan
+            # session's MonitoredPath
+            budgets = {root: io_budget_manager.for_path(path, root) for _, root in reachable}
+
+            def walk_location(root: str, cursor: Optional[_LocationWalk]):
+                return self._walk(
+                    Path(root), scan_threads, tracker, syscalls, excludes, cursor, budgets[root]
+                )
+
+            cold_walks = _ConcurrentLocationWalks(reachable, walk_location, cold_cursor)
+            for location_walk, entry in cold_walks:
+                if chunk_entries >= self.INVENTORY_CHUNK_SIZE:
+                    flush_chunk(StorageType.COLD, cold_cursor)
+
                 cold_file_path = Path(entry.path)
                 file_count += 1
+                chunk_entries += 1
+
+                relative_path = None
+                if entry.path.startswith(location_walk.root + os.sep):
+                    relative_path = entry.path[len(location_walk.root) + 1 :]
+                if relative_path is not None and relative_path in relocating:
+                    continue
 
                 stat_info = None
                 try:
@@ -372,60 +1070,152 @@ class FileWorkflowService:
                     continue
 
                 # Collect metadata for inventory sync
-                if not entry.is_symlink():
-                    cold_files_metadata.append(
-                        {
-                            "path": entry.path,
-                            "size": stat_info.st_size,
-                            "mtime": datetime.fromtimestamp(stat_info.st_mtime, tz=timezone.utc),
-                            "atime": datetime.fromtimestamp(stat_info.st_atime, tz=timezone.utc),
-                            "ctime": datetime.fromtimestamp(stat_info.st_ctime, tz=timezone.utc),
-                        }
-                    )
+                cold_is_symlink = entry.is_symlink()
+                if not cold_is_symlink:
+                    chunk_metadata.append(ScanRecord.from_stat(entry.path, stat_info))
 
-                try:
-                    relative_path = cold_file_path.relative_to(dest_base)
-                    hot_file_path = source_path / relative_path
-                except ValueError:
+                if relative_path is None or relative_path in thawing:
                     continue
+                hot_file_path = source_path / relative_path
 
-                if hot_file_path.exists():
+                if relative_path in hot_index:
                     continue
+                # Fall back to the filesystem where the hot walk could not have seen the file
+                if not hot_index_complete or os.path.dirname(str(hot_file_path)) in (
+                    tracker.skipped_dirs
+                ):
+                    syscalls.add("exists")
+                    if hot_file_path.exists():
+                        continue
 
                 if cold_file_path in pinned_paths or hot_file_path in pinned_paths:
                     continue
 
                 try:
-                    is_active, _ = CriteriaMatcher.match_file(
-                        hot_file_path, path.criteria, cold_file_path
+                    is_active, _ = criteria.match_file(
+                        hot_file_path,
+                        cold_file_path,
+                        stat_info=None if cold_is_symlink else stat_info,
                     )
                     if is_active:
-                        files_to_thaw.append((hot_file_path, cold_file_path))
+                        chunk_to_hot.append((hot_file_path, cold_file_path))
+                        thawing.add(relative_path)
+                        thaws_found += 1
                     else:
                         files_skipped_cold += 1
                 except (OSError, PermissionError):
                     continue
 
-        # Update inventory using collected metadata (Avoid redundant walks!)
-        inventory_updated = self._update_file_inventory(
-            path,
-            db,
-            hot_files=hot_files_metadata,
-            cold_files=cold_files_metadata,
-            scan_start_time=scan_start_time,
+            for timing in cold_walks.timings():
+                logger.info(
+                    f"Path {path.name}: cold location {timing['name']} walked "
+                    f"{timing['files']} files in {timing['seconds']:.2f}s"
+                    + (f" (error: {timing['error']})" if timing["error"] else "")
+                )
+
+        # Sync the remaining chunks and drop rows for files that are gone
+        if resumed and not tracker.full_scan:
+            # Directories skipped before the interruption are unknown, so missing rows
+            # are left to the next scan
+            for tier, records in (
+                (StorageType.HOT, hot_remainder),
+                (StorageType.COLD, chunk_metadata),
+            ):
+                if records:
+                    inventory_updated += self._update_db_entries_batch(
+                        path, records, tier, db, cold_prefixes
+                    )
+        else:
+            inventory_updated += self._update_file_inventory(
+                path,
+                db,
+                hot_files=hot_remainder,
+                cold_files=chunk_metadata,
+                scan_start_time=scan_start_time,
+                skipped_dirs=tracker.skipped_dirs,
+                cold_prefixes=cold_prefixes,
+            )
+
+        # Snapshots of directories walked before an interruption were never recorded, so a
+        # resumed scan must not treat them as gone
+        tracker.save(db, scopes=() if resumed else None)
+        db.query(ScanSeenRange).filter(ScanSeenRange.path_id == path.id).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        checkpointer.finish()
+        if tracker.full_scan:
+            # Also read by watch mode to schedule its reconciliation scans
+            path.last_full_scan_at = scan_start_time
+            db.commit()
+
+        # Dispatch the last moves only after the scan's own writes are committed
+        chunk_to_cold = hot_remainder_to_cold + chunk_to_cold
+        chunk_to_hot = hot_remainder_to_hot + chunk_to_hot
+        dispatch_chunk()
+
+        syscall_counts = syscalls.as_dict()
+        logger.info(
+            f"Path {path.name}: {'full' if tracker.full_scan else 'incremental'} scan walked "
+            f"{tracker.dirs_walked} directories, skipped {tracker.dirs_skipped} unchanged, "
+            f"{syscall_counts['total']} filesystem calls for {file_count} files"
         )
 
         return {
             "to_cold": matching_files,
             "to_hot": files_to_thaw,
+            "files_found": files_found,
+            "thaws_found": thaws_found,
             "inventory_updated": inventory_updated,
             "skipped_hot": files_skipped_hot,
             "skipped_cold": files_skipped_cold,
             "total_scanned": file_count,
+            "hardlinked_files": sum(hot_links.values()),
+            "hardlink_groups": len(hot_links),
+            "full_scan": tracker.full_scan,
+            "dirs_walked": tracker.dirs_walked,
+            "dirs_skipped": tracker.dirs_skipped,
+            "syscalls": syscall_counts,
+            "cold_locations": cold_walks.timings() if cold_walks is not None else [],
+            "scan_generation": path.scan_generation,
+            "resumed": resumed,
+            "checkpoints_saved": checkpointer.checkpoints_saved,
         }
 
+    def _storage_roots(self, path: MonitoredPath) -> List[str]:
+        """Storage location roots of a path, longest first, as plain and real paths."""
+        roots = set()
+        for location in path.storage_locations:
+            roots.add(os.path.normpath(location.path))
+            roots.add(os.path.realpath(location.path))
+        return sorted(roots, key=len, reverse=True)
+
+    def _resolve_symlink(
+        self, link_path: str, storage_roots: List[str], syscalls: SyscallCounter
+    ) -> tuple:
+        """Resolve a symlink with a single readlink where possible.
+
+        Returns (target, root), where root is the storage location root containing the
+        target or None. Links whose target is not directly inside a storage root (e.g.
+        chained links) fall back to full resolution.
+        """
+        syscalls.add("readlink")
+        target = os.path.normpath(
+            os.path.join(os.path.dirname(link_path), os.readlink(link_path))
+        )
+        for root in storage_roots:
+            if target.startswith(root + os.sep):
+                return target, root
+
+        syscalls.add("resolve")
+        target = str(Path(link_path).resolve(strict=True))
+        for root in storage_roots:
+            if target.startswith(root + os.sep):
+                return target, root
+        return target, None
+
     def _process_single_file(
-        self, file_path: Path, matched_criteria_ids: list, path: MonitoredPath
+        self, file_path: Path, matched_criteria_ids: list, path_id: int
     ) -> dict:
         """Process a single file: move it to cold storage and record in database."""
         result = {
@@ -437,6 +1227,10 @@ class FileWorkflowService:
 
         db = SessionFactory()
         try:
+            path = db.get(MonitoredPath, path_id)
+            if path is None:
+                result["error"] = f"Monitored path {path_id} no longer exists"
+                return result
             source_base = Path(path.source_path)
 
             # Pre-check: verify file still exists
@@ -542,13 +1336,10 @@ class FileWorkflowService:
                     path.id, file_name, "move_to_cold", file_size
                 )
 
-                # Calculate checksum before move
-                checksum_before = checksum_verifier.calculate_checksum(file_path)
-
-                # Move file with transaction pattern and checksum verification
-                success, error, checksum_after = FileMover.move_with_rollback(
-                    file_path, dest_path, path.operation_type, verify_checksum=True
-                )
+                with recording_copies() as copy_record:
+                    success, error, checksum_before, checksum_after = self._freeze_file(
+                        db, path, inventory_entry, file_path, dest_path, original_stat
+                    )
 
                 if success:
                     # Preserve timestamps
@@ -571,11 +1362,20 @@ class FileWorkflowService:
 
                     # Update inventory entry
                     # COPY keeps the hot file active; only MOVE/SYMLINK transitions to COLD
+                    fingerprint_stat = original_stat
                     if path.operation_type in ["move", "symlink"]:
                         inventory_entry.storage_type = StorageType.COLD
                         inventory_entry.cold_storage_location_id = storage_location.id
                         inventory_entry.file_path = str(dest_path)
+                        try:
+                            fingerprint_stat = dest_path.stat()
+                        except OSError:
+                            fingerprint_stat = None
                     inventory_entry.status = FileStatus.ACTIVE
+                    if checksum_before and fingerprint_stat is not None:
+                        # The verified checksum stays valid for the file as it now is
+                        set_fingerprint(inventory_entry, fingerprint_stat)
+                        inventory_entry.checksum = checksum_before
                     db.commit()
 
                     # Log to audit trail
@@ -589,6 +1389,7 @@ class FileWorkflowService:
                         checksum_after=checksum_after,
                         success=True,
                         initiated_by="automatic_scan",
+                        copy_strategy=copy_record.strategy,
                     )
 
                     result["success"] = True
@@ -634,8 +1435,155 @@ class FileWorkflowService:
 
         return result
 
+    def _freeze_file(
+        self,
+        db: Session,
+        path: MonitoredPath,
+        inventory_entry: FileInventory,
+        file_path: Path,
+        dest_path: Path,
+        original_stat: os.stat_result,
+    ) -> Tuple[bool, Optional[str], Optional[str], Optional[str]]:
+        """Hash and move one file to cold storage.
+
+        Returns (success, error, checksum_before, checksum_after). A file with other hard
+        links is moved under its inode's lock. Once one link has a verified copy in cold
+        storage, the others become hard links to that copy: their data is neither copied
+        nor hashed again.
+        """
+        key = None
+        if (
+            path.operation_type in ["move", "symlink"]
+            and (original_stat.st_nlink > 1 or inventory_entry.link_group)
+            and not file_path.is_symlink()
+        ):
+            key = inode_key(original_stat)
+
+        with hardlink_registry.locked(key):
+            if key is not None:
+                sibling = self._placed_link(db, inventory_entry, original_stat, StorageType.COLD)
+                if sibling is not None:
+                    existing, checksum = sibling
+                    success, error = FileMover.link_file(
+                        file_path, existing, dest_path, path.operation_type
+                    )
+                    if success:
+                        return True, None, checksum, checksum
+                    logger.debug(f"Copying {file_path} instead of linking it: {error}")
+
+            # The stored checksum is reused while the fingerprint matches; otherwise the
+            # file is hashed while it is moved
+            checksum_before = stored_checksum(inventory_entry, original_stat)
+
+            # Move file with transaction pattern and checksum verification
+            success, error, checksum_after = FileMover.move_with_rollback(
+                file_path,
+                dest_path,
+                path.operation_type,
+                verify_checksum=True,
+                source_checksum=checksum_before,
+            )
+            if success:
+                # Differs from checksum_before only when nothing was stored, or when a
+                # renamed file had changed since its checksum was stored
+                checksum_before = checksum_after
+            if success and key is not None:
+                hardlink_registry.record(original_stat, dest_path, checksum_before)
+        return success, error, checksum_before, checksum_after
+
+    def _thaw_file(
+        self,
+        db: Session,
+        inventory_entry: FileInventory,
+        cold_path: Path,
+        hot_path: Path,
+        stat_info: os.stat_result,
+    ) -> Optional[str]:
+        """Move one file back to hot storage; returns the checksum of the thawed file.
+
+        Hard links are handled as in _freeze_file: a link whose inode already has a
+        verified copy in hot storage is linked to it instead of being copied and hashed.
+        """
+        key = None
+        if stat_info.st_nlink > 1 or inventory_entry.link_group:
+            key = inode_key(stat_info)
+
+        with hardlink_registry.locked(key):
+            if key is not None:
+                sibling = self._placed_link(db, inventory_entry, stat_info, StorageType.HOT)
+                if sibling is not None:
+                    existing, checksum = sibling
+                    try:
+                        os.link(existing, hot_path)
+                    except OSError as e:
+                        logger.debug(f"Copying {cold_path} instead of linking it: {e}")
+                    else:
+                        try:
+                            cold_path.unlink()
+                        except OSError:
+                            hot_path.unlink()
+                            raise
+                        return checksum
+
+            # The stored checksum is reused while the fingerprint matches; otherwise the
+            # file is hashed while it is moved
+            stored = stored_checksum(inventory_entry, stat_info)
+            checksum = FileMover.move_verified(cold_path, hot_path, stored)
+            if stored and checksum != stored:
+                # A copy that fails verification raises and keeps the cold file, so this
+                # was a rename of a file that changed since its checksum was stored
+                logger.warning(
+                    f"Stored checksum of {cold_path} is stale, using the checksum of the "
+                    f"thawed file: {stored[:16]}... != {checksum[:16]}..."
+                )
+            if key is not None:
+                hardlink_registry.record(stat_info, hot_path, checksum)
+        return checksum
+
+    @staticmethod
+    def _placed_link(
+        db: Session,
+        inventory_entry: FileInventory,
+        source_stat: os.stat_result,
+        storage_type: StorageType,
+    ) -> Optional[Tuple[Path, Optional[str]]]:
+        """An already placed copy of another link of the source's inode, with its checksum.
+
+        Copies placed by this process are found in the hard link registry. After a restart,
+        a row of the same link group in ``storage_type`` qualifies when its stored checksum
+        and the source's are both valid for the files as they are now, and equal.
+        """
+        placed = hardlink_registry.lookup(source_stat)
+        if placed is not None:
+            return Path(placed.destination), placed.checksum
+
+        checksum = stored_checksum(inventory_entry, source_stat)
+        if not checksum or not inventory_entry.link_group:
+            return None
+        siblings = (
+            db.query(FileInventory)
+            .filter(
+                FileInventory.path_id == inventory_entry.path_id,
+                FileInventory.link_group == inventory_entry.link_group,
+                FileInventory.storage_type == storage_type,
+                FileInventory.status == FileStatus.ACTIVE,
+                FileInventory.checksum == checksum,
+                FileInventory.id != inventory_entry.id,
+            )
+            .limit(8)
+            .all()
+        )
+        for sibling in siblings:
+            try:
+                sibling_stat = os.stat(sibling.file_path)
+            except OSError:
+                continue
+            if stored_checksum(sibling, sibling_stat) == checksum:
+                return Path(sibling.file_path), checksum
+        return None
+
     def _thaw_single_file(
-        self, symlink_path: Path, cold_storage_path: Path, path: MonitoredPath
+        self, symlink_path: Path, cold_storage_path: Path, path_id: int
     ) -> dict:
         """Thaw a single file (move back from cold to hot storage)."""
         result = {
@@ -647,13 +1595,16 @@ class FileWorkflowService:
 
         db = SessionFactory()
         try:
-            # Get file inventory record with lock
+            # Get file inventory record with lock; freezes record moved files under their
+            # cold path, so fall back to that row
             inventory_entry = (
                 db.query(FileInventory)
                 .with_for_update()
                 .filter(
-                    FileInventory.path_id == path.id, FileInventory.file_path == str(symlink_path)
+                    FileInventory.path_id == path_id,
+                    FileInventory.file_path.in_([str(symlink_path), str(cold_storage_path)]),
                 )
+                .order_by((FileInventory.file_path == str(symlink_path)).desc())
                 .first()
             )
 
@@ -671,34 +1622,11 @@ class FileWorkflowService:
                         symlink_path.parent.mkdir(parents=True, exist_ok=True)
                         stat_info = cold_storage_path.stat()
 
-                        # Calculate checksum before move
-                        checksum_before = checksum_verifier.calculate_checksum(cold_storage_path)
-
                         # Move file with verification
-                        try:
-                            cold_storage_path.rename(symlink_path)
-                        except OSError:
-                            shutil.copy2(str(cold_storage_path), str(symlink_path))
-                            os.utime(
-                                str(symlink_path),
-                                ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns),
-                            )
-                            cold_storage_path.unlink()
-
-                        # Verify checksum after move
-                        checksum_after = checksum_verifier.calculate_checksum(symlink_path)
-                        if checksum_before and checksum_after != checksum_before:
-                            logger.error(
-                                f"Checksum mismatch after thaw: {checksum_before[:16]}... != {checksum_after[:16]}..."
+                        with recording_copies() as copy_record:
+                            checksum_after = self._thaw_file(
+                                db, inventory_entry, cold_storage_path, symlink_path, stat_info
                             )
-                            # Rollback - move file back
-                            if cold_storage_path.exists():
-                                symlink_path.unlink()
-                            inventory_entry.status = old_status
-                            db.commit()
-                            result["error"] = "Checksum verification failed after thaw"
-                            return result
-
                         file_record = (
                             db.query(FileRecord)
                             .filter(FileRecord.cold_storage_path == str(cold_storage_path))
@@ -709,9 +1637,16 @@ class FileWorkflowService:
                             db.delete(file_record)
 
                         # Update inventory
+                        inventory_entry.file_path = str(symlink_path)
                         inventory_entry.storage_type = StorageType.HOT
                         inventory_entry.status = FileStatus.ACTIVE
                         inventory_entry.cold_storage_location_id = None
+                        if checksum_after:
+                            try:
+                                set_fingerprint(inventory_entry, symlink_path.stat())
+                                inventory_entry.checksum = checksum_after
+                            except OSError as e:
+                                logger.debug(f"Could not stat thawed file {symlink_path}: {e}")
                         db.commit()
 
                         # Log to audit trail
@@ -720,10 +1655,11 @@ class FileWorkflowService:
                             file=inventory_entry,
                             source_path=cold_storage_path,
                             dest_path=symlink_path,
-                            checksum_before=checksum_before,
+                            checksum_before=checksum_after,
                             checksum_after=checksum_after,
                             success=True,
                             initiated_by="automatic_scan",
+                            copy_strategy=copy_record.strategy,
                         )
 
                         result["success"] = True
@@ -843,32 +1779,228 @@ class FileWorkflowService:
 
         return file_record_id
 
-    def _recursive_scandir(self, path: Path) -> Iterator[os.DirEntry]:
-        """Generator for recursive directory scanning."""
+    def _recursive_scandir(
+        self,
+        path: Path,
+        tracker: Optional[DirectorySnapshotTracker] = None,
+        parent_path: Optional[str] = None,
+        syscalls: Optional[SyscallCounter] = None,
+        excludes: Optional[ExcludeMatcher] = None,
+        rel_prefix: str = "",
+        budget: Optional[IOBudget] = None,
+    ) -> Iterator[os.DirEntry]:
+        """Generator for recursive directory scanning.
+
+        Yielded entries already have their lstat cached. Directories matched by the exclude
+        rules are pruned without being listed. When a snapshot tracker is given,
+        directories whose snapshot is unchanged are not listed; only their known
+        subdirectories are visited. Listings and stats are charged to ``budget``.
+        """
+        if excludes is None:
+            excludes = self._default_excludes
+        dir_path = str(path)
+        if tracker is not None and not tracker.begin_directory(dir_path):
+            for subdir in tracker.skip_directory(dir_path, parent_path):
+                # Exclude rules may have changed since the snapshot was taken
+                name = os.path.basename(subdir)
+                if not excludes.excludes(name, rel_prefix + name, True):
+                    yield from self._recursive_scandir(
+                        subdir,
+                        tracker,
+                        dir_path,
+                        syscalls,
+                        excludes,
+                        f"{rel_prefix}{name}/",
+                        budget,
+                    )
+            return
+
+        entry_count = 0
+        needs_path = excludes.needs_path
+        if syscalls is not None:
+            syscalls.add("scandir")
+        if budget is not None:
+            budget.stat()
         try:
-            with os.scandir(str(path)) as it:
+            with os.scandir(dir_path) as it:
                 for entry in it:
-                    if entry.name.startswith("."):
-                        continue
-                    if any(fnmatch.fnmatch(entry.name, p) for p in self.IGNORED_PATTERNS):
+                    entry_count += 1
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    rel = rel_prefix + entry.name if needs_path else ""
+                    if excludes.excludes(entry.name, rel, is_dir):
                         continue
 
-                    if entry.is_dir(follow_symlinks=False):
-                        yield from self._recursive_scandir(Path(entry.path))
+                    if is_dir:
+                        yield from self._recursive_scandir(
+                            entry.path,
+                            tracker,
+                            dir_path,
+                            syscalls,
+                            excludes,
+                            f"{rel_prefix}{entry.name}/",
+                            budget,
+                        )
                     else:
+                        if syscalls is not None:
+                            syscalls.add("lstat")
+                        try:
+                            if budget is not None:
+                                budget.stat_entry(entry)
+                            else:
+                                entry.stat(follow_symlinks=False)
+                        except OSError:
+                            pass
                         yield entry
         except (OSError, PermissionError):
-            pass
+            return
+
+        if tracker is not None:
+            tracker.finish_directory(dir_path, parent_path, entry_count)
+
+    @staticmethod
+    def _move_pool(max_workers: int) -> ThreadPoolExecutor:
+        """Worker pool for freeze/thaw jobs, running at background priority."""
+        return ThreadPoolExecutor(max_workers=max_workers, initializer=apply_background_priority)
+
+    def _excludes_for(self, path: Optional[MonitoredPath]) -> ExcludeMatcher:
+        """Compile the built-in ignore list plus the path's own exclude patterns."""
+        if path is None or not path.exclude_patterns:
+            return self._default_excludes
+        return ExcludeMatcher([*self.IGNORED_PATTERNS, *path.exclude_patterns])
+
+    def _scan_threads(self, path: Optional[MonitoredPath]) -> int:
+        """Number of walker threads for a path, capped by its max_scan_threads."""
+        threads = settings.scan_walker_threads
+        if path is not None and path.max_scan_threads:
+            threads = min(threads, path.max_scan_threads)
+        return max(1, threads)
+
+    def _walk(
+        self,
+        root: Path,
+        max_workers: int = 1,
+        tracker: Optional[DirectorySnapshotTracker] = None,
+        syscalls: Optional[SyscallCounter] = None,
+        excludes: Optional[ExcludeMatcher] = None,
+        cursor: Optional[WalkCursor] = None,
+        budget: Optional[IOBudget] = None,
+    ) -> Iterator[os.DirEntry]:
+        """Walk a tree, in parallel when more than one worker is allowed.
+
+        The parallel walker yields files in completion order rather than depth-first order.
+        With a cursor, the walk records its progress there and starts from the cursor's
+        resume points.
+        """
+        if excludes is None:
+            excludes = self._default_excludes
+        if max_workers <= 1:
+            if cursor is not None:
+                return self._stack_scandir(root, cursor, tracker, syscalls, excludes, budget)
+            return self._recursive_scandir(
+                root, tracker, syscalls=syscalls, excludes=excludes, budget=budget
+            )
+        walker = ParallelDirectoryWalker(max_workers, excludes, budget=budget)
+        return walker.walk(str(root), tracker, syscalls, cursor)
+
+    def _stack_scandir(
+        self,
+        root: Path,
+        cursor: WalkCursor,
+        tracker: Optional[DirectorySnapshotTracker] = None,
+        syscalls: Optional[SyscallCounter] = None,
+        excludes: Optional[ExcludeMatcher] = None,
+        budget: Optional[IOBudget] = None,
+    ) -> Iterator[os.DirEntry]:
+        """Sequential walk driven by an explicit directory stack, recording progress in cursor.
+
+        Each directory is listed completely before its files are yielded, so the cursor
+        always knows which subdirectories are still to be walked. Directories the cursor
+        marks as partially delivered only have their files listed again.
+        """
+        if excludes is None:
+            excludes = self._default_excludes
+        root = str(root)
+        rel_start = len(root) + 1
+        needs_path = excludes.needs_path
+        stack = [
+            (dir_path, None if dir_path == root else os.path.dirname(dir_path), files_only)
+            for dir_path, files_only in reversed(cursor.start_points(root))
+        ]
+
+        while stack:
+            dir_path, parent_path, files_only = stack.pop()
+            files: List[os.DirEntry] = []
+            subdirs: List[str] = []
+
+            if not files_only and tracker is not None and not tracker.begin_directory(dir_path):
+                for subdir in tracker.skip_directory(dir_path, parent_path):
+                    # Exclude rules may have changed since the snapshot was taken
+                    rel = subdir[rel_start:] if needs_path else ""
+                    if not excludes.excludes(os.path.basename(subdir), rel, True):
+                        subdirs.append(subdir)
+            else:
+                entry_count = 0
+                listed = True
+                if syscalls is not None:
+                    syscalls.add("scandir")
+                if budget is not None:
+                    budget.stat()
+                try:
+                    with os.scandir(dir_path) as it:
+                        for entry in it:
+                            entry_count += 1
+                            is_dir = entry.is_dir(follow_symlinks=False)
+                            rel = entry.path[rel_start:] if needs_path else ""
+                            if excludes.excludes(entry.name, rel, is_dir):
+                                continue
+                            if is_dir:
+                                if not files_only:
+                                    subdirs.append(entry.path)
+                                continue
+                            if syscalls is not None:
+                                syscalls.add("lstat")
+                            try:
+                                if budget is not None:
+                                    budget.stat_entry(entry)
+                                else:
+                                    entry.stat(follow_symlinks=False)
+                            except OSError:
+                                pass
+                            files.append(entry)
+                except OSError:
+                    listed = False
+                if listed and tracker is not None and not files_only:
+                    tracker.finish_directory(dir_path, parent_path, entry_count)
+
+            if files:
+                cursor.add_batch(dir_path)
+            cursor.listed(dir_path, subdirs)
+            stack.extend((subdir, dir_path, False) for subdir in reversed(subdirs))
+
+            if files:
+                yield from files
+                cursor.consumed(dir_path)
 
     def _update_file_inventory(
         self,
         path: MonitoredPath,
         db: Session,
-        hot_files: Optional[List[Dict]] = None,
-        cold_files: Optional[List[Dict]] = None,
+        hot_files: Optional[List[ScanRecord]] = None,
+        cold_files: Optional[List[ScanRecord]] = None,
         scan_start_time: Optional[datetime] = None,
+        skipped_dirs: Optional[Set[str]] = None,
+        cold_prefixes: Optional[List[Tuple[str, int]]] = None,
     ) -> int:
-        """Update database inventory for both storage tiers using provided metadata."""
+        """Update database inventory for both storage tiers using provided metadata.
+
+        Files in ``skipped_dirs`` (directories an incremental scan did not list) were not
+        seen by this scan, so they are never treated as missing. Without ``cold_files``,
+        every cold storage location attached to the path is scanned.
+
+        A row is live if the path's current scan generation wrote it or one of the
+        generation's ScanSeenRange runs covers its id; all other active rows are deleted
+        with a single statement.
+        """
         updated_count = 0
         if scan_start_time is None:
             scan_start_time = datetime.now(tz=timezone.utc)
@@ -877,41 +2009,131 @@ class FileWorkflowService:
         if hot_files is not None:
             updated_count += self._update_db_entries_batch(path, hot_files, StorageType.HOT, db)
         else:
-            hot_files_list = self._scan_flat_list(path.source_path)
+            hot_files_list = self._scan_flat_list(
+                path.source_path, self._scan_threads(path), self._excludes_for(path)
+            )
             updated_count += self._update_db_entries_batch(
                 path, hot_files_list, StorageType.HOT, db
             )
 
         # Sync cold tier
-        if cold_files is not None:
-            updated_count += self._update_db_entries_batch(path, cold_files, StorageType.COLD, db)
-        else:
-            cold_files_list = self._scan_flat_list(path.cold_storage_path)
-            updated_count += self._update_db_entries_batch(
-                path, cold_files_list, StorageType.COLD, db
-            )
+        if cold_prefixes is None:
+            cold_prefixes = [
+                (os.path.normpath(location.path) + os.sep, location.id)
+                for location in path.storage_locations
+            ]
+        if cold_files is None:
+            cold_files = []
+            for location in path.storage_locations:
+                cold_files.extend(
+                    self._scan_flat_list(
+                        location.path, self._scan_threads(path), self._excludes_for(path)
+                    )
+                )
+        updated_count += self._update_db_entries_batch(
+            path, cold_files, StorageType.COLD, db, cold_prefixes
+        )
 
-        # Delete inventory entries for files that are no longer found
-        # Use scan_start_time to avoid deleting files that were just scanned
-        # We give a 1-minute grace period for clock drift/duration
+        # Delete inventory entries for files that are no longer found: rows this scan
+        # neither wrote (seen_generation) nor recorded in a seen range. The last_seen
+        # cutoff keeps rows that movers updated while the scan was running; we give a
+        # 1-minute grace period for clock drift/duration
         cutoff = scan_start_time - timedelta(minutes=1)
-
+        generation = path.scan_generation or 0
+        self._merge_seen_ranges(db, path.id, generation)
+
+        seen = ScanSeenRange.__table__
+        covering_range_end = (
+            select(seen.c.last_id)
+            .where(
+                seen.c.path_id == path.id,
+                seen.c.scan_generation == generation,
+                seen.c.first_id <= FileInventory.id,
+            )
+            .order_by(seen.c.first_id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
         missing_query = db.query(FileInventory).filter(
             FileInventory.path_id == path.id,
-            FileInventory.last_seen < cutoff,
             FileInventory.status == FileStatus.ACTIVE,
+            or_(
+                FileInventory.seen_generation.is_(None),
+                FileInventory.seen_generation != generation,
+            ),
+            func.coalesce(covering_range_end, 0) < FileInventory.id,
+            FileInventory.last_seen < cutoff,
         )
 
-        # Get the count of records to be deleted before deleting them
-        missing_count = missing_query.count()
+        if skipped_dirs:
+            # Only rows outside the skipped directories can be known to be missing
+            missing_ids = [
+                entry_id
+                for entry_id, file_path in missing_query.with_entities(
+                    FileInventory.id, FileInventory.file_path
+                ).yield_per(5000)
+                if os.path.dirname(file_path) not in skipped_dirs
+            ]
+            for i in range(0, len(missing_ids), 500):
+                db.query(FileInventory).filter(
+                    FileInventory.id.in_(missing_ids[i : i + 500])
+                ).delete(synchronize_session=False)
+            if missing_ids:
+                db.commit()
+            return updated_count + len(missing_ids)
 
+        missing_count = missing_query.delete(synchronize_session=False)
         if missing_count > 0:
-            missing_query.delete(synchronize_session=False)
             db.commit()
 
         return updated_count + missing_count
 
-    def _scan_flat_list(self, directory_path: str) -> List[Dict]:
+    @staticmethod
+    def _merge_seen_ranges(db: Session, path_id: int, generation: int):
+        """Merge overlapping and adjacent seen ranges of a scan generation.
+
+        Missing-file detection only looks at the range with the greatest ``first_id`` at or
+        below an id, which is correct once ranges do not overlap. Overlaps come from a
+        resumed scan re-walking directories it had partly synced.
+        """
+        seen = ScanSeenRange.__table__
+        ranges = db.execute(
+            select(seen.c.first_id, seen.c.last_id)
+            .where(seen.c.path_id == path_id, seen.c.scan_generation == generation)
+            .order_by(seen.c.first_id)
+        ).all()
+        merged: List[Tuple[int, int]] = []
+        for first_id, last_id in ranges:
+            if merged and first_id <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], last_id))
+            else:
+                merged.append((first_id, last_id))
+        if len(merged) == len(ranges):
+            return
+
+        db.execute(
+            seen.delete().where(seen.c.path_id == path_id, seen.c.scan_generation == generation)
+        )
+        db.execute(
+            insert(seen),
+            [
+                {
+                    "path_id": path_id,
+                    "scan_generation": generation,
+                    "first_id": first_id,
+                    "last_id": last_id,
+                }
+                for first_id, last_id in merged
+            ],
+        )
+        db.commit()
+
+    def _scan_flat_list(
+        self,
+        directory_path: str,
+        max_workers: int = 1,
+        excludes: Optional[ExcludeMatcher] = None,
+    ) -> List[ScanRecord]:
         """Get metadata for inventory updates.
 
         Note: Symlinks are excluded from results to prevent them from appearing
@@ -922,175 +2144,263 @@ class FileWorkflowService:
         if not os.path.exists(directory_path):
             return results
 
-        for entry in self._recursive_scandir(Path(directory_path)):
+        for entry in self._walk(Path(directory_path), max_workers, excludes=excludes):
             try:
                 # Skip symlinks - they should not be added to inventory
-                is_symlink = Path(entry.path).is_symlink()
-                if is_symlink:
+                if entry.is_symlink():
                     continue
 
                 stat = entry.stat(follow_symlinks=False)
 
-                results.append(
-                    {
-                        "path": entry.path,
-                        "size": stat.st_size,
-                        "mtime": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
-                        "atime": datetime.fromtimestamp(stat.st_atime, tz=timezone.utc),
-                        "ctime": datetime.fromtimestamp(stat.st_ctime, tz=timezone.utc),
-                    }
-                )
+                results.append(ScanRecord.from_stat(entry.path, stat))
             except OSError:
                 continue
         return results
 
     def _update_db_entries_batch(
-        self, path: MonitoredPath, files: List[Dict], tier: StorageType, db: Session
+        self,
+        path: MonitoredPath,
+        files: List[ScanRecord],
+        tier: StorageType,
+        db: Session,
+        cold_prefixes: Optional[List[Tuple[str, int]]] = None,
+        mark_seen: bool = True,
     ) -> int:
-        """Synchronize file metadata with the database in batches for performance."""
-        from app.models import TagRule
+        """Synchronize file metadata with the database in set-based batches.
+
+        Each batch reads the stored fingerprints of its paths with one Core select, then
+        writes new and changed rows with a single ``INSERT ... ON CONFLICT DO UPDATE``
+        executemany on ``(path_id, file_path)``, stamping them with the path's scan
+        generation. Rows whose stat fingerprint (dev, inode, size, mtime_ns), tier and status
+        are unchanged are not written at all; with ``mark_seen`` their ids are recorded as
+        ScanSeenRange runs for missing-file detection. No ORM objects are loaded; enabled tag
+        rules are compiled once and applied to the written rows of each batch in bulk.
+
+        Extension and MIME type are derived from the file name; nothing is read from disk.
+        Written rows that still lack a checksum are queued for the background metadata
+        enrichment workers instead of being hashed here.
+
+        ``cold_prefixes`` maps cold location roots (with a trailing separator, longest first)
+        to location ids, so cold rows record which location holds them.
+        """
         from app.services.file_metadata import FileMetadataExtractor
-        from app.services.tag_rule_service import TagRuleService
+        from app.services.tag_rule_service import CompiledTagRules
 
-        count = 0
-        tag_rule_service = TagRuleService(db)
+        inventory = FileInventory.__table__
         scan_time = datetime.now(tz=timezone.utc)
+        generation = path.scan_generation or 0
 
-        # Pre-fetch tag rules to avoid N+1 queries during rules application
-        tag_rules = (
-            db.query(TagRule)
-            .filter(TagRule.enabled)
-            .order_by(TagRule.priority.desc(), TagRule.created_at.asc())
-            .all()
-        )
+        # Rules are compiled once per sync and applied to each written batch in bulk
+        tag_rules = CompiledTagRules.load(db)
 
-        # Process in batches to avoid N+1 queries and memory issues
-        batch_size = 100
+        count = 0
+        batch_size = self.INVENTORY_UPSERT_BATCH_SIZE
         for i in range(0, len(files), batch_size):
             batch = files[i : i + batch_size]
-            batch_paths = [f["path"] for f in batch]
-
-            # Bulk fetch existing entries for this batch
-            existing_entries = {
-                e.file_path: e
-                for e in db.query(FileInventory)
-                .filter(FileInventory.path_id == path.id, FileInventory.file_path.in_(batch_paths))
-                .all()
-            }
 
-            new_files_batch = []
-            updated_files_batch = []
-            touched_entries = []
+            existing = {
+                row.file_path: row
+                for row in db.execute(
+                    select(
+                        inventory.c.id,
+                        inventory.c.file_path,
+                        inventory.c.file_dev,
+                        inventory.c.file_inode,
+                        inventory.c.file_size,
+                        inventory.c.file_mtime_ns,
+                        inventory.c.link_group,
+                        inventory.c.status,
+                        inventory.c.storage_type,
+                        inventory.c.cold_storage_location_id,
+                        inventory.c.file_extension,
+                        inventory.c.mime_type,
+                    ).where(
+                        inventory.c.path_id == path.id,
+                        inventory.c.file_path.in_([f.path for f in batch]),
+                    )
+                )
+            }
 
+            upserts = []
+            seen_ids = []
             for info in batch:
-                file_path_str = info["path"]
-                entry = existing_entries.get(file_path_str)
-
-                if entry:
-                    # Always update last_seen for files found during scan
-                    entry.last_seen = scan_time
-                    touched_entries.append(entry)
-
-                    updated = False
-                    if (
-                        entry.file_size != info["size"]
-                        or entry.status != FileStatus.ACTIVE
-                        or entry.storage_type != tier
-                    ):
-                        entry.file_size = info["size"]
-                        entry.file_mtime = info["mtime"]
-                        entry.file_atime = info["atime"]
-                        entry.file_ctime = info["ctime"]
-                        entry.status = FileStatus.ACTIVE
-                        entry.storage_type = tier
-                        updated = True
-
-                    # Extract metadata if missing
-                    if entry.file_extension is None or entry.mime_type is None:
-                        try:
-                            file_path = Path(file_path_str)
-                            if file_path.exists():
-                                extension, mime_type, checksum = (
-                                    FileMetadataExtractor.extract_metadata(file_path)
-                                )
-                                if entry.file_extension is None and extension:
-                                    entry.file_extension = extension
-                                    updated = True
-                                if entry.mime_type is None and mime_type:
-                                    entry.mime_type = mime_type
-                                    updated = True
-                                if (
-                                    entry.checksum is None
-                                    and checksum
-                                    and info["size"] < 1024 * 1024 * 100
-                                ):
-                                    entry.checksum = checksum
-                                    updated = True
-                        except Exception as e:
-                            logger.debug(f"Could not extract metadata for {file_path_str}: {e}")
-
-                    if updated:
-                        updated_files_batch.append(entry)
-                    count += 1
-                else:
-                    # New file
-                    extension = None
-                    mime_type = None
-                    checksum = None
-
-                    try:
-                        file_path = Path(file_path_str)
-                        if file_path.exists():
-                            extension, mime_type, checksum = FileMetadataExtractor.extract_metadata(
-                                file_path
-                            )
-                    except Exception as e:
-                        logger.debug(f"Could not extract metadata for {file_path_str}: {e}")
-
-                    new_entry = FileInventory(
-                        path_id=path.id,
-                        file_path=file_path_str,
-                        storage_type=tier,
-                        file_size=info["size"],
-                        file_mtime=info["mtime"],
-                        file_atime=info["atime"],
-                        file_ctime=info["ctime"],
-                        status=FileStatus.ACTIVE,
-                        file_extension=extension,
-                        mime_type=mime_type,
-                        checksum=checksum,
-                        last_seen=scan_time,
+                file_path_str = info.path
+                row = existing.get(file_path_str)
+                location_id = None
+                if tier == StorageType.COLD and cold_prefixes:
+                    location_id = next(
+                        (lid for prefix, lid in cold_prefixes if file_path_str.startswith(prefix)),
+                        None,
                     )
-                    db.add(new_entry)
-                    new_files_batch.append(new_entry)
-                    count += 1
 
-            # Commit batch
-            if touched_entries or new_files_batch:
-                db.commit()
-
-                # Apply tag rules
-                for file_entry in new_files_batch:
-                    try:
-                        db.refresh(file_entry)
-                        tag_rule_service.apply_rules_to_file(file_entry, rules=tag_rules)
-                    except Exception as e:
-                        logger.exception(
-                            f"Error applying tag rules to new file {file_entry.file_path}: {e}"
+                if row is None:
+                    extension, mime_type = FileMetadataExtractor.extract_name_metadata(
+                        Path(file_path_str)
+                    )
+                else:
+                    # Rows synced before fingerprints existed compare unequal and get one
+                    changed = (
+                        (row.file_dev, row.file_inode, row.file_size, row.file_mtime_ns)
+                        != info.fingerprint
+                        or row.status != FileStatus.ACTIVE
+                        or row.storage_type != tier
+                        or (location_id is not None and row.cold_storage_location_id != location_id)
+                        or (row.link_group is None and info.nlink > 1)
+                    )
+                    extension, mime_type = None, None
+                    if row.file_extension is None or row.mime_type is None:
+                        extension, mime_type = FileMetadataExtractor.extract_name_metadata(
+                            Path(file_path_str)
                         )
-
-                for file_entry in updated_files_batch:
-                    try:
-                        tag_rule_service.apply_rules_to_file(file_entry, rules=tag_rules)
-                    except Exception as e:
-                        logger.exception(
-                            f"Error applying tag rules to updated file {file_entry.file_path}: {e}"
+                        changed = changed or bool(
+                            (row.file_extension is None and extension)
+                            or (row.mime_type is None and mime_type)
                         )
+                    seen_ids.append(row.id)
+                    if not changed:
+                        count += 1
+                        continue
+
+                upserts.append(
+                    {
+                        "path_id": path.id,
+                        "file_path": file_path_str,
+                        "storage_type": tier,
+                        **info.fingerprint_columns(),
+                        "link_group": info.link_group,
+                        "file_mtime": info.mtime,
+                        "file_atime": info.atime,
+                        "file_ctime": info.ctime,
+                        "status": FileStatus.ACTIVE,
+                        "file_extension": extension,
+                        "mime_type": mime_type,
+                        "last_seen": scan_time,
+                        "seen_generation": generation,
+                        "cold_storage_location_id": location_id,
+                    }
+                )
+                count += 1
+
+            # Existing rows are marked seen as id runs; written rows carry the generation
+            seen_runs = _id_runs(seen_ids) if mark_seen else []
+            if seen_runs:
+                db.execute(
+                    insert(ScanSeenRange.__table__),
+                    [
+                        {
+                            "path_id": path.id,
+                            "scan_generation": generation,
+                            "first_id": first_id,
+                            "last_id": last_id,
+                        }
+                        for first_id, last_id in seen_runs
+                    ],
+                )
+            if upserts:
+                db.execute(self._inventory_upsert_statement(), upserts)
+                # Checksums are computed off the scan path by the enrichment workers
+                metadata_enrichment_queue.enqueue_paths(
+                    db, path.id, [row["file_path"] for row in upserts]
+                )
+                if tag_rules:
+                    self._apply_tag_rules(db, path, tag_rules, upserts)
+            if seen_runs or upserts:
+                db.commit()
+            if upserts:
+                metadata_enrichment_queue.notify()
 
         return count
 
+    @staticmethod
+    def _apply_tag_rules(db: Session, path: MonitoredPath, tag_rules, upserts: List[dict]):
+        """Tag written rows with one select and one ``INSERT OR IGNORE`` into file_tags."""
+        inventory = FileInventory.__table__
+        try:
+            rows = db.execute(
+                select(
+                    inventory.c.id,
+                    inventory.c.file_path,
+                    inventory.c.file_extension,
+                    inventory.c.mime_type,
+                    inventory.c.file_size,
+                ).where(
+                    inventory.c.path_id == path.id,
+                    inventory.c.file_path.in_([row["file_path"] for row in upserts]),
+                )
+            ).all()
+            tag_rules.apply(db, rows)
+        except Exception as e:
+            logger.exception(f"Error applying tag rules to files in {path.source_path}: {e}")
+
+    @staticmethod
+    def _inventory_upsert_statement():
+        """``INSERT ... ON CONFLICT (path_id, file_path) DO UPDATE`` for scanned rows.
+
+        Stat fields, tier and status are overwritten. The checksum is cleared when the stat
+        fingerprint (dev, inode, size, mtime_ns) changed; rows without a stored fingerprint
+        keep it if the size is unchanged. The cold location is only replaced when the scan
+        resolved one, and name-derived metadata only fills columns that are still empty.
+        A file keeps its hard link group while its inode is unchanged, even once the other
+        links are gone: the group is what lets a freeze or thaw relink them.
+        """
+        inventory = FileInventory.__table__
+        stmt = sqlite_insert(inventory)
+        excluded = stmt.excluded
+        return stmt.on_conflict_do_update(
+            index_elements=[inventory.c.path_id, inventory.c.file_path],
+            set_={
+                "storage_type": excluded.storage_type,
+                "checksum": case(
+                    (
+                        and_(
+                            inventory.c.file_size == excluded.file_size,
+                            inventory.c.file_mtime_ns.is_(None),
+                        ),
+                        inventory.c.checksum,
+                    ),
+                    (
+                        and_(
+                            inventory.c.file_size == excluded.file_size,
+                            inventory.c.file_mtime_ns == excluded.file_mtime_ns,
+                            inventory.c.file_inode == excluded.file_inode,
+                            inventory.c.file_dev == excluded.file_dev,
+                        ),
+                        inventory.c.checksum,
+                    ),
+                    else_=None,
+                ),
+                "link_group": case(
+                    (
+                        and_(
+                            inventory.c.file_inode == excluded.file_inode,
+                            inventory.c.file_dev == excluded.file_dev,
+                        ),
+                        func.coalesce(inventory.c.link_group, excluded.link_group),
+                    ),
+                    else_=excluded.link_group,
+                ),
+                "file_dev": excluded.file_dev,
+                "file_inode": excluded.file_inode,
+                "file_size": excluded.file_size,
+                "file_mtime_ns": excluded.file_mtime_ns,
+                "file_mtime": excluded.file_mtime,
+                "file_atime": excluded.file_atime,
+                "file_ctime": excluded.file_ctime,
+                "status": excluded.status,
+                "last_seen": excluded.last_seen,
+                "seen_generation": excluded.seen_generation,
+                "cold_storage_location_id": func.coalesce(
+                    excluded.cold_storage_location_id, inventory.c.cold_storage_location_id
+                ),
+                "file_extension": func.coalesce(
+                    inventory.c.file_extension, excluded.file_extension
+                ),
+                "mime_type": func.coalesce(inventory.c.mime_type, excluded.mime_type),
+            },
+        )
+
     def _update_db_entries(
-        self, path: MonitoredPath, files: List[Dict], tier: StorageType, db: Session
+        self, path: MonitoredPath, files: List[ScanRecord], tier: StorageType, db: Session
     ) -> int:
         """Deprecated: Use _update_db_entries_batch instead."""
         return self._update_db_entries_batch(path, files, tier, db)
@@ -0,0 +1,128 @@
+"""Hard link bookkeeping so movers copy and hash each inode once."""
+
+import contextlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.services.scan_records import stat_fingerprint
+
+# (dev, inode), folded like the fingerprint stored on FileInventory
+InodeKey = Tuple[int, int]
+
+
+def inode_key(stat_result: os.stat_result) -> InodeKey:
+    """Key of the inode behind stat_result."""
+    dev, ino, _, _ = stat_fingerprint(stat_result)
+    return dev, ino
+
+
+@dataclass(frozen=True)
+class PlacedCopy:
+    """Where one link of a source inode was placed, and the content it had then."""
+
+    destination: str
+    destination_key: InodeKey
+    size: int
+    mtime_ns: int
+    checksum: Optional[str]
+
+
+class HardlinkRegistry:
+    """
+    Per-inode locks and the placed copy of recently moved inodes.
+
+    Movers handling a file with several links hold its inode lock while copying and
+    hashing, so the other links wait instead of copying the same data. Once a copy is
+    placed it is recorded here; the next link of the source inode can be created as a hard
+    link to it as long as neither side changed. Entries are bounded, least recently used
+    first out.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._inode_locks: Dict[InodeKey, List] = {}
+        self._placed: OrderedDict[InodeKey, PlacedCopy] = OrderedDict()
+
+    @contextlib.contextmanager
+    def locked(self, key: Optional[InodeKey]) -> Iterator[None]:
+        """Hold the lock of one inode; a key of None locks nothing."""
+        if key is None:
+            yield
+            return
+        with self._lock:
+            slot = self._inode_locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if not slot[1]:
+                    del self._inode_locks[key]
+
+    def record(
+        self,
+        source_stat: os.stat_result,
+        destination: Path,
+        checksum: Optional[str],
+    ) -> None:
+        """Record that the inode of source_stat now has a copy at destination."""
+        try:
+            destination_key = inode_key(os.stat(destination))
+        except OSError:
+            return
+        key = inode_key(source_stat)
+        with self._lock:
+            self._placed[key] = PlacedCopy(
+                str(destination),
+                destination_key,
+                source_stat.st_size,
+                source_stat.st_mtime_ns,
+                checksum,
+            )
+            self._placed.move_to_end(key)
+            while len(self._placed) > self.max_entries:
+                self._placed.popitem(last=False)
+
+    def lookup(self, source_stat: os.stat_result) -> Optional[PlacedCopy]:
+        """
+        The placed copy of source_stat's inode, if it can stand in for copying it again.
+
+        The source must still have the size and mtime it had when copied, and the copy must
+        still be the same inode with the same size; stale entries are dropped.
+        """
+        key = inode_key(source_stat)
+        with self._lock:
+            placed = self._placed.get(key)
+        if placed is None:
+            return None
+        try:
+            destination_stat = os.stat(placed.destination)
+            valid = (
+                placed.size == source_stat.st_size
+                and placed.mtime_ns == source_stat.st_mtime_ns
+                and inode_key(destination_stat) == placed.destination_key
+                and destination_stat.st_size == placed.size
+            )
+        except OSError:
+            valid = False
+        with self._lock:
+            if valid:
+                self._placed.move_to_end(key)
+            else:
+                self._placed.pop(key, None)
+        return placed if valid else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._placed.clear()
+
+
+# Global singleton instance
+hardlink_registry = HardlinkRegistry()
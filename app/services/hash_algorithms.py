@@ -0,0 +1,139 @@
+"""Hash algorithms for file checksums, and the form checksums are stored in.
+
+A checksum records the algorithm that produced it: ``<algorithm>:<hex digest>``, except
+for SHA-256, which stays bare hex so existing checksums and remote peers keep working.
+Checks re-hash with the recorded algorithm, so inventories hashed with different
+algorithms stay valid as the configured one changes.
+
+``<algorithm>-tree`` is the tree form of an algorithm: the file is hashed as fixed-size
+segments in parallel and the segment digests are combined into the checksum (see
+tree_hash). Files of at least CHECKSUM_TREE_MIN_SIZE_MB get it.
+"""
+
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SHA256 = "sha256"
+BLAKE2B = "blake2b"
+BLAKE3 = "blake3"
+XXH3 = "xxh3"
+
+TREE_SUFFIX = "-tree"
+
+
+def _blake3() -> Any:
+    import blake3  # Optional dependency: pip install blake3
+
+    return blake3.blake3()
+
+
+def _xxh3() -> Any:
+    import xxhash  # Optional dependency: pip install xxhash
+
+    # Not cryptographic: detects corruption, not tampering
+    return xxhash.xxh3_128()
+
+
+# Named algorithms; other hashlib names (sha512, md5, ...) also work
+ALGORITHMS: Dict[str, Callable[[], Any]] = {
+    SHA256: hashlib.sha256,
+    BLAKE2B: hashlib.blake2b,
+    BLAKE3: _blake3,
+    XXH3: _xxh3,
+}
+
+_warned_lock = threading.Lock()
+_warned: set = set()
+
+
+def new_hash(algorithm: str) -> Any:
+    """
+    A new hash object of the given algorithm.
+
+    Raises ValueError for unknown algorithms, or ones whose optional package is missing.
+    """
+    if is_tree_algorithm(algorithm):
+        from app.services.tree_hash import TreeHash  # tree_hash imports this module
+
+        return TreeHash(inner_algorithm(algorithm))
+    factory = ALGORITHMS.get(algorithm)
+    try:
+        if factory is None:
+            return hashlib.new(algorithm)
+        return factory()
+    except ImportError as e:
+        raise ValueError(f"Checksum algorithm {algorithm} requires the {e.name} package") from e
+    except ValueError as e:
+        raise ValueError(f"Unknown checksum algorithm: {algorithm}") from e
+
+
+def tree_algorithm(algorithm: str) -> str:
+    """The tree form of an algorithm."""
+    return algorithm if is_tree_algorithm(algorithm) else f"{algorithm}{TREE_SUFFIX}"
+
+
+def is_tree_algorithm(algorithm: str) -> bool:
+    return algorithm.endswith(TREE_SUFFIX)
+
+
+def inner_algorithm(algorithm: str) -> str:
+    """The algorithm a tree algorithm hashes its segments with."""
+    return algorithm[: -len(TREE_SUFFIX)] if is_tree_algorithm(algorithm) else algorithm
+
+
+def is_available(algorithm: str) -> bool:
+    """Whether checksums of this algorithm can be computed here."""
+    try:
+        new_hash(algorithm)
+    except ValueError:
+        return False
+    return True
+
+
+def configured_algorithm() -> str:
+    """
+    The algorithm new checksums are computed with (CHECKSUM_ALGORITHM).
+
+    Falls back to SHA-256, with a warning, if the configured one is not available.
+    """
+    algorithm = settings.checksum_algorithm.strip().lower()
+    if algorithm == SHA256 or is_available(algorithm):
+        return algorithm
+    with _warned_lock:
+        if algorithm not in _warned:
+            _warned.add(algorithm)
+            logger.warning(
+                f"Checksum algorithm {algorithm} is not available; using {SHA256} instead"
+            )
+    return SHA256
+
+
+def format_checksum(algorithm: str, hexdigest: str) -> str:
+    """The stored form of a digest."""
+    if algorithm == SHA256:
+        return hexdigest
+    return f"{algorithm}:{hexdigest}"
+
+
+def checksum_algorithm(checksum: str) -> str:
+    """The algorithm a stored checksum was computed with."""
+    algorithm, sep, _ = checksum.partition(":")
+    return algorithm.lower() if sep else SHA256
+
+
+def algorithm_for_size(size: int) -> str:
+    """
+    The algorithm a new checksum of a file of this size is computed with: the tree form
+    of the configured one from CHECKSUM_TREE_MIN_SIZE_MB up, the configured one below.
+    """
+    algorithm = configured_algorithm()
+    min_size_mb = settings.checksum_tree_min_size_mb
+    if min_size_mb > 0 and size >= min_size_mb * 1024 * 1024:
+        return tree_algorithm(algorithm)
+    return algorithm
@@ -0,0 +1,405 @@
+"""I/O budgets and priorities that keep scans and moves from starving production traffic."""
+
+import contextlib
+import contextvars
+import ctypes
+import ctypes.util
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ioprio_set(2): the class lives above IOPRIO_CLASS_SHIFT, the level (0-7) below it
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_CLASSES = {"best-effort": 2, "idle": 3}
+_SYS_IOPRIO_SET = {"x86_64": 251, "aarch64": 30, "i686": 289, "armv7l": 314}
+
+_current_budget: contextvars.ContextVar[Optional["IOBudget"]] = contextvars.ContextVar(
+    "io_budget", default=None
+)
+_thread_state = threading.local()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill at ``rate`` per second up to ``burst``. A request larger than the bucket
+    is admitted by going into debt, so the caller sleeps for the time the refill needs.
+    A rate of 0 means unlimited.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate: Tokens per second (0 = unlimited)
+            burst: Bucket size; defaults to one second worth of tokens
+            clock: Monotonic clock, replaceable in tests
+            sleep: Sleep function, replaceable in tests
+        """
+        self.rate = max(0.0, float(rate))
+        self.burst = float(burst) if burst is not None else self.rate
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Take tokens, sleeping until the bucket can cover them.
+
+        Returns:
+            Seconds spent waiting
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+
+class IOBudget:
+    """
+    Limits on the I/O of scans and moves for one monitored path or one device.
+
+    Stats and directory listings draw from a stats/sec bucket, file reads (hashing and
+    copying) from a bytes/sec bucket, and whole move operations from a concurrency limit.
+    A budget may have a parent (the device budget), which is charged as well.
+
+    With adaptive back-off, the latency of every stat is fed into a fast moving average.
+    When it rises well above the lowest average seen, the volume is assumed to be busy
+    with user I/O and each stat or read chunk is delayed; the delay doubles while latency
+    stays high and halves once it recovers.
+    """
+
+    # Latency above baseline * BACKOFF_RATIO (and above the absolute threshold) is congestion
+    BACKOFF_RATIO = 4.0
+    # Back-off delay adjustments are made at most this often
+    ADJUST_INTERVAL_SECONDS = 0.5
+    MIN_BACKOFF_SECONDS = 0.001
+    # Weight of a new sample in the fast latency average
+    LATENCY_ALPHA = 0.2
+    # How quickly the baseline follows a lasting latency increase
+    BASELINE_DRIFT = 0.001
+
+    def __init__(
+        self,
+        name: str,
+        stats_per_second: float = 0,
+        read_bytes_per_second: float = 0,
+        max_concurrent: int = 0,
+        adaptive: bool = False,
+        parent: Optional["IOBudget"] = None,
+        latency_threshold_seconds: float = 0.002,
+        max_backoff_seconds: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize the budget.
+
+        Args:
+            name: Label used in logs and status output
+            stats_per_second: Maximum stats and directory listings per second (0 = unlimited)
+            read_bytes_per_second: Maximum bytes read per second (0 = unlimited)
+            max_concurrent: Maximum concurrent move operations (0 = unlimited)
+            adaptive: Back off when stat latency rises
+            parent: Budget charged in addition to this one (usually the device budget)
+            latency_threshold_seconds: Stat latency below which there is never back-off
+            max_backoff_seconds: Upper bound of the per-operation back-off delay
+            clock: Monotonic clock, replaceable in tests
+            sleep: Sleep function, replaceable in tests
+        """
+        self.name = name
+        self.limits = (float(stats_per_second), float(read_bytes_per_second), int(max_concurrent))
+        self.adaptive = adaptive
+        self.parent = parent
+        self.latency_threshold = latency_threshold_seconds
+        self.max_backoff = max_backoff_seconds
+        self.clock = clock
+        self.sleep = sleep
+
+        self._stats = TokenBucket(stats_per_second, clock=clock, sleep=sleep)
+        # Allow a full chunk of reads even at very low rates
+        read_burst = None
+        if read_bytes_per_second:
+            read_burst = max(float(read_bytes_per_second), 1024 * 1024)
+        self._reads = TokenBucket(read_bytes_per_second, read_burst, clock=clock, sleep=sleep)
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+
+        self._lock = threading.Lock()
+        self._latency: Optional[float] = None
+        self._baseline: Optional[float] = None
+        self._last_adjust = clock()
+        self.backoff_delay = 0.0
+        self.stats_charged = 0
+        self.bytes_charged = 0
+        self.seconds_throttled = 0.0
+
+    def stat(self, count: int = 1):
+        """Charge stats or directory listings, sleeping as the budget requires."""
+        waited = self._stats.acquire(count) + self._backoff()
+        self.stats_charged += count
+        if waited:
+            self.seconds_throttled += waited
+        if self.parent is not None:
+            self.parent.stat(count)
+
+    def stat_entry(self, entry: os.DirEntry, follow_symlinks: bool = False) -> os.stat_result:
+        """Charge one stat, run it on a DirEntry and record its latency."""
+        self.stat()
+        started = time.perf_counter()
+        try:
+            return entry.stat(follow_symlinks=follow_symlinks)
+        finally:
+            self.observe_stat_latency(time.perf_counter() - started)
+
+    def read(self, nbytes: int):
+        """Charge bytes read from a file, sleeping as the budget requires."""
+        waited = self._reads.acquire(nbytes) + self._backoff()
+        self.bytes_charged += nbytes
+        if waited:
+            self.seconds_throttled += waited
+        if self.parent is not None:
+            self.parent.read(nbytes)
+
+    @property
+    def limits_reads(self) -> bool:
+        """Whether this budget or its parent has a read rate limit."""
+        return self._reads.rate > 0 or (self.parent is not None and self.parent.limits_reads)
+
+    @contextlib.contextmanager
+    def operation(self) -> Iterator["IOBudget"]:
+        """
+        Hold a concurrency slot and make this budget current for the calling thread.
+
+        Hashing and copying code picks the current budget up with ``current_budget()``.
+        """
+        parent_operation = (
+            self.parent.operation() if self.parent is not None else contextlib.nullcontext()
+        )
+        if self._slots is not None:
+            self._slots.acquire()
+        try:
+            with parent_operation:
+                token = _current_budget.set(self)
+                try:
+                    yield self
+                finally:
+                    _current_budget.reset(token)
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+    def observe_stat_latency(self, seconds: float):
+        """Feed a stat latency sample into the adaptive back-off."""
+        if self.parent is not None:
+            self.parent.observe_stat_latency(seconds)
+        if not self.adaptive:
+            return
+        with self._lock:
+            if self._latency is None:
+                self._latency = seconds
+            else:
+                self._latency += (seconds - self._latency) * self.LATENCY_ALPHA
+            if self._baseline is None or self._latency < self._baseline:
+                self._baseline = self._latency
+            else:
+                self._baseline += (self._latency - self._baseline) * self.BASELINE_DRIFT
+
+            now = self.clock()
+            if now - self._last_adjust < self.ADJUST_INTERVAL_SECONDS:
+                return
+            self._last_adjust = now
+            congested = self._latency > max(
+                self.latency_threshold, self._baseline * self.BACKOFF_RATIO
+            )
+            if congested:
+                if not self.backoff_delay:
+                    logger.info(
+                        f"I/O budget {self.name}: stat latency {self._latency * 1000:.1f} ms, "
+                        "backing off"
+                    )
+                self.backoff_delay = min(
+                    self.max_backoff, max(self.MIN_BACKOFF_SECONDS, self.backoff_delay * 2)
+                )
+            elif self.backoff_delay:
+                self.backoff_delay /= 2
+                if self.backoff_delay < self.MIN_BACKOFF_SECONDS:
+                    self.backoff_delay = 0.0
+                    logger.info(f"I/O budget {self.name}: stat latency recovered")
+
+    def _backoff(self) -> float:
+        delay = self.backoff_delay
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+    def status(self) -> dict:
+        """Limits, current back-off and totals charged, for status endpoints."""
+        stats_per_second, read_bytes_per_second, max_concurrent = self.limits
+        return {
+            "name": self.name,
+            "max_stats_per_second": stats_per_second or None,
+            "max_read_mb_per_second": read_bytes_per_second / (1024 * 1024) or None,
+            "max_concurrent_operations": max_concurrent or None,
+            "adaptive_backoff": self.adaptive,
+            "backoff_delay_ms": round(self.backoff_delay * 1000, 3),
+            "stat_latency_ms": None if self._latency is None else round(self._latency * 1000, 3),
+            "stats_charged": self.stats_charged,
+            "bytes_charged": self.bytes_charged,
+            "seconds_throttled": round(self.seconds_throttled, 3),
+        }
+
+
+def current_budget() -> Optional[IOBudget]:
+    """Budget of the move operation running on this thread, if any."""
+    return _current_budget.get()
+
+
+class IOBudgetManager:
+    """
+    Builds and caches per-device and per-path budgets.
+
+    Device budgets come from the IO_DEVICE_* settings and are shared by every path on the
+    same device, so two paths on one volume together stay within its limits. Path budgets
+    come from the path's io_* columns and are charged in addition to their device budget.
+    Use the module-level `io_budget_manager` instance.
+    """
+
+    def __init__(self):
+        """Initialize the manager."""
+        self._lock = threading.Lock()
+        self._devices: Dict[int, IOBudget] = {}
+        self._paths: Dict[Tuple[int, str], IOBudget] = {}
+
+    def device_budget(self, root: str) -> Optional[IOBudget]:
+        """Shared budget of the device holding root, or None if devices are unlimited."""
+        limits = (
+            settings.io_device_max_stats_per_second,
+            settings.io_device_max_read_mb_per_second * 1024 * 1024,
+            settings.io_device_max_concurrent_operations,
+        )
+        adaptive = settings.io_adaptive_backoff
+        if not any(limits) and not adaptive:
+            return None
+        try:
+            device = os.stat(root).st_dev
+        except OSError:
+            return None
+
+        with self._lock:
+            budget = self._devices.get(device)
+            if budget is None or budget.limits != limits or budget.adaptive != adaptive:
+                budget = IOBudget(
+                    f"device {os.major(device)}:{os.minor(device)}",
+                    *limits,
+                    adaptive=adaptive,
+                    latency_threshold_seconds=settings.io_backoff_latency_threshold_ms / 1000,
+                    max_backoff_seconds=settings.io_max_backoff_ms / 1000,
+                )
+                self._devices[device] = budget
+            return budget
+
+    def for_path(self, path, root: Optional[str] = None) -> Optional[IOBudget]:
+        """
+        Budget for work on a monitored path, chained to the budget of root's device.
+
+        Args:
+            path: Monitored path (its io_* limits apply)
+            root: Directory whose device is charged; defaults to the path's hot storage
+
+        Returns:
+            Budget to charge, or None if nothing is limited
+        """
+        root = root or path.source_path
+        device_budget = self.device_budget(root)
+        limits = (
+            float(path.io_max_stats_per_second or 0),
+            float(path.io_max_read_mb_per_second or 0) * 1024 * 1024,
+            int(path.io_max_concurrent_operations or 0),
+        )
+        if not any(limits):
+            return device_budget
+
+        key = (path.id, root)
+        with self._lock:
+            budget = self._paths.get(key)
+            if budget is None or budget.limits != limits or budget.parent is not device_budget:
+                budget = IOBudget(f"path {path.name}", *limits, parent=device_budget)
+                self._paths[key] = budget
+            return budget
+
+    def status(self) -> list:
+        """Status of every budget built so far."""
+        with self._lock:
+            budgets = list(self._devices.values()) + list(self._paths.values())
+        return [budget.status() for budget in budgets]
+
+
+def apply_background_priority() -> None:
+    """
+    Lower the CPU and I/O priority of the calling thread for background work.
+
+    Uses BACKGROUND_IO_PRIORITY (``idle`` or ``best-effort`` via Linux ioprio_set) and
+    BACKGROUND_NICE (os.nice; per-thread on Linux). Applied once per thread; meant as a
+    ThreadPoolExecutor initializer for threads the application owns. Never call it on a
+    request thread: a raised nice value cannot be lowered again. Failures are logged and
+    otherwise ignored.
+    """
+    if getattr(_thread_state, "priority_applied", False):
+        return
+    _thread_state.priority_applied = True
+
+    io_class = (settings.background_io_priority or "none").lower()
+    if io_class in IOPRIO_CLASSES:
+        try:
+            _set_io_priority(IOPRIO_CLASSES[io_class], 7)
+        except OSError as e:
+            logger.debug(f"Could not set I/O priority {io_class}: {e}")
+
+    if settings.background_nice > 0:
+        try:
+            os.nice(settings.background_nice)
+        except OSError as e:
+            logger.debug(f"Could not lower CPU priority: {e}")
+
+
+def _set_io_priority(io_class: int, level: int) -> None:
+    """Set the I/O scheduling class of the calling thread (Linux only)."""
+    syscall_nr = _SYS_IOPRIO_SET.get(platform.machine())
+    if not sys.platform.startswith("linux") or syscall_nr is None:
+        raise OSError(38, "ioprio_set is not available on this platform")
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    ioprio = (io_class << IOPRIO_CLASS_SHIFT) | level
+    # who=0 means the calling thread
+    if libc.syscall(syscall_nr, IOPRIO_WHO_PROCESS, 0, ioprio) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+
+
+# Global singleton instance
+io_budget_manager = IOBudgetManager()
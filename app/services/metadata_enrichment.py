@@ -0,0 +1,425 @@
+"""Background metadata enrichment: a persistent queue of inventory rows awaiting checksums."""
+
+import contextlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Deque, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import engine
+from app.models import FileInventory, MetadataEnrichmentTask, MonitoredPath
+from app.services.checksum_cache import checksum_cache
+from app.services.checksum_verifier import checksum_verifier
+from app.services.hardlinks import hardlink_registry
+from app.services.io_budget import apply_background_priority, io_budget_manager
+from app.services.scan_records import inventory_fingerprint, stat_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Separate session factory so enrichment workers never share a session with API requests
+EnrichmentSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Queue priorities; higher values are hashed first
+PRIORITY_SCAN = 0
+PRIORITY_FREEZE = 10
+PRIORITY_TRANSFER = 20
+
+
+class MetadataEnrichmentQueue:
+    """
+    Persistent queue of inventory rows that still need a checksum, drained by a worker pool.
+
+    The inventory sync queues new and changed rows instead of hashing them in the scan
+    thread; files about to be frozen or transferred are queued again with a higher
+    priority. A dispatcher thread claims the highest-priority entries in batches and hashes
+    them on a pool of background-priority threads, with reads charged to the I/O budget of
+    the path. Claims only live in memory: entries being hashed when the process stops are
+    still in the table and are picked up again after a restart.
+    Use the module-level `metadata_enrichment_queue` instance.
+    """
+
+    # Failed attempts after which an entry is dropped from the queue
+    MAX_ATTEMPTS = 3
+    # Entries claimed per worker and dispatch round
+    CLAIM_PER_WORKER = 4
+    # How long an idle dispatcher sleeps when nothing wakes it
+    IDLE_POLL_SECONDS = 30.0
+    # Window over which hash throughput is reported
+    THROUGHPUT_WINDOW_SECONDS = 60.0
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = EnrichmentSessionLocal,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            session_factory: Creates the sessions used by the dispatcher and workers
+            clock: Monotonic clock, replaceable in tests
+        """
+        self.session_factory = session_factory
+        self.clock = clock
+        self.workers = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._recent: Deque[Tuple[float, int]] = deque()
+        self.files_hashed = 0
+        self.bytes_hashed = 0
+        self.files_failed = 0
+        self.files_linked = 0  # Checksums taken from another link of the same inode
+        self.seconds_hashing = 0.0
+
+    @staticmethod
+    def enqueue_paths(
+        db: Session, path_id: int, file_paths: Iterable[str], priority: int = PRIORITY_SCAN
+    ) -> None:
+        """
+        Queue the rows of a path that still need a checksum.
+
+        Entries already queued keep the higher of their priority and ``priority``. Works
+        set-based on the caller's session; the caller commits.
+        """
+        inventory = FileInventory.__table__
+        file_paths = list(file_paths)
+        for i in range(0, len(file_paths), 5000):
+            MetadataEnrichmentQueue._enqueue(
+                db,
+                priority,
+                inventory.c.path_id == path_id,
+                inventory.c.file_path.in_(file_paths[i : i + 5000]),
+            )
+
+    @staticmethod
+    def enqueue_ids(
+        db: Session, inventory_ids: Iterable[int], priority: int = PRIORITY_SCAN
+    ) -> None:
+        """Queue inventory rows by id; see enqueue_paths."""
+        inventory = FileInventory.__table__
+        inventory_ids = list(inventory_ids)
+        for i in range(0, len(inventory_ids), 5000):
+            MetadataEnrichmentQueue._enqueue(
+                db, priority, inventory.c.id.in_(inventory_ids[i : i + 5000])
+            )
+
+    @staticmethod
+    def _enqueue(db: Session, priority: int, *criteria) -> None:
+        inventory = FileInventory.__table__
+        queue = MetadataEnrichmentTask.__table__
+        max_bytes = settings.metadata_enrichment_max_file_size_mb * 1024 * 1024
+        rows = select(
+            inventory.c.id,
+            literal(priority),
+            literal(datetime.now(tz=timezone.utc)),
+            literal(0),
+        ).where(*criteria, inventory.c.checksum.is_(None), inventory.c.file_size < max_bytes)
+        stmt = sqlite_insert(queue).from_select(
+            ["inventory_id", "priority", "enqueued_at", "attempts"], rows
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[queue.c.inventory_id],
+                set_={"priority": func.max(queue.c.priority, stmt.excluded.priority)},
+            )
+        )
+
+    def notify(self):
+        """Wake the dispatcher after entries were queued and committed."""
+        self._wake.set()
+
+    def start(self, workers: Optional[int] = None):
+        """Start the dispatcher thread and worker pool (METADATA_ENRICHMENT_WORKERS)."""
+        if self._thread is not None:
+            return
+        workers = settings.metadata_enrichment_workers if workers is None else workers
+        if workers <= 0:
+            logger.info("Background metadata enrichment is disabled")
+            return
+        self.workers = workers
+        self._stop.clear()
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="metadata-enrichment",
+            initializer=apply_background_priority,
+        )
+        self._thread = threading.Thread(
+            target=self._dispatch_loop, name="metadata-enrichment-dispatcher", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Metadata enrichment started with {workers} workers")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the dispatcher and wait for the files being hashed."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        self.workers = 0
+
+    def run_once(self, limit: Optional[int] = None) -> int:
+        """
+        Claim the highest-priority entries and hash them.
+
+        Runs on the worker pool when started, otherwise on the calling thread.
+
+        Returns:
+            Number of entries claimed
+        """
+        if limit is None:
+            limit = max(1, self.workers) * self.CLAIM_PER_WORKER
+        queue = MetadataEnrichmentTask.__table__
+        db = self.session_factory()
+        try:
+            claimed = db.execute(
+                select(queue.c.id, queue.c.inventory_id)
+                .order_by(queue.c.priority.desc(), queue.c.id)
+                .limit(limit)
+            ).all()
+        finally:
+            db.close()
+
+        if self._pool is not None:
+            wait([self._pool.submit(self._process, *entry) for entry in claimed])
+        else:
+            for entry in claimed:
+                self._process(*entry)
+        return len(claimed)
+
+    def depth(self, db: Session) -> int:
+        """Number of queued entries."""
+        return db.query(func.count(MetadataEnrichmentTask.id)).scalar() or 0
+
+    def status(self, db: Session) -> dict:
+        """Queue depth, hashing throughput and checksum cache hit rate, for the API."""
+        by_priority = dict(
+            db.query(MetadataEnrichmentTask.priority, func.count(MetadataEnrichmentTask.id))
+            .group_by(MetadataEnrichmentTask.priority)
+            .all()
+        )
+        with self._lock:
+            now = self.clock()
+            self._trim(now)
+            window_bytes = sum(nbytes for _, nbytes in self._recent)
+            window_files = len(self._recent)
+            totals = {
+                "files_hashed": self.files_hashed,
+                "bytes_hashed": self.bytes_hashed,
+                "files_failed": self.files_failed,
+                "files_linked": self.files_linked,
+                "seconds_hashing": round(self.seconds_hashing, 3),
+            }
+        window = self.THROUGHPUT_WINDOW_SECONDS
+        return {
+            "running": self._thread is not None,
+            "workers": self.workers,
+            "queue_depth": sum(by_priority.values()),
+            "queued_by_priority": {
+                "transfer": by_priority.get(PRIORITY_TRANSFER, 0),
+                "freeze": by_priority.get(PRIORITY_FREEZE, 0),
+                "scan": by_priority.get(PRIORITY_SCAN, 0),
+            },
+            "hash_mb_per_second": round(window_bytes / window / (1024 * 1024), 3),
+            "files_per_second": round(window_files / window, 3),
+            **totals,
+            "checksum_cache": checksum_cache.stats(db),
+        }
+
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            try:
+                claimed = self.run_once()
+            except Exception:
+                logger.exception("Error in metadata enrichment dispatcher")
+                claimed = 0
+            if not claimed:
+                self._wake.wait(self.IDLE_POLL_SECONDS)
+                self._wake.clear()
+
+    def _process(self, task_id: int, inventory_id: int):
+        if self._stop.is_set() and self._thread is not None:
+            return
+        inventory = FileInventory.__table__
+        queue = MetadataEnrichmentTask.__table__
+        db = self.session_factory()
+        try:
+            row = db.execute(
+                select(
+                    inventory.c.path_id,
+                    inventory.c.file_path,
+                    inventory.c.file_dev,
+                    inventory.c.file_inode,
+                    inventory.c.file_size,
+                    inventory.c.file_mtime_ns,
+                    inventory.c.link_group,
+                    inventory.c.checksum,
+                ).where(inventory.c.id == inventory_id)
+            ).first()
+            if row is None or row.checksum is not None or self._changed_since_scan(row):
+                # Row is gone, a freeze or transfer already computed the checksum, or the
+                # file changed and the next scan queues it again with its new fingerprint
+                db.execute(queue.delete().where(queue.c.id == task_id))
+                db.commit()
+                return
+
+            file_path = Path(row.file_path)
+            # Links of one inode are hashed once: the others wait, then reuse its checksum
+            key = None
+            if row.link_group is not None and inventory_fingerprint(row) is not None:
+                key = (row.file_dev, row.file_inode)
+            with hardlink_registry.locked(key):
+                checksum = self._link_group_checksum(db, row) if key is not None else None
+                hashed = checksum is None
+                if hashed:
+                    budget = self._budget_for(db, row.path_id, row.file_path)
+                    started = self.clock()
+                    before = self._fingerprint(file_path)
+                    with budget.operation() if budget is not None else contextlib.nullcontext():
+                        checksum = checksum_verifier.calculate_checksum(file_path)
+                    elapsed = self.clock() - started
+                    if checksum is not None and self._fingerprint(file_path) != before:
+                        # Changed while it was read: the entry stays queued, and the next
+                        # round hashes the file again or drops the entry as out of date
+                        return
+
+                if checksum is not None:
+                    # A sync may have stored a new fingerprint while the file was read. Its
+                    # re-queue merged into this entry, so the entry is kept in that case.
+                    written = db.execute(
+                        inventory.update()
+                        .where(
+                            inventory.c.id == inventory_id,
+                            inventory.c.checksum.is_(None),
+                            inventory.c.file_dev == row.file_dev,
+                            inventory.c.file_inode == row.file_inode,
+                            inventory.c.file_size == row.file_size,
+                            inventory.c.file_mtime_ns == row.file_mtime_ns,
+                        )
+                        .values(checksum=checksum)
+                    ).rowcount
+                    if written or not self._awaits_checksum(db, inventory_id):
+                        db.execute(queue.delete().where(queue.c.id == task_id))
+                    db.commit()
+                    if hashed:
+                        self._record(row.file_size or 0, elapsed)
+                    else:
+                        with self._lock:
+                            self.files_linked += 1
+                    return
+
+            with self._lock:
+                self.files_failed += 1
+            if not os.path.exists(file_path):
+                # Moved or deleted; the next scan queues it again under its new path
+                db.execute(queue.delete().where(queue.c.id == task_id))
+            else:
+                task = db.get(MetadataEnrichmentTask, task_id)
+                if task is not None:
+                    task.attempts += 1
+                    task.last_error = "Could not read file"
+                    if task.attempts >= self.MAX_ATTEMPTS:
+                        logger.warning(f"Giving up on checksum for {file_path}")
+                        db.delete(task)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception(f"Error enriching inventory row {inventory_id}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _link_group_checksum(db: Session, row) -> Optional[str]:
+        """Checksum already stored for another link of the row's inode, if any."""
+        inventory = FileInventory.__table__
+        return db.execute(
+            select(inventory.c.checksum)
+            .where(
+                inventory.c.path_id == row.path_id,
+                inventory.c.link_group == row.link_group,
+                inventory.c.file_dev == row.file_dev,
+                inventory.c.file_inode == row.file_inode,
+                inventory.c.file_size == row.file_size,
+                inventory.c.file_mtime_ns == row.file_mtime_ns,
+                inventory.c.checksum.is_not(None),
+            )
+            .limit(1)
+        ).scalar()
+
+    @staticmethod
+    def _fingerprint(file_path: Path):
+        """Stat fingerprint of a file, or None if it cannot be stat'ed."""
+        try:
+            return stat_fingerprint(os.stat(file_path))
+        except OSError:
+            return None
+
+    @staticmethod
+    def _awaits_checksum(db: Session, inventory_id: int) -> bool:
+        """Whether the inventory row still exists without a checksum."""
+        inventory = FileInventory.__table__
+        return (
+            db.execute(
+                select(inventory.c.id).where(
+                    inventory.c.id == inventory_id, inventory.c.checksum.is_(None)
+                )
+            ).first()
+            is not None
+        )
+
+    @staticmethod
+    def _changed_since_scan(row) -> bool:
+        """Whether the file no longer matches the fingerprint its row was synced with."""
+        stored = inventory_fingerprint(row)
+        if stored is None:
+            return False
+        try:
+            return stat_fingerprint(os.stat(row.file_path)) != stored
+        except OSError:
+            return False
+
+    @staticmethod
+    def _budget_for(db: Session, path_id: int, file_path: str):
+        """I/O budget of the path, charged to the device of the root holding the file."""
+        path = db.get(MonitoredPath, path_id)
+        if path is None:
+            return None
+        roots: List[str] = [path.source_path] + [loc.path for loc in path.storage_locations]
+        root = next(
+            (r for r in roots if file_path.startswith(os.path.normpath(r) + os.sep)), None
+        )
+        return io_budget_manager.for_path(path, root)
+
+    def _record(self, nbytes: int, seconds: float):
+        with self._lock:
+            now = self.clock()
+            self.files_hashed += 1
+            self.bytes_hashed += nbytes
+            self.seconds_hashing += seconds
+            self._recent.append((now, nbytes))
+            self._trim(now)
+
+    def _trim(self, now: float):
+        cutoff = now - self.THROUGHPUT_WINDOW_SECONDS
+        while self._recent and self._recent[0][0] < cutoff:
+            self._recent.popleft()
+
+
+# Global singleton instance
+metadata_enrichment_queue = MetadataEnrichmentQueue()
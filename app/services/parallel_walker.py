@@ -0,0 +1,228 @@
+"""Multi-threaded directory walker for latency-bound filesystems (NFS/SMB)."""
+
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
+
+from app.services.exclude_rules import ExcludeMatcher
+from app.services.io_budget import IOBudget, apply_background_priority
+
+if TYPE_CHECKING:
+    from app.services.directory_snapshot import DirectorySnapshotTracker
+    from app.services.scan_checkpoint import WalkCursor
+    from app.services.scan_syscalls import SyscallCounter
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class ParallelDirectoryWalker:
+    """
+    Walks a directory tree with a pool of worker threads.
+
+    Each worker lists one directory at a time, fans its subdirectories out to the pool and
+    hands the directory's files to the consumer as a single batch. The resulting stream is
+    unordered: files from different directories interleave in completion order.
+
+    The output queue is bounded, so workers block when the consumer falls behind and memory
+    stays flat regardless of tree size.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        excludes: ExcludeMatcher,
+        max_pending_batches: int = 256,
+        batch_size: int = 1000,
+        budget: Optional[IOBudget] = None,
+    ):
+        """
+        Initialize the walker.
+
+        Args:
+            max_workers: Number of directories listed concurrently
+            excludes: Exclude rules; excluded directories are pruned
+            max_pending_batches: Directory batches buffered before workers block
+            batch_size: Maximum entries per batch, so huge directories stream in pieces
+            budget: Optional I/O budget charged for every listing and stat
+        """
+        self.max_workers = max(1, max_workers)
+        self.excludes = excludes
+        self.max_pending_batches = max_pending_batches
+        self.batch_size = batch_size
+        self.budget = budget
+
+    def walk(
+        self,
+        root: str,
+        tracker: Optional["DirectorySnapshotTracker"] = None,
+        syscalls: Optional["SyscallCounter"] = None,
+        cursor: Optional["WalkCursor"] = None,
+    ) -> Iterator[os.DirEntry]:
+        """Yield file entries (including symlinks) below root, with lstat already cached.
+
+        With a cursor, a directory's subdirectories are only handed to the pool once it has
+        been listed completely, and the walk starts from the cursor's resume points.
+        """
+        results: queue.Queue = queue.Queue(maxsize=self.max_pending_batches)
+        stop = threading.Event()
+        pending_lock = threading.Lock()
+        pending = [0]
+        excludes = self.excludes
+        root = str(root)
+        rel_start = len(root) + 1
+        needs_path = excludes.needs_path
+        budget = self.budget
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="scan-walker",
+            initializer=apply_background_priority,
+        )
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def submit(dir_path: str, parent_path: Optional[str], files_only: bool = False):
+            if stop.is_set():
+                return
+            with pending_lock:
+                pending[0] += 1
+            try:
+                executor.submit(run, dir_path, parent_path, files_only)
+            except RuntimeError:
+                # Executor already shut down because the consumer stopped early
+                with pending_lock:
+                    pending[0] -= 1
+
+        def put_files(dir_path: str, files: List[os.DirEntry]) -> bool:
+            if cursor is not None:
+                cursor.add_batch(dir_path)
+            return put((dir_path, files))
+
+        def run(dir_path: str, parent_path: Optional[str], files_only: bool):
+            try:
+                if not stop.is_set():
+                    files, subdirs = list_directory(dir_path, parent_path, files_only)
+                    if cursor is not None:
+                        # Files and subdirectories must be accounted for before the
+                        # directory stops being pending
+                        if files:
+                            cursor.add_batch(dir_path)
+                        cursor.listed(dir_path, subdirs)
+                        if files:
+                            put((dir_path, files))
+                        for subdir in subdirs:
+                            submit(subdir, dir_path)
+                    elif files:
+                        put((dir_path, files))
+            except Exception as e:
+                logger.warning(f"Error walking {dir_path}: {e}")
+            finally:
+                with pending_lock:
+                    pending[0] -= 1
+                    finished = pending[0] == 0
+                if finished:
+                    put(_DONE)
+
+        def found_subdir(subdirs: List[str], subdir: str, parent_path: str):
+            # Without a cursor, subdirectories fan out while the listing is still running
+            if cursor is None:
+                submit(subdir, parent_path)
+            else:
+                subdirs.append(subdir)
+
+        def list_directory(
+            dir_path: str, parent_path: Optional[str], files_only: bool = False
+        ) -> Tuple[List[os.DirEntry], List[str]]:
+            subdirs: List[str] = []
+            if (
+                not files_only
+                and tracker is not None
+                and not tracker.begin_directory(dir_path)
+            ):
+                for subdir in tracker.skip_directory(dir_path, parent_path):
+                    # Exclude rules may have changed since the snapshot was taken
+                    rel = subdir[rel_start:] if needs_path else ""
+                    if not excludes.excludes(os.path.basename(subdir), rel, True):
+                        found_subdir(subdirs, subdir, dir_path)
+                return [], subdirs
+
+            files = []
+            entry_count = 0
+            stats = 0
+            if syscalls is not None:
+                syscalls.add("scandir")
+            if budget is not None:
+                budget.stat()
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        entry_count += 1
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        rel = entry.path[rel_start:] if needs_path else ""
+                        if excludes.excludes(entry.name, rel, is_dir):
+                            continue
+                        if is_dir:
+                            if not files_only:
+                                found_subdir(subdirs, entry.path, dir_path)
+                            continue
+                        # Prime the DirEntry stat cache while still on the worker thread,
+                        # so the consumer does not pay the round trip
+                        stats += 1
+                        try:
+                            if budget is not None:
+                                budget.stat_entry(entry)
+                            else:
+                                entry.stat(follow_symlinks=False)
+                        except OSError:
+                            pass
+                        files.append(entry)
+                        if len(files) >= self.batch_size:
+                            put_files(dir_path, files)
+                            files = []
+            except OSError:
+                return files, subdirs
+            finally:
+                if syscalls is not None and stats:
+                    syscalls.add("lstat", stats)
+
+            if tracker is not None and not files_only:
+                tracker.finish_directory(dir_path, parent_path, entry_count)
+            return files, subdirs
+
+        starts = [(root, False)] if cursor is None else cursor.start_points(root)
+        if not starts:
+            return
+        # Hold a token while submitting, so an early finisher cannot end the walk
+        with pending_lock:
+            pending[0] += 1
+        for dir_path, files_only in starts:
+            submit(dir_path, None if dir_path == root else os.path.dirname(dir_path), files_only)
+        with pending_lock:
+            pending[0] -= 1
+            finished = pending[0] == 0
+        if finished:
+            put(_DONE)
+        try:
+            while True:
+                batch = results.get()
+                if batch is _DONE:
+                    break
+                dir_path, files = batch
+                yield from files
+                if cursor is not None:
+                    cursor.consumed(dir_path)
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
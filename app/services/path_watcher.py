@@ -0,0 +1,716 @@
+"""Change-driven scanning: inotify/fanotify watchers feeding a debounced change queue."""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import engine
+from app.models import MonitoredPath, WatchMode
+from app.services.exclude_rules import ExcludeMatcher
+from app.services.file_workflow_service import file_workflow_service
+
+logger = logging.getLogger(__name__)
+
+# Separate session factory so watch batches never share a session with API requests
+WatchSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Constants and event layout from the inotify(7) man page
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_DONT_FOLLOW = 0x02000000
+_IN_EXCL_UNLINK = 0x04000000
+_IN_ISDIR = 0x40000000
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+# Constants and event layout from the fanotify(7) man page
+_FAN_CLASS_NOTIF = 0x00000000
+_FAN_CLOEXEC = 0x00000001
+_FAN_NONBLOCK = 0x00000002
+_FAN_MARK_ADD = 0x00000001
+_FAN_MARK_MOUNT = 0x00000010
+_FAN_MODIFY = 0x00000002
+_FAN_CLOSE_WRITE = 0x00000008
+_FAN_Q_OVERFLOW = 0x00004000
+_FAN_EVENT_METADATA = struct.Struct("IBBHQii")
+_AT_FDCWD = -100
+
+_READ_SIZE = 64 * 1024
+
+
+@lru_cache(maxsize=1)
+def _load_libc():
+    # Cached rather than kept in a global: watcher threads may call this concurrently
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.ENOSYS, "Filesystem watches are only supported on Linux")
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.fanotify_mark.argtypes = [
+        ctypes.c_int,
+        ctypes.c_uint,
+        ctypes.c_uint64,
+        ctypes.c_int,
+        ctypes.c_char_p,
+    ]
+    return libc
+
+
+def _errno_error(call: str, target: str = "") -> OSError:
+    err = ctypes.get_errno()
+    return OSError(err, f"{call} failed: {os.strerror(err)}", target or None)
+
+
+class ChangeBatch(NamedTuple):
+    """Changes that have been quiet for the debounce window."""
+
+    paths: Set[str]  # Files created, modified, deleted or renamed
+    rescan_dirs: Set[str]  # Subtrees whose contents must be walked
+    overflow: bool  # Events were lost; only a full scan can catch up
+
+
+class DebouncedChangeQueue:
+    """
+    Coalesces change events per path until the path has been quiet for a while.
+
+    A path is released once no event arrived for ``debounce_seconds``, or once its first
+    event is ``max_delay_seconds`` old so files written continuously are still processed.
+    When more than ``max_pending`` paths are waiting (or the kernel reports lost events)
+    the queue drops them and reports an overflow instead.
+    """
+
+    def __init__(
+        self,
+        debounce_seconds: float = 2.0,
+        max_delay_seconds: float = 30.0,
+        max_pending: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max(max_delay_seconds, debounce_seconds)
+        self.max_pending = max_pending
+        self.events_received = 0
+        self._clock = clock
+        # path -> (first event, last event)
+        self._paths: Dict[str, Tuple[float, float]] = {}
+        self._dirs: Dict[str, Tuple[float, float]] = {}
+        self._overflow_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._paths) + len(self._dirs)
+
+    @property
+    def overflowed(self) -> bool:
+        with self._lock:
+            return self._overflow_at is not None
+
+    def add_path(self, path: str):
+        """Record a change to a single entry."""
+        self._add(self._paths, path)
+
+    def add_dir(self, path: str):
+        """Record a subtree whose contents must be walked."""
+        self._add(self._dirs, path)
+
+    def mark_overflow(self):
+        """Record that events were lost."""
+        with self._lock:
+            self.events_received += 1
+            self._set_overflow(self._clock())
+
+    def requeue(self, batch: ChangeBatch):
+        """Put back a batch that could not be processed yet."""
+        if batch.overflow:
+            self.mark_overflow()
+            return
+        for path in batch.paths:
+            self.add_path(path)
+        for path in batch.rescan_dirs:
+            self.add_dir(path)
+
+    def pop_ready(self) -> Optional[ChangeBatch]:
+        """Remove and return the changes that are ready, or None."""
+        now = self._clock()
+        with self._lock:
+            if self._overflow_at is not None:
+                if now - self._overflow_at < self.debounce_seconds:
+                    return None
+                self._overflow_at = None
+                return ChangeBatch(set(), set(), True)
+            paths = self._take_ready(self._paths, now)
+            dirs = self._take_ready(self._dirs, now)
+        if not paths and not dirs:
+            return None
+        return ChangeBatch(paths, dirs, False)
+
+    def _add(self, target: Dict[str, Tuple[float, float]], path: str):
+        now = self._clock()
+        with self._lock:
+            self.events_received += 1
+            if self._overflow_at is not None:
+                # A full scan is already due; keep pushing it back while events arrive
+                self._overflow_at = now
+                return
+            first = target[path][0] if path in target else now
+            target[path] = (first, now)
+            if len(self._paths) + len(self._dirs) > self.max_pending:
+                self._set_overflow(now)
+
+    def _set_overflow(self, now: float):
+        self._overflow_at = now
+        self._paths.clear()
+        self._dirs.clear()
+
+    def _take_ready(self, target: Dict[str, Tuple[float, float]], now: float) -> Set[str]:
+        ready = {
+            path
+            for path, (first, last) in target.items()
+            if now - last >= self.debounce_seconds or now - first >= self.max_delay_seconds
+        }
+        for path in ready:
+            del target[path]
+        return ready
+
+
+class InotifyBackend:
+    """
+    Recursive inotify watches over one directory tree.
+
+    Every directory needs its own watch. When the per-user watch limit
+    (``fs.inotify.max_user_watches``) is exhausted, the directories that could not be
+    watched are recorded in ``unwatched_dirs`` and left to scheduled subtree scans.
+    """
+
+    name = "inotify"
+
+    MASK = (
+        _IN_CREATE
+        | _IN_DELETE
+        | _IN_MODIFY
+        | _IN_CLOSE_WRITE
+        | _IN_ATTRIB
+        | _IN_MOVED_FROM
+        | _IN_MOVED_TO
+        | _IN_DELETE_SELF
+        | _IN_MOVE_SELF
+        | _IN_ONLYDIR
+        | _IN_DONT_FOLLOW
+        | _IN_EXCL_UNLINK
+    )
+
+    def __init__(self, root: str, excludes: ExcludeMatcher, queue: DebouncedChangeQueue):
+        self.root = os.path.normpath(root)
+        self.excludes = excludes
+        self.queue = queue
+        self._prefix = self.root + os.sep
+        self._fd = -1
+        self._wd_paths: Dict[int, str] = {}
+        self._path_wds: Dict[str, int] = {}
+        self._unwatched: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def watch_count(self) -> int:
+        return len(self._wd_paths)
+
+    @property
+    def unwatched_dirs(self) -> Set[str]:
+        with self._lock:
+            return set(self._unwatched)
+
+    def start(self):
+        """Create the inotify instance and watch the whole tree."""
+        fd = _load_libc().inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise _errno_error("inotify_init1")
+        self._fd = fd
+        self._watch_tree(self.root)
+        if self._unwatched:
+            logger.warning(
+                f"inotify watch limit reached for {self.root}: {len(self._unwatched)} "
+                f"subtrees left to scheduled scans ({self.watch_count} watches active). "
+                "Raise fs.inotify.max_user_watches to watch the whole tree."
+            )
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._wd_paths.clear()
+        self._path_wds.clear()
+
+    def retry_unwatched(self):
+        """Try again to watch subtrees skipped because of the watch limit."""
+        with self._lock:
+            pending = sorted(self._unwatched)
+            self._unwatched.clear()
+        for dir_path in pending:
+            self._watch_tree(dir_path)
+            if dir_path not in self._unwatched:
+                # Changes made while unwatched are picked up by walking the subtree once
+                self.queue.add_dir(dir_path)
+
+    def read_events(self):
+        """Read the pending events and feed them to the queue."""
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return
+        offset = 0
+        header = _INOTIFY_EVENT.size
+        while offset + header <= len(data):
+            wd, mask, _cookie, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            name = data[offset + header : offset + header + length].split(b"\0", 1)[0]
+            offset += header + length
+            self._handle(wd, mask, os.fsdecode(name))
+
+    def _handle(self, wd: int, mask: int, name: str):
+        if mask & _IN_Q_OVERFLOW:
+            logger.warning(f"inotify queue overflowed for {self.root}; a full scan will follow")
+            self.queue.mark_overflow()
+            return
+        dir_path = self._wd_paths.get(wd)
+        if dir_path is None:
+            return
+        if mask & _IN_IGNORED:
+            self._drop_watch(wd)
+            return
+        if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF):
+            if dir_path == self.root:
+                self.queue.mark_overflow()
+            # Other directories are handled through their parent's event
+            return
+        if not name:
+            return
+
+        path = os.path.join(dir_path, name)
+        is_dir = bool(mask & _IN_ISDIR)
+        rel = path[len(self._prefix) :] if self.excludes.needs_path else ""
+        if self.excludes.excludes(name, rel, is_dir):
+            return
+        if not is_dir:
+            self.queue.add_path(path)
+        elif mask & (_IN_CREATE | _IN_MOVED_TO):
+            # Entries may have appeared before the watch existed, so walk the new subtree
+            self._watch_tree(path)
+            self.queue.add_dir(path)
+        elif mask & _IN_MOVED_FROM:
+            # The watches follow the inodes, which now live outside this path
+            self._forget_tree(path)
+            self.queue.add_dir(path)
+        elif mask & _IN_DELETE:
+            self.queue.add_dir(path)
+
+    def _watch_tree(self, top: str):
+        stack = [top]
+        while stack:
+            dir_path = stack.pop()
+            try:
+                self._add_watch(dir_path)
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    # Out of watches: nothing else can be watched right now
+                    with self._lock:
+                        self._unwatched.add(dir_path)
+                        self._unwatched.update(stack)
+                    return
+                if e.errno not in (errno.ENOENT, errno.ENOTDIR):
+                    logger.debug(f"Cannot watch {dir_path}: {e}")
+                continue
+
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                        rel = entry.path[len(self._prefix) :] if self.excludes.needs_path else ""
+                        if not self.excludes.excludes(entry.name, rel, True):
+                            stack.append(entry.path)
+            except OSError:
+                continue
+
+    def _add_watch(self, dir_path: str) -> int:
+        wd = _load_libc().inotify_add_watch(self._fd, os.fsencode(dir_path), self.MASK)
+        if wd < 0:
+            raise _errno_error("inotify_add_watch", dir_path)
+        previous = self._wd_paths.get(wd)
+        if previous is not None and previous != dir_path:
+            # Same directory re-added under a new name
+            self._path_wds.pop(previous, None)
+        self._wd_paths[wd] = dir_path
+        self._path_wds[dir_path] = wd
+        return wd
+
+    def _drop_watch(self, wd: int):
+        dir_path = self._wd_paths.pop(wd, None)
+        if dir_path is not None and self._path_wds.get(dir_path) == wd:
+            del self._path_wds[dir_path]
+
+    def _forget_tree(self, top: str):
+        prefix = top + os.sep
+        for dir_path in [p for p in self._path_wds if p == top or p.startswith(prefix)]:
+            wd = self._path_wds.pop(dir_path)
+            self._wd_paths.pop(wd, None)
+            _load_libc().inotify_rm_watch(self._fd, wd)
+        with self._lock:
+            self._unwatched = {p for p in self._unwatched if not (p == top or p.startswith(prefix))}
+
+
+class FanotifyBackend:
+    """
+    One fanotify mark on the mount holding the tree, filtered to the tree.
+
+    A mount mark needs no per-directory watches, so it is not affected by the inotify watch
+    limit, but it requires CAP_SYS_ADMIN and only reports writes: files created empty,
+    deleted or renamed without being written are picked up by reconciliation scans.
+    Writes made by this process (the movers) are ignored.
+    """
+
+    name = "fanotify"
+
+    def __init__(self, root: str, excludes: ExcludeMatcher, queue: DebouncedChangeQueue):
+        self.root = os.path.normpath(root)
+        self.excludes = excludes
+        self.queue = queue
+        self._prefix = self.root + os.sep
+        self._fd = -1
+        self._pid = os.getpid()
+
+    @property
+    def watch_count(self) -> int:
+        return 1 if self._fd >= 0 else 0
+
+    @property
+    def unwatched_dirs(self) -> Set[str]:
+        return set()
+
+    def start(self):
+        """Create the fanotify group and mark the mount."""
+        libc = _load_libc()
+        fd = libc.fanotify_init(
+            _FAN_CLASS_NOTIF | _FAN_CLOEXEC | _FAN_NONBLOCK,
+            os.O_RDONLY | getattr(os, "O_LARGEFILE", 0),
+        )
+        if fd < 0:
+            raise _errno_error("fanotify_init")
+        rc = libc.fanotify_mark(
+            fd,
+            _FAN_MARK_ADD | _FAN_MARK_MOUNT,
+            _FAN_MODIFY | _FAN_CLOSE_WRITE,
+            _AT_FDCWD,
+            os.fsencode(self.root),
+        )
+        if rc < 0:
+            error = _errno_error("fanotify_mark", self.root)
+            os.close(fd)
+            raise error
+        self._fd = fd
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def retry_unwatched(self):
+        """Mount marks never leave subtrees unwatched."""
+
+    def read_events(self):
+        """Read the pending events and feed them to the queue."""
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _FAN_EVENT_METADATA.size <= len(data):
+            event_len, _vers, _reserved, _meta_len, mask, event_fd, pid = (
+                _FAN_EVENT_METADATA.unpack_from(data, offset)
+            )
+            offset += max(event_len, _FAN_EVENT_METADATA.size)
+            if mask & _FAN_Q_OVERFLOW:
+                logger.warning(
+                    f"fanotify queue overflowed for {self.root}; a full scan will follow"
+                )
+                self.queue.mark_overflow()
+            if event_fd < 0:
+                continue
+            try:
+                path = os.readlink(f"/proc/self/fd/{event_fd}")
+            except OSError:
+                continue
+            finally:
+                os.close(event_fd)
+            if pid == self._pid or not path.startswith(self._prefix):
+                continue
+            if not self.excludes.excludes_path(path[len(self._prefix) :], False):
+                self.queue.add_path(path)
+
+
+class PathWatcher:
+    """
+    Watches one monitored path and hands debounced change batches to a callback.
+
+    A reader thread drains the kernel queue into a DebouncedChangeQueue; a flusher thread
+    pops ready batches and calls ``on_batch(path_id, batch)``, which returns False when the
+    batch could not be processed yet (for example while a scan is running) so it is
+    requeued.
+    """
+
+    # How often subtrees left unwatched by the watch limit are retried
+    RETRY_UNWATCHED_SECONDS = 300
+
+    def __init__(
+        self,
+        path_id: int,
+        root: str,
+        mode: WatchMode,
+        excludes: ExcludeMatcher,
+        on_batch: Callable[[int, ChangeBatch], bool],
+        debounce_seconds: float = 2.0,
+        max_delay_seconds: float = 30.0,
+        max_pending: int = 100_000,
+    ):
+        self.path_id = path_id
+        self.root = os.path.normpath(root)
+        self.mode = mode
+        self.excludes = excludes
+        self.on_batch = on_batch
+        self.queue = DebouncedChangeQueue(debounce_seconds, max_delay_seconds, max_pending)
+        self.backend = None
+        self.batches_processed = 0
+        self.last_batch_at: Optional[datetime] = None
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """
+        Open the watch backend and start the worker threads.
+
+        Raises:
+            OSError: If no backend can watch the path
+        """
+        self.backend = self._open_backend()
+        for target, suffix in ((self._read_loop, "reader"), (self._flush_loop, "flusher")):
+            thread = threading.Thread(
+                target=target, name=f"path-watch-{self.path_id}-{suffix}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker threads and release the watches."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        if self.backend is not None:
+            self.backend.close()
+
+    def fallback_dirs(self) -> Set[str]:
+        """Subtrees that are not watched and must be covered by scheduled scans."""
+        return self.backend.unwatched_dirs if self.backend is not None else {self.root}
+
+    def status(self) -> dict:
+        """Watch statistics for the API."""
+        return {
+            "mode": self.backend.name if self.backend is not None else None,
+            "requested_mode": self.mode.value,
+            "watches": self.backend.watch_count if self.backend is not None else 0,
+            "unwatched_dirs": len(self.fallback_dirs()),
+            "pending_changes": len(self.queue),
+            "overflowed": self.queue.overflowed,
+            "events_received": self.queue.events_received,
+            "batches_processed": self.batches_processed,
+            "last_batch_at": self.last_batch_at.isoformat() if self.last_batch_at else None,
+        }
+
+    def _open_backend(self):
+        if self.mode == WatchMode.FANOTIFY:
+            backend = FanotifyBackend(self.root, self.excludes, self.queue)
+            try:
+                backend.start()
+                return backend
+            except OSError as e:
+                logger.warning(f"fanotify unavailable for {self.root} ({e}); using inotify")
+        backend = InotifyBackend(self.root, self.excludes, self.queue)
+        try:
+            backend.start()
+        except OSError:
+            backend.close()
+            raise
+        return backend
+
+    def _read_loop(self):
+        next_retry = time.monotonic() + self.RETRY_UNWATCHED_SECONDS
+        while not self._stop.is_set():
+            try:
+                ready, _, _ = select.select([self.backend.fileno()], [], [], 0.5)
+                if ready:
+                    self.backend.read_events()
+                if time.monotonic() >= next_retry:
+                    next_retry = time.monotonic() + self.RETRY_UNWATCHED_SECONDS
+                    self.backend.retry_unwatched()
+            except (OSError, ValueError):
+                if self._stop.is_set():
+                    return
+                logger.exception(f"Error reading watch events for path {self.path_id}")
+                self._stop.wait(1.0)
+
+    def _flush_loop(self):
+        interval = min(1.0, max(0.1, self.queue.debounce_seconds / 2))
+        while not self._stop.wait(interval):
+            batch = self.queue.pop_ready()
+            if batch is None:
+                continue
+            try:
+                handled = self.on_batch(self.path_id, batch)
+            except Exception:
+                # Dropped: the next reconciliation scan covers these files
+                logger.exception(f"Error processing watched changes for path {self.path_id}")
+                handled = True
+            if handled:
+                self.batches_processed += 1
+                self.last_batch_at = datetime.now(tz=timezone.utc)
+            else:
+                self.queue.requeue(batch)
+
+
+class PathWatchManager:
+    """Owns the watchers of all monitored paths with a watch mode enabled."""
+
+    def __init__(self):
+        self._watchers: Dict[int, PathWatcher] = {}
+        self._lock = threading.Lock()
+
+    def watch(self, path: MonitoredPath) -> bool:
+        """
+        Start (or restart) watching a path according to its watch_mode.
+
+        Returns:
+            True if the path is now watched; False leaves it on scheduled scans only
+        """
+        self.unwatch(path.id)
+        if not path.enabled or path.watch_mode in (None, WatchMode.OFF):
+            return False
+
+        watcher = PathWatcher(
+            path.id,
+            path.source_path,
+            path.watch_mode,
+            file_workflow_service._excludes_for(path),
+            self._process_batch,
+            debounce_seconds=settings.watch_debounce_seconds,
+            max_delay_seconds=settings.watch_max_delay_seconds,
+            max_pending=settings.watch_max_pending_changes,
+        )
+        try:
+            watcher.start()
+        except OSError as e:
+            logger.warning(
+                f"Cannot watch path {path.id} ({path.name}): {e}; using scheduled scans only"
+            )
+            return False
+
+        with self._lock:
+            self._watchers[path.id] = watcher
+        logger.info(
+            f"Watching path {path.id} ({path.name}) with {watcher.backend.name}: "
+            f"{watcher.backend.watch_count} watches"
+        )
+        return True
+
+    def unwatch(self, path_id: int):
+        """Stop watching a path."""
+        with self._lock:
+            watcher = self._watchers.pop(path_id, None)
+        if watcher is not None:
+            watcher.stop()
+            logger.info(f"Stopped watching path {path_id}")
+
+    def stop_all(self):
+        """Stop every watcher."""
+        with self._lock:
+            path_ids = list(self._watchers)
+        for path_id in path_ids:
+            self.unwatch(path_id)
+
+    def get(self, path_id: int) -> Optional[PathWatcher]:
+        with self._lock:
+            return self._watchers.get(path_id)
+
+    def status(self, path_id: int) -> Optional[dict]:
+        """Watch statistics for a path, or None if it is not watched."""
+        watcher = self.get(path_id)
+        return watcher.status() if watcher is not None else None
+
+    def plan_scheduled_scan(self, path: MonitoredPath) -> Optional[List[str]]:
+        """
+        Decide what a scheduled scan of a path still has to do.
+
+        Returns:
+            None if a full scan must run (the path is not watched, or its reconciliation
+            scan is due); otherwise the unwatched subtrees to scan, possibly empty.
+        """
+        watcher = self.get(path.id)
+        if watcher is None or path.last_full_scan_at is None:
+            return None
+        last_full = path.last_full_scan_at
+        if last_full.tzinfo is None:
+            last_full = last_full.replace(tzinfo=timezone.utc)
+        interval = timedelta(hours=path.full_scan_interval_hours or 24)
+        if datetime.now(tz=timezone.utc) - last_full >= interval:
+            return None
+        return sorted(watcher.fallback_dirs())
+
+    def _process_batch(self, path_id: int, batch: ChangeBatch) -> bool:
+        db = WatchSessionLocal()
+        try:
+            path = db.query(MonitoredPath).filter(MonitoredPath.id == path_id).first()
+            if path is None or not path.enabled:
+                return True
+            if batch.overflow:
+                logger.info(f"Watch events lost for path {path_id}; running a full scan")
+                result = file_workflow_service.process_path(path, db)
+            else:
+                result = file_workflow_service.process_changes(
+                    path, db, batch.paths, batch.rescan_dirs
+                )
+            if result.get("scan_skipped"):
+                return False
+            for error in result.get("errors", []):
+                logger.warning(f"Path {path_id}: {error}")
+            return True
+        finally:
+            db.close()
+
+
+# Singleton instance
+path_watch_manager = PathWatchManager()
@@ -30,7 +30,11 @@ from app.models import (
     TransferDirection,
     TransferStatus,
 )
+from app.services import tree_hash
 from app.services.file_metadata import file_metadata_extractor
+from app.services.hash_algorithms import checksum_algorithm, is_tree_algorithm
+from app.services.metadata_enrichment import PRIORITY_TRANSFER, metadata_enrichment_queue
+from app.services.scan_records import stored_checksum
 from app.utils.remote_signature import get_signed_headers
 from app.utils.retry_strategy import retry_strategy
 
@@ -116,14 +120,16 @@ class RemoteTransferService:
             logger.error(msg)
             raise ValueError(msg)
 
-        file_size = source_path.stat().st_size
+        source_stat = source_path.stat()
+        file_size = source_stat.st_size
         logger.debug(f"File size: {file_size} bytes")
 
-        # Compute checksum if not already present
-        checksum = file_obj.checksum
+        # Don't hash in the request; move the file to the front of the enrichment queue and
+        # let run_transfer pick the checksum up (or compute it) when the job starts. A stored
+        # checksum is only used while the file's stat fingerprint still matches
+        checksum = stored_checksum(file_obj, source_stat)
         if not checksum:
-            logger.info(f"Computing checksum for {source_path}")
-            checksum = file_metadata_extractor.compute_sha256(source_path)
+            metadata_enrichment_queue.enqueue_ids(db, [file_obj.id], PRIORITY_TRANSFER)
         else:
             logger.debug(f"Using existing checksum: {checksum}")
 
@@ -148,6 +154,8 @@ class RemoteTransferService:
         db.add(job)
         db.commit()
         db.refresh(job)
+        if not checksum:
+            metadata_enrichment_queue.notify()
 
         logger.info(
             f"Created transfer job {job.id} ({direction.value}) for file "
@@ -280,6 +288,9 @@ class RemoteTransferService:
             "remote_path_id": str(job.remote_monitored_path_id),
             "storage_type": job.storage_type.value,
         }
+        if job.checksum and is_tree_algorithm(checksum_algorithm(job.checksum)):
+            # Ask for the digests of the segments received so far
+            params["checksum_algorithm"] = checksum_algorithm(job.checksum)
         # Build a request to sign it
         req = httpx.Request("GET", url, params=params)
         signed_headers = await get_signed_headers(db, req.method, str(req.url), req.content)
@@ -294,6 +305,26 @@ class RemoteTransferService:
             logger.debug(f"Failed to get remote status for job {job.id}, starting fresh")
             return {"size": 0, "status": "not_found"}
 
+    def _resume_offset(self, job: RemoteTransferJob, remote_status: dict) -> int:
+        """
+        Where to resume sending: after the segments the remote holds intact if it reported
+        segment digests and ours are stored, otherwise after everything it received.
+        """
+        remote_size = remote_status.get("size", 0)
+        remote_segments = remote_status.get("segments")
+        if remote_size <= 0 or remote_segments is None or not job.checksum:
+            return max(remote_size, 0)
+        local_segments = tree_hash.segment_store.load(job.checksum)
+        if local_segments is None:
+            return remote_size
+        offset = min(tree_hash.verified_prefix(local_segments, remote_segments), remote_size)
+        if offset < remote_size:
+            logger.warning(
+                f"Remote copy for job {job.id} differs from byte {offset} on; "
+                f"resending the {remote_size - offset} bytes after it"
+            )
+        return offset
+
     async def _send_chunks(
         self, job: RemoteTransferJob, conn: RemoteConnection, db: Session, client: httpx.AsyncClient
     ):
@@ -307,18 +338,19 @@ class RemoteTransferService:
         source_path = Path(job.source_path)
 
         remote_status = await self._get_remote_status(db, client, conn, job)
-        remote_size = remote_status.get("size", 0)
+        offset = self._resume_offset(job, remote_status)
 
         # Initialize chunk index
         chunk_idx = 0
 
         async with aiofiles.open(source_path, "rb") as f:
             # Resume from where we left off if remote has partial data
-            if remote_size > 0:
-                logger.info(f"Resuming transfer from byte {remote_size}")
-                await f.seek(remote_size)
-                job.current_size = remote_size
-                chunk_idx = remote_size // CHUNK_SIZE
+            if offset > 0:
+                logger.info(f"Resuming transfer from byte {offset}")
+                await f.seek(offset)
+                job.current_size = offset
+                # Receivers that ignore X-Chunk-Offset append to any chunk index above 0
+                chunk_idx = -(-offset // CHUNK_SIZE)
                 db.commit()
 
             while True:
@@ -343,6 +375,7 @@ class RemoteTransferService:
                 headers = {
                     "X-Job-ID": str(job.id),
                     "X-Chunk-Index": str(chunk_idx),
+                    "X-Chunk-Offset": str(offset),
                     "X-Is-Final": "true" if is_final else "false",
                     "X-Relative-Path": job.relative_path,
                     "X-Remote-Path-ID": str(job.remote_monitored_path_id),
@@ -389,6 +422,7 @@ class RemoteTransferService:
                     raise
 
                 chunk_idx += 1
+                offset += len(chunk)
                 self._update_job_progress(job, len(chunk), start_time_ts, db)
 
                 # Log progress at reasonable intervals (approx every 10%)
@@ -448,6 +482,17 @@ class RemoteTransferService:
                 db.commit()
                 return
 
+            if not job.checksum:
+                # Queued for enrichment at job creation; use its result if it is done
+                file_obj = db.get(FileInventory, job.file_inventory_id)
+                job.checksum = stored_checksum(file_obj, source_path.stat())
+                if not job.checksum:
+                    logger.info(f"Computing checksum for {source_path}")
+                    job.checksum = await asyncio.to_thread(
+                        file_metadata_extractor.compute_checksum, source_path
+                    )
+                db.commit()
+
             # Retry loop with exponential backoff
             for attempt in range(MAX_RETRIES):
                 try:
@@ -0,0 +1,279 @@
+"""Checkpoints that let an interrupted scan of a very large tree continue where it stopped."""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import MonitoredPath, ScanCheckpoint, StorageType
+from app.services.scan_progress import scan_progress_manager
+
+logger = logging.getLogger(__name__)
+
+
+class WalkCursor:
+    """
+    Thread-safe record of which directories a walk still has to deliver.
+
+    A directory is *pending* from the moment its parent lists it until it is listed itself,
+    and *partial* while files it produced have not all been consumed. Everything else has
+    been fully delivered. When the consumer has synced everything it received, ``state()``
+    is therefore a complete description of the remaining work: pending directories are
+    walked again (listing and descending), partial directories only have their files
+    listed again.
+
+    Walkers call ``listed()`` once a directory's listing is complete, ``add_batch()``
+    before handing over each batch of its files, and the consumer calls ``consumed()``
+    after processing the last entry of a batch.
+    """
+
+    def __init__(self, pending: Iterable[str] = (), partial: Iterable[str] = ()):
+        """
+        Initialize the cursor.
+
+        Args:
+            pending: Directories still to be walked (from a checkpoint)
+            partial: Directories whose files still have to be listed (from a checkpoint)
+        """
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set(pending)
+        self._relist: Set[str] = set(partial)
+        self._batches: Dict[str, int] = {}
+        self.resumed = bool(self._pending or self._relist)
+
+    @classmethod
+    def from_state(cls, state: dict) -> "WalkCursor":
+        """Rebuild a cursor from ``state()`` output."""
+        return cls(state.get("pending", []), state.get("partial", []))
+
+    def start_points(self, root: str) -> List[Tuple[str, bool]]:
+        """
+        Directories the walk starts from, as (dir_path, files_only) pairs.
+
+        A fresh cursor starts at root; a resumed one at its pending and partial directories
+        inside root. One cursor can be shared by walks of several roots.
+        """
+        with self._lock:
+            if not self.resumed:
+                self._pending.add(root)
+                return [(root, False)]
+            prefix = root.rstrip(os.sep) + os.sep
+
+            def inside(d: str) -> bool:
+                return d == root or d.startswith(prefix)
+
+            return [(d, False) for d in sorted(self._pending) if inside(d)] + [
+                (d, True) for d in sorted(self._relist) if inside(d)
+            ]
+
+    def add_batch(self, dir_path: str):
+        """Record a batch of files from dir_path that is about to be handed over."""
+        with self._lock:
+            self._batches[dir_path] = self._batches.get(dir_path, 0) + 1
+
+    def listed(self, dir_path: str, subdirs: Iterable[str] = ()):
+        """Record that dir_path was listed and its subdirectories still have to be walked."""
+        with self._lock:
+            self._pending.update(subdirs)
+            self._pending.discard(dir_path)
+            self._relist.discard(dir_path)
+
+    def consumed(self, dir_path: str):
+        """Record that the consumer processed a batch of files from dir_path."""
+        with self._lock:
+            remaining = self._batches.get(dir_path, 0) - 1
+            if remaining > 0:
+                self._batches[dir_path] = remaining
+            else:
+                self._batches.pop(dir_path, None)
+
+    def state(self) -> dict:
+        """JSON-serializable remaining work."""
+        with self._lock:
+            partial = self._relist | {
+                d for d, count in self._batches.items() if count > 0 and d not in self._pending
+            }
+            return {"pending": sorted(self._pending), "partial": sorted(partial)}
+
+
+class ScanCheckpointer:
+    """
+    Persists periodic checkpoints of a scan and restores them when a scan restarts.
+
+    ``begin()`` either resumes the path's checkpoint (same scan generation, not older than
+    ``scan_checkpoint_max_age_hours``) or starts a new scan generation. The scan then calls
+    ``maybe_save()`` right after each inventory chunk is synced, and ``finish()`` once it
+    completes. A scan that dies leaves its last checkpoint behind for the next one.
+    """
+
+    def __init__(
+        self,
+        path: MonitoredPath,
+        db: Session,
+        interval_seconds: Optional[float] = None,
+        max_age_hours: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the checkpointer.
+
+        Args:
+            path: Monitored path being scanned
+            db: Database session
+            interval_seconds: Minimum time between checkpoints (0 disables them)
+            max_age_hours: Age above which a checkpoint is not resumed
+            clock: Monotonic clock, replaceable in tests
+        """
+        self.path = path
+        self.db = db
+        self.interval_seconds = (
+            settings.scan_checkpoint_interval_seconds
+            if interval_seconds is None
+            else interval_seconds
+        )
+        self.max_age_hours = (
+            settings.scan_checkpoint_max_age_hours if max_age_hours is None else max_age_hours
+        )
+        self.clock = clock
+
+        self.resumed = False
+        self.resume_tier: Optional[StorageType] = None
+        self.full_scan: Optional[bool] = None
+        self.scan_started_at: Optional[datetime] = None
+        self.entries_synced = 0
+        self.resume_count = 0
+        self.checkpoints_saved = 0
+        self._cursor_state: dict = {}
+        self._last_save = clock()
+
+    def begin(self) -> bool:
+        """
+        Resume the path's checkpoint if it is still valid, otherwise start a new generation.
+
+        Returns:
+            True if the scan resumes from a checkpoint
+        """
+        path = self.path
+        now = datetime.now(tz=timezone.utc)
+        checkpoint = (
+            self.db.query(ScanCheckpoint).filter(ScanCheckpoint.path_id == path.id).first()
+        )
+
+        if checkpoint is not None:
+            checkpointed_at = checkpoint.checkpointed_at
+            if checkpointed_at.tzinfo is None:
+                checkpointed_at = checkpointed_at.replace(tzinfo=timezone.utc)
+            fresh = now - checkpointed_at < timedelta(hours=self.max_age_hours)
+            if fresh and checkpoint.scan_generation == (path.scan_generation or 0):
+                scan_started_at = checkpoint.scan_started_at
+                if scan_started_at.tzinfo is None:
+                    scan_started_at = scan_started_at.replace(tzinfo=timezone.utc)
+                checkpoint.resume_count += 1
+                self.db.commit()
+
+                self.resumed = True
+                self.resume_tier = checkpoint.tier
+                self.full_scan = bool(checkpoint.cursor.get("full_scan", True))
+                self.scan_started_at = scan_started_at
+                self.entries_synced = checkpoint.entries_synced
+                self.resume_count = checkpoint.resume_count
+                self._cursor_state = checkpoint.cursor
+                logger.info(
+                    f"Path {path.name}: resuming scan generation {checkpoint.scan_generation} "
+                    f"from {checkpoint.tier.value} checkpoint ({checkpoint.entries_synced} "
+                    f"entries synced, resume #{checkpoint.resume_count})"
+                )
+                scan_progress_manager.update_checkpoint(
+                    path.id,
+                    scan_generation=checkpoint.scan_generation,
+                    resume_count=checkpoint.resume_count,
+                    checkpointed_at=checkpointed_at,
+                )
+                return True
+
+            logger.info(
+                f"Path {path.name}: discarding {'stale' if not fresh else 'outdated'} "
+                f"scan checkpoint from {checkpointed_at.isoformat()}"
+            )
+            self.db.delete(checkpoint)
+
+        path.scan_generation = (path.scan_generation or 0) + 1
+        self.db.commit()
+        self.scan_started_at = now
+        scan_progress_manager.update_checkpoint(path.id, scan_generation=path.scan_generation)
+        return False
+
+    def cursor_for(self, tier: StorageType) -> Optional[WalkCursor]:
+        """
+        Cursor for walking a tier, or None if the checkpoint shows the tier is already done.
+        """
+        if self.resumed and self.resume_tier == StorageType.COLD and tier == StorageType.HOT:
+            return None
+        if self.resumed and self.resume_tier == tier:
+            return WalkCursor.from_state(self._cursor_state)
+        return WalkCursor()
+
+    def maybe_save(self, tier: StorageType, cursor: WalkCursor, entries_synced: int) -> bool:
+        """
+        Write a checkpoint if the checkpoint interval has elapsed.
+
+        Must only be called when every entry the walk has yielded so far is synced.
+
+        Args:
+            tier: Tier being walked
+            cursor: Cursor of that walk
+            entries_synced: Entries synced by this run since begin()
+
+        Returns:
+            True if a checkpoint was written
+        """
+        if self.interval_seconds <= 0:
+            return False
+        if self.clock() - self._last_save < self.interval_seconds:
+            return False
+        self.save(tier, cursor, entries_synced)
+        return True
+
+    def save(self, tier: StorageType, cursor: WalkCursor, entries_synced: int):
+        """Write a checkpoint now."""
+        now = datetime.now(tz=timezone.utc)
+        state = {"full_scan": bool(self.full_scan), **cursor.state()}
+        checkpoint = (
+            self.db.query(ScanCheckpoint).filter(ScanCheckpoint.path_id == self.path.id).first()
+        )
+        if checkpoint is None:
+            checkpoint = ScanCheckpoint(
+                path_id=self.path.id,
+                scan_generation=self.path.scan_generation or 0,
+                scan_started_at=self.scan_started_at,
+                resume_count=self.resume_count,
+            )
+            self.db.add(checkpoint)
+        checkpoint.tier = tier
+        checkpoint.cursor = state
+        checkpoint.entries_synced = self.entries_synced + entries_synced
+        checkpoint.checkpointed_at = now
+        self.db.commit()
+
+        self._last_save = self.clock()
+        self.checkpoints_saved += 1
+        scan_progress_manager.update_checkpoint(self.path.id, checkpointed_at=now)
+        logger.debug(
+            f"Path {self.path.name}: checkpoint ({tier.value}, {len(state['pending'])} pending "
+            f"and {len(state['partial'])} partial directories)"
+        )
+
+    def finish(self):
+        """Drop the checkpoint of a scan that completed."""
+        checkpoint = (
+            self.db.query(ScanCheckpoint).filter(ScanCheckpoint.path_id == self.path.id).first()
+        )
+        if checkpoint is not None:
+            self.db.delete(checkpoint)
+            self.db.commit()
+
@@ -44,6 +44,9 @@ class ScanProgress:
     files_skipped: int = 0
     current_operations: List[FileOperation] = field(default_factory=list)
     errors: List[str] = field(default_factory=list)
+    scan_generation: int = 0
+    resume_count: int = 0
+    last_checkpoint_at: Optional[str] = None
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -68,6 +71,9 @@ class ScanProgress:
             "files_skipped": self.files_skipped,
             "percent": self.percent_complete,
         }
+        data["checkpoint"] = checkpoint_summary(
+            self.scan_generation, self.resume_count, self.last_checkpoint_at
+        )
         return data
 
     @property
@@ -78,6 +84,22 @@ class ScanProgress:
         return min(100, int((self.files_processed / self.total_files) * 100))
 
 
+def checkpoint_summary(
+    scan_generation: int, resume_count: int, last_checkpoint_at: Optional[str]
+) -> dict:
+    """Checkpoint block of a progress response, with the checkpoint age in seconds."""
+    age = None
+    if last_checkpoint_at:
+        checkpointed = datetime.fromisoformat(last_checkpoint_at)
+        age = max(0.0, (datetime.now(tz=timezone.utc) - checkpointed).total_seconds())
+    return {
+        "scan_generation": scan_generation,
+        "resume_count": resume_count,
+        "last_checkpoint_at": last_checkpoint_at,
+        "checkpoint_age_seconds": age,
+    }
+
+
 class ScanProgressManager:
     """
     Thread-safe manager for tracking scan progress in memory.
@@ -184,6 +206,25 @@ class ScanProgressManager:
             if path_id in self._scans:
                 self._scans[path_id].total_files = total_files
 
+    def update_checkpoint(
+        self,
+        path_id: int,
+        scan_generation: Optional[int] = None,
+        resume_count: Optional[int] = None,
+        checkpointed_at: Optional[datetime] = None,
+    ):
+        """Record the scan generation, resume count and latest checkpoint of a running scan."""
+        with self._lock:
+            if path_id not in self._scans:
+                return
+            progress = self._scans[path_id]
+            if scan_generation is not None:
+                progress.scan_generation = scan_generation
+            if resume_count is not None:
+                progress.resume_count = resume_count
+            if checkpointed_at is not None:
+                progress.last_checkpoint_at = checkpointed_at.isoformat()
+
     def start_file_operation(self, path_id: int, file_name: str, operation: str, file_size: int):
         """
         Start tracking a file operation.
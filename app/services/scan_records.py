@@ -0,0 +1,139 @@
+"""Compact per-file records produced by directory scans."""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# (dev, inode, size, mtime_ns)
+Fingerprint = Tuple[int, int, int, int]
+
+
+def ns_to_datetime(ns: int) -> datetime:
+    """Convert a nanosecond timestamp to an aware UTC datetime (microsecond precision)."""
+    return _EPOCH + timedelta(microseconds=ns // 1000)
+
+
+def _sqlite_int(value: int) -> int:
+    """Fold an unsigned 64-bit stat field (dev, inode) into SQLite's signed INTEGER range."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def stat_fingerprint(stat_result: os.stat_result) -> Fingerprint:
+    """Stat fingerprint of a file, in the form stored on FileInventory."""
+    return (
+        _sqlite_int(stat_result.st_dev),
+        _sqlite_int(stat_result.st_ino),
+        stat_result.st_size,
+        stat_result.st_mtime_ns,
+    )
+
+
+def inventory_fingerprint(entry) -> Optional[Fingerprint]:
+    """Fingerprint stored on a FileInventory row, or None for rows synced before it existed."""
+    if entry.file_mtime_ns is None or entry.file_inode is None or entry.file_dev is None:
+        return None
+    return (entry.file_dev, entry.file_inode, entry.file_size, entry.file_mtime_ns)
+
+
+def link_group(dev: int, ino: int) -> str:
+    """Hard link group id of an inode, as stored on FileInventory.link_group."""
+    return f"{_sqlite_int(dev)}:{_sqlite_int(ino)}"
+
+
+def set_fingerprint(entry, stat_result: os.stat_result) -> None:
+    """Record the fingerprint of stat_result on a FileInventory row."""
+    entry.file_dev, entry.file_inode, entry.file_size, entry.file_mtime_ns = stat_fingerprint(
+        stat_result
+    )
+
+
+def stored_checksum(entry, stat_result: os.stat_result) -> Optional[str]:
+    """
+    Checksum of a FileInventory row, if it can stand in for hashing the file again.
+
+    The stored checksum is only trusted while the row's fingerprint matches the file's
+    current stat; rows without a fingerprint never qualify.
+    """
+    if entry is None or not entry.checksum:
+        return None
+    if inventory_fingerprint(entry) != stat_fingerprint(stat_result):
+        return None
+    return entry.checksum
+
+
+class ScanRecord:
+    """
+    Raw stat fields for one scanned file.
+
+    Scans create one record per file, so this keeps only integers in ``__slots__``.
+    Datetimes are built on demand through the ``mtime``/``atime``/``ctime`` properties,
+    which the inventory sync only touches for rows it actually writes.
+    """
+
+    __slots__ = ("path", "size", "mtime_ns", "atime_ns", "ctime_ns", "ino", "dev", "nlink")
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        mtime_ns: int,
+        atime_ns: int,
+        ctime_ns: int,
+        ino: int = 0,
+        dev: int = 0,
+        nlink: int = 1,
+    ):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.atime_ns = atime_ns
+        self.ctime_ns = ctime_ns
+        self.ino = ino
+        self.dev = dev
+        self.nlink = nlink
+
+    @classmethod
+    def from_stat(cls, path: str, stat_result: os.stat_result) -> "ScanRecord":
+        """Build a record from an os.stat_result (e.g. DirEntry.stat())."""
+        return cls(
+            path,
+            stat_result.st_size,
+            stat_result.st_mtime_ns,
+            stat_result.st_atime_ns,
+            stat_result.st_ctime_ns,
+            stat_result.st_ino,
+            stat_result.st_dev,
+            stat_result.st_nlink,
+        )
+
+    @property
+    def fingerprint(self) -> Fingerprint:
+        """(dev, inode, size, mtime_ns), as stored on FileInventory."""
+        return (_sqlite_int(self.dev), _sqlite_int(self.ino), self.size, self.mtime_ns)
+
+    def fingerprint_columns(self) -> Dict[str, int]:
+        """FileInventory column values for this record's fingerprint."""
+        dev, ino, size, mtime_ns = self.fingerprint
+        return {"file_dev": dev, "file_inode": ino, "file_size": size, "file_mtime_ns": mtime_ns}
+
+    @property
+    def link_group(self) -> Optional[str]:
+        """Hard link group of the file, or None when it has a single link."""
+        return link_group(self.dev, self.ino) if self.nlink > 1 else None
+
+    @property
+    def mtime(self) -> datetime:
+        return ns_to_datetime(self.mtime_ns)
+
+    @property
+    def atime(self) -> datetime:
+        return ns_to_datetime(self.atime_ns)
+
+    @property
+    def ctime(self) -> datetime:
+        return ns_to_datetime(self.ctime_ns)
+
+    def __repr__(self) -> str:
+        return f"ScanRecord({self.path!r}, size={self.size}, mtime_ns={self.mtime_ns})"
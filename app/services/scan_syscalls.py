@@ -0,0 +1,35 @@
+"""Per-scan tally of filesystem calls, used to verify scan syscall budgets."""
+
+import threading
+from collections import Counter
+from typing import Dict
+
+
+class SyscallCounter:
+    """
+    Thread-safe count of filesystem calls made by one scan.
+
+    Keys are call names such as ``scandir``, ``lstat``, ``stat``, ``readlink`` and
+    ``exists``. Only calls issued by the scan engine itself are counted.
+    """
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, count: int = 1):
+        """Record ``count`` calls of ``name``."""
+        with self._lock:
+            self._counts[name] += count
+
+    @property
+    def total(self) -> int:
+        with self._lock:
+            return sum(self._counts.values())
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return a snapshot of the counts, including a ``total`` key."""
+        with self._lock:
+            counts = dict(self._counts)
+        counts["total"] = sum(counts.values())
+        return counts
@@ -11,6 +11,8 @@ from sqlalchemy.orm import Session, sessionmaker
 from app.database import engine
 from app.models import MonitoredPath
 from app.services.file_workflow_service import file_workflow_service
+from app.services.io_budget import apply_background_priority
+from app.services.metadata_enrichment import metadata_enrichment_queue
 from app.services.notification_events import (
     DiskSpaceCautionData,
     DiskSpaceCriticalData,
@@ -19,6 +21,7 @@ from app.services.notification_events import (
     ScanErrorData,
 )
 from app.services.notification_service import notification_service
+from app.services.path_watcher import path_watch_manager
 from app.services.remote_transfer_service import remote_transfer_service
 from app.services.stats_cleanup import cleanup_old_stats_job_func
 from app.utils.remote_auth import remote_auth
@@ -47,7 +50,12 @@ class SchedulerService:
 
         self.scheduler = BackgroundScheduler(
             jobstores={"default": jobstore},
-            executors={"default": ThreadPoolExecutor(5)},
+            # Job threads run at background priority; manual scans on request threads do not
+            executors={
+                "default": ThreadPoolExecutor(
+                    5, pool_kwargs={"initializer": apply_background_priority}
+                )
+            },
             job_defaults={
                 "coalesce": True,  # Skip overlapping jobs
                 "max_instances": 1,  # Only one instance per job
@@ -71,6 +79,7 @@ class SchedulerService:
                 self._add_nonce_cleanup_job()
                 self._add_remote_code_rotation_job()
                 self._add_remote_transfer_job()
+                metadata_enrichment_queue.start()
             except Exception:
                 logger.exception("Error starting scheduler")
                 # Try to clean up
@@ -83,6 +92,8 @@ class SchedulerService:
 
     def stop(self):
         """Stop the scheduler gracefully."""
+        path_watch_manager.stop_all()
+        metadata_enrichment_queue.stop()
         if self.scheduler.running:
             try:
                 # Shutdown gracefully, waiting for running jobs to complete
@@ -144,8 +155,12 @@ class SchedulerService:
         except Exception:
             logger.exception(f"Error adding job for path {path.id}")
 
+        # Watched paths react to changes; the scheduled job becomes reconciliation
+        path_watch_manager.watch(path)
+
     def remove_path_job(self, path_id: int):
         """Remove scheduled job for a path."""
+        path_watch_manager.unwatch(path_id)
         job_id = f"scan_path_{path_id}"
         if self.scheduler.get_job(job_id):
             self.scheduler.remove_job(job_id)
@@ -153,7 +168,7 @@ class SchedulerService:
 
     def trigger_scan(self, path_id: int):
         """Manually trigger a scan for a path."""
-        scan_path_job_func(path_id)
+        scan_path_job_func(path_id, full_scan=True)
 
     def trigger_encryption_job(self, location_id: int):
         """Trigger background job to encrypt all files in a location."""
@@ -425,11 +440,14 @@ def disk_space_monitoring_job_func():
         db.close()
 
 
-def scan_path_job_func(path_id: int):
+def scan_path_job_func(path_id: int, full_scan: bool = False):
     """
     Module-level function to scan a path.
     This is used by APScheduler to avoid serialization issues.
     Uses separate database session to avoid interfering with API requests.
+
+    Watched paths skip scheduled scans until their reconciliation scan is due, unless
+    full_scan is set (manual scans).
     """
     db = SchedulerSessionLocal()
     path = db.query(MonitoredPath).filter(MonitoredPath.id == path_id).first()
@@ -438,6 +456,25 @@ def scan_path_job_func(path_id: int):
         db.close()
         return
 
+    # A watched path only needs its unwatched subtrees scanned until reconciliation is due
+    fallback_dirs = None if full_scan else path_watch_manager.plan_scheduled_scan(path)
+    if fallback_dirs is not None:
+        try:
+            if fallback_dirs:
+                logger.info(
+                    f"Scanning {len(fallback_dirs)} unwatched subtrees of path {path_id} ({path.name})"
+                )
+                result = file_workflow_service.process_changes(path, db, rescan_dirs=fallback_dirs)
+                for error_msg in result["errors"]:
+                    logger.warning(f"Path {path_id}: {error_msg}")
+            else:
+                logger.debug(f"Path {path_id} is watched, skipping scheduled scan")
+        except Exception:
+            logger.exception(f"Error scanning unwatched subtrees of path {path_id}")
+        finally:
+            db.close()
+        return
+
     start_time = time.time()
     try:
         logger.info(f"Starting scan for path {path_id} ({path.name})")
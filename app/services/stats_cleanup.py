@@ -17,6 +17,8 @@ from app.models import (
     RemoteTransferJob,
     TransferStatus,
 )
+from app.services.checksum_cache import checksum_cache
+from app.services.tree_hash import segment_store
 
 logger = logging.getLogger(__name__)
 
@@ -277,6 +279,12 @@ def cleanup_old_stats_job_func():
         # Clean up old database records
         result = service.cleanup_old_records(db)
         logger.info(f"Stats cleanup completed: {result}")
+
+        # Prune checksum cache entries that have not been used for a while
+        pruned = checksum_cache.prune(db)
+        logger.info(f"Checksum cache pruning completed: {pruned} entries removed")
+        pruned = segment_store.prune(db)
+        logger.info(f"Segment digest pruning completed: {pruned} entries removed")
     except Exception:
         logger.exception("Error in scheduled stats cleanup")
     finally:
@@ -0,0 +1,472 @@
+"""Background re-tagging of the file inventory when tag rules change."""
+
+import logging
+import os
+import re
+import threading
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, false, func, literal, not_, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models import FileInventory, FileTag, Operator, TagRule, TagRuleCriterionType
+from app.services.tag_rule_service import (
+    INVENTORY_CHUNK_SIZE,
+    CompiledTagRules,
+    TagRuleService,
+    inventory_chunks,
+)
+
+logger = logging.getLogger(__name__)
+
+AUTO_RULE = "auto-rule"
+
+# fnmatch only agrees with SQLite GLOB where paths are compared as-is (not on Windows)
+_PATHS_COMPARED_AS_IS = os.path.normcase("A/b") == "A/b"
+
+# MIME wildcard patterns whose regex and LIKE readings agree
+_SIMPLE_MIME_PATTERN = re.compile(r"^[a-z0-9/*_-]+$")
+
+
+@dataclass(frozen=True)
+class RuleSpec:
+    """The matching-relevant fields of a tag rule, captured before the rule is changed."""
+
+    id: int
+    tag_id: int
+    criterion_type: TagRuleCriterionType
+    operator: Operator
+    value: str
+    enabled: bool
+
+    @classmethod
+    def of(cls, rule: TagRule) -> "RuleSpec":
+        return cls(
+            id=rule.id,
+            tag_id=rule.tag_id,
+            criterion_type=rule.criterion_type,
+            operator=rule.operator,
+            value=rule.value,
+            enabled=bool(rule.enabled),
+        )
+
+
+def rule_predicate(rule) -> Tuple[Optional[object], bool]:
+    """
+    SQL predicate on file_inventory for a tag rule.
+
+    Returns:
+        Tuple of (predicate, exact). Exact predicates select precisely the rows
+        TagRuleService.evaluate_rule matches. Otherwise the predicate (if any) selects a
+        superset and rows have to be checked in Python.
+    """
+    inventory = FileInventory.__table__
+    criterion_type = rule.criterion_type
+    operator = rule.operator
+    value = rule.value
+
+    if criterion_type == TagRuleCriterionType.EXTENSION:
+        rule_ext = value.lower()
+        if not rule_ext.startswith("."):
+            rule_ext = f".{rule_ext}"
+        # SQLite lower() only folds ASCII
+        if not rule_ext.isascii():
+            return None, False
+        column = func.lower(inventory.c.file_extension)
+        present = inventory.c.file_extension.is_not(None)
+        if operator in (Operator.EQ, Operator.MATCHES):
+            return present & (column == rule_ext), True
+        if operator == Operator.CONTAINS:
+            return present & (func.instr(column, rule_ext) > 0), True
+        return false(), True
+
+    if criterion_type == TagRuleCriterionType.MIME_TYPE:
+        rule_mime = value.lower()
+        if not rule_mime.isascii():
+            return None, False
+        column = func.lower(inventory.c.mime_type)
+        present = inventory.c.mime_type.is_not(None)
+        if operator == Operator.EQ or (operator == Operator.MATCHES and "*" not in rule_mime):
+            return present & (column == rule_mime), True
+        if operator == Operator.CONTAINS:
+            return present & (func.instr(column, rule_mime) > 0), True
+        if operator == Operator.MATCHES:
+            if not _SIMPLE_MIME_PATTERN.match(rule_mime):
+                return None, False
+            pattern = rule_mime.replace("_", "\\_").replace("*", "%")
+            return present & column.like(pattern, escape="\\"), True
+        return false(), True
+
+    if criterion_type == TagRuleCriterionType.SIZE:
+        try:
+            size_value = TagRuleService._parse_size(value)
+        except ValueError:
+            return false(), True
+        column = inventory.c.file_size
+        comparisons = {
+            Operator.GT: column > size_value,
+            Operator.LT: column < size_value,
+            Operator.EQ: column == size_value,
+            Operator.GTE: column >= size_value,
+            Operator.LTE: column <= size_value,
+        }
+        if operator not in comparisons:
+            return false(), True
+        return column.is_not(None) & comparisons[operator], True
+
+    if criterion_type == TagRuleCriterionType.PATH_PATTERN:
+        column = inventory.c.file_path
+        if operator == Operator.CONTAINS:
+            return func.instr(column, value) > 0, True
+        if operator == Operator.MATCHES and _PATHS_COMPARED_AS_IS and "[" not in value:
+            # GLOB agrees with fnmatch for "*" and "?", and uses the file_path index for
+            # literal prefixes such as "/data/projects/*"
+            return column.op("GLOB")(value), True
+        return None, False
+
+    if criterion_type == TagRuleCriterionType.NAME_PATTERN:
+        column = inventory.c.file_path
+        if operator == Operator.CONTAINS:
+            return func.instr(column, value) > 0, False
+        if operator == Operator.MATCHES and _PATHS_COMPARED_AS_IS and "[" not in value:
+            glob = column.op("GLOB")
+            return or_(glob(f"*/{value}"), glob(value)), False
+        return None, False
+
+    return false(), True
+
+
+def rule_matches_same_files(before, after) -> bool:
+    """Whether two versions of a rule tag exactly the same files with the same tag."""
+    fields = ("enabled", "tag_id", "criterion_type", "operator", "value")
+    return all(getattr(before, field) == getattr(after, field) for field in fields)
+
+
+@dataclass
+class RetagJob:
+    """Represents a re-tagging job for one rule change, or for all rules."""
+
+    job_id: str
+    rule_id: Optional[int]
+    action: str  # "create", "update", "delete", "apply_all"
+    status: str  # "pending", "running", "completed", "failed"
+    created_at: str
+    phase: Optional[str] = None  # "removing", "adding"
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    rows_total: int = 0
+    rows_processed: int = 0
+    tags_added: int = 0
+    tags_removed: int = 0
+    error_message: Optional[str] = None
+
+    @property
+    def percent_complete(self) -> int:
+        """Calculate percentage complete."""
+        if self.status == "completed":
+            return 100
+        if self.rows_total == 0:
+            return 0
+        return min(100, int((self.rows_processed / self.rows_total) * 100))
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        data = asdict(self)
+        data["percent_complete"] = self.percent_complete
+        return data
+
+
+class TagRuleRetagger:
+    """
+    Brings file_tags up to date after a tag rule changed, touching only that rule's delta.
+
+    Only tags added by rules ("auto-rule") are ever removed. A tag is removed when the old
+    version of the rule matched the file and no enabled rule for the same tag still does.
+    Tags are added for files the new version matches.
+
+    Rules that rule_predicate translates exactly run as a single ``DELETE`` or
+    ``INSERT OR IGNORE ... SELECT``. Regex and bracket-glob rules (and name rules, which
+    SQL can only narrow down) read the candidate rows in id-ordered chunks and are checked
+    in Python; each chunk commits so scans are not held up behind a long job.
+    """
+
+    CHUNK_SIZE = INVENTORY_CHUNK_SIZE
+
+    def __init__(self, db: Session, progress: Optional[Callable[..., None]] = None):
+        """
+        Args:
+            db: Database session; the retagger commits on it
+            progress: Called with RetagJob field updates as keyword arguments
+        """
+        self.db = db
+        self.progress = progress or (lambda **fields: None)
+
+    def rule_changed(
+        self, before: Optional[RuleSpec], after: Optional[RuleSpec]
+    ) -> Dict[str, int]:
+        """
+        Apply the change from one version of a rule to another.
+
+        Args:
+            before: The rule before the change (None for a new rule)
+            after: The rule after the change (None for a deleted rule)
+
+        Returns:
+            Dictionary with statistics (tags_added, tags_removed)
+        """
+        tags_removed = 0
+        tags_added = 0
+        if before is not None and after is not None and rule_matches_same_files(before, after):
+            return {"tags_added": 0, "tags_removed": 0}
+        if before is not None and before.enabled:
+            self.progress(phase="removing")
+            tags_removed = self.remove_rule_tags(before)
+            self.progress(tags_removed=tags_removed)
+        if after is not None and after.enabled:
+            self.progress(phase="adding", rows_processed=0, rows_total=0)
+            tags_added = self.add_rule_tags(after)
+            self.progress(tags_added=tags_added)
+        return {"tags_added": tags_added, "tags_removed": tags_removed}
+
+    def add_rule_tags(self, rule) -> int:
+        """Tag every file the rule matches; returns the number of tags added."""
+        inventory = FileInventory.__table__
+        predicate, exact = rule_predicate(rule)
+        if exact:
+            result = self.db.execute(
+                sqlite_insert(FileTag.__table__)
+                .prefix_with("OR IGNORE")
+                .from_select(
+                    ["file_id", "tag_id", "tagged_by"],
+                    select(inventory.c.id, literal(rule.tag_id), literal(AUTO_RULE)).where(
+                        predicate
+                    ),
+                )
+            )
+            self.db.commit()
+            return max(result.rowcount, 0)
+
+        query = select().select_from(inventory)
+        if predicate is not None:
+            query = query.where(predicate)
+        compiled = CompiledTagRules([rule])
+        tags_added = 0
+        for rows in inventory_chunks(self.db, query, self.progress, self.CHUNK_SIZE):
+            tags_added += compiled.apply(self.db, rows)
+            self.db.commit()
+        return tags_added
+
+    def remove_rule_tags(self, rule) -> int:
+        """Remove the rule's automatic tags that no enabled rule justifies any more."""
+        inventory = FileInventory.__table__
+        file_tags = FileTag.__table__
+        keepers = [
+            RuleSpec.of(keeper)
+            for keeper in self.db.query(TagRule).filter(
+                TagRule.enabled, TagRule.tag_id == rule.tag_id
+            )
+        ]
+        keep_sql = []
+        keep_python = []
+        for keeper in keepers:
+            keeper_predicate, keeper_exact = rule_predicate(keeper)
+            if keeper_exact:
+                keep_sql.append(keeper_predicate)
+            else:
+                keep_python.append(keeper)
+
+        predicate, exact = rule_predicate(rule)
+        conditions = [] if predicate is None else [predicate]
+        if keep_sql:
+            conditions.append(not_(or_(*keep_sql)))
+        tagged = (file_tags.c.tag_id == rule.tag_id) & (file_tags.c.tagged_by == AUTO_RULE)
+
+        if exact and not keep_python:
+            result = self.db.execute(
+                delete(file_tags).where(
+                    tagged,
+                    file_tags.c.file_id.in_(select(inventory.c.id).where(*conditions)),
+                )
+            )
+            self.db.commit()
+            return max(result.rowcount, 0)
+
+        matches = CompiledTagRules([rule])
+        kept = CompiledTagRules(keep_python)
+        query = (
+            select()
+            .select_from(inventory.join(file_tags, file_tags.c.file_id == inventory.c.id))
+            .where(tagged, *conditions)
+        )
+        tags_removed = 0
+        for rows in inventory_chunks(self.db, query, self.progress, self.CHUNK_SIZE):
+            if exact:
+                matched = {row.id for row in rows}
+            else:
+                matched = {file_id for file_id, _ in matches.tags_for(rows)}
+            matched -= {file_id for file_id, _ in kept.tags_for(rows)}
+            if matched:
+                result = self.db.execute(
+                    delete(file_tags).where(tagged, file_tags.c.file_id.in_(sorted(matched)))
+                )
+                tags_removed += max(result.rowcount, 0)
+                self.db.commit()
+        return tags_removed
+
+
+class TagRuleJobManager:
+    """
+    Thread-safe manager for background re-tagging jobs.
+
+    Jobs run one at a time on a worker thread that is started with the first job.
+    Use the module-level `tag_rule_jobs` instance.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        """
+        Args:
+            session_factory: Creates the worker's sessions (default: app.database.SessionLocal)
+        """
+        self._lock = threading.Lock()
+        self._session_factory = session_factory
+        self._jobs: Dict[str, RetagJob] = {}
+        self._changes: Dict[str, Tuple[Optional[RuleSpec], Optional[RuleSpec]]] = {}
+        self._queue: List[str] = []
+        self._wakeup = threading.Event()
+        self._worker_thread: Optional[threading.Thread] = None
+        self._max_finished_jobs = 50
+
+    def submit_rule_change(
+        self, action: str, before: Optional[RuleSpec], after: Optional[RuleSpec]
+    ) -> Optional[str]:
+        """
+        Queue re-tagging for a rule that was created, updated or deleted.
+
+        Returns:
+            job_id, or None when the change cannot alter any file's tags
+        """
+        if before is not None and after is not None and rule_matches_same_files(before, after):
+            return None
+        if not (before is not None and before.enabled) and not (
+            after is not None and after.enabled
+        ):
+            return None
+        rule_id = (after or before).id
+        return self._submit(action, rule_id, (before, after))
+
+    def submit_apply_all(self) -> str:
+        """Queue application of all enabled rules to the whole inventory."""
+        return self._submit("apply_all", None, None)
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Get job status by job ID."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def get_recent_jobs(self, limit: int = 20) -> List[dict]:
+        """Get recent jobs, newest first."""
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)[:limit]
+            return [job.to_dict() for job in jobs]
+
+    def _submit(self, action: str, rule_id: Optional[int], change) -> str:
+        with self._lock:
+            job_id = str(uuid.uuid4())
+            self._jobs[job_id] = RetagJob(
+                job_id=job_id,
+                rule_id=rule_id,
+                action=action,
+                status="pending",
+                created_at=datetime.now(tz=timezone.utc).isoformat(),
+            )
+            self._changes[job_id] = change
+            self._queue.append(job_id)
+            self._forget_finished_jobs()
+            self._ensure_worker()
+        self._wakeup.set()
+        logger.info(f"Queued tag rule job {job_id} ({action}, rule {rule_id})")
+        return job_id
+
+    def _ensure_worker(self):
+        """Start the worker thread if it is not running (called with the lock held)."""
+        if self._worker_thread is None or not self._worker_thread.is_alive():
+            self._worker_thread = threading.Thread(
+                target=self._worker, daemon=True, name="tag-rule-jobs"
+            )
+            self._worker_thread.start()
+            logger.info("Tag rule job worker thread started")
+
+    def _forget_finished_jobs(self):
+        finished = sorted(
+            (job for job in self._jobs.values() if job.status in ("completed", "failed")),
+            key=lambda j: j.created_at,
+        )
+        for job in finished[: max(0, len(finished) - self._max_finished_jobs)]:
+            self._jobs.pop(job.job_id, None)
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                job_id = self._queue.pop(0) if self._queue else None
+                if job_id is None:
+                    self._wakeup.clear()
+            if job_id is None:
+                self._wakeup.wait(timeout=60)
+                continue
+            session_factory = self._session_factory
+            if session_factory is None:
+                from app.database import SessionLocal
+
+                session_factory = SessionLocal
+            db = session_factory()
+            try:
+                self._process(job_id, db)
+            finally:
+                db.close()
+
+    def _process(self, job_id: str, db: Session):
+        """Run one queued job to completion on the given session."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            change = self._changes.pop(job_id, None)
+            if job is None:
+                return
+            job.status = "running"
+            job.started_at = datetime.now(tz=timezone.utc).isoformat()
+
+        def progress(**fields):
+            with self._lock:
+                for field, value in fields.items():
+                    setattr(job, field, value)
+
+        try:
+            if change is None:
+                progress(phase="adding")
+                stats = TagRuleService(db).apply_all_rules(progress=progress)
+                progress(tags_added=stats["tags_added"])
+            else:
+                TagRuleRetagger(db, progress=progress).rule_changed(*change)
+            with self._lock:
+                job.status = "completed"
+                job.phase = None
+                job.completed_at = datetime.now(tz=timezone.utc).isoformat()
+            logger.info(
+                f"Tag rule job {job_id} completed: {job.tags_added} tags added, "
+                f"{job.tags_removed} removed"
+            )
+        except Exception as e:
+            logger.exception(f"Tag rule job {job_id} failed")
+            db.rollback()
+            with self._lock:
+                job.status = "failed"
+                job.error_message = str(e)
+                job.completed_at = datetime.now(tz=timezone.utc).isoformat()
+
+
+# Global singleton instance
+tag_rule_jobs = TagRuleJobManager()
@@ -2,16 +2,36 @@
 
 import fnmatch
 import logging
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from app.models import FileInventory, FileTag, Operator, TagRule, TagRuleCriterionType
 
 logger = logging.getLogger(__name__)
 
+# Test for one rule against an inventory row (ORM object or Core row)
+RuleTest = Callable[[object], bool]
+
+# Inventory rows read per query when rules are applied to the whole inventory
+INVENTORY_CHUNK_SIZE = 5000
+
+
+@lru_cache(maxsize=256)
+def _compile_regex(pattern: str) -> "re.Pattern[str]":
+    """Compiled regex, cached so per-file evaluation does not recompile rule patterns."""
+    return re.compile(pattern)
+
+
+def _never(file) -> bool:
+    return False
+
 
 class TagRuleService:
     """Service for evaluating and applying tag rules."""
@@ -76,7 +96,7 @@ class TagRuleService:
         if rule.operator == Operator.REGEX:
             # Regex pattern matching
             try:
-                pattern = re.compile(rule.value)
+                pattern = _compile_regex(rule.value)
                 return bool(pattern.search(file.file_path))
             except re.error:
                 logger.exception(f"Invalid regex pattern in rule {rule.id}")
@@ -104,7 +124,7 @@ class TagRuleService:
             if "*" in rule_mime:
                 pattern = rule_mime.replace("*", ".*")
                 try:
-                    return bool(re.match(f"^{pattern}$", file_mime))
+                    return bool(_compile_regex(f"^{pattern}$").match(file_mime))
                 except re.error:
                     return False
             return file_mime == rule_mime
@@ -147,7 +167,7 @@ class TagRuleService:
         if rule.operator == Operator.REGEX:
             # Regex pattern matching
             try:
-                pattern = re.compile(rule.value)
+                pattern = _compile_regex(rule.value)
                 return bool(pattern.search(filename))
             except re.error:
                 logger.exception(f"Invalid regex pattern in rule {rule.id}")
@@ -158,7 +178,8 @@ class TagRuleService:
         else:
             return False
 
-    def _parse_size(self, size_str: str) -> int:
+    @staticmethod
+    def _parse_size(size_str: str) -> int:
         """
         Parse size string to bytes.
         Supports: 100, 100B, 10KB, 5MB, 2GB
@@ -239,48 +260,244 @@ class TagRuleService:
 
         return tags_added
 
-    def apply_all_rules(self) -> Dict[str, int]:
+    def apply_all_rules(self, progress: Optional[Callable[..., None]] = None) -> Dict[str, int]:
         """
         Apply all enabled tag rules to all files in inventory.
 
+        Rows are read in id-ordered chunks and tagged in bulk, committing after each chunk.
+
+        Args:
+            progress: Optional callback receiving progress fields as keyword arguments
+
         Returns:
             Dictionary with statistics (files_processed, tags_added)
         """
         logger.info("Applying all tag rules to file inventory...")
 
-        # Get all enabled rules
-        rules = (
-            self.db.query(TagRule)
-            .filter(TagRule.enabled)
-            .order_by(TagRule.priority.desc(), TagRule.created_at.asc())
-            .all()
-        )
-
+        rules = CompiledTagRules.load(self.db)
         if not rules:
             logger.info("No enabled tag rules found")
             return {"files_processed": 0, "tags_added": 0}
 
-        # Get all files
-        files = self.db.query(FileInventory).all()
-
         files_processed = 0
         tags_added = 0
-
-        for file in files:
-            for rule in rules:
-                if self.apply_rule_to_file(rule, file):
-                    tags_added += 1
-            files_processed += 1
-
-            # Commit periodically to avoid long transactions
-            if files_processed % 100 == 0:
-                self.db.commit()
-                logger.info(f"Processed {files_processed} files, added {tags_added} tags")
-
-        # Final commit
-        self.db.commit()
+        for rows in inventory_chunks(self.db, progress=progress):
+            tags_added += rules.apply(self.db, rows)
+            self.db.commit()
+            files_processed += len(rows)
+            logger.info(f"Processed {files_processed} files, added {tags_added} tags")
 
         logger.info(
             f"Tag rule application complete: {files_processed} files processed, {tags_added} tags added"
         )
         return {"files_processed": files_processed, "tags_added": tags_added}
+
+
+def inventory_chunks(
+    db: Session,
+    query=None,
+    progress: Optional[Callable[..., None]] = None,
+    chunk_size: int = INVENTORY_CHUNK_SIZE,
+) -> Iterator[list]:
+    """
+    Yield inventory rows in id order, chunk_size at a time, with the columns tag rules read.
+
+    Each chunk is its own query keyed on the last id seen, so callers can write and commit
+    between chunks. Reports rows_total and rows_processed to progress.
+
+    Args:
+        query: Select whose FROM includes file_inventory and whose WHERE narrows the rows
+            (default: the whole inventory)
+    """
+    inventory = FileInventory.__table__
+    if query is None:
+        query = select().select_from(inventory)
+    if progress is not None:
+        total = db.execute(query.with_only_columns(func.count())).scalar_one()
+        progress(rows_total=total, rows_processed=0)
+
+    columns = query.with_only_columns(
+        inventory.c.id,
+        inventory.c.file_path,
+        inventory.c.file_extension,
+        inventory.c.mime_type,
+        inventory.c.file_size,
+    ).order_by(inventory.c.id)
+    last_id = 0
+    processed = 0
+    while True:
+        rows = db.execute(columns.where(inventory.c.id > last_id).limit(chunk_size)).all()
+        if not rows:
+            break
+        yield rows
+        last_id = rows[-1].id
+        processed += len(rows)
+        if progress is not None:
+            progress(rows_processed=processed)
+
+
+class CompiledTagRules:
+    """
+    Enabled tag rules compiled once for evaluating whole batches of inventory rows.
+
+    Values are parsed and patterns compiled when the rules are loaded, so a batch costs one
+    pass over its rows in memory and one ``INSERT OR IGNORE`` into ``file_tags``; the
+    unique (file_id, tag_id) index makes tags that already exist a no-op. Results match
+    ``TagRuleService.evaluate_rule`` for every rule.
+    """
+
+    def __init__(self, rules: Sequence[TagRule]):
+        """Compile rules; disabled ones are ignored."""
+        self.rules: List[Tuple[int, int, RuleTest]] = [
+            (rule.id, rule.tag_id, self._compile(rule)) for rule in rules if rule.enabled
+        ]
+
+    @classmethod
+    def load(cls, db: Session) -> "CompiledTagRules":
+        """Compile the enabled rules, highest priority first."""
+        return cls(
+            db.query(TagRule)
+            .filter(TagRule.enabled)
+            .order_by(TagRule.priority.desc(), TagRule.created_at.asc())
+            .all()
+        )
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def tags_for(self, files: Iterable) -> List[Tuple[int, int]]:
+        """
+        (file_id, tag_id) pairs for every rule matching each file.
+
+        Files need ``id``, ``file_path``, ``file_extension``, ``mime_type`` and ``file_size``.
+        """
+        pairs = []
+        for file in files:
+            tag_ids = set()
+            for rule_id, tag_id, test in self.rules:
+                if tag_id in tag_ids:
+                    continue
+                try:
+                    matched = test(file)
+                except Exception:
+                    logger.exception(f"Error evaluating rule {rule_id}")
+                    matched = False
+                if matched:
+                    tag_ids.add(tag_id)
+                    pairs.append((file.id, tag_id))
+        return pairs
+
+    def apply(self, db: Session, files: Iterable) -> int:
+        """
+        Tag a batch of files, on the caller's session; the caller commits.
+
+        Returns:
+            Number of tags added
+        """
+        if not self.rules:
+            return 0
+        pairs = self.tags_for(files)
+        if not pairs:
+            return 0
+        result = db.execute(
+            sqlite_insert(FileTag.__table__).prefix_with("OR IGNORE"),
+            [
+                {"file_id": file_id, "tag_id": tag_id, "tagged_by": "auto-rule"}
+                for file_id, tag_id in pairs
+            ],
+        )
+        return max(result.rowcount, 0)
+
+    @staticmethod
+    def _compile(rule: TagRule) -> RuleTest:
+        """Resolve one rule into a test with the semantics of TagRuleService.evaluate_rule."""
+        criterion_type = rule.criterion_type
+        operator = rule.operator
+        value = rule.value
+        try:
+            if criterion_type == TagRuleCriterionType.EXTENSION:
+                return CompiledTagRules._extension_test(operator, value)
+            if criterion_type == TagRuleCriterionType.PATH_PATTERN:
+                return CompiledTagRules._pattern_test(rule, lambda file: file.file_path)
+            if criterion_type == TagRuleCriterionType.MIME_TYPE:
+                return CompiledTagRules._mime_test(operator, value)
+            if criterion_type == TagRuleCriterionType.SIZE:
+                return CompiledTagRules._size_test(rule)
+            if criterion_type == TagRuleCriterionType.NAME_PATTERN:
+                return CompiledTagRules._pattern_test(
+                    rule, lambda file: os.path.basename(file.file_path)
+                )
+        except Exception:
+            logger.exception(f"Error compiling rule {rule.id}")
+            return _never
+        logger.warning(f"Unknown criterion type: {criterion_type}")
+        return _never
+
+    @staticmethod
+    def _extension_test(operator: Operator, value: str) -> RuleTest:
+        rule_ext = value.lower()
+        if not rule_ext.startswith("."):
+            rule_ext = f".{rule_ext}"
+        if operator in (Operator.EQ, Operator.MATCHES):
+            return lambda file: bool(file.file_extension) and (
+                file.file_extension.lower() == rule_ext
+            )
+        if operator == Operator.CONTAINS:
+            return lambda file: bool(file.file_extension) and (
+                rule_ext in file.file_extension.lower()
+            )
+        return _never
+
+    @staticmethod
+    def _pattern_test(rule: TagRule, subject: Callable[[object], str]) -> RuleTest:
+        value = rule.value
+        if rule.operator == Operator.MATCHES:
+            # fnmatch.fnmatch normalizes case per platform before matching
+            pattern = re.compile(fnmatch.translate(os.path.normcase(value)))
+            return lambda file: bool(file.file_path) and (
+                pattern.match(os.path.normcase(subject(file))) is not None
+            )
+        if rule.operator == Operator.REGEX:
+            try:
+                pattern = re.compile(value)
+            except re.error:
+                logger.exception(f"Invalid regex pattern in rule {rule.id}")
+                return _never
+            return lambda file: bool(file.file_path) and pattern.search(subject(file)) is not None
+        if rule.operator == Operator.CONTAINS:
+            return lambda file: bool(file.file_path) and value in subject(file)
+        return _never
+
+    @staticmethod
+    def _mime_test(operator: Operator, value: str) -> RuleTest:
+        rule_mime = value.lower()
+        if operator == Operator.EQ or (operator == Operator.MATCHES and "*" not in rule_mime):
+            return lambda file: bool(file.mime_type) and file.mime_type.lower() == rule_mime
+        if operator == Operator.CONTAINS:
+            return lambda file: bool(file.mime_type) and rule_mime in file.mime_type.lower()
+        if operator == Operator.MATCHES:
+            try:
+                pattern = re.compile(f"^{rule_mime.replace('*', '.*')}$")
+            except re.error:
+                return _never
+            return lambda file: bool(file.mime_type) and bool(pattern.match(file.mime_type.lower()))
+        return _never
+
+    @staticmethod
+    def _size_test(rule: TagRule) -> RuleTest:
+        try:
+            size_value = TagRuleService._parse_size(rule.value)
+        except ValueError:
+            logger.exception(f"Invalid size value in rule {rule.id}")
+            return _never
+        comparisons = {
+            Operator.GT: lambda size: size > size_value,
+            Operator.LT: lambda size: size < size_value,
+            Operator.EQ: lambda size: size == size_value,
+            Operator.GTE: lambda size: size >= size_value,
+            Operator.LTE: lambda size: size <= size_value,
+        }
+        compare = comparisons.get(rule.operator)
+        if compare is None:
+            return _never
+        return lambda file: file.file_size is not None and compare(file.file_size)
@@ -0,0 +1,260 @@
+"""Tree checksums: files hashed as fixed-size segments in parallel, combined into a root.
+
+A tree checksum of algorithm ``<inner>-tree`` hashes each SEGMENT_SIZE segment of a file
+with the inner algorithm, on several threads reading with os.pread, and hashes the
+segment digests into the root that is stored as the checksum. The segment digests are
+kept too (see SegmentStore): a later mismatch then names the corrupt segments, and a
+resumed transfer checks the segments already received instead of trusting them.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import engine
+from app.models import ChecksumSegments, FileInventory
+from app.services.hash_algorithms import (
+    format_checksum,
+    inner_algorithm,
+    is_tree_algorithm,
+    new_hash,
+    tree_algorithm,
+)
+
+logger = logging.getLogger(__name__)
+
+# Part of the algorithm: every tree checksum depends on it
+SEGMENT_SIZE = 64 * 1024 * 1024
+# Bytes per pread
+READ_SIZE = 1024 * 1024
+
+SegmentSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def segment_count(size: int) -> int:
+    """Segments of a file of this size; an empty file has one, empty, segment."""
+    return max(1, -(-size // SEGMENT_SIZE))
+
+
+def combine(inner: str, size: int, digests: Sequence[str]) -> str:
+    """Root hex digest of a file of ``size`` bytes from its segment digests."""
+    root = new_hash(inner)
+    root.update(f"tree:{SEGMENT_SIZE}:{size}:".encode())
+    for digest in digests:
+        root.update(bytes.fromhex(digest))
+    return root.hexdigest()
+
+
+class TreeHash:
+    """
+    Tree hash fed sequentially, for data that streams through anyway (copies).
+
+    Gives the same checksum as hash_file; ``new_hash("<inner>-tree")`` returns one.
+    """
+
+    def __init__(self, inner: str):
+        self.inner = inner
+        self.name = tree_algorithm(inner)
+        self._digests: List[str] = []
+        self._segment = new_hash(inner)
+        self._filled = 0
+        self._size = 0
+
+    def update(self, data) -> None:
+        view = memoryview(data).cast("B")
+        while view:
+            take = min(len(view), SEGMENT_SIZE - self._filled)
+            self._segment.update(view[:take])
+            self._filled += take
+            self._size += take
+            view = view[take:]
+            if self._filled == SEGMENT_SIZE:
+                self._digests.append(self._segment.hexdigest())
+                self._segment = new_hash(self.inner)
+                self._filled = 0
+
+    @property
+    def segment_digests(self) -> List[str]:
+        if self._filled or not self._digests:
+            return [*self._digests, self._segment.hexdigest()]
+        return list(self._digests)
+
+    def hexdigest(self) -> str:
+        return combine(self.inner, self._size, self.segment_digests)
+
+
+def _hash_segment(
+    fd: int, index: int, size: int, inner: str, on_read: Optional[Callable[[int], None]]
+) -> str:
+    segment = new_hash(inner)
+    offset = index * SEGMENT_SIZE
+    end = min(size, offset + SEGMENT_SIZE)
+    while offset < end:
+        data = os.pread(fd, min(READ_SIZE, end - offset), offset)
+        if not data:
+            break  # The file shrank; the checksum will not match
+        if on_read is not None:
+            on_read(len(data))
+        segment.update(data)
+        offset += len(data)
+    return segment.hexdigest()
+
+
+def hash_segments(
+    file_path: Path,
+    inner: str,
+    indices: Optional[Iterable[int]] = None,
+    on_read: Optional[Callable[[int], None]] = None,
+    workers: Optional[int] = None,
+) -> Tuple[int, List[str]]:
+    """
+    Digests of segments of a file, hashed in parallel.
+
+    Args:
+        file_path: File to hash
+        inner: Algorithm of the segment digests
+        indices: Segments to hash (default: all of them)
+        on_read: Called with the size of every read, from the hashing threads
+        workers: Hashing threads (default: CHECKSUM_TREE_WORKERS)
+
+    Returns:
+        (file size, digest of each requested segment in order)
+    """
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        indices = list(range(segment_count(size)) if indices is None else indices)
+        workers = min(workers or settings.checksum_tree_workers, len(indices)) or 1
+        if workers == 1:
+            digests = [_hash_segment(fd, i, size, inner, on_read) for i in indices]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                digests = list(
+                    pool.map(lambda i: _hash_segment(fd, i, size, inner, on_read), indices)
+                )
+    finally:
+        os.close(fd)
+    return size, digests
+
+
+def hash_file(
+    file_path: Path,
+    algorithm: str,
+    on_read: Optional[Callable[[int], None]] = None,
+) -> Tuple[str, List[str]]:
+    """Tree checksum of a file in stored form, and its segment digests."""
+    inner = inner_algorithm(algorithm)
+    size, digests = hash_segments(file_path, inner, on_read=on_read)
+    return format_checksum(algorithm, combine(inner, size, digests)), digests
+
+
+def mismatched_segments(expected: Sequence[str], actual: Sequence[str]) -> List[int]:
+    """Indices of segments whose digests differ, including ones only one side has."""
+    return [
+        i
+        for i in range(max(len(expected), len(actual)))
+        if i >= len(expected) or i >= len(actual) or expected[i] != actual[i]
+    ]
+
+
+def verified_prefix(expected: Sequence[str], actual: Sequence[str]) -> int:
+    """Bytes covered by the leading segments whose digests match."""
+    matched = 0
+    for want, have in zip(expected, actual):
+        if want != have:
+            break
+        matched += 1
+    return matched * SEGMENT_SIZE
+
+
+class SegmentStore:
+    """
+    Segment digests of tree checksums, in the checksum_segments table.
+
+    Keyed by the checksum itself, so files with the same content share one entry. Best
+    effort like the checksum cache: database errors are logged and never raised.
+    Use the module-level `segment_store` instance.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SegmentSessionLocal):
+        self.session_factory = session_factory
+
+    def save(self, checksum: str, digests: Sequence[str]) -> None:
+        if not is_tree_algorithm(checksum.partition(":")[0]):
+            return
+        stmt = (
+            sqlite_insert(ChecksumSegments)
+            .values(
+                checksum=checksum,
+                segment_size=SEGMENT_SIZE,
+                digests=list(digests),
+                created_at=datetime.now(timezone.utc),
+            )
+            .on_conflict_do_nothing(index_elements=["checksum"])
+        )
+        db = self.session_factory()
+        try:
+            db.execute(stmt)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.debug(f"Could not store segment digests: {e}")
+        finally:
+            db.close()
+
+    def load(self, checksum: str) -> Optional[List[str]]:
+        db = self.session_factory()
+        try:
+            entry = db.get(ChecksumSegments, checksum)
+            if entry is None or entry.segment_size != SEGMENT_SIZE:
+                return None
+            return list(entry.digests)
+        except SQLAlchemyError as e:
+            logger.debug(f"Could not load segment digests: {e}")
+            return None
+        finally:
+            db.close()
+
+    def prune(self, db: Session, max_age_days: Optional[int] = None) -> int:
+        """Delete entries older than max_age_days that no inventory row refers to."""
+        if max_age_days is None:
+            max_age_days = settings.checksum_cache_max_age_days
+        cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+        in_use = db.query(FileInventory.checksum).filter(FileInventory.checksum.isnot(None))
+        deleted = (
+            db.query(ChecksumSegments)
+            .filter(ChecksumSegments.created_at < cutoff, ChecksumSegments.checksum.notin_(in_use))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+
+def corrupt_segments(
+    file_path: Path, checksum: str, store: Optional[SegmentStore] = None
+) -> Optional[List[int]]:
+    """
+    Segments of a file that no longer match a tree checksum's stored digests.
+
+    None if the checksum is not a tree checksum or its digests are not stored.
+    """
+    algorithm = checksum.partition(":")[0]
+    if not is_tree_algorithm(algorithm):
+        return None
+    expected = (store or segment_store).load(checksum)
+    if expected is None:
+        return None
+    _, actual = hash_segments(file_path, inner_algorithm(algorithm))
+    return mismatched_segments(expected, actual)
+
+
+# Global singleton instance
+segment_store = SegmentStore()
@@ -0,0 +1,111 @@
+"""Micro-benchmark: per-file CriteriaMatcher.match_file vs compiled criteria plans.
+
+Compares the per-file matcher with a compiled plan evaluated per file (match_file) and
+per batch of columnar stat results (match_batch, as the hot walk does per chunk).
+
+Evaluates the criteria combinations used in tests/services/test_criteria_matcher.py
+(time, size, name and owner criteria) against synthetic stat results, so the benchmark
+measures criteria evaluation rather than filesystem speed.
+
+Usage:
+    python scripts/benchmark_criteria.py [num_files]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.models import Criteria, CriterionType, Operator
+from app.services.criteria_compiler import StatBatch, compile_criteria
+from app.services.criteria_matcher import CriteriaMatcher
+
+
+def criterion(criterion_id, criterion_type, operator, value):
+    return Criteria(
+        id=criterion_id,
+        enabled=True,
+        criterion_type=criterion_type,
+        operator=operator,
+        value=value,
+    )
+
+
+CRITERIA_SETS = {
+    "mtime": [criterion(1, CriterionType.MTIME, Operator.GT, "30")],
+    "size": [criterion(1, CriterionType.SIZE, Operator.GT, "1k")],
+    "name glob": [criterion(1, CriterionType.NAME, Operator.MATCHES, "*.log")],
+    "name regex": [criterion(1, CriterionType.NAME, Operator.REGEX, r"report-\d+\.log$")],
+    "user": [criterion(1, CriterionType.USER, Operator.EQ, "root")],
+    "combined": [
+        criterion(1, CriterionType.NAME, Operator.REGEX, r"\.(log|pdf)$"),
+        criterion(2, CriterionType.MTIME, Operator.GT, "5"),
+        criterion(3, CriterionType.SIZE, Operator.GT, "1k"),
+        criterion(4, CriterionType.NAME, Operator.CONTAINS, "report"),
+    ],
+}
+
+
+def make_entries(num_files):
+    now = time.time()
+    names = ["report-1.log", "report-final.pdf", "notes.txt", "data.bin"]
+    entries = []
+    for i in range(num_files):
+        timestamp = now - (i % 120) * 60
+        size = (i * 37) % 8192
+        uid = 0 if i % 2 else 1000
+        st = os.stat_result((0o100644, i, 1, 1, uid, 1000, size, timestamp, timestamp, timestamp))
+        entries.append((Path(f"/data/dir{i // 1000}") / f"{i}-{names[i % len(names)]}", st))
+    return entries
+
+
+def measure(label, evaluate, entries):
+    start = time.perf_counter()
+    matched = sum(1 for file_path, st in entries if evaluate(file_path, st)[0])
+    elapsed = time.perf_counter() - start
+    return elapsed, matched
+
+
+def measure_batches(compiled, entries, batch_size=5000):
+    start = time.perf_counter()
+    matched = 0
+    for i in range(0, len(entries), batch_size):
+        chunk = entries[i : i + batch_size]
+        batch = StatBatch([file_path for file_path, _ in chunk], [st for _, st in chunk])
+        matched += sum(compiled.match_batch(batch))
+    return time.perf_counter() - start, matched
+
+
+def main():
+    num_files = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    entries = make_entries(num_files)
+
+    print(f"{num_files} files")
+    for label, criteria in CRITERIA_SETS.items():
+        per_file, matched = measure(
+            label,
+            lambda file_path, st, criteria=criteria: CriteriaMatcher.match_file(
+                file_path, criteria, stat_info=st
+            ),
+            entries,
+        )
+        compiled = compile_criteria(criteria)
+        plan, compiled_matched = measure(
+            label,
+            lambda file_path, st, compiled=compiled: compiled.match_file(file_path, stat_info=st),
+            entries,
+        )
+        batched, batch_matched = measure_batches(compile_criteria(criteria), entries)
+        assert matched == compiled_matched == batch_matched, label
+        print(
+            f"{label:<12} match_file {per_file / num_files * 1e9:7.0f} ns/file   "
+            f"compiled {plan / num_files * 1e9:7.0f} ns/file   "
+            f"batch {batched / num_files * 1e9:7.0f} ns/file   ({matched} matched)"
+        )
+
+
+if __name__ == "__main__":
+    main()
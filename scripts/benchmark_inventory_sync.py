@@ -0,0 +1,105 @@
+"""Benchmark: inventory sync throughput, ORM row-by-row vs set-based upsert.
+
+Syncs synthetic scan records into a fresh SQLite database twice per strategy: a first
+pass that inserts every row and a second pass over the same, unchanged files. The ORM
+strategy is the previous implementation (an ``IN`` select per 100 files, per-object
+mutation and ``db.add``); the upsert strategy is the current ``_update_db_entries_batch``.
+
+Usage:
+    python scripts/benchmark_inventory_sync.py [num_rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import FileInventory, FileStatus, MonitoredPath, StorageType
+from app.services.file_workflow_service import FileWorkflowService
+from app.services.scan_records import ScanRecord
+
+
+def orm_sync(path, records, db):
+    scan_time = datetime.now(tz=timezone.utc)
+    for i in range(0, len(records), 100):
+        batch = records[i : i + 100]
+        existing = {
+            e.file_path: e
+            for e in db.query(FileInventory)
+            .filter(
+                FileInventory.path_id == path.id,
+                FileInventory.file_path.in_([r.path for r in batch]),
+            )
+            .all()
+        }
+        for info in batch:
+            entry = existing.get(info.path)
+            if entry:
+                entry.last_seen = scan_time
+                if entry.file_size != info.size or entry.status != FileStatus.ACTIVE:
+                    entry.file_size = info.size
+                    entry.file_mtime = info.mtime
+                    entry.status = FileStatus.ACTIVE
+            else:
+                db.add(
+                    FileInventory(
+                        path_id=path.id,
+                        file_path=info.path,
+                        storage_type=StorageType.HOT,
+                        file_size=info.size,
+                        file_mtime=info.mtime,
+                        file_atime=info.atime,
+                        file_ctime=info.ctime,
+                        status=FileStatus.ACTIVE,
+                        last_seen=scan_time,
+                    )
+                )
+        db.commit()
+
+
+def upsert_sync(path, records, db):
+    FileWorkflowService()._update_db_entries_batch(path, records, StorageType.HOT, db)
+
+
+def measure(label, sync, records, tmp):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, label)}.db")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    path = MonitoredPath(name=label, source_path="/bench/hot", operation_type="move")
+    db.add(path)
+    db.commit()
+
+    for pass_name in ("insert", "resync"):
+        start = time.perf_counter()
+        sync(path, records, db)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<8} {pass_name:<7} {elapsed:8.2f} s   {len(records) / elapsed:10.0f} rows/s")
+    db.close()
+    engine.dispose()
+
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    now_ns = time.time_ns()
+    records = [
+        ScanRecord(f"/bench/hot/dir{i // 1000}/file{i}.dat", i % 65536, now_ns, now_ns, now_ns)
+        for i in range(num_rows)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{num_rows} rows")
+        measure("orm", orm_sync, records, tmp)
+        measure("upsert", upsert_sync, records, tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Micro-benchmark: per-file cost of scan metadata dicts vs ScanRecord.
+
+Compares the per-file dicts with three datetimes that scans used to build against the
+compact ScanRecord, measuring construction time and retained memory per file.
+
+Usage:
+    python scripts/benchmark_scan_records.py [num_files]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.scan_records import ScanRecord
+
+
+def build_dicts(entries):
+    return [
+        {
+            "path": path,
+            "size": st.st_size,
+            "mtime": datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+            "atime": datetime.fromtimestamp(st.st_atime, tz=timezone.utc),
+            "ctime": datetime.fromtimestamp(st.st_ctime, tz=timezone.utc),
+        }
+        for path, st in entries
+    ]
+
+
+def build_records(entries):
+    return [ScanRecord.from_stat(path, st) for path, st in entries]
+
+
+def measure(label, builder, entries):
+    # Timing pass
+    start = time.perf_counter()
+    rows = builder(entries)
+    elapsed = time.perf_counter() - start
+    del rows
+
+    # Memory pass (separate so tracemalloc overhead does not skew timing)
+    tracemalloc.start()
+    rows = builder(entries)
+    retained, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+
+    n = len(entries)
+    print(f"{label:<12} {elapsed / n * 1e9:8.0f} ns/file   {retained / n:8.0f} bytes/file")
+
+
+def main():
+    num_files = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Stat a small set of real files and reuse the results, so the benchmark measures
+        # record construction rather than filesystem speed
+        samples = []
+        for i in range(100):
+            sample = Path(tmp) / f"file{i}.txt"
+            sample.write_text("x" * i)
+            samples.append(os.stat(sample))
+
+        entries = [
+            (os.path.join(tmp, f"dir{i // 1000}", f"file{i}.txt"), samples[i % len(samples)])
+            for i in range(num_files)
+        ]
+
+        print(f"{num_files} files")
+        measure("dict", build_dicts, entries)
+        measure("ScanRecord", build_records, entries)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,8 @@ settings.database_path = ":memory:"
 settings.secret_key = "test-secret-key"
 settings.encryption_key_file = "./test_encryption.key"
 settings.require_fingerprint_verification = False
+# The checksum cache writes through its own sessions; tests that need it enable it
+settings.checksum_cache_enabled = False
 
 
 # Use an in-memory SQLite database for tests
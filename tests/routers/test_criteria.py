@@ -128,3 +128,38 @@ class TestCriteriaRouter:
         response = authenticated_client.post(f"/api/v1/criteria/path/{path.id}", json=payload)
         assert response.status_code == 400
         assert "atime not supported" in response.json()["detail"].lower()
+
+    def test_preview_criteria(self, authenticated_client, db_session, monitored_path_factory):
+        """Previewing criteria reports what would move without saving the criteria."""
+        from datetime import datetime, timedelta, timezone
+
+        from app.models import FileInventory, StorageType
+
+        path = monitored_path_factory("Preview Path", "/tmp/hot_crit_preview")
+        db_session.add(
+            FileInventory(
+                path_id=path.id,
+                file_path="/tmp/hot_crit_preview/big.iso",
+                file_size=4096,
+                file_mtime=datetime.now(timezone.utc) - timedelta(days=2),
+                file_extension=".iso",
+                storage_type=StorageType.HOT,
+            )
+        )
+        db_session.commit()
+
+        payload = {"criteria": [{"criterion_type": "mtime", "operator": "<", "value": "60"}]}
+        response = authenticated_client.post(
+            f"/api/v1/criteria/path/{path.id}/preview", json=payload
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["to_cold"]["file_count"] == 1
+        assert data["to_cold"]["by_extension"] == [
+            {"extension": ".iso", "file_count": 1, "total_bytes": 4096}
+        ]
+        assert data["to_cold"]["samples"][0]["file_path"] == "/tmp/hot_crit_preview/big.iso"
+        assert db_session.query(Criteria).filter(Criteria.path_id == path.id).count() == 0
+
+        missing = authenticated_client.post("/api/v1/criteria/path/9999/preview", json=payload)
+        assert missing.status_code == 404
@@ -1,3 +1,4 @@
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
@@ -5,7 +6,7 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
-from app.models import MonitoredPath, ColdStorageLocation, ScanStatus
+from app.models import MonitoredPath, ColdStorageLocation, ScanCheckpoint, ScanStatus, StorageType
 
 
 def test_list_paths(authenticated_client: TestClient, monitored_path_factory):
@@ -115,6 +116,34 @@ def test_get_scan_progress(mock_get_progress, authenticated_client: TestClient,
     assert data["progress"]["percent"] == 50
     mock_get_progress.assert_called_once_with(path.id)
 
+@patch("app.services.scan_progress.scan_progress_manager.get_progress", return_value=None)
+def test_get_scan_progress_reports_checkpoint(mock_get_progress, authenticated_client: TestClient, db_session: Session, monitored_path_factory, tmp_path):
+    """An idle path with an interrupted scan reports the checkpoint it will resume from."""
+    path = monitored_path_factory("Checkpoint Path", str(tmp_path / "checkpoint_hot"))
+
+    response = authenticated_client.get(f"/api/v1/paths/{path.id}/scan/progress")
+    assert response.json()["status"] == "idle"
+    assert response.json()["checkpoint"] is None
+
+    db_session.add(ScanCheckpoint(
+        path_id=path.id,
+        scan_generation=3,
+        tier=StorageType.COLD,
+        cursor={"full_scan": True, "pending": [], "partial": []},
+        entries_synced=5000,
+        scan_started_at=datetime.now(timezone.utc) - timedelta(minutes=10),
+        checkpointed_at=datetime.now(timezone.utc) - timedelta(minutes=2),
+        resume_count=1,
+    ))
+    db_session.commit()
+
+    checkpoint = authenticated_client.get(f"/api/v1/paths/{path.id}/scan/progress").json()["checkpoint"]
+    assert checkpoint["scan_generation"] == 3
+    assert checkpoint["resume_count"] == 1
+    assert checkpoint["tier"] == "cold"
+    assert checkpoint["entries_synced"] == 5000
+    assert 110 < checkpoint["checkpoint_age_seconds"] < 300
+
 def test_get_scan_errors(authenticated_client: TestClient, db_session: Session, monitored_path_factory, tmp_path):
     """Test getting scan errors for a path."""
     path = monitored_path_factory("Error Path", str(tmp_path / "error_hot"))
@@ -300,3 +329,57 @@ def test_validate_path_access_not_executable(authenticated_client: TestClient, s
     response = authenticated_client.post("/api/v1/paths", json=payload)
     assert response.status_code == 400
     assert "not executable" in response.json()["detail"].lower()
+
+
+@patch("app.services.scheduler.scheduler_service.add_path_job")
+def test_create_path_with_exclude_patterns(mock_add_job, authenticated_client: TestClient, storage_location: ColdStorageLocation, tmp_path):
+    """Exclude patterns are stored, and invalid ones are rejected."""
+    source_path = tmp_path / "excl_hot"
+    source_path.mkdir()
+    path_data = {
+        "name": "Excluding Path",
+        "source_path": str(source_path),
+        "check_interval_seconds": 3600,
+        "storage_location_ids": [storage_location.id],
+        "exclude_patterns": ["node_modules/", " *.tmp ", ""],
+    }
+
+    response = authenticated_client.post("/api/v1/paths", json=path_data)
+    assert response.status_code == 201
+    assert response.json()["exclude_patterns"] == ["node_modules/", "*.tmp"]
+
+    path_data["name"] = "Bad Excludes"
+    path_data["exclude_patterns"] = ["!keep.txt"]
+    response = authenticated_client.post("/api/v1/paths", json=path_data)
+    assert response.status_code == 422
+
+
+@patch("app.services.scheduler.scheduler_service.add_path_job")
+def test_watch_status(mock_add_job, authenticated_client: TestClient, storage_location: ColdStorageLocation, tmp_path):
+    """watch_mode is stored and the watch endpoint reports whether the path is watched."""
+    source_path = tmp_path / "watch_hot"
+    source_path.mkdir()
+    path_data = {
+        "name": "Watched Path",
+        "source_path": str(source_path),
+        "check_interval_seconds": 3600,
+        "storage_location_ids": [storage_location.id],
+        "watch_mode": "inotify",
+    }
+    response = authenticated_client.post("/api/v1/paths", json=path_data)
+    assert response.status_code == 201
+    path_id = response.json()["id"]
+    assert response.json()["watch_mode"] == "inotify"
+
+    # The scheduler is mocked, so nothing is watching yet
+    response = authenticated_client.get(f"/api/v1/paths/{path_id}/watch")
+    assert response.status_code == 200
+    assert response.json()["watch_mode"] == "inotify"
+    assert response.json()["watching"] is False
+
+    with patch("app.routers.api.paths.path_watch_manager.status", return_value={"mode": "inotify", "watches": 3}):
+        response = authenticated_client.get(f"/api/v1/paths/{path_id}/watch")
+    assert response.json()["watching"] is True
+    assert response.json()["status"]["watches"] == 3
+
+    assert authenticated_client.get("/api/v1/paths/9999/watch").status_code == 404
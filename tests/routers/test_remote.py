@@ -1,3 +1,4 @@
+import hashlib
 import itertools
 import json
 import time
@@ -377,7 +378,7 @@ def test_receive_chunk(
 
 
 @patch("app.routers.api.remote.scheduler_service.trigger_scan")
-@patch("app.services.file_metadata.file_metadata_extractor.compute_sha256", return_value="hash")
+@patch("app.services.file_metadata.file_metadata_extractor.compute_checksum", return_value="hash")
 @patch("pathlib.Path.rename")
 @patch("app.routers.api.remote._get_found_tmp", new_callable=AsyncMock)
 def test_verify_transfer_success(
@@ -393,6 +394,23 @@ def test_verify_transfer_success(
     assert response.status_code == 200
 
 
+@patch("app.services.file_metadata.file_metadata_extractor.compute_checksum")
+@patch("pathlib.Path.rename")
+@patch("app.routers.api.remote._get_found_tmp", new_callable=AsyncMock)
+def test_verify_transfer_unsupported_algorithm(
+    mock_get_tmp, mock_rename, mock_hash, authenticated_client: TestClient, tmp_path
+):
+    """A checksum this instance cannot recompute is rejected and the upload kept."""
+    mock_get_tmp.return_value = tmp_path / "test.fftmp"
+
+    data = {"relative_path": "test.txt", "remote_path_id": 1, "checksum": "nohash:abc"}
+    response = authenticated_client.post("/api/v1/remote/verify-transfer", json=data)
+    assert response.status_code == 422
+    assert "nohash" in response.json()["detail"]
+    mock_rename.assert_not_called()
+    mock_hash.assert_not_called()
+
+
 @patch("app.routers.api.remote._get_base_directory", return_value="/tmp")
 @patch("pathlib.Path.exists", side_effect=[True, False])
 @patch("pathlib.Path.stat")
@@ -530,3 +548,61 @@ def test_get_transfer_status_not_found(authenticated_client: TestClient):
     """Test getting transfer status for non-existent path."""
     response = authenticated_client.get("/api/v1/remote/transfer-status?relative_path=none.txt&remote_path_id=9999&storage_type=hot")
     assert response.status_code == 404
+
+
+@patch("app.routers.api.remote._decrypt_chunk", new_callable=AsyncMock, return_value=b"NEW")
+@patch("app.routers.api.remote._decompress_chunk", new_callable=AsyncMock, return_value=b"NEW")
+def test_receive_chunk_at_offset(
+    mock_decompress, mock_decrypt, client: TestClient, monitored_path_factory,
+    mock_verify_remote_signature, tmp_path
+):
+    """A chunk with X-Chunk-Offset replaces whatever the partial file holds past the offset."""
+    path = monitored_path_factory("Offset", str(tmp_path / "offset"))
+    partial = tmp_path / "offset" / "test.txt.fftmp"
+    partial.write_bytes(b"goodBAD")
+    headers = {
+        "X-Chunk-Index": "1",
+        "X-Chunk-Offset": "4",
+        "X-Relative-Path": "test.txt",
+        "X-Remote-Path-ID": str(path.id),
+        "X-Storage-Type": "hot",
+        "X-Job-ID": "job1",
+        "X-Is-Final": "true",
+        "X-Fingerprint": "mockfingerprint",
+        "X-Timestamp": str(int(time.time())),
+        "X-Nonce": "nonce",
+        "X-Signature": "sig",
+    }
+
+    response = client.post("/api/v1/remote/receive", headers=headers, content=b"x")
+    assert response.status_code == 200
+    assert partial.read_bytes() == b"goodNEW"
+
+    # An offset past the end of the partial file would leave a hole
+    response = client.post(
+        "/api/v1/remote/receive", headers={**headers, "X-Chunk-Offset": "100"}, content=b"x"
+    )
+    assert response.status_code == 409
+
+
+def test_get_transfer_status_partial_segments(
+    authenticated_client: TestClient, monitored_path_factory, tmp_path, monkeypatch
+):
+    """With a tree algorithm, a partial transfer reports the digests of its complete segments."""
+    from app.services import tree_hash
+
+    monkeypatch.setattr(tree_hash, "SEGMENT_SIZE", 4)
+    path = monitored_path_factory("Segments", str(tmp_path / "segments"))
+    (tmp_path / "segments" / "test.txt.fftmp").write_bytes(b"aaaabbbbcc")
+    url = (
+        f"/api/v1/remote/transfer-status?relative_path=test.txt&remote_path_id={path.id}"
+        f"&storage_type=hot"
+    )
+
+    response = authenticated_client.get(url + "&checksum_algorithm=sha256-tree")
+    assert response.json() == {
+        "size": 10,
+        "status": "partial",
+        "segments": [hashlib.sha256(b"aaaa").hexdigest(), hashlib.sha256(b"bbbb").hexdigest()],
+    }
+    assert "segments" not in authenticated_client.get(url).json()
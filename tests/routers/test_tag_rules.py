@@ -1,6 +1,19 @@
 import pytest
 
 from app.models import Tag, TagRule
+from app.services.tag_rule_jobs import tag_rule_jobs
+
+
+@pytest.fixture(autouse=True)
+def submitted_jobs(monkeypatch):
+    """Record re-tagging jobs instead of running them on the worker thread."""
+    jobs = []
+    monkeypatch.setattr(
+        tag_rule_jobs,
+        "submit_rule_change",
+        lambda action, before, after: jobs.append((action, before, after)) or "job-id",
+    )
+    return jobs
 
 
 @pytest.mark.unit
@@ -98,3 +111,38 @@ class TestTagRulesRouter:
         response = authenticated_client.post("/api/v1/tag-rules/apply")
         assert response.status_code == 200
         assert response.json()["tags_added"] == 5
+
+    def test_rule_changes_queue_retagging(self, authenticated_client, create_tag, submitted_jobs):
+        """Creating, editing and deleting a rule queue a job with both versions of the rule."""
+        tag = create_tag("Retag Tag")
+        payload = {"tag_id": tag.id, "criterion_type": "extension", "operator": "=", "value": "log"}
+        rule_id = authenticated_client.post("/api/v1/tag-rules", json=payload).json()["id"]
+        authenticated_client.patch(f"/api/v1/tag-rules/{rule_id}", json={"value": "txt"})
+        authenticated_client.delete(f"/api/v1/tag-rules/{rule_id}")
+
+        assert [action for action, _, _ in submitted_jobs] == ["create", "update", "delete"]
+        _, before, after = submitted_jobs[1]
+        assert (before.value, after.value) == ("log", "txt")
+        assert submitted_jobs[0][1] is None
+        assert submitted_jobs[2][2] is None
+
+    def test_retag_jobs(self, authenticated_client, monkeypatch):
+        """Job progress is listed and fetched by id; background apply returns the job."""
+        monkeypatch.setattr(tag_rule_jobs, "_ensure_worker", lambda: None)
+        job_id = tag_rule_jobs.submit_apply_all()
+
+        response = authenticated_client.get(f"/api/v1/tag-rules/jobs/{job_id}")
+        assert response.status_code == 200
+        assert response.json()["status"] == "pending"
+        assert response.json()["action"] == "apply_all"
+        jobs = authenticated_client.get("/api/v1/tag-rules/jobs").json()
+        assert job_id in [job["job_id"] for job in jobs]
+        assert authenticated_client.get("/api/v1/tag-rules/jobs/missing").status_code == 404
+
+        response = authenticated_client.post("/api/v1/tag-rules/apply?background=true")
+        assert response.status_code == 200
+        assert response.json()["action"] == "apply_all"
+
+        with tag_rule_jobs._lock:
+            tag_rule_jobs._queue.clear()
+            tag_rule_jobs._changes.clear()
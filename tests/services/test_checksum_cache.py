@@ -0,0 +1,148 @@
+import errno
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.models import ChecksumCacheEntry
+from app.services.checksum_cache import ChecksumCache
+from app.services.checksum_verifier import ChecksumVerifier
+from app.services.file_metadata import FileMetadataExtractor
+from app.services.file_mover import move_verified
+
+DATA = os.urandom(ChecksumCache.MIN_FILE_SIZE)
+SHA256 = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture
+def cache(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "checksum_cache_enabled", True)
+    cache = ChecksumCache(session_factory=lambda: db_session)
+    for module in ("checksum_verifier", "file_metadata", "file_mover"):
+        monkeypatch.setattr(f"app.services.{module}.checksum_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(DATA)
+    return path
+
+
+def test_unchanged_files_are_hashed_once_across_services(cache, data_file):
+    with patch.object(
+        ChecksumVerifier, "_hash_file", wraps=ChecksumVerifier._hash_file
+    ) as verifier_hash, patch.object(
+        FileMetadataExtractor, "_hash_file", wraps=FileMetadataExtractor._hash_file
+    ) as extractor_hash:
+        assert ChecksumVerifier.calculate_checksum(data_file) == SHA256
+        assert ChecksumVerifier.calculate_checksum(data_file) == SHA256
+        # The remote transfer service and verify_transfer hash through the extractor
+        assert FileMetadataExtractor.compute_checksum(data_file) == SHA256
+        assert FileMetadataExtractor.compute_sha256(data_file) == SHA256
+
+    assert verifier_hash.call_count == 1
+    assert extractor_hash.call_count == 0
+    assert cache.stats() == {
+        "enabled": True,
+        "hits": 3,
+        "misses": 1,
+        "hit_rate": 0.75,
+        "invalidated": 0,
+        "stored": 1,
+        "errors": 0,
+    }
+
+    # Each algorithm has its own entry
+    blake = ChecksumVerifier.calculate_checksum(data_file, "blake2b")
+    assert blake == f"blake2b:{hashlib.blake2b(DATA).hexdigest()}"
+    assert cache.stored == 2
+
+
+def test_changed_files_invalidate_their_entry(cache, db_session, data_file):
+    ChecksumVerifier.calculate_checksum(data_file)
+    changed = bytes(reversed(DATA))
+    data_file.write_bytes(changed)
+    st = data_file.stat()
+    os.utime(data_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1000))
+
+    assert ChecksumVerifier.calculate_checksum(data_file) == hashlib.sha256(changed).hexdigest()
+    assert cache.invalidated == 1
+    assert cache.hits == 0
+    entry = db_session.query(ChecksumCacheEntry).one()
+    assert entry.checksum == hashlib.sha256(changed).hexdigest()
+
+
+def test_explicit_verification_reads_the_file(cache, data_file):
+    ChecksumVerifier.calculate_checksum(data_file)
+    with patch.object(ChecksumVerifier, "_hash_file", return_value="0" * 64) as hashed:
+        assert not ChecksumVerifier.verify_checksum(data_file, SHA256)
+        assert ChecksumVerifier.calculate_checksum(data_file, use_cache=False) == "0" * 64
+    assert hashed.call_count == 2
+    assert cache.hits == 0
+
+
+def test_files_changing_while_hashed_and_small_files_are_not_cached(cache, tmp_path, data_file):
+    def touch_while_hashing():
+        os.utime(data_file, ns=(0, 10**18))
+        return SHA256
+
+    assert cache.get_or_compute(data_file, "sha256", touch_while_hashing) == SHA256
+    small = tmp_path / "small.txt"
+    small.write_bytes(b"tiny")
+    ChecksumVerifier.calculate_checksum(small)
+
+    assert cache.stored == 0
+    assert cache.misses == 1  # Small files are not even looked up
+
+
+def test_verified_copies_are_cached(cache, tmp_path, data_file, monkeypatch):
+    def cross_device(self, target):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(Path, "rename", cross_device)
+    moved = tmp_path / "moved.bin"
+
+    assert move_verified(data_file, moved, SHA256) == SHA256
+
+    with patch.object(ChecksumVerifier, "_hash_file") as hashed:
+        assert ChecksumVerifier.calculate_checksum(moved) == SHA256
+    hashed.assert_not_called()
+
+
+def test_database_errors_count_as_misses(data_file, monkeypatch):
+    monkeypatch.setattr(settings, "checksum_cache_enabled", True)
+    db = MagicMock()
+    db.get.side_effect = OperationalError("SELECT", {}, Exception("database is locked"))
+    db.execute.side_effect = OperationalError("INSERT", {}, Exception("database is locked"))
+    cache = ChecksumCache(session_factory=lambda: db)
+
+    assert cache.get_or_compute(data_file, "sha256", lambda: SHA256) == SHA256
+    assert (cache.misses, cache.errors, cache.stored) == (1, 2, 0)
+
+
+def test_disabled_cache_and_prune(cache, db_session, data_file, monkeypatch):
+    ChecksumVerifier.calculate_checksum(data_file)
+    old = ChecksumCacheEntry(
+        file_dev=1,
+        file_inode=2,
+        algorithm="sha256",
+        file_size=3,
+        file_mtime_ns=4,
+        checksum="old",
+        last_used=datetime.now(timezone.utc) - timedelta(days=100),
+    )
+    db_session.add(old)
+    db_session.commit()
+
+    assert cache.prune(db_session, max_age_days=90) == 1
+    assert cache.stats(db_session)["entries"] == 1
+
+    monkeypatch.setattr(settings, "checksum_cache_enabled", False)
+    assert cache.get_or_compute(data_file, "sha256", lambda: "computed") == "computed"
@@ -0,0 +1,115 @@
+import errno
+import hashlib
+import os
+
+import pytest
+
+from app.services import copy_engine
+from app.services.copy_engine import copy_file_data, recording_copies
+
+
+def copy(source, dest, **kwargs):
+    size = source.stat().st_size
+    with open(source, "rb", buffering=0) as fsrc, open(dest, "wb", buffering=0) as fdst:
+        return copy_file_data(fsrc, fdst, size, **kwargs)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.bin"
+    # Not a multiple of any chunk size
+    path.write_bytes(os.urandom(3 * copy_engine.READ_BUFFER_SIZE + 12345))
+    return path
+
+
+@pytest.mark.parametrize("strategy", copy_engine.available_strategies())
+def test_each_strategy_copies_the_data(tmp_path, source, strategy, monkeypatch):
+    monkeypatch.setattr(copy_engine, "KERNEL_CHUNK_SIZE", 1024 * 1024)
+    reads, progress = [], []
+    dest = tmp_path / "dest.bin"
+
+    used = copy(
+        source, dest, on_read=reads.append, on_progress=progress.append, strategies=[strategy]
+    )
+
+    assert dest.read_bytes() == source.read_bytes()
+    size = source.stat().st_size
+    assert progress[-1] == size
+    if used == copy_engine.REFLINK:
+        assert reads == []
+    else:
+        # Reflink is not supported everywhere and falls back to the read loop
+        assert used == strategy or strategy == copy_engine.REFLINK
+        assert sum(reads) == size
+        assert len(reads) > 1
+
+
+def test_unsupported_strategy_hands_over_at_offset(tmp_path, source, monkeypatch):
+    """A strategy failing midway as unsupported is continued by the next one."""
+    calls = []
+    real = os.copy_file_range
+
+    def flaky(src, dst, count, offset_src, offset_dst):
+        calls.append(offset_src)
+        if len(calls) > 1:
+            raise OSError(errno.EXDEV, "cross-device")
+        return real(src, dst, count, offset_src, offset_dst)
+
+    monkeypatch.setattr(copy_engine, "KERNEL_CHUNK_SIZE", 1024 * 1024)
+    monkeypatch.setattr(os, "copy_file_range", flaky)
+    dest = tmp_path / "dest.bin"
+
+    used = copy(source, dest, strategies=[copy_engine.COPY_FILE_RANGE, copy_engine.READ_LOOP])
+
+    assert used == copy_engine.READ_LOOP
+    assert calls == [0, 1024 * 1024]
+    assert dest.read_bytes() == source.read_bytes()
+
+
+def test_copy_errors_are_not_masked(tmp_path, source, monkeypatch):
+    def full(*args):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(os, "copy_file_range", full)
+    with pytest.raises(OSError) as exc_info:
+        copy(source, tmp_path / "dest.bin", strategies=[copy_engine.COPY_FILE_RANGE])
+    assert exc_info.value.errno == errno.ENOSPC
+
+
+@pytest.mark.parametrize("reflinked", [False, True])
+def test_hashing_copies_pass_data_through_userspace(tmp_path, source, monkeypatch, reflinked):
+    if reflinked:
+        # Stand in for FICLONE on filesystems without reflinks
+        def fake_reflink(src, dst, offset, size):
+            os.copy_file_range(src.fileno(), dst.fileno(), size, 0, 0)
+            yield size
+
+        monkeypatch.setitem(copy_engine._COPIERS, copy_engine.REFLINK, fake_reflink)
+    digest = hashlib.sha256()
+    reads = []
+    dest = tmp_path / "dest.bin"
+
+    used = copy(source, dest, on_read=reads.append, hash_update=digest.update)
+
+    assert used == (copy_engine.REFLINK if reflinked else copy_engine.READ_LOOP)
+    assert digest.hexdigest() == hashlib.sha256(source.read_bytes()).hexdigest()
+    assert dest.read_bytes() == source.read_bytes()
+    # The source is read exactly once either way
+    assert sum(reads) == source.stat().st_size
+
+
+def test_recording_copies_is_per_block():
+    stats = copy_engine.copy_strategy_stats.as_dict()
+    before = stats.get(copy_engine.SENDFILE, {"files": 0, "bytes": 0})
+
+    copy_engine.note_copy(copy_engine.SENDFILE, 10)  # Outside any record
+    with recording_copies() as outer:
+        with recording_copies() as inner:
+            copy_engine.note_copy(copy_engine.SENDFILE, 5)
+        assert outer.strategy is None
+        copy_engine.note_copy(copy_engine.READ_LOOP, 7)
+
+    assert (inner.strategy, inner.bytes_copied) == (copy_engine.SENDFILE, 5)
+    assert (outer.strategy, outer.bytes_copied) == (copy_engine.READ_LOOP, 7)
+    after = copy_engine.copy_strategy_stats.as_dict()[copy_engine.SENDFILE]
+    assert after == {"files": before["files"] + 2, "bytes": before["bytes"] + 15}
@@ -0,0 +1,154 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from app.models import Criteria, CriterionType, Operator
+from app.services.criteria_compiler import CompiledCriteria, StatBatch, compile_criteria
+from app.services.criteria_matcher import CriteriaMatcher
+
+NOW = 1_700_000_000.0
+
+
+def make_stat(age_minutes=0.0, size=0, mode=0o100644, uid=1000, gid=1000):
+    timestamp = NOW - age_minutes * 60
+    return os.stat_result((mode, 1, 1, 1, uid, gid, size, timestamp, timestamp, timestamp))
+
+
+def criterion(criterion_id, criterion_type, operator, value, enabled=True):
+    return Criteria(
+        id=criterion_id,
+        enabled=enabled,
+        criterion_type=criterion_type,
+        operator=operator,
+        value=value,
+    )
+
+
+CRITERIA_SETS = [
+    [criterion(1, CriterionType.MTIME, Operator.GT, "30")],
+    [criterion(1, CriterionType.MTIME, Operator.EQ, "30")],
+    [criterion(1, CriterionType.ATIME, Operator.LTE, "45")],
+    [criterion(1, CriterionType.SIZE, Operator.GTE, "1k")],
+    [criterion(1, CriterionType.SIZE, Operator.LT, "1.5M")],
+    [criterion(1, CriterionType.SIZE, Operator.GT, "lots")],
+    [criterion(1, CriterionType.NAME, Operator.MATCHES, "*.log")],
+    [criterion(1, CriterionType.INAME, Operator.MATCHES, "REPORT*")],
+    [criterion(1, CriterionType.NAME, Operator.REGEX, r"^report-\d+")],
+    [criterion(1, CriterionType.NAME, Operator.REGEX, "[unclosed")],
+    [criterion(1, CriterionType.PERM, Operator.EQ, "644")],
+    [criterion(1, CriterionType.PERM, Operator.EQ, "rx")],
+    [criterion(1, CriterionType.USER, Operator.EQ, "1000")],
+    [criterion(1, CriterionType.GROUP, Operator.EQ, "no-such-group-xyz")],
+    [
+        criterion(3, CriterionType.NAME, Operator.CONTAINS, "report"),
+        criterion(1, CriterionType.MTIME, Operator.GT, "5"),
+        criterion(7, CriterionType.SIZE, Operator.GT, "1k", enabled=False),
+        criterion(2, CriterionType.SIZE, Operator.LTE, "4k"),
+    ],
+]
+
+FILES = [
+    ("report-1.log", make_stat(age_minutes=10, size=2048)),
+    ("Report-final.pdf", make_stat(age_minutes=30, size=500, mode=0o100600)),
+    ("notes.txt", make_stat(age_minutes=60, size=4096, uid=0)),
+    ("archive.LOG", make_stat(age_minutes=29.8, size=2 * 1024 * 1024, mode=0o100755)),
+]
+
+
+@pytest.mark.parametrize("criteria", CRITERIA_SETS)
+def test_compiled_criteria_match_criteria_matcher(criteria, monkeypatch):
+    """Compiled plans give the same result and ids as CriteriaMatcher for every file."""
+    monkeypatch.setattr("app.services.criteria_matcher.time.time", lambda: NOW)
+    compiled = compile_criteria(criteria, now=NOW)
+
+    for name, stat_info in FILES:
+        file_path = Path("/data") / name
+        expected = CriteriaMatcher.match_file(file_path, criteria, stat_info=stat_info)
+        assert compiled.match_file(file_path, stat_info=stat_info) == expected
+
+
+@pytest.mark.parametrize("criteria", CRITERIA_SETS)
+def test_match_batch_matches_criteria_matcher(criteria, monkeypatch):
+    """Batch evaluation gives exactly the per-file results, ids included."""
+    monkeypatch.setattr("app.services.criteria_matcher.time.time", lambda: NOW)
+    # Ages on both sides of every threshold used above, including the EQ tolerance edges
+    ages = [0, 4.9, 5, 5.1, 29.5, 29.5001, 30, 30.4999, 30.5, 45, 60]
+    files = FILES + [
+        (f"file{i}.log", make_stat(age_minutes=age, size=i * 512)) for i, age in enumerate(ages)
+    ]
+    file_paths = [Path("/data") / name for name, _ in files]
+    stats = [stat_info for _, stat_info in files]
+
+    compiled = compile_criteria(criteria, now=NOW)
+    mask = compiled.match_batch(StatBatch(file_paths, stats))
+
+    results = [(True, compiled.matched_ids) if matches else (False, []) for matches in mask]
+    assert results == [
+        CriteriaMatcher.match_file(file_path, criteria, stat_info=stat_info)
+        for file_path, stat_info in zip(file_paths, stats)
+    ]
+
+
+def test_match_batch_runs_per_file_tests_on_survivors_only():
+    """Name tests only see the files left after the column criteria."""
+    seen = []
+    compiled = compile_criteria(
+        [
+            criterion(1, CriterionType.NAME, Operator.CONTAINS, "report"),
+            criterion(2, CriterionType.SIZE, Operator.GT, "1k"),
+        ],
+        now=NOW,
+    )
+    name_entry = next(e for e in compiled._compiled if e.column_test is None)
+    name_test = name_entry.test
+    name_entry.test = lambda file_path, st: seen.append(file_path.name) or name_test(
+        file_path, st
+    )
+    batch = StatBatch(
+        [Path("report-small"), Path("report-big"), Path("notes-big")],
+        [make_stat(size=10), make_stat(size=4096), make_stat(size=4096)],
+    )
+
+    assert compiled.match_batch(batch) == [False, True, False]
+    assert seen == ["report-big", "notes-big"]
+    assert compile_criteria([]).match_batch(batch) == [True] * 3
+
+
+def test_compiled_criteria_freeze_now():
+    """Ages are measured against the time the plan was compiled."""
+    compiled = compile_criteria([criterion(1, CriterionType.MTIME, Operator.GT, "30")], now=NOW)
+    stat_info = make_stat(age_minutes=20)
+
+    assert compiled.matches(Path("a.txt"), stat_info) is False
+    compiled.now = NOW + 3600  # changing the attribute afterwards has no effect
+    assert compiled.matches(Path("a.txt"), stat_info) is False
+
+
+def test_compiled_criteria_stat_failure(tmp_path):
+    compiled = compile_criteria([criterion(1, CriterionType.NAME, Operator.EQ, "missing")])
+
+    assert compiled.match_file(tmp_path / "missing") == (False, [])
+    assert compile_criteria([]).match_file(tmp_path / "missing") == (True, [])
+
+
+def test_compiled_criteria_reorder_by_selectivity(monkeypatch):
+    """Cheap tests run first; after calibration the most selective of a cost class leads."""
+    monkeypatch.setattr(CompiledCriteria, "CALIBRATION_FILES", 10)
+    criteria = [
+        criterion(1, CriterionType.NAME, Operator.REGEX, r"\.log$"),
+        criterion(2, CriterionType.SIZE, Operator.GT, "0"),  # rarely rejects
+        criterion(3, CriterionType.MTIME, Operator.GT, "30"),  # usually rejects
+    ]
+    compiled = compile_criteria(criteria, now=NOW)
+    assert compiled.order() == [2, 3, 1]
+
+    for i in range(10):
+        compiled.match_file(Path(f"f{i}.log"), stat_info=make_stat(age_minutes=i, size=1))
+
+    assert compiled.order() == [3, 2, 1]
+    # Matched ids keep the order the criteria were defined in
+    assert compiled.match_file(Path("old.log"), stat_info=make_stat(60, size=1)) == (
+        True,
+        [1, 2, 3],
+    )
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import (
+    Criteria,
+    CriterionType,
+    FileInventory,
+    FileStatus,
+    Operator,
+    PinnedFile,
+    StorageType,
+)
+from app.services.criteria_preview import CriteriaPreview, preview_criteria
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def criterion(criterion_type, operator, value, enabled=True):
+    return Criteria(criterion_type=criterion_type, operator=operator, value=value, enabled=enabled)
+
+
+@pytest.fixture
+def inventory_path(db_session, monitored_path_factory, tmp_path):
+    path = monitored_path_factory("Preview", str(tmp_path / "hot"))
+
+    def add(name, age_minutes, size, storage_type=StorageType.HOT, status=FileStatus.ACTIVE):
+        file_path = tmp_path / "hot" / name
+        suffix = file_path.suffix.lower() or None
+        db_session.add(
+            FileInventory(
+                path_id=path.id,
+                file_path=str(file_path),
+                file_size=size,
+                file_mtime=NOW - timedelta(minutes=age_minutes),
+                file_atime=NOW - timedelta(minutes=age_minutes),
+                file_extension=suffix,
+                storage_type=storage_type,
+                status=status,
+            )
+        )
+        return str(file_path)
+
+    add("old.log", 120, 5000)
+    add("old.PDF", 90, 2000)
+    add("new.log", 5, 7000)
+    add(".bashrc", 300, 10)
+    add("gone.log", 500, 1, status=FileStatus.DELETED)
+    pinned = add("pinned.log", 500, 1)
+    add("cold-recent.pdf", 1, 300, storage_type=StorageType.COLD)
+    add("cold-old.pdf", 600, 400, storage_type=StorageType.COLD)
+    db_session.add(PinnedFile(path_id=path.id, file_path=pinned))
+    db_session.commit()
+    return path
+
+
+def test_preview_time_and_size_in_sql(db_session, inventory_path):
+    """Hot rows failing a criterion would freeze; cold rows matching all would thaw."""
+    result = preview_criteria(
+        db_session,
+        inventory_path,
+        [
+            criterion(CriterionType.MTIME, Operator.LT, "60"),  # keep files younger than 1h
+            criterion(CriterionType.SIZE, Operator.GT, "1k", enabled=False),
+        ],
+        now=NOW.timestamp(),
+    )
+
+    to_cold = result["to_cold"]
+    assert to_cold["file_count"] == 3
+    assert to_cold["total_bytes"] == 7010
+    assert {e["extension"]: e["file_count"] for e in to_cold["by_extension"]} == {
+        ".log": 1,
+        ".pdf": 1,
+        None: 1,
+    }
+    assert [s["file_size"] for s in to_cold["samples"]] == [5000, 2000, 10]
+    assert result["to_hot"]["file_count"] == 1
+    assert result["to_hot"]["samples"][0]["file_path"].endswith("cold-recent.pdf")
+    assert result["hot_file_count"] == 4
+    assert result["criteria_in_sql"] == 1
+    assert result["rows_streamed"] == 0
+
+
+def test_preview_streams_name_criteria(db_session, inventory_path):
+    """Name globs narrow rows with the extension index and are checked in Python."""
+    preview = CriteriaPreview(
+        [
+            criterion(CriterionType.INAME, Operator.MATCHES, "*.pdf"),
+            criterion(CriterionType.USER, Operator.EQ, "root"),
+        ],
+        now=NOW.timestamp(),
+        sample_size=1,
+    )
+    result = preview.run(db_session, inventory_path)
+
+    # Hot files other than old.PDF fail the name criterion
+    assert result["to_cold"]["file_count"] == 3
+    assert result["to_cold"]["total_bytes"] == 12010
+    assert len(result["to_cold"]["samples"]) == 1
+    assert result["to_hot"]["file_count"] == 2
+    assert result["criteria_streamed"] == 1
+    # Only rows with .pdf or no extension are streamed
+    assert result["rows_streamed"] == 4
+    assert [c["criterion_type"] for c in result["unevaluated_criteria"]] == [CriterionType.USER]
+
+
+def test_preview_invalid_values_match_nothing(db_session, inventory_path):
+    result = preview_criteria(
+        db_session,
+        inventory_path,
+        [criterion(CriterionType.SIZE, Operator.GT, "lots")],
+        now=NOW.timestamp(),
+    )
+
+    assert result["to_cold"]["file_count"] == 4
+    assert result["to_hot"]["file_count"] == 0
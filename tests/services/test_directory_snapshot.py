@@ -0,0 +1,117 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from app.models import DirectorySnapshot, MonitoredPath
+from app.services.directory_snapshot import DirectorySnapshotTracker
+from app.services.file_workflow_service import FileWorkflowService
+
+
+def _age_dirs(root: Path):
+    """Push directory mtimes out of the racy window."""
+    old = time.time() - 3600
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (old, old))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "hot"
+    (root / "a" / "deep").mkdir(parents=True)
+    (root / "b").mkdir()
+    (root / "top.txt").touch()
+    (root / "a" / "one.txt").touch()
+    (root / "a" / "deep" / "two.txt").touch()
+    (root / "b" / "three.txt").touch()
+    _age_dirs(root)
+    return root
+
+
+@pytest.fixture
+def incremental_path(db_session, tree):
+    path = MonitoredPath(
+        name="Incremental",
+        source_path=str(tree),
+        incremental_scan=True,
+        full_scan_interval_hours=24,
+    )
+    db_session.add(path)
+    db_session.commit()
+    return path
+
+
+def _scan(service, path, db_session):
+    tracker = DirectorySnapshotTracker.for_path(path, db_session)
+    names = sorted(Path(e.path).name for e in service._recursive_scandir(path.source_path, tracker))
+    tracker.save(db_session)
+    if tracker.full_scan:
+        path.last_full_scan_at = datetime.now(timezone.utc)
+        db_session.commit()
+    return tracker, names
+
+
+def test_non_incremental_path_does_not_persist(db_session, tree):
+    path = MonitoredPath(name="Full", source_path=str(tree))
+    db_session.add(path)
+    db_session.commit()
+
+    tracker, names = _scan(FileWorkflowService(), path, db_session)
+
+    assert tracker.full_scan is True
+    assert len(names) == 4
+    assert db_session.query(DirectorySnapshot).count() == 0
+
+
+def test_incremental_scan_skips_unchanged_directories(db_session, incremental_path, tree):
+    service = FileWorkflowService()
+
+    first, names = _scan(service, incremental_path, db_session)
+    assert first.full_scan is True
+    assert first.dirs_walked == 4
+    assert names == ["one.txt", "three.txt", "top.txt", "two.txt"]
+    assert db_session.query(DirectorySnapshot).count() == 4
+
+    # Add a file deep in the tree; only that directory changes
+    (tree / "a" / "deep" / "new.txt").touch()
+    old = time.time() - 1800
+    os.utime(tree / "a" / "deep", (old, old))
+
+    second, names = _scan(service, incremental_path, db_session)
+    assert second.full_scan is False
+    assert second.dirs_walked == 1
+    assert second.dirs_skipped == 3
+    assert names == ["new.txt", "two.txt"]
+    assert str(tree / "a") in second.skipped_dirs
+    assert str(tree / "a" / "deep") not in second.skipped_dirs
+
+
+def test_full_scan_forced_after_interval(db_session, incremental_path):
+    service = FileWorkflowService()
+    _scan(service, incremental_path, db_session)
+
+    incremental_path.last_full_scan_at = datetime.now(timezone.utc) - timedelta(hours=25)
+    db_session.commit()
+
+    tracker, names = _scan(service, incremental_path, db_session)
+    assert tracker.full_scan is True
+    assert tracker.dirs_skipped == 0
+    assert len(names) == 4
+
+
+def test_removed_directory_snapshot_is_dropped(db_session, incremental_path, tree):
+    service = FileWorkflowService()
+    _scan(service, incremental_path, db_session)
+
+    (tree / "b" / "three.txt").unlink()
+    (tree / "b").rmdir()
+    _age_dirs(tree)
+
+    tracker, names = _scan(service, incremental_path, db_session)
+    assert tracker.full_scan is False
+    assert "three.txt" not in names
+    dirs = {s.dir_path for s in db_session.query(DirectorySnapshot).all()}
+    assert str(tree / "b") not in dirs
+    assert len(dirs) == 3
@@ -0,0 +1,110 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from app.services.exclude_rules import ExcludeMatcher
+from app.services.file_workflow_service import FileWorkflowService
+from app.services.parallel_walker import ParallelDirectoryWalker
+
+
+@pytest.mark.parametrize(
+    ("patterns", "name", "rel_path", "is_dir", "expected"),
+    [
+        (["node_modules/"], "node_modules", "a/node_modules", True, True),
+        (["node_modules/"], "node_modules", "a/node_modules", False, False),
+        (["*.tmp"], "x.tmp", "deep/dir/x.tmp", False, True),
+        (["*.tmp"], "x.tmp.keep", "x.tmp.keep", False, False),
+        (["/build"], "build", "build", True, True),
+        (["/build"], "build", "src/build", True, False),
+        (["docs/tmp"], "tmp", "docs/tmp", True, True),
+        (["docs/tmp"], "tmp", "x/docs/tmp", True, False),
+        (["cache/**"], "cache", "cache", True, True),
+        (["cache/**"], "cache", "cache", False, False),
+        (["**/logs/*.log"], "a.log", "x/y/logs/a.log", False, True),
+        (["**/logs/*.log"], "a.log", "logs/a.log", False, True),
+        (["a/**/b"], "b", "a/x/y/b", True, True),
+        (["a/**/b"], "b", "a/b", True, True),
+        (["file?.txt"], "file1.txt", "file1.txt", False, True),
+        (["file[0-9].txt"], "fileA.txt", "fileA.txt", False, False),
+        (["file[!0-9].txt"], "fileA.txt", "fileA.txt", False, True),
+        (["*.bak", "# comment", ""], "x.bak", "x.bak", False, True),
+        ([], ".hidden", ".hidden", False, True),
+    ],
+)
+def test_exclude_semantics(patterns, name, rel_path, is_dir, expected):
+    assert ExcludeMatcher(patterns).excludes(name, rel_path, is_dir) is expected
+
+
+def test_literal_names_do_not_need_path():
+    matcher = ExcludeMatcher(["node_modules/", "thumbs.db", ".cache"])
+    assert not matcher.needs_path
+    assert matcher.excludes("thumbs.db", "", False)
+    assert ExcludeMatcher(["*.tmp"]).needs_path
+
+
+def test_hidden_entries_can_be_kept():
+    matcher = ExcludeMatcher([], skip_hidden=False)
+    assert not matcher.excludes(".env", ".env", False)
+
+
+@pytest.mark.parametrize("pattern", ["!keep.txt", "[z-a]"])
+def test_invalid_patterns_rejected(pattern):
+    with pytest.raises(ValueError):
+        ExcludeMatcher([pattern])
+
+
+@pytest.fixture
+def project_tree(tmp_path):
+    root = tmp_path / "root"
+    for rel in [
+        "src/main.py",
+        "src/main.tmp",
+        "node_modules/pkg/index.js",
+        "app/node_modules/pkg/index.js",
+        "build/out.bin",
+        "src/build/keep.txt",
+        "cache/a/b.dat",
+    ]:
+        f = root / rel
+        f.parent.mkdir(parents=True, exist_ok=True)
+        f.write_text("x")
+    return root
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_walk_prunes_excluded_directories(project_tree, threads):
+    service = FileWorkflowService()
+    matcher = ExcludeMatcher(
+        [*FileWorkflowService.IGNORED_PATTERNS, "node_modules/", "*.tmp", "/build", "cache/**"]
+    )
+
+    with pytest.MonkeyPatch.context() as mp:
+        listed = []
+        real_scandir = os.scandir
+        mp.setattr("os.scandir", lambda p: listed.append(str(p)) or real_scandir(p))
+        files = service._walk(project_tree, threads, excludes=matcher)
+        found = sorted(str(Path(e.path).relative_to(project_tree)) for e in files)
+
+    assert found == ["src/build/keep.txt", "src/main.py"]
+    # Pruned directories are never listed
+    assert not [d for d in listed if "node_modules" in d or d.endswith("cache")]
+
+
+def test_parallel_walker_prunes(project_tree):
+    matcher = ExcludeMatcher(["node_modules/", "*.tmp", "/build", "cache/**"])
+    found = {
+        str(Path(e.path).relative_to(project_tree))
+        for e in ParallelDirectoryWalker(3, matcher).walk(str(project_tree))
+    }
+    assert found == {"src/build/keep.txt", "src/main.py"}
+
+
+def test_excludes_path_checks_parent_directories():
+    matcher = ExcludeMatcher(["node_modules/", "/build", "*.tmp"])
+    assert matcher.excludes_path("src/node_modules/pkg/index.js", False)
+    assert matcher.excludes_path("build/out.o", False)
+    assert matcher.excludes_path("src/a.tmp", False)
+    assert matcher.excludes_path(".git/config", False)
+    assert not matcher.excludes_path("src/build/out.o", False)
+    assert not matcher.excludes_path("src/main.py", False)
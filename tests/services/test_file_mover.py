@@ -1,7 +1,7 @@
 import os
 import shutil
 from pathlib import Path
-from unittest.mock import MagicMock, patch, call
+from unittest.mock import ANY, MagicMock, patch, call
 
 import pytest
 from app.models import MonitoredPath, OperationType
@@ -10,6 +10,7 @@ from app.services.file_mover import (
     _move,
     _copy,
     _move_and_symlink,
+    link_file,
     move_with_rollback,
     preserve_directory_structure,
 )
@@ -133,7 +134,7 @@ def test_move_cross_filesystem(mock_unlink, mock_copy, mock_rename, source_and_d
     assert success is True
     assert error is None
     mock_rename.assert_called_once_with(dest)
-    mock_copy.assert_called_once_with(source, dest, None)
+    mock_copy.assert_called_once_with(source, dest, None, None)
     mock_unlink.assert_called_once()
 
 
@@ -150,11 +151,11 @@ def test_copy(mock_copy_with_progress, source_and_dest):
 
     assert success is True
     assert error is None
-    mock_copy_with_progress.assert_called_once_with(source, dest, None)
+    mock_copy_with_progress.assert_called_once_with(source, dest, None, None)
 
 
-@patch("shutil.copy2", side_effect=Exception("Disk full"))
-def test_copy_exception(mock_copy2, source_and_dest):
+@patch("app.services.copy_engine.copy_file_data", side_effect=Exception("Disk full"))
+def test_copy_exception(mock_copy_file_data, source_and_dest):
     """Test that _copy handles exceptions."""
     source, dest = source_and_dest
     success, error = _copy(source, dest, None)
@@ -206,7 +207,7 @@ def test_move_and_symlink_file(mock_symlink_to, mock_move, source_and_dest):
 
     assert success is True
     assert error is None
-    mock_move.assert_called_once_with(source, dest, None)
+    mock_move.assert_called_once_with(source, dest, None, None)
     mock_symlink_to.assert_called_once()
 
 
@@ -243,51 +244,33 @@ def test_move_with_rollback_success(mock_move, mock_verifier, source_and_dest):
     """Test move_with_rollback with successful move and checksum verification."""
     source, dest = source_and_dest
     mock_move.return_value = (True, None)
-    mock_verifier.calculate_checksum.side_effect = ["checksum1", "checksum1"]
+    mock_verifier.calculate_checksum.side_effect = ["checksum1"]
 
     success, error, checksum = move_with_rollback(source, dest, OperationType.MOVE)
 
     assert success is True
     assert error is None
     assert checksum == "checksum1"
-    mock_move.assert_called_once_with(source, dest, None)
-    mock_verifier.calculate_checksum.assert_has_calls([call(source), call(dest)])
+    mock_move.assert_called_once_with(source, dest, None, ANY)
+    # Renamed without copying: the destination is hashed once, the source not at all
+    mock_verifier.calculate_checksum.assert_called_once_with(dest)
 
 
-@patch("app.services.file_mover.checksum_verifier")
-@patch("app.services.file_mover._move")
-def test_move_with_rollback_checksum_mismatch(
-    mock_move, mock_verifier, source_and_dest, mocker
-):  # Removed mock_unlink, added mocker
-    """Test move_with_rollback with checksum mismatch triggers rollback."""
-    source, dest = source_and_dest
-    mock_move.return_value = (True, None)
-    mock_verifier.calculate_checksum.side_effect = ["checksum1", "checksum2"]
-
-    # Create the destination file so checksum_verifier doesn't fail immediately
-    dest.touch()
+def test_move_with_rollback_keeps_renamed_file_with_stale_checksum(source_and_dest):
+    """A renamed file that no longer matches its stored checksum is kept, with a fresh one."""
+    import hashlib
 
-    # Capture the real Path.exists BEFORE patching
-    _original_path_exists = Path.exists
-
-    # Patch Path.exists and Path.unlink at the class level
-    mock_path_exists = mocker.patch("pathlib.Path.exists", autospec=True)
-    mock_path_unlink = mocker.patch("pathlib.Path.unlink", autospec=True)
+    source, dest = source_and_dest
+    content = source.read_bytes()
 
-    # Return True for the dest path in rollback check; delegate to the real method otherwise
-    def custom_exists_side_effect(path_obj):
-        if path_obj == dest:
-            return True
-        return _original_path_exists(path_obj)
+    success, error, checksum = move_with_rollback(
+        source, dest, OperationType.MOVE, source_checksum="stale"
+    )
 
-    mock_path_exists.side_effect = custom_exists_side_effect
-
-    success, error, checksum = move_with_rollback(source, dest, OperationType.MOVE)
-    assert success is False
-    assert "Checksum verification failed" in error
-    assert checksum == "checksum1"
-    # Ensure unlink was called on the correct destination path
-    mock_path_unlink.assert_called_once_with(dest)
+    # The rename left the destination as the only copy; it must not be deleted
+    assert success, error
+    assert dest.read_bytes() == content
+    assert checksum == hashlib.sha256(content).hexdigest()
 
 def test_move_symlink_direct(tmp_path):
     """Test _move_symlink when it points to an absolute path."""
@@ -323,12 +306,86 @@ def test_move_symlink_relative(tmp_path):
     assert dest.exists()
     assert dest.read_text() == "relative data"
 
-@patch("app.services.file_mover.shutil.copy2")
-@patch("app.services.file_mover.os.utime")
-def test_copy_no_progress(mock_utime, mock_copy2, source_and_dest):
-    """Test _copy_with_progress without callback (uses shutil.copy2)."""
-    source, dest = source_and_dest
+def test_copy_with_progress_records_strategy(tmp_path):
+    """_copy_with_progress copies through the copy engine and records the strategy used."""
+    from app.services import copy_engine
     from app.services.file_mover import _copy_with_progress
-    _copy_with_progress(source, dest, None)
-    mock_copy2.assert_called_once()
-    mock_utime.assert_called_once()
+
+    source = tmp_path / "source.bin"
+    source.write_bytes(os.urandom(200_000))
+    os.utime(source, ns=(1_000_000_000, 2_000_000_000))
+    dest = tmp_path / "dest.bin"
+
+    with copy_engine.recording_copies() as record:
+        _copy_with_progress(source, dest, None)
+
+    assert dest.read_bytes() == source.read_bytes()
+    assert dest.stat().st_mtime_ns == 2_000_000_000
+    assert record.strategy in copy_engine.STRATEGIES
+    assert record.bytes_copied == 200_000
+
+
+def test_link_file_symlink_operation(tmp_path):
+    """The destination becomes a hard link to the existing copy; the source a symlink."""
+    source = tmp_path / "hot" / "b.txt"
+    source.parent.mkdir()
+    source.write_text("content")
+    existing = tmp_path / "cold" / "a.txt"
+    existing.parent.mkdir()
+    existing.write_text("content")
+    destination = tmp_path / "cold" / "sub" / "b.txt"
+
+    success, error = link_file(source, existing, destination, OperationType.SYMLINK)
+
+    assert success, error
+    assert os.path.samefile(existing, destination)
+    assert source.is_symlink()
+    assert source.resolve() == destination.resolve()
+
+
+def test_link_file_keeps_source_when_link_fails(tmp_path):
+    source = tmp_path / "b.txt"
+    source.write_text("content")
+
+    success, error = link_file(source, tmp_path / "missing", tmp_path / "dest", OperationType.MOVE)
+
+    assert not success
+    assert "Hard link failed" in error
+    assert source.exists()
+
+
+@pytest.mark.parametrize("read_back", [True, False])
+def test_move_with_rollback_hashes_while_copying(source_and_dest, monkeypatch, read_back):
+    """A cross-device move reads the source once and the copy at most once."""
+    import hashlib
+
+    source, dest = source_and_dest
+    expected = hashlib.sha256(source.read_bytes()).hexdigest()
+    monkeypatch.setattr("app.services.file_mover.settings.verify_copy_read_back", read_back)
+    with patch("pathlib.Path.rename", side_effect=OSError), patch(
+        "app.services.file_mover.checksum_verifier.calculate_checksum",
+        side_effect=lambda path, algorithm=None, use_cache=True: expected,
+    ) as read:
+        success, error, checksum = move_with_rollback(source, dest, OperationType.MOVE)
+
+    assert success, error
+    assert checksum == expected
+    assert not source.exists()
+    # The source digest came from the copy stream; only the copy is re-read, if at all
+    assert [c.args[0] for c in read.call_args_list] == ([dest] if read_back else [])
+
+
+def test_move_with_rollback_keeps_source_when_copy_mismatches(source_and_dest):
+    """A source that no longer matches its known checksum is not removed."""
+    source, dest = source_and_dest
+    content = source.read_bytes()
+
+    with patch("pathlib.Path.rename", side_effect=OSError):
+        success, error, checksum = move_with_rollback(
+            source, dest, OperationType.MOVE, source_checksum="stale"
+        )
+
+    assert success is False
+    assert "Checksum verification failed" in error
+    assert source.read_bytes() == content
+    assert not dest.exists()
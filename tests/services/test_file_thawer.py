@@ -46,6 +46,43 @@ class TestFileThawer:
         assert inv.status == FileStatus.ACTIVE
         assert db_session.query(FileRecord).count() == 0
 
+    def test_thaw_file_refreshes_stale_checksum_after_rename(
+        self, db_session, tmp_path, file_inventory_factory
+    ):
+        """A renamed file whose stored checksum is stale is thawed with a fresh one."""
+        import hashlib
+
+        from app.services.scan_records import set_fingerprint
+
+        hot_file = tmp_path / "hot" / "test.txt"
+        cold_dir = tmp_path / "cold"
+        cold_dir.mkdir()
+        cold_file = cold_dir / "test.txt"
+        cold_file.write_text("content")
+
+        inv = file_inventory_factory(path=str(cold_file), storage_type=StorageType.COLD)
+        set_fingerprint(inv, cold_file.stat())
+        inv.checksum = "stale"
+        record = FileRecord(
+            path_id=inv.path_id,
+            original_path=str(hot_file),
+            cold_storage_path=str(cold_file),
+            file_size=7,
+            operation_type=OperationType.MOVE,
+        )
+        db_session.add(record)
+        db_session.commit()
+
+        success, error = FileThawer.thaw_file(record, db=db_session)
+
+        assert success is True, f"Thaw failed: {error}"
+        assert hot_file.read_text() == "content"
+        db_session.refresh(inv)
+        assert inv.storage_type == StorageType.HOT
+        assert inv.file_path == str(hot_file)
+        assert inv.checksum == hashlib.sha256(b"content").hexdigest()
+        assert db_session.query(FileRecord).count() == 0
+
     def test_thaw_file_encrypted_success(self, db_session, tmp_path, file_inventory_factory):
         """Test thawing an encrypted file."""
         hot_dir = tmp_path / "hot"
@@ -1,4 +1,5 @@
 
+import os
 import time
 from concurrent.futures import Future
 from datetime import datetime, timezone
@@ -6,7 +7,9 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch, call, ANY
 
 import pytest
-from app.models import MonitoredPath, Criteria, CriterionType, Operator, FileInventory, FileStatus, StorageType, ScanStatus, ColdStorageLocation
+from app.models import MonitoredPath, Criteria, CriterionType, Operator, FileInventory, FileStatus, StorageType, ScanStatus, ColdStorageLocation, ScanSeenRange, MetadataEnrichmentTask
+from app.services import copy_engine
+from app.services.criteria_compiler import CompiledCriteria
 from app.services.file_workflow_service import FileWorkflowService
 
 @pytest.fixture
@@ -137,11 +140,11 @@ def test_process_path_main_workflow(
     assert result["errors"] == []
     assert db_session.query(MonitoredPath).get(monitored_path.id).last_scan_status == ScanStatus.SUCCESS
 
-    mock_scan_path.assert_called_once_with(monitored_path, db_session)
-    mock_process_single_file.assert_called_once_with(file_to_move, [1], monitored_path)
+    mock_scan_path.assert_called_once_with(monitored_path, db_session, dispatcher=ANY)
+    mock_process_single_file.assert_called_once_with(file_to_move, [1], monitored_path.id)
 
 
-@patch("app.services.file_workflow_service.CriteriaMatcher.match_file")
+@patch("app.services.criteria_compiler.CompiledCriteria.match_batch")
 @patch("app.services.file_workflow_service.FileWorkflowService._recursive_scandir")
 @patch("app.services.file_workflow_service.FileWorkflowService._update_file_inventory")
 @patch("app.services.file_workflow_service.check_atime_availability", return_value=(True, None))
@@ -149,7 +152,7 @@ def test_scan_path(
     mock_check_atime,
     mock_update_inventory,
     mock_scandir,
-    mock_match_file,
+    mock_match_batch,
     monitored_path,
     db_session,
     tmp_path
@@ -191,8 +194,8 @@ def test_scan_path(
         ]
     ]
     
-    # Mock CriteriaMatcher to control which files match
-    def match_file_side_effect(file_path, criteria, actual_file_path):
+    # Mock the compiled criteria to control which files match
+    def match_file_side_effect(file_path):
         if file_path == file_to_freeze:
             return False, [] # Not active -> move to cold
         if file_path == file_to_keep:
@@ -201,7 +204,9 @@ def test_scan_path(
             return True, [2] # Active -> thaw from cold
         return True, []
 
-    mock_match_file.side_effect = match_file_side_effect
+    mock_match_batch.side_effect = lambda batch: [
+        match_file_side_effect(file_path)[0] for file_path in batch.file_paths
+    ]
 
     service = FileWorkflowService()
     result = service._scan_path(monitored_path, db_session)
@@ -216,7 +221,7 @@ def test_scan_path(
 
 @patch("app.services.file_workflow_service.FileMover.move_with_rollback")
 @patch("app.services.file_workflow_service.storage_routing_service.select_storage_location")
-@patch("app.services.file_workflow_service.checksum_verifier.calculate_checksum")
+@patch("app.services.checksum_verifier.checksum_verifier.calculate_checksum")
 @patch("app.services.file_workflow_service.audit_trail_service")
 @patch("app.services.file_workflow_service.scan_progress_manager")
 def test_process_single_file(
@@ -256,7 +261,7 @@ def test_process_single_file(
             "app.services.file_workflow_service.SessionFactory",
             side_effect=lambda: db_session,
         ):
-            result = service._process_single_file(file_to_move, [1], monitored_path)
+            result = service._process_single_file(file_to_move, [1], monitored_path.id)
     finally:
         db_session.close = original_close
 
@@ -270,7 +275,68 @@ def test_process_single_file(
     mock_audit_trail.log_freeze_operation.assert_called_once()
 
 
-@patch("app.services.file_workflow_service.checksum_verifier.calculate_checksum")
+@patch("app.services.file_workflow_service.FileMover.move_with_rollback")
+@patch("app.services.file_workflow_service.storage_routing_service.select_storage_location")
+@patch("app.services.checksum_verifier.checksum_verifier.calculate_checksum")
+@patch("app.services.file_workflow_service.audit_trail_service")
+@patch("app.services.file_workflow_service.scan_progress_manager")
+def test_process_single_file_reuses_checksum_with_matching_fingerprint(
+    mock_scan_progress,
+    mock_audit_trail,
+    mock_checksum,
+    mock_select_location,
+    mock_move,
+    monitored_path,
+    file_inventory,
+    db_session,
+    tmp_path,
+):
+    """A stored checksum whose fingerprint matches the file is not recomputed."""
+    from app.services.scan_records import set_fingerprint
+
+    hot_path = tmp_path / "hot"
+    hot_path.mkdir()
+    cold_path = tmp_path / "cold"
+    cold_path.mkdir()
+    monitored_path.source_path = str(hot_path)
+    file_to_move = hot_path / "file.txt"
+    file_to_move.write_text("content")
+
+    inventory = file_inventory(file_to_move, StorageType.HOT, FileStatus.ACTIVE)
+    set_fingerprint(inventory, file_to_move.stat())
+    inventory.checksum = "stored"
+    db_session.commit()
+
+    def move(source, dest, *args, **kwargs):
+        source.rename(dest)
+        return True, None, kwargs["source_checksum"]
+
+    mock_select_location.return_value = MagicMock(id=1, path=str(cold_path))
+    mock_move.side_effect = move
+
+    service = FileWorkflowService()
+    original_close = db_session.close
+    db_session.close = lambda: None
+    try:
+        with patch(
+            "app.services.file_workflow_service.SessionFactory",
+            side_effect=lambda: db_session,
+        ):
+            result = service._process_single_file(file_to_move, [1], monitored_path.id)
+    finally:
+        db_session.close = original_close
+
+    assert result["success"] is True
+    mock_checksum.assert_not_called()
+    assert mock_move.call_args.kwargs["source_checksum"] == "stored"
+    db_session.expire_all()
+    reloaded = db_session.get(FileInventory, inventory.id)
+    # The row now carries the fingerprint of the cold copy
+    assert reloaded.file_inode == (cold_path / "file.txt").stat().st_ino
+    assert reloaded.checksum == "stored"
+
+
+@patch("app.services.checksum_verifier.checksum_verifier.calculate_checksum")
 @patch("app.services.file_workflow_service.audit_trail_service")
 def test_thaw_single_file(
     mock_audit_trail,
@@ -312,7 +378,7 @@ def test_thaw_single_file(
             "app.services.file_workflow_service.SessionFactory",
             side_effect=lambda: db_session,
         ):
-            result = service._thaw_single_file(symlink_path, cold_file, monitored_path)
+            result = service._thaw_single_file(symlink_path, cold_file, monitored_path.id)
     finally:
         db_session.close = original_close
 
@@ -326,6 +392,110 @@ def test_thaw_single_file(
 
     mock_audit_trail.log_thaw_operation.assert_called_once()
 
+
+@patch("app.services.file_workflow_service.storage_routing_service.select_storage_location")
+@patch("app.services.file_workflow_service.audit_trail_service")
+@patch("app.services.file_workflow_service.scan_progress_manager")
+def test_process_single_file_refreshes_stale_checksum_after_rename(
+    mock_scan_progress,
+    mock_audit_trail,
+    mock_select_location,
+    monitored_path,
+    file_inventory,
+    db_session,
+    tmp_path,
+):
+    """A renamed file whose stored checksum is stale stays frozen and gets a fresh one."""
+    import hashlib
+
+    from app.services.scan_records import set_fingerprint
+
+    hot_path = tmp_path / "hot"
+    hot_path.mkdir()
+    cold_path = tmp_path / "cold"
+    cold_path.mkdir()
+    monitored_path.source_path = str(hot_path)
+    file_to_move = hot_path / "file.txt"
+    file_to_move.write_text("content")
+
+    inventory = file_inventory(file_to_move, StorageType.HOT, FileStatus.ACTIVE)
+    set_fingerprint(inventory, file_to_move.stat())
+    inventory.checksum = "stale"
+    db_session.commit()
+    mock_select_location.return_value = MagicMock(id=1, path=str(cold_path))
+
+    service = FileWorkflowService()
+    original_close = db_session.close
+    db_session.close = lambda: None
+    try:
+        with patch(
+            "app.services.file_workflow_service.SessionFactory",
+            side_effect=lambda: db_session,
+        ):
+            result = service._process_single_file(file_to_move, [1], monitored_path.id)
+    finally:
+        db_session.close = original_close
+
+    assert result["success"] is True
+    assert (cold_path / "file.txt").read_text() == "content"
+    db_session.expire_all()
+    reloaded = db_session.get(FileInventory, inventory.id)
+    assert reloaded.storage_type == StorageType.COLD
+    assert reloaded.checksum == hashlib.sha256(b"content").hexdigest()
+
+
+@patch("app.services.file_workflow_service.audit_trail_service")
+def test_thaw_single_file_refreshes_stale_checksum_after_rename(
+    mock_audit_trail,
+    monitored_path,
+    file_inventory,
+    db_session,
+    tmp_path,
+):
+    """A thawed file whose stored checksum is stale is kept in hot storage, not orphaned."""
+    import hashlib
+
+    from app.services.scan_records import set_fingerprint
+
+    hot_path = tmp_path / "hot"
+    hot_path.mkdir()
+    cold_path = tmp_path / "cold"
+    cold_path.mkdir()
+    monitored_path.source_path = str(hot_path)
+    monitored_path.storage_locations[0].path = str(cold_path)
+
+    cold_file = cold_path / "file.txt"
+    cold_file.write_text("content")
+    symlink_path = hot_path / "file.txt"
+    symlink_path.symlink_to(cold_file)
+
+    inventory = file_inventory(symlink_path, StorageType.COLD, FileStatus.ACTIVE)
+    set_fingerprint(inventory, cold_file.stat())
+    inventory.checksum = "stale"
+    db_session.commit()
+
+    service = FileWorkflowService()
+    original_close = db_session.close
+    db_session.close = lambda: None
+    try:
+        with patch(
+            "app.services.file_workflow_service.SessionFactory",
+            side_effect=lambda: db_session,
+        ):
+            result = service._thaw_single_file(symlink_path, cold_file, monitored_path.id)
+    finally:
+        db_session.close = original_close
+
+    assert result["success"] is True
+    assert not symlink_path.is_symlink()
+    assert symlink_path.read_text() == "content"
+    db_session.expire_all()
+    reloaded = db_session.get(FileInventory, inventory.id)
+    assert reloaded.storage_type == StorageType.HOT
+    assert reloaded.file_path == str(symlink_path)
+    assert reloaded.checksum == hashlib.sha256(b"content").hexdigest()
+
+
 def test_recursive_scandir(tmp_path):
     """Test the recursive directory scanning utility."""
     # Setup nested structure
@@ -349,3 +519,589 @@ def test_recursive_scandir(tmp_path):
     assert "f2.txt" in names
     assert ".DS_Store" not in names
     assert len(files) == 2
+
+
+@patch(
+    "app.services.criteria_compiler.CompiledCriteria.match_batch",
+    side_effect=lambda batch: [False] * len(batch),
+)
+@patch("app.services.file_workflow_service.check_atime_availability", return_value=(True, None))
+def test_scan_path_streams_moves_per_chunk(
+    mock_check_atime, mock_match_batch, monitored_path, db_session, tmp_path
+):
+    """Moves are dispatched chunk by chunk, each after its inventory rows are written."""
+    hot_path = tmp_path / "hot"
+    hot_path.mkdir()
+    cold_path = tmp_path / "cold"
+    cold_path.mkdir()
+    monitored_path.source_path = str(hot_path)
+    monitored_path.storage_locations[0].path = str(cold_path)
+    db_session.commit()
+
+    for i in range(7):
+        (hot_path / f"file{i}.txt").write_text(str(i))
+
+    dispatched = []
+
+    def record_freeze(file_path, matched_ids):
+        in_inventory = (
+            db_session.query(FileInventory).filter_by(file_path=str(file_path)).count() == 1
+        )
+        dispatched.append((file_path, in_inventory))
+
+    dispatcher = MagicMock()
+    dispatcher.freeze.side_effect = record_freeze
+
+    service = FileWorkflowService()
+    with patch.object(FileWorkflowService, "INVENTORY_CHUNK_SIZE", 3):
+        with patch.object(
+            service, "_update_db_entries_batch", wraps=service._update_db_entries_batch
+        ) as mock_batch:
+            result = service._scan_path(monitored_path, db_session, dispatcher=dispatcher)
+
+    assert result["to_cold"] == []
+    assert result["files_found"] == 7
+    assert len(dispatched) == 7
+    assert all(in_inventory for _, in_inventory in dispatched)
+    # Two full hot chunks during the walk, then the remainder with the final sync
+    hot_chunk_sizes = [
+        len(c.args[1]) for c in mock_batch.call_args_list if c.args[2] == StorageType.HOT
+    ]
+    assert hot_chunk_sizes == [3, 3, 1]
+
+
+def test_move_dispatcher_bounds_pending_jobs(monitored_path):
+    """The dispatcher never lets more than max_pending jobs wait and collects every result."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.services.file_workflow_service import _MoveDispatcher
+
+    service = FileWorkflowService()
+    max_seen = []
+    path_ids = set()
+    results = {"files_moved": 0, "errors": []}
+
+    def fake_freeze(file_path, matched_ids, path_id):
+        path_ids.add(path_id)
+        time.sleep(0.01)
+        if file_path.name == "bad.txt":
+            return {"success": False, "error": "boom"}
+        return {"success": True}
+
+    with patch.object(service, "_process_single_file", side_effect=fake_freeze), patch(
+        "app.services.file_workflow_service.scan_progress_manager"
+    ):
+        with ThreadPoolExecutor(max_workers=2) as freeze_pool, ThreadPoolExecutor(
+            max_workers=1
+        ) as thaw_pool:
+            dispatcher = _MoveDispatcher(service, monitored_path, freeze_pool, thaw_pool, results, 3)
+            for i in range(10):
+                dispatcher.freeze(Path(f"/tmp/hot/f{i}.txt"), [])
+                max_seen.append(len(dispatcher._pending))
+            dispatcher.freeze(Path("/tmp/hot/bad.txt"), [])
+            dispatcher.drain()
+
+    assert max(max_seen) <= 3
+    assert results["files_moved"] == 10
+    assert results["errors"] == ["boom"]
+    # Jobs load the path in their own session rather than sharing the scan's object
+    assert path_ids == {monitored_path.id}
+
+
+@patch("app.services.file_workflow_service.check_atime_availability", return_value=(True, None))
+def test_scan_path_reuses_stats_and_counts_syscalls(
+    mock_check_atime, monitored_path, db_session, tmp_path
+):
+    """Criteria reuse the walk's stat, symlinks resolve via readlink, cold checks stay in memory."""
+    hot_path = tmp_path / "hot"
+    (hot_path / "sub").mkdir(parents=True)
+    cold_path = tmp_path / "cold"
+    cold_path.mkdir()
+    monitored_path.source_path = str(hot_path)
+    monitored_path.storage_locations[0].path = str(cold_path)
+    # Keep everything hot so nothing is queued
+    db_session.add(
+        Criteria(path_id=monitored_path.id, criterion_type=CriterionType.MTIME, operator=Operator.GT, value="-1")
+    )
+    db_session.commit()
+    db_session.refresh(monitored_path)
+
+    for i in range(5):
+        (hot_path / "sub" / f"file{i}.txt").write_text("x")
+    # Frozen file: relative symlink in hot pointing into cold storage
+    (cold_path / "frozen.txt").write_text("cold")
+    (hot_path / "frozen.txt").symlink_to(os.path.relpath(cold_path / "frozen.txt", hot_path))
+    # Cold-only file whose hot counterpart does not exist
+    (cold_path / "orphan.txt").write_text("orphan")
+
+    service = FileWorkflowService()
+    with patch(
+        "app.services.criteria_compiler.CompiledCriteria.match_file",
+        autospec=True,
+        side_effect=CompiledCriteria.match_file,
+    ) as mock_match, patch(
+        "app.services.criteria_compiler.CompiledCriteria.match_batch",
+        autospec=True,
+        side_effect=CompiledCriteria.match_batch,
+    ) as mock_match_batch:
+        result = service._scan_path(monitored_path, db_session)
+
+    # Every criteria evaluation reused a stat result from the walk: hot files in one
+    # batch, cold files one by one
+    batches = [c.args[1] for c in mock_match_batch.call_args_list]
+    assert sum(len(batch) for batch in batches) + mock_match.call_count == 7
+    assert all(st is not None for batch in batches for st in batch.stats)
+    assert all(c.kwargs["stat_info"] is not None for c in mock_match.call_args_list)
+
+    calls = result["syscalls"]
+    assert calls["scandir"] == 3  # hot, hot/sub, cold
+    assert calls["lstat"] == 8  # 6 hot entries + 2 cold files
+    assert calls["readlink"] == 1
+    assert calls["stat"] == 1  # symlink target only
+    assert "resolve" not in calls
+    assert "exists" not in calls
+    assert calls["total"] == 13
+
+    # Frozen file is thawed (criteria say keep hot), orphan is pulled back as well
+    assert result["to_hot"] == [
+        (hot_path / "frozen.txt", cold_path / "frozen.txt"),
+        (hot_path / "orphan.txt", cold_path / "orphan.txt"),
+    ]
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_scan_path_walks_all_cold_locations(monitored_path, db_session, tmp_path, threads):
+    """Every attached cold location is walked and merged into one inventory sync and thaw pass."""
+    hot_path = tmp_path / "hot"
+    hot_path.mkdir()
+    first_cold = tmp_path / "cold_a"
+    second_cold = tmp_path / "cold_b"
+    for cold in (first_cold, second_cold):
+        (cold / "sub").mkdir(parents=True)
+    monitored_path.source_path = str(hot_path)
+    monitored_path.max_scan_threads = threads
+    monitored_path.storage_locations[0].path = str(first_cold)
+    second = ColdStorageLocation(name="Second", path=str(second_cold))
+    monitored_path.storage_locations.append(second)
+    # Keep everything hot, so cold-only files are thawed
+    db_session.add(
+        Criteria(path_id=monitored_path.id, criterion_type=CriterionType.MTIME, operator=Operator.GT, value="-1")
+    )
+    db_session.commit()
+    db_session.refresh(monitored_path)
+
+    (hot_path / "hot.txt").write_text("hot")
+    for i in range(3):
+        (first_cold / "sub" / f"a{i}.txt").write_text("a")
+        (second_cold / "sub" / f"b{i}.txt").write_text("b")
+    # Present in both locations: thawed only once
+    (first_cold / "dup.txt").write_text("a")
+    (second_cold / "dup.txt").write_text("b")
+
+    with patch("app.config.settings.scan_walker_threads", threads):
+        result = FileWorkflowService()._scan_path(monitored_path, db_session)
+
+    thawed = {hot for hot, _ in result["to_hot"]}
+    assert len(result["to_hot"]) == len(thawed) == 7
+    assert hot_path / "sub" / "b2.txt" in thawed
+    assert hot_path / "dup.txt" in thawed
+
+    timings = {t["location_id"]: t for t in result["cold_locations"]}
+    assert set(timings) == {monitored_path.storage_locations[0].id, second.id}
+    assert timings[second.id]["files"] == 4
+    assert timings[second.id]["error"] is None
+    assert all(t["seconds"] >= 0 for t in timings.values())
+
+    cold_rows = (
+        db_session.query(FileInventory)
+        .filter(FileInventory.path_id == monitored_path.id, FileInventory.storage_type == StorageType.COLD)
+        .all()
+    )
+    assert len(cold_rows) == 8
+    assert {row.cold_storage_location_id for row in cold_rows if row.file_path.startswith(str(second_cold))} == {second.id}
+
+
+@patch("app.services.file_workflow_service.scan_progress_manager")
+def test_process_changes_only_touches_changed_entries(
+    mock_scan_progress, monitored_path, db_session, file_inventory, tmp_path
+):
+    """Watched changes sync inventory for the reported entries and walk reported subtrees."""
+    mock_scan_progress.start_scan.return_value = ("scan123", True)
+    hot_path = tmp_path / "hot"
+    (hot_path / "new_dir").mkdir(parents=True)
+    cold_path = tmp_path / "cold"
+    cold_path.mkdir()
+    monitored_path.source_path = str(hot_path)
+    monitored_path.storage_locations[0].path = str(cold_path)
+    db_session.commit()
+
+    # Only files over 1G stay hot, so every file evaluated is frozen
+    db_session.add(
+        Criteria(path_id=monitored_path.id, criterion_type=CriterionType.SIZE, operator=Operator.GT, value="1G")
+    )
+    db_session.commit()
+    db_session.refresh(monitored_path)
+
+    (hot_path / "changed.txt").write_text("changed")
+    (hot_path / "untouched.txt").write_text("untouched")
+    (hot_path / "new_dir" / "inside.txt").write_text("inside")
+    file_inventory(hot_path / "deleted.txt", StorageType.HOT, FileStatus.ACTIVE)
+    file_inventory(hot_path / "new_dir" / "gone.txt", StorageType.HOT, FileStatus.ACTIVE)
+    db_session.query(FileInventory).update({FileInventory.last_seen: datetime(2020, 1, 1, tzinfo=timezone.utc)})
+    db_session.commit()
+
+    service = FileWorkflowService()
+    frozen = []
+    with patch.object(
+        service,
+        "_process_single_file",
+        side_effect=lambda file_path, matched_ids, path: frozen.append(file_path)
+        or {"success": True},
+    ):
+        result = service.process_changes(
+            monitored_path,
+            db_session,
+            changed_paths=[str(hot_path / "changed.txt"), str(hot_path / "deleted.txt")],
+            rescan_dirs=[str(hot_path / "new_dir")],
+        )
+
+    assert result["errors"] == []
+    assert result["total_scanned"] == 2
+    assert result["files_removed"] == 2
+    assert result["files_moved"] == 2
+    # Files that were not reported are left alone
+    assert sorted(frozen) == [hot_path / "changed.txt", hot_path / "new_dir" / "inside.txt"]
+    paths = {e.file_path for e in db_session.query(FileInventory).all()}
+    assert paths == {str(hot_path / "changed.txt"), str(hot_path / "new_dir" / "inside.txt")}
+    mock_scan_progress.finish_scan.assert_called_once_with(monitored_path.id, status="completed")
+
+
+@patch("app.services.file_workflow_service.scan_progress_manager")
+def test_process_changes_skips_excluded_and_defers_while_scanning(
+    mock_scan_progress, monitored_path, db_session, tmp_path
+):
+    hot_path = tmp_path / "hot"
+    (hot_path / "cache").mkdir(parents=True)
+    (hot_path / "cache" / "blob.bin").write_text("x")
+    monitored_path.source_path = str(hot_path)
+    monitored_path.exclude_patterns = ["cache/"]
+    db_session.commit()
+    service = FileWorkflowService()
+
+    mock_scan_progress.start_scan.return_value = ("scan123", False)
+    result = service.process_changes(monitored_path, db_session, [str(hot_path / "cache" / "blob.bin")])
+    assert result["scan_skipped"] is True
+
+    mock_scan_progress.start_scan.return_value = ("scan123", True)
+    result = service.process_changes(monitored_path, db_session, [str(hot_path / "cache" / "blob.bin")])
+    assert result["total_scanned"] == 0
+    assert db_session.query(FileInventory).count() == 0
+
+
+def test_update_db_entries_batch_upserts_only_changed_rows(monitored_path, db_session, tmp_path):
+    """Inventory sync inserts new rows, rewrites changed ones and only touches the rest."""
+    from app.services.file_metadata import FileMetadataExtractor
+    from app.services.scan_records import ScanRecord
+
+    for name in ("same.txt", "grown.txt", "new.txt"):
+        (tmp_path / name).write_text(name)
+    records = {
+        name: ScanRecord.from_stat(str(tmp_path / name), os.stat(tmp_path / name))
+        for name in ("same.txt", "grown.txt", "new.txt")
+    }
+    service = FileWorkflowService()
+    assert service._update_db_entries_batch(
+        monitored_path, [records["same.txt"], records["grown.txt"]], StorageType.HOT, db_session
+    ) == 2
+    old_seen = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    db_session.query(FileInventory).update(
+        {FileInventory.last_seen: old_seen, FileInventory.checksum: "kept"}
+    )
+    db_session.query(MetadataEnrichmentTask).delete()
+    db_session.commit()
+
+    grown = records["grown.txt"]
+    grown.size += 10
+    with patch.object(
+        FileMetadataExtractor,
+        "extract_name_metadata",
+        wraps=FileMetadataExtractor.extract_name_metadata,
+    ) as extract, patch.object(FileMetadataExtractor, "compute_checksum") as compute_checksum:
+        count = service._update_db_entries_batch(
+            monitored_path, list(records.values()), StorageType.HOT, db_session
+        )
+
+    assert count == 3
+    # Existing rows already carry metadata, so only the new file is inspected
+    assert [c.args[0] for c in extract.call_args_list] == [tmp_path / "new.txt"]
+    # Hashing is left to the enrichment queue
+    compute_checksum.assert_not_called()
+    rows = {Path(e.file_path).name: e for e in db_session.query(FileInventory).all()}
+    assert len(rows) == 3
+    assert rows["grown.txt"].file_size == grown.size
+    # A changed fingerprint invalidates the stored checksum
+    assert rows["grown.txt"].checksum is None
+    assert rows["new.txt"].file_extension == ".txt"
+    assert rows["new.txt"].checksum is None
+    queued = {t.inventory_id for t in db_session.query(MetadataEnrichmentTask).all()}
+    assert queued == {rows["grown.txt"].id, rows["new.txt"].id}
+    # The unchanged row is not rewritten; it is recorded as seen instead
+    assert rows["same.txt"].last_seen.replace(tzinfo=None) == old_seen.replace(tzinfo=None)
+    assert rows["new.txt"].seen_generation == monitored_path.scan_generation
+    ranges = [(r.first_id, r.last_id) for r in db_session.query(ScanSeenRange).all()]
+    assert ranges == [(rows["same.txt"].id, rows["grown.txt"].id)]
+
+
+def test_update_db_entries_batch_invalidates_checksum_on_fingerprint_change(
+    monitored_path, db_session, tmp_path
+):
+    """Checksums survive rescans and are cleared when a file is rewritten in place."""
+    from app.services.scan_records import ScanRecord
+
+    names = ("same.txt", "rewritten.txt", "legacy.txt")
+    for name in names:
+        (tmp_path / name).write_text("1234")
+    service = FileWorkflowService()
+
+    def sync():
+        records = [ScanRecord.from_stat(str(tmp_path / n), os.stat(tmp_path / n)) for n in names]
+        return service._update_db_entries_batch(
+            monitored_path, records, StorageType.HOT, db_session
+        )
+
+    sync()
+    db_session.query(FileInventory).update({FileInventory.checksum: "stored"})
+    # Rows synced before fingerprints existed
+    db_session.query(FileInventory).filter(FileInventory.file_path.endswith("legacy.txt")).update(
+        {FileInventory.file_mtime_ns: None}, synchronize_session=False
+    )
+    db_session.query(MetadataEnrichmentTask).delete()
+    db_session.commit()
+
+    # Same size, new content and mtime
+    st = os.stat(tmp_path / "rewritten.txt")
+    (tmp_path / "rewritten.txt").write_text("abcd")
+    os.utime(tmp_path / "rewritten.txt", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    sync()
+
+    db_session.expire_all()
+    rows = {Path(e.file_path).name: e for e in db_session.query(FileInventory).all()}
+    assert rows["same.txt"].checksum == "stored"
+    assert rows["rewritten.txt"].checksum is None
+    assert rows["rewritten.txt"].file_mtime_ns == st.st_mtime_ns + 10**9
+    # The legacy row gets its fingerprint and keeps its checksum
+    assert rows["legacy.txt"].checksum == "stored"
+    assert rows["legacy.txt"].file_mtime_ns == os.stat(tmp_path / "legacy.txt").st_mtime_ns
+    queued = [t.inventory_id for t in db_session.query(MetadataEnrichmentTask).all()]
+    assert queued == [rows["rewritten.txt"].id]
+
+
+def test_update_file_inventory_deletes_rows_not_seen_by_generation(
+    monitored_path, db_session, file_inventory, tmp_path
+):
+    """Rows neither written by this scan generation nor in its seen ranges are missing."""
+    old_seen = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    gone = file_inventory(tmp_path / "gone.txt", StorageType.HOT, FileStatus.ACTIVE)
+    unchanged = file_inventory(tmp_path / "unchanged.txt", StorageType.HOT, FileStatus.ACTIVE)
+    written = file_inventory(tmp_path / "written.txt", StorageType.HOT, FileStatus.ACTIVE)
+    resynced = file_inventory(tmp_path / "resynced.txt", StorageType.HOT, FileStatus.ACTIVE)
+    monitored_path.scan_generation = 3
+    written.seen_generation = 3
+    gone.seen_generation = 2
+    # Overlapping ranges, as left by a resumed scan that re-walked a directory
+    db_session.add_all(
+        ScanSeenRange(path_id=monitored_path.id, scan_generation=g, first_id=a, last_id=b)
+        for g, a, b in [
+            (3, unchanged.id, resynced.id),
+            (3, written.id, written.id),
+            (2, gone.id, gone.id),
+        ]
+    )
+    db_session.commit()
+    db_session.query(FileInventory).update({FileInventory.last_seen: old_seen})
+    db_session.commit()
+
+    service = FileWorkflowService()
+    removed = service._update_file_inventory(
+        monitored_path, db_session, hot_files=[], cold_files=[], cold_prefixes=[]
+    )
+
+    assert removed == 1
+    remaining = {e.id for e in db_session.query(FileInventory).all()}
+    assert remaining == {unchanged.id, written.id, resynced.id}
+
+
+def test_scan_path_applies_tag_rules_in_bulk(monitored_path, db_session, tmp_path):
+    """Written inventory rows are tagged by enabled rules; rescans add no duplicates."""
+    from app.models import FileTag, Tag, TagRule, TagRuleCriterionType
+
+    hot_path = tmp_path / "hot"
+    hot_path.mkdir()
+    monitored_path.source_path = str(hot_path)
+    monitored_path.storage_locations[0].path = str(tmp_path / "cold")
+    db_session.add(
+        Criteria(path_id=monitored_path.id, criterion_type=CriterionType.MTIME, operator=Operator.GT, value="-1")
+    )
+    tag = Tag(name="Logs")
+    db_session.add(tag)
+    db_session.flush()
+    db_session.add(
+        TagRule(tag_id=tag.id, criterion_type=TagRuleCriterionType.EXTENSION, operator=Operator.EQ, value="log", enabled=True)
+    )
+    db_session.commit()
+    db_session.refresh(monitored_path)
+    for name in ("a.log", "b.log", "c.txt"):
+        (hot_path / name).write_text("x")
+
+    service = FileWorkflowService()
+    service._scan_path(monitored_path, db_session)
+    (hot_path / "a.log").write_text("changed")  # rewritten row is tagged again
+    service._scan_path(monitored_path, db_session)
+
+    tagged = {
+        Path(file_path).name
+        for (file_path,) in db_session.query(FileInventory.file_path).join(
+            FileTag, FileTag.file_id == FileInventory.id
+        )
+    }
+    assert tagged == {"a.log", "b.log"}
+    assert db_session.query(FileTag).count() == 2
+
+
+def test_scan_path_records_hardlink_groups(monitored_path, db_session, tmp_path):
+    """Hard links share a link group, which outlives the other links."""
+    hot_path = tmp_path / "hot"
+    hot_path.mkdir()
+    monitored_path.source_path = str(hot_path)
+    monitored_path.storage_locations[0].path = str(tmp_path / "cold")
+    db_session.add(
+        Criteria(path_id=monitored_path.id, criterion_type=CriterionType.MTIME, operator=Operator.GT, value="-1")
+    )
+    db_session.commit()
+    db_session.refresh(monitored_path)
+    (hot_path / "a.bin").write_text("x")
+    os.link(hot_path / "a.bin", hot_path / "b.bin")
+    (hot_path / "c.bin").write_text("y")
+
+    service = FileWorkflowService()
+    result = service._scan_path(monitored_path, db_session)
+
+    assert result["hardlinked_files"] == 2
+    assert result["hardlink_groups"] == 1
+    groups = {Path(e.file_path).name: e.link_group for e in db_session.query(FileInventory)}
+    assert groups["a.bin"] is not None
+    assert groups["a.bin"] == groups["b.bin"]
+    assert groups["c.bin"] is None
+
+    (hot_path / "b.bin").unlink()
+    (hot_path / "a.bin").write_text("changed")
+    result = service._scan_path(monitored_path, db_session)
+
+    assert result["hardlink_groups"] == 0
+    db_session.expire_all()
+    rows = {Path(e.file_path).name: e for e in db_session.query(FileInventory)}
+    # Same inode, so the group is kept for relinking the frozen link
+    assert rows["a.bin"].link_group == groups["a.bin"]
+
+
+@pytest.mark.parametrize("restart", [False, True])
+def test_freeze_and_thaw_relink_hardlinks_across_devices(
+    monitored_path, db_session, tmp_path, monkeypatch, restart
+):
+    """Each inode is copied and hashed once per direction; its other links are relinked."""
+    import errno
+    import hashlib
+
+    from app.services import file_mover
+    from app.services.checksum_verifier import checksum_verifier
+    from app.services.hardlinks import HardlinkRegistry
+    from app.services.scan_records import ScanRecord
+
+    hot_path = tmp_path / "hot"
+    cold_path = tmp_path / "cold"
+    (hot_path / "dir").mkdir(parents=True)
+    (cold_path / "dir").mkdir(parents=True)
+    monitored_path.source_path = str(hot_path)
+    location = monitored_path.storage_locations[0]
+    location.path = str(cold_path)
+    db_session.commit()
+    hot_files = [hot_path / "dir" / "a.bin", hot_path / "dir" / "b.bin"]
+    cold_files = [cold_path / "dir" / "a.bin", cold_path / "dir" / "b.bin"]
+    hot_files[0].write_bytes(b"payload")
+    os.link(hot_files[0], hot_files[1])
+
+    service = FileWorkflowService()
+    service._update_db_entries_batch(
+        monitored_path,
+        [ScanRecord.from_stat(str(p), p.stat()) for p in hot_files],
+        StorageType.HOT,
+        db_session,
+    )
+    # Checksums as the enrichment workers store them
+    db_session.query(FileInventory).update(
+        {FileInventory.checksum: hashlib.sha256(b"payload").hexdigest()}
+    )
+    db_session.commit()
+    group = db_session.query(FileInventory).first().link_group
+
+    def cross_device(self, target):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(Path, "rename", cross_device)
+    registry = HardlinkRegistry()
+    monkeypatch.setattr("app.services.file_workflow_service.hardlink_registry", registry)
+    copies = MagicMock(wraps=file_mover._copy_with_progress)
+    monkeypatch.setattr(file_mover, "_copy_with_progress", copies)
+    monkeypatch.setattr(db_session, "close", lambda: None)
+
+    strategies = []
+
+    def run(operation, *args):
+        if restart:
+            registry.clear()
+        with patch(
+            "app.services.file_workflow_service.SessionFactory", side_effect=lambda: db_session
+        ), patch(
+            "app.services.file_workflow_service.storage_routing_service.select_storage_location",
+            return_value=location,
+        ), patch("app.services.file_workflow_service.audit_trail_service") as audit, patch(
+            "app.services.file_workflow_service.scan_progress_manager"
+        ), patch(
+            "app.services.checksum_verifier.checksum_verifier.calculate_checksum",
+            wraps=checksum_verifier.calculate_checksum,
+        ) as checksum:
+            result = operation(*args)
+            assert result["success"] is True, result
+        strategies.extend(c.kwargs["copy_strategy"] for c in audit.method_calls)
+        return checksum.call_count
+
+    hashed = sum(run(service._process_single_file, p, [], monitored_path.id) for p in hot_files)
+
+    # Only the copy of the first link is read back for verification
+    assert hashed == 1
+    assert copies.call_count == 1
+    # The audit trail names how the data was copied; the second link copied nothing
+    assert strategies[0] in copy_engine.STRATEGIES
+    assert strategies[1] is None
+    assert not any(p.exists() for p in hot_files)
+    assert cold_files[0].stat().st_nlink == 2
+    assert os.path.samefile(cold_files[0], cold_files[1])
+    db_session.expire_all()
+    rows = db_session.query(FileInventory).order_by(FileInventory.id).all()
+    assert [r.file_path for r in rows] == [str(p) for p in cold_files]
+    assert {r.storage_type for r in rows} == {StorageType.COLD}
+    assert {r.link_group for r in rows} == {group}
+
+    hashed = sum(
+        run(service._thaw_single_file, hot, cold, monitored_path.id)
+        for hot, cold in zip(hot_files, cold_files)
+    )
+
+    assert hashed == 1
+    assert not any(p.exists() for p in cold_files)
+    assert os.path.samefile(hot_files[0], hot_files[1])
+    assert hot_files[1].read_bytes() == b"payload"
+    db_session.expire_all()
+    rows = db_session.query(FileInventory).order_by(FileInventory.id).all()
+    assert [r.file_path for r in rows] == [str(p) for p in hot_files]
+    assert {r.storage_type for r in rows} == {StorageType.HOT}
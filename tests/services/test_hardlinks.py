@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+
+from app.services.hardlinks import HardlinkRegistry, inode_key
+
+
+def test_lookup_validates_both_sides(tmp_path):
+    source = tmp_path / "a.bin"
+    source.write_bytes(b"data")
+    os.link(source, tmp_path / "b.bin")
+    copy = tmp_path / "copy.bin"
+    copy.write_bytes(b"data")
+    registry = HardlinkRegistry()
+
+    assert registry.lookup(source.stat()) is None
+    registry.record(source.stat(), copy, "sum")
+
+    placed = registry.lookup((tmp_path / "b.bin").stat())
+    assert placed.destination == str(copy)
+    assert placed.checksum == "sum"
+    assert placed.destination_key == inode_key(copy.stat())
+
+    # A replaced copy no longer stands in for the source
+    replacement = tmp_path / "replacement.bin"
+    replacement.write_bytes(b"data")
+    replacement.replace(copy)
+    assert registry.lookup(source.stat()) is None
+
+    registry.record(source.stat(), copy, "sum")
+    st = source.stat()
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert registry.lookup(source.stat()) is None
+
+
+def test_entries_are_bounded(tmp_path):
+    registry = HardlinkRegistry(max_entries=2)
+    files = []
+    for name in ("a", "b", "c"):
+        f = tmp_path / name
+        f.write_text(name)
+        registry.record(f.stat(), f, name)
+        files.append(f)
+
+    assert registry.lookup(files[0].stat()) is None
+    assert registry.lookup(files[2].stat()).checksum == "c"
+
+
+def test_locked_serializes_one_inode():
+    registry = HardlinkRegistry()
+    order = []
+
+    def hold(name, key):
+        with registry.locked(key):
+            order.append(f"{name} in")
+            time.sleep(0.05)
+            order.append(f"{name} out")
+
+    first = threading.Thread(target=hold, args=("first", (1, 2)))
+    first.start()
+    time.sleep(0.01)
+    second = threading.Thread(target=hold, args=("second", (1, 2)))
+    second.start()
+    with registry.locked(None), registry.locked((1, 3)):
+        order.append("other")
+    first.join()
+    second.join()
+
+    assert order.index("first out") < order.index("second in")
+    assert order.index("other") < order.index("first out")
+    assert registry._inode_locks == {}
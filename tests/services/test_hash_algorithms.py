@@ -0,0 +1,98 @@
+import errno
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from app.config import settings
+from app.services import hash_algorithms
+from app.services.checksum_verifier import ChecksumVerifier
+from app.services.file_metadata import FileMetadataExtractor
+from app.services.file_mover import move_verified
+from app.services.hash_algorithms import (
+    checksum_algorithm,
+    configured_algorithm,
+    format_checksum,
+    is_available,
+    new_hash,
+)
+
+DATA = b"cold storage" * 1000
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(DATA)
+    return path
+
+
+def test_checksums_record_their_algorithm():
+    sha = hashlib.sha256(DATA).hexdigest()
+    blake = hashlib.blake2b(DATA).hexdigest()
+
+    # SHA-256 stays bare hex, so existing checksums keep their meaning
+    assert format_checksum("sha256", sha) == sha
+    assert checksum_algorithm(sha) == "sha256"
+    assert format_checksum("blake2b", blake) == f"blake2b:{blake}"
+    assert checksum_algorithm(f"blake2b:{blake}") == "blake2b"
+    assert checksum_algorithm(f"XXH3:{blake[:32]}") == "xxh3"
+
+
+def test_unavailable_algorithms(monkeypatch):
+    assert is_available("sha256") and is_available("blake2b") and is_available("sha512")
+    with pytest.raises(ValueError, match="Unknown checksum algorithm"):
+        new_hash("crc-nonsense")
+
+    def missing():
+        raise ImportError("No module named 'blake3'", name="blake3")
+
+    monkeypatch.setitem(hash_algorithms.ALGORITHMS, "blake3", missing)
+    with pytest.raises(ValueError, match="requires the blake3 package"):
+        new_hash("blake3")
+
+    # A configured algorithm that is not installed falls back to SHA-256
+    monkeypatch.setattr(settings, "checksum_algorithm", "BLAKE3")
+    assert configured_algorithm() == "sha256"
+    monkeypatch.setattr(settings, "checksum_algorithm", "blake2b")
+    assert configured_algorithm() == "blake2b"
+
+
+def test_new_checksums_use_configured_algorithm(data_file, monkeypatch):
+    monkeypatch.setattr(settings, "checksum_algorithm", "blake2b")
+    expected = f"blake2b:{hashlib.blake2b(DATA).hexdigest()}"
+
+    assert ChecksumVerifier.calculate_checksum(data_file) == expected
+    assert FileMetadataExtractor.compute_checksum(data_file) == expected
+    # compute_sha256 stays SHA-256
+    assert FileMetadataExtractor.compute_sha256(data_file) == hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.mark.parametrize("configured", ["sha256", "blake2b"])
+def test_checks_rehash_with_recorded_algorithm(data_file, monkeypatch, configured):
+    """Mixed inventories stay valid whatever the configured algorithm is."""
+    monkeypatch.setattr(settings, "checksum_algorithm", configured)
+    sha = hashlib.sha256(DATA).hexdigest()
+    blake = f"blake2b:{hashlib.blake2b(DATA).hexdigest()}"
+
+    assert ChecksumVerifier.verify_checksum(data_file, sha)
+    assert ChecksumVerifier.verify_checksum(data_file, blake)
+    assert ChecksumVerifier.verify_checksum(data_file, sha.upper())
+    assert not ChecksumVerifier.verify_checksum(data_file, f"blake2b:{'0' * 128}")
+
+
+@pytest.mark.parametrize("cross_device", [False, True])
+def test_moves_verify_with_recorded_algorithm(tmp_path, data_file, monkeypatch, cross_device):
+    monkeypatch.setattr(settings, "checksum_algorithm", "sha256")
+    recorded = f"blake2b:{hashlib.blake2b(DATA).hexdigest()}"
+    if cross_device:
+
+        def exdev(self, target):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        monkeypatch.setattr(Path, "rename", exdev)
+
+    moved = move_verified(data_file, tmp_path / "moved.bin", recorded)
+
+    assert moved == recorded
+    assert (tmp_path / "moved.bin").read_bytes() == DATA
@@ -0,0 +1,195 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services import copy_engine
+from app.services.checksum_verifier import ChecksumVerifier
+from app.services.file_mover import _copy_with_progress
+from app.services.file_workflow_service import FileWorkflowService
+from app.services.io_budget import (
+    IOBudget,
+    IOBudgetManager,
+    TokenBucket,
+    apply_background_priority,
+    current_budget,
+)
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_waits_for_refill():
+    t = FakeTime()
+    bucket = TokenBucket(10, clock=t.clock, sleep=t.sleep)
+
+    for _ in range(10):
+        assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.1)
+
+    # Requests larger than the bucket go into debt
+    t.now += 1.0
+    assert bucket.acquire(25) == pytest.approx(1.5)
+
+    assert TokenBucket(0).acquire(10**9) == 0
+
+
+def test_budget_charges_parent_and_limits_concurrency():
+    t = FakeTime()
+    device = IOBudget("device", stats_per_second=100, max_concurrent=1, clock=t.clock, sleep=t.sleep)
+    path_budget = IOBudget("path", read_bytes_per_second=1024 * 1024, parent=device, clock=t.clock, sleep=t.sleep)
+
+    path_budget.stat(5)
+    path_budget.read(3 * 1024 * 1024)
+    assert device.stats_charged == 5
+    assert device.bytes_charged == 3 * 1024 * 1024
+    assert path_budget.seconds_throttled == pytest.approx(2.0)
+    assert path_budget.limits_reads and not device.limits_reads
+
+    entered = threading.Event()
+    release = threading.Event()
+    order = []
+
+    def hold():
+        with path_budget.operation():
+            order.append("first")
+            entered.set()
+            release.wait(2)
+
+    worker = threading.Thread(target=hold)
+    worker.start()
+    entered.wait(2)
+
+    def second():
+        with path_budget.operation():
+            order.append("second")
+
+    blocked = threading.Thread(target=second)
+    blocked.start()
+    time.sleep(0.05)
+    assert order == ["first"]  # device allows one operation at a time
+    release.set()
+    worker.join(2)
+    blocked.join(2)
+    assert order == ["first", "second"]
+
+
+def test_operation_makes_budget_current():
+    budget = IOBudget("path")
+    assert current_budget() is None
+    with budget.operation():
+        assert current_budget() is budget
+    assert current_budget() is None
+
+
+def test_adaptive_backoff_follows_stat_latency():
+    t = FakeTime()
+    budget = IOBudget("device", adaptive=True, latency_threshold_seconds=0.002, clock=t.clock, sleep=t.sleep)
+
+    def feed(latency, seconds):
+        for _ in range(int(seconds * 10)):
+            t.now += 0.1
+            budget.observe_stat_latency(latency)
+
+    feed(0.0005, 2)
+    assert budget.backoff_delay == 0
+
+    # Latency jumps: the delay doubles each adjustment up to the cap
+    feed(0.01, 5)
+    assert budget.backoff_delay == pytest.approx(budget.max_backoff)
+    budget.stat()
+    assert t.slept[-1] == pytest.approx(budget.max_backoff)
+
+    # Latency recovers: the delay decays back to zero
+    feed(0.0005, 10)
+    assert budget.backoff_delay == 0
+
+
+def test_copy_and_hash_charge_current_budget(tmp_path, monkeypatch):
+    # A reflink reads nothing; keep the copy on strategies that read the source
+    monkeypatch.setattr(
+        copy_engine, "available_strategies", lambda: [copy_engine.COPY_FILE_RANGE]
+    )
+    source = tmp_path / "source.bin"
+    source.write_bytes(b"x" * 300_000)
+    budget = IOBudget("path", read_bytes_per_second=100 * 1024 * 1024)
+
+    with budget.operation():
+        _copy_with_progress(source, tmp_path / "copy.bin")
+        ChecksumVerifier.calculate_checksum(source)
+    assert (tmp_path / "copy.bin").read_bytes() == source.read_bytes()
+    assert budget.bytes_charged == 600_000
+
+    # Without a read limit the copy is charged all the same
+    unlimited = IOBudget("path", adaptive=True)
+    with unlimited.operation():
+        _copy_with_progress(source, tmp_path / "copy2.bin")
+    assert unlimited.bytes_charged == 300_000
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_walk_charges_listings_and_stats(tmp_path, threads):
+    for d in ("a", "b"):
+        (tmp_path / d).mkdir()
+        for f in range(3):
+            (tmp_path / d / f"{f}.txt").write_text("x")
+    budget = IOBudget("path", adaptive=True)
+
+    files = list(FileWorkflowService()._walk(tmp_path, threads, budget=budget))
+    assert len(files) == 6
+    # 3 directory listings plus 6 stats
+    assert budget.stats_charged == 9
+    assert budget.status()["stat_latency_ms"] is not None
+
+
+def test_manager_builds_budgets_from_settings(tmp_path, monkeypatch):
+    manager = IOBudgetManager()
+    path = MagicMock(id=1, source_path=str(tmp_path), io_max_stats_per_second=None, io_max_read_mb_per_second=None, io_max_concurrent_operations=None)
+    path.name = "Budgeted"
+
+    monkeypatch.setattr("app.config.settings.io_adaptive_backoff", False)
+    assert manager.for_path(path) is None
+
+    monkeypatch.setattr("app.config.settings.io_device_max_stats_per_second", 500)
+    device = manager.for_path(path)
+    assert device.limits == (500.0, 0.0, 0)
+    assert manager.for_path(path) is device
+
+    path.io_max_read_mb_per_second = 2
+    budget = manager.for_path(path)
+    assert budget.parent is device
+    assert budget.limits == (0.0, 2 * 1024 * 1024, 0)
+    assert len(manager.status()) == 2
+
+
+def test_background_priority_is_best_effort(monkeypatch):
+    monkeypatch.setattr("app.config.settings.background_io_priority", "idle")
+    monkeypatch.setattr("app.config.settings.background_nice", 1)
+    nice_calls = []
+    monkeypatch.setattr("app.services.io_budget.os.nice", lambda inc: nice_calls.append(inc))
+
+    errors = []
+
+    def worker():
+        try:
+            apply_background_priority()
+            apply_background_priority()  # applied once per thread
+        except Exception as e:  # pragma: no cover - must never raise
+            errors.append(e)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert errors == []
+    assert nice_calls == [1]
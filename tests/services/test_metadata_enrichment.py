@@ -0,0 +1,173 @@
+import hashlib
+import os
+from unittest.mock import patch
+
+from app.models import FileInventory, MetadataEnrichmentTask
+from app.services.metadata_enrichment import (
+    PRIORITY_FREEZE,
+    PRIORITY_SCAN,
+    PRIORITY_TRANSFER,
+    MetadataEnrichmentQueue,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_file(tmp_path, name, content=b"data"):
+    file_path = tmp_path / name
+    file_path.write_bytes(content)
+    return file_path
+
+
+def test_worker_hashes_queued_rows_by_priority(db_session, file_inventory_factory, tmp_path):
+    scanned = file_inventory_factory(path=str(make_file(tmp_path, "scanned.txt")), size=4)
+    transfer = file_inventory_factory(path=str(make_file(tmp_path, "transfer.txt")), size=4)
+    hashed = file_inventory_factory(
+        path=str(make_file(tmp_path, "hashed.txt")), size=4, checksum="known"
+    )
+    queue = MetadataEnrichmentQueue(session_factory=lambda: db_session)
+
+    queue.enqueue_paths(db_session, scanned.path_id, [scanned.file_path, hashed.file_path])
+    queue.enqueue_ids(db_session, [transfer.id], PRIORITY_TRANSFER)
+    # Re-queueing at a lower priority keeps the higher one
+    queue.enqueue_ids(db_session, [transfer.id], PRIORITY_SCAN)
+    db_session.commit()
+
+    queued = {t.inventory_id: t.priority for t in db_session.query(MetadataEnrichmentTask)}
+    # Rows that already have a checksum are never queued
+    assert queued == {scanned.id: PRIORITY_SCAN, transfer.id: PRIORITY_TRANSFER}
+
+    assert queue.run_once(limit=1) == 1
+    checksums = dict(db_session.query(FileInventory.id, FileInventory.checksum))
+    assert checksums[transfer.id] == hashlib.sha256(b"data").hexdigest()
+    assert checksums[scanned.id] is None
+
+    assert queue.run_once() == 1
+    assert queue.run_once() == 0
+    assert dict(db_session.query(FileInventory.id, FileInventory.checksum))[scanned.id]
+    status = queue.status(db_session)
+    assert status["queue_depth"] == 0
+    assert status["files_hashed"] == 2
+    assert status["bytes_hashed"] == 8
+    assert status["checksum_cache"]["entries"] == 0
+
+
+def test_missing_files_leave_the_queue(db_session, file_inventory_factory, tmp_path):
+    missing = file_inventory_factory(path=str(tmp_path / "missing.txt"), size=4)
+    queue = MetadataEnrichmentQueue(session_factory=lambda: db_session)
+    queue.enqueue_ids(db_session, [missing.id], PRIORITY_FREEZE)
+    db_session.commit()
+
+    queue.run_once()
+
+    assert db_session.query(MetadataEnrichmentTask).count() == 0
+    assert queue.status(db_session)["files_failed"] == 1
+
+
+def test_status_reports_throughput_over_window(db_session):
+    clock = FakeClock()
+    queue = MetadataEnrichmentQueue(session_factory=lambda: db_session, clock=clock)
+    queue._record(30 * 1024 * 1024, 0.5)
+    clock.now = 30.0
+    queue._record(30 * 1024 * 1024, 0.5)
+
+    status = queue.status(db_session)
+    assert status["hash_mb_per_second"] == 1.0
+    assert status["files_per_second"] == round(2 / 60, 3)
+
+    clock.now = 75.0
+    status = queue.status(db_session)
+    assert status["hash_mb_per_second"] == 0.5
+    assert status["files_hashed"] == 2
+
+
+def test_hard_links_are_hashed_once(db_session, file_inventory_factory, tmp_path):
+    from app.services.scan_records import link_group, set_fingerprint
+
+    first = make_file(tmp_path, "a.txt")
+    second = tmp_path / "b.txt"
+    os.link(first, second)
+    st = first.stat()
+    rows = [
+        file_inventory_factory(path=str(p), size=4, link_group=link_group(st.st_dev, st.st_ino))
+        for p in (first, second)
+    ]
+    for row in rows:
+        row.path_id = rows[0].path_id
+        set_fingerprint(row, st)
+    db_session.commit()
+    queue = MetadataEnrichmentQueue(session_factory=lambda: db_session)
+    queue.enqueue_ids(db_session, [r.id for r in rows], PRIORITY_SCAN)
+    db_session.commit()
+
+    assert queue.run_once() == 2
+
+    checksums = {c for (c,) in db_session.query(FileInventory.checksum)}
+    assert checksums == {hashlib.sha256(b"data").hexdigest()}
+    status = queue.status(db_session)
+    assert status["files_hashed"] == 1
+    assert status["files_linked"] == 1
+
+
+def test_checksum_is_dropped_when_row_is_resynced_while_hashing(
+    db_session, file_inventory_factory, tmp_path
+):
+    from app.services.scan_records import set_fingerprint
+
+    file_path = make_file(tmp_path, "busy.txt")
+    row = file_inventory_factory(path=str(file_path), size=4)
+    set_fingerprint(row, file_path.stat())
+    db_session.commit()
+    row_id = row.id
+    queue = MetadataEnrichmentQueue(session_factory=lambda: db_session)
+    queue.enqueue_ids(db_session, [row_id], PRIORITY_SCAN)
+    db_session.commit()
+
+    def hash_during_sync(*_args, **_kwargs):
+        # A sync stores a new fingerprint and re-queues the row, merging into this entry
+        db_session.query(FileInventory).filter(FileInventory.id == row_id).update(
+            {FileInventory.file_mtime_ns: FileInventory.file_mtime_ns + 1}
+        )
+        queue.enqueue_ids(db_session, [row_id], PRIORITY_FREEZE)
+        db_session.commit()
+        return "old-content"
+
+    with patch(
+        "app.services.metadata_enrichment.checksum_verifier.calculate_checksum",
+        side_effect=hash_during_sync,
+    ):
+        assert queue.run_once() == 1
+
+    assert db_session.get(FileInventory, row_id).checksum is None
+    # The re-queue survives, so the file is hashed again against its new fingerprint
+    task = db_session.query(MetadataEnrichmentTask).one()
+    assert task.priority == PRIORITY_FREEZE
+
+
+def test_checksum_is_dropped_when_file_changes_while_hashing(
+    db_session, file_inventory_factory, tmp_path
+):
+    file_path = make_file(tmp_path, "busy.txt")
+    row_id = file_inventory_factory(path=str(file_path), size=4).id
+    queue = MetadataEnrichmentQueue(session_factory=lambda: db_session)
+    queue.enqueue_ids(db_session, [row_id], PRIORITY_SCAN)
+    db_session.commit()
+
+    def hash_while_writing(*_args, **_kwargs):
+        file_path.write_bytes(b"newer data")
+        return "old-content"
+
+    with patch(
+        "app.services.metadata_enrichment.checksum_verifier.calculate_checksum",
+        side_effect=hash_while_writing,
+    ):
+        queue.run_once()
+
+    assert db_session.get(FileInventory, row_id).checksum is None
+    assert db_session.query(MetadataEnrichmentTask).count() == 1
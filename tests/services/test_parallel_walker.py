@@ -0,0 +1,86 @@
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.models import MonitoredPath
+from app.services.directory_snapshot import DirectorySnapshotTracker
+from app.services.exclude_rules import ExcludeMatcher
+from app.services.file_workflow_service import FileWorkflowService
+from app.services.parallel_walker import ParallelDirectoryWalker
+
+DEFAULT_EXCLUDES = ExcludeMatcher(FileWorkflowService.IGNORED_PATTERNS)
+
+
+@pytest.fixture
+def wide_tree(tmp_path):
+    root = tmp_path / "root"
+    expected = set()
+    for i in range(10):
+        for j in range(5):
+            d = root / f"d{i}" / f"s{j}"
+            d.mkdir(parents=True)
+            for k in range(3):
+                f = d / f"f{k}.txt"
+                f.touch()
+                expected.add(str(f))
+    (root / "top.txt").touch()
+    expected.add(str(root / "top.txt"))
+    (root / ".DS_Store").touch()
+    (root / "d0" / "thumbs.db").touch()
+    return root, expected
+
+
+def test_parallel_walk_matches_sequential(wide_tree):
+    root, expected = wide_tree
+    service = FileWorkflowService()
+
+    sequential = {e.path for e in service._recursive_scandir(str(root))}
+    parallel = {e.path for e in ParallelDirectoryWalker(8, DEFAULT_EXCLUDES).walk(str(root))}
+
+    assert sequential == expected
+    assert parallel == expected
+
+
+def test_parallel_walk_small_batches(wide_tree):
+    root, expected = wide_tree
+    walker = ParallelDirectoryWalker(4, DEFAULT_EXCLUDES, batch_size=2)
+    assert {e.path for e in walker.walk(str(root))} == expected
+
+
+def test_parallel_walk_early_close_stops_workers(wide_tree):
+    root, _ = wide_tree
+    walker = ParallelDirectoryWalker(4, DEFAULT_EXCLUDES, max_pending_batches=1)
+    stream = walker.walk(str(root))
+    next(stream)
+    stream.close()
+
+    assert not any(t.name.startswith("scan-walker") for t in threading.enumerate())
+
+
+def test_parallel_walk_updates_tracker(db_session, wide_tree):
+    root, expected = wide_tree
+    path = MonitoredPath(name="Parallel", source_path=str(root), incremental_scan=True)
+    db_session.add(path)
+    db_session.commit()
+
+    tracker = DirectorySnapshotTracker.for_path(path, db_session)
+    walker = ParallelDirectoryWalker(4, DEFAULT_EXCLUDES)
+    assert {e.path for e in walker.walk(str(root), tracker)} == expected
+
+    # root + 10 first-level + 50 second-level directories
+    assert tracker.dirs_walked == 61
+
+
+def test_scan_threads_capped_per_path():
+    service = FileWorkflowService()
+    path = MonitoredPath(name="Share", source_path="/mnt/share")
+
+    with patch("app.services.file_workflow_service.settings") as mock_settings:
+        mock_settings.scan_walker_threads = 8
+        assert service._scan_threads(path) == 8
+        path.max_scan_threads = 2
+        assert service._scan_threads(path) == 2
+        mock_settings.scan_walker_threads = 1
+        assert service._scan_threads(path) == 1
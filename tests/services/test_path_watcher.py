@@ -0,0 +1,212 @@
+import errno
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models import WatchMode
+from app.services.exclude_rules import ExcludeMatcher
+from app.services.path_watcher import (
+    ChangeBatch,
+    DebouncedChangeQueue,
+    InotifyBackend,
+    PathWatchManager,
+)
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def drain(backend, timeout=2.0):
+    """Read events until the backend has been quiet briefly."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        backend.read_events()
+
+
+def test_queue_coalesces_until_quiet():
+    clock = FakeClock()
+    queue = DebouncedChangeQueue(debounce_seconds=2, max_delay_seconds=30, clock=clock)
+
+    queue.add_path("/hot/a.txt")
+    clock.now = 1.5
+    queue.add_path("/hot/a.txt")
+    queue.add_dir("/hot/new")
+    assert len(queue) == 2
+
+    clock.now = 3.0
+    assert queue.pop_ready() is None  # last event 1.5s ago
+
+    clock.now = 3.5
+    batch = queue.pop_ready()
+    assert batch == ChangeBatch({"/hot/a.txt"}, {"/hot/new"}, False)
+    assert len(queue) == 0
+    assert queue.events_received == 3
+
+
+def test_queue_releases_busy_paths_after_max_delay():
+    clock = FakeClock()
+    queue = DebouncedChangeQueue(debounce_seconds=2, max_delay_seconds=5, clock=clock)
+
+    for tick in range(7):
+        clock.now = float(tick)
+        queue.add_path("/hot/busy.log")
+        if tick < 5:
+            assert queue.pop_ready() is None
+
+    assert queue.pop_ready().paths == {"/hot/busy.log"}
+
+
+def test_queue_overflow_replaces_pending_changes():
+    clock = FakeClock()
+    queue = DebouncedChangeQueue(debounce_seconds=1, max_pending=2, clock=clock)
+
+    queue.add_path("/hot/a")
+    queue.add_path("/hot/b")
+    queue.add_path("/hot/c")
+    assert queue.overflowed
+    assert len(queue) == 0
+
+    clock.now = 2.0
+    assert queue.pop_ready() == ChangeBatch(set(), set(), True)
+    assert not queue.overflowed
+
+    # A batch that could not be processed is put back as it was
+    queue.requeue(ChangeBatch({"/hot/d"}, set(), False))
+    clock.now = 4.0
+    assert queue.pop_ready().paths == {"/hot/d"}
+
+
+@linux_only
+def test_inotify_reports_files_and_new_directories(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "node_modules").mkdir()
+    queue = DebouncedChangeQueue(debounce_seconds=0, max_delay_seconds=0)
+    backend = InotifyBackend(str(tmp_path), ExcludeMatcher(["node_modules/", "*.tmp"]), queue)
+    backend.start()
+    try:
+        # Root and sub; the excluded directory is not watched
+        assert backend.watch_count == 2
+
+        (tmp_path / "sub" / "file.txt").write_text("x")
+        (tmp_path / "sub" / "scratch.tmp").write_text("x")
+        (tmp_path / "node_modules" / "dep.js").write_text("x")
+        (tmp_path / "new").mkdir()
+        drain(backend, 0.3)
+
+        (tmp_path / "new" / "later.txt").write_text("x")
+        drain(backend, 0.3)
+
+        batch = queue.pop_ready()
+        assert batch.paths == {
+            str(tmp_path / "sub" / "file.txt"),
+            str(tmp_path / "new" / "later.txt"),
+        }
+        assert batch.rescan_dirs == {str(tmp_path / "new")}
+        assert backend.watch_count == 3
+    finally:
+        backend.close()
+
+
+@linux_only
+def test_inotify_watch_limit_leaves_subtrees_unwatched(tmp_path):
+    for name in ("a", "b", "c"):
+        (tmp_path / name / "deep").mkdir(parents=True)
+    queue = DebouncedChangeQueue(debounce_seconds=0, max_delay_seconds=0)
+    backend = InotifyBackend(str(tmp_path), ExcludeMatcher(), queue)
+    real_add_watch = backend._add_watch
+    calls = []
+
+    def limited_add_watch(dir_path):
+        calls.append(dir_path)
+        if len(calls) > 2:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return real_add_watch(dir_path)
+
+    try:
+        with patch.object(backend, "_add_watch", side_effect=limited_add_watch):
+            backend.start()
+
+        # Root plus one top-level directory fit; everything still queued is left to
+        # subtree scans: that directory's child and the two other top-level directories
+        assert backend.watch_count == 2
+        unwatched = backend.unwatched_dirs
+        assert len(unwatched) == 3
+        assert str(tmp_path) not in unwatched
+        assert sum(1 for d in unwatched if d.endswith(os.sep + "deep")) == 1
+
+        # Once watches are available again the subtrees are watched and walked once
+        backend.retry_unwatched()
+        assert backend.unwatched_dirs == set()
+        assert backend.watch_count == 7
+        assert queue.pop_ready().rescan_dirs == unwatched
+    finally:
+        backend.close()
+
+
+def test_plan_scheduled_scan():
+    manager = PathWatchManager()
+    path = MagicMock(id=1, full_scan_interval_hours=24)
+    path.last_full_scan_at = datetime.now(timezone.utc) - timedelta(hours=1)
+
+    # Not watched: always a full scan
+    assert manager.plan_scheduled_scan(path) is None
+
+    watcher = MagicMock()
+    watcher.fallback_dirs.return_value = {"/hot/b", "/hot/a"}
+    manager._watchers[1] = watcher
+    assert manager.plan_scheduled_scan(path) == ["/hot/a", "/hot/b"]
+
+    # Reconciliation due, or never reconciled
+    path.last_full_scan_at = datetime.now(timezone.utc) - timedelta(hours=25)
+    assert manager.plan_scheduled_scan(path) is None
+    path.last_full_scan_at = None
+    assert manager.plan_scheduled_scan(path) is None
+
+
+def test_watch_falls_back_to_scheduled_scans_when_unavailable():
+    manager = PathWatchManager()
+    path = MagicMock(id=3, enabled=True, watch_mode=WatchMode.INOTIFY, source_path="/nonexistent")
+    path.name = "Missing"
+    path.exclude_patterns = []
+
+    with patch("app.services.path_watcher.PathWatcher.start", side_effect=OSError(errno.ENOSYS, "nope")):
+        assert manager.watch(path) is False
+    assert manager.get(3) is None
+
+    path.watch_mode = WatchMode.OFF
+    assert manager.watch(path) is False
+
+
+def test_process_batch_requeues_while_scan_running(db_session, monitored_path_factory):
+    path = monitored_path_factory("Watched", "/tmp/hot_watched")
+    manager = PathWatchManager()
+    batch = ChangeBatch({"/tmp/hot_watched/a.txt"}, set(), False)
+
+    with patch("app.services.path_watcher.WatchSessionLocal", return_value=db_session), patch.object(
+        db_session, "close"
+    ), patch("app.services.path_watcher.file_workflow_service") as mock_service:
+        mock_service.process_changes.return_value = {"scan_skipped": True, "errors": []}
+        assert manager._process_batch(path.id, batch) is False
+
+        mock_service.process_changes.return_value = {"errors": []}
+        assert manager._process_batch(path.id, batch) is True
+        mock_service.process_changes.assert_called_with(
+            path, db_session, batch.paths, batch.rescan_dirs
+        )
+
+        # Lost events trigger a full scan instead
+        mock_service.process_path.return_value = {"errors": []}
+        assert manager._process_batch(path.id, ChangeBatch(set(), set(), True)) is True
+        mock_service.process_path.assert_called_once_with(path, db_session)
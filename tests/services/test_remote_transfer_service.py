@@ -64,3 +64,23 @@ class TestRemoteTransferService:
         timeouts = get_transfer_timeouts()
         assert timeouts.connect is not None
         assert timeouts.read is not None
+
+    def test_resume_offset_checks_remote_segments(self, monkeypatch):
+        """A resume starts after the last remote segment that matches ours."""
+        from app.services import tree_hash
+
+        job = MagicMock(id=1, checksum="sha256-tree:root")
+        store = MagicMock()
+        monkeypatch.setattr(tree_hash, "segment_store", store)
+        seg = tree_hash.SEGMENT_SIZE
+
+        store.load.return_value = ["a", "b", "c"]
+        status = {"size": 2 * seg + 5, "segments": ["a", "x"]}
+        assert remote_transfer_service._resume_offset(job, status) == seg
+        status = {"size": 2 * seg + 5, "segments": ["a", "b"]}
+        assert remote_transfer_service._resume_offset(job, status) == 2 * seg
+
+        # Without digests on either side the received size is trusted, as before
+        assert remote_transfer_service._resume_offset(job, {"size": 7}) == 7
+        store.load.return_value = None
+        assert remote_transfer_service._resume_offset(job, status) == 2 * seg + 5
@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import FileInventory, ScanCheckpoint, StorageType
+from app.services.exclude_rules import ExcludeMatcher
+from app.services.file_workflow_service import FileWorkflowService
+from app.services.parallel_walker import ParallelDirectoryWalker
+from app.services.scan_checkpoint import ScanCheckpointer, WalkCursor
+
+
+def make_tree(root, dirs=5, files_per_dir=3):
+    expected = set()
+    for d in range(dirs):
+        sub = root / f"d{d}" / "nested"
+        sub.mkdir(parents=True)
+        for f in range(files_per_dir):
+            for target in (sub.parent / f"f{f}.txt", sub / f"n{f}.txt"):
+                target.write_text("x")
+                expected.add(str(target))
+    return expected
+
+
+def interrupted_walk(walk, stop_after):
+    """Consume stop_after entries, then snapshot the cursor like a scan checkpoint would."""
+    seen = []
+    for entry in walk:
+        if len(seen) == stop_after:
+            break
+        seen.append(entry.path)
+    return seen
+
+
+def test_cursor_tracks_pending_and_partial_directories():
+    cursor = WalkCursor()
+    assert cursor.start_points("/hot") == [("/hot", False)]
+    assert cursor.state() == {"pending": ["/hot"], "partial": []}
+
+    cursor.add_batch("/hot")
+    cursor.listed("/hot", ["/hot/a", "/hot/b"])
+    assert cursor.state() == {"pending": ["/hot/a", "/hot/b"], "partial": ["/hot"]}
+
+    cursor.consumed("/hot")
+    cursor.listed("/hot/a")
+    assert cursor.state() == {"pending": ["/hot/b"], "partial": []}
+
+    resumed = WalkCursor.from_state({"pending": ["/hot/b"], "partial": ["/hot/c"]})
+    assert resumed.resumed
+    assert resumed.start_points("/hot") == [("/hot/b", False), ("/hot/c", True)]
+    resumed.listed("/hot/c")
+    assert resumed.state() == {"pending": ["/hot/b"], "partial": []}
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_resumed_walk_covers_the_rest_of_the_tree(tmp_path, threads):
+    expected = make_tree(tmp_path)
+    service = FileWorkflowService()
+
+    def walk(cursor):
+        if threads == 1:
+            return service._walk(tmp_path, 1, cursor=cursor)
+        walker = ParallelDirectoryWalker(threads, ExcludeMatcher(), batch_size=2)
+        return walker.walk(str(tmp_path), cursor=cursor)
+
+    cursor = WalkCursor()
+    walk_iter = walk(cursor)
+    first = interrupted_walk(walk_iter, 7)
+    state = cursor.state()
+    walk_iter.close()
+
+    rest = [entry.path for entry in walk(WalkCursor.from_state(state))]
+    assert set(first) | set(rest) == expected
+    # Only directories that were not fully delivered are walked again
+    assert len(rest) < len(expected)
+
+
+def test_checkpointer_resumes_or_starts_a_new_generation(db_session, monitored_path_factory):
+    path = monitored_path_factory("Checkpointed", "/tmp/hot_checkpointed")
+
+    first = ScanCheckpointer(path, db_session, interval_seconds=60)
+    assert first.begin() is False
+    assert path.scan_generation == 1
+    cursor = WalkCursor.from_state({"pending": ["/tmp/hot_checkpointed/a"]})
+    first.full_scan = True
+    first.save(StorageType.HOT, cursor, 1000)
+
+    second = ScanCheckpointer(path, db_session, interval_seconds=60)
+    assert second.begin() is True
+    assert path.scan_generation == 1
+    assert second.resume_count == 1
+    assert second.entries_synced == 1000
+    assert second.scan_started_at == first.scan_started_at.replace(tzinfo=timezone.utc)
+    assert second.cursor_for(StorageType.HOT).state()["pending"] == ["/tmp/hot_checkpointed/a"]
+    assert second.cursor_for(StorageType.COLD).resumed is False
+
+    # Stale checkpoints are discarded
+    checkpoint = db_session.query(ScanCheckpoint).filter_by(path_id=path.id).one()
+    checkpoint.checkpointed_at = datetime.now(timezone.utc) - timedelta(hours=48)
+    db_session.commit()
+    third = ScanCheckpointer(path, db_session, interval_seconds=60, max_age_hours=24)
+    assert third.begin() is False
+    assert path.scan_generation == 2
+    assert db_session.query(ScanCheckpoint).count() == 0
+
+
+def test_maybe_save_respects_interval(db_session, monitored_path_factory):
+    path = monitored_path_factory("Interval", "/tmp/hot_interval")
+    now = [0.0]
+    checkpointer = ScanCheckpointer(path, db_session, interval_seconds=60, clock=lambda: now[0])
+    checkpointer.begin()
+
+    assert checkpointer.maybe_save(StorageType.HOT, WalkCursor(), 10) is False
+    now[0] = 61.0
+    assert checkpointer.maybe_save(StorageType.HOT, WalkCursor(), 10) is True
+    assert checkpointer.maybe_save(StorageType.HOT, WalkCursor(), 20) is False
+    assert db_session.query(ScanCheckpoint).one().entries_synced == 10
+
+    checkpointer.finish()
+    assert db_session.query(ScanCheckpoint).count() == 0
+
+
+def test_interrupted_scan_resumes_from_checkpoint(
+    db_session, monitored_path_factory, tmp_path, monkeypatch
+):
+    hot = tmp_path / "hot"
+    hot.mkdir()
+    expected = make_tree(hot, dirs=4)
+    path = monitored_path_factory("Resumable", str(hot))
+
+    service = FileWorkflowService()
+    monkeypatch.setattr(FileWorkflowService, "INVENTORY_CHUNK_SIZE", 4)
+    monkeypatch.setattr("app.config.settings.scan_checkpoint_interval_seconds", 1e-9)
+
+    real_batch = service._update_db_entries_batch
+    calls = []
+
+    def failing_batch(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 3:
+            raise RuntimeError("scan interrupted")
+        return real_batch(*args, **kwargs)
+
+    monkeypatch.setattr(service, "_update_db_entries_batch", failing_batch)
+    with pytest.raises(RuntimeError):
+        service._scan_path(path, db_session)
+
+    checkpoint = db_session.query(ScanCheckpoint).filter_by(path_id=path.id).one()
+    assert checkpoint.scan_generation == 1
+    assert checkpoint.entries_synced == 8
+    assert checkpoint.tier == StorageType.HOT
+
+    monkeypatch.setattr(service, "_update_db_entries_batch", real_batch)
+    result = service._scan_path(path, db_session)
+
+    assert result["resumed"] is True
+    assert result["scan_generation"] == 1
+    assert result["total_scanned"] < len(expected)
+    inventory = {
+        row.file_path
+        for row in db_session.query(FileInventory).filter(FileInventory.path_id == path.id)
+    }
+    assert inventory == expected
+    assert db_session.query(ScanCheckpoint).count() == 0
+
+    # The next scan starts a new generation from the top
+    result = service._scan_path(path, db_session)
+    assert result["resumed"] is False
+    assert result["scan_generation"] == 2
+    assert result["total_scanned"] == len(expected)
@@ -0,0 +1,73 @@
+import os
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.services.scan_records import (
+    ScanRecord,
+    ns_to_datetime,
+    set_fingerprint,
+    stored_checksum,
+)
+
+
+def test_from_stat_keeps_raw_fields(tmp_path):
+    f = tmp_path / "a.txt"
+    f.write_text("hello")
+    st = f.stat()
+
+    record = ScanRecord.from_stat(str(f), st)
+
+    assert record.path == str(f)
+    assert record.size == 5
+    assert record.mtime_ns == st.st_mtime_ns
+    assert record.atime_ns == st.st_atime_ns
+    assert record.ctime_ns == st.st_ctime_ns
+    assert record.ino == st.st_ino
+    assert record.dev == st.st_dev
+    assert not hasattr(record, "__dict__")
+
+
+def test_datetimes_built_on_demand():
+    ns = 1_700_000_000_123_456_789
+    record = ScanRecord("/tmp/x", 1, ns, ns, ns)
+
+    expected = datetime(2023, 11, 14, 22, 13, 20, 123456, tzinfo=timezone.utc)
+    assert record.mtime == expected
+    assert record.atime == expected
+    assert record.ctime == expected
+
+
+def test_ns_to_datetime_before_epoch():
+    assert ns_to_datetime(-1_500_000_000) == datetime(
+        1969, 12, 31, 23, 59, 58, 500000, tzinfo=timezone.utc
+    )
+
+
+def test_fingerprint_folds_unsigned_fields_into_sqlite_range():
+    record = ScanRecord("/tmp/x", 7, 123, 0, 0, ino=(1 << 64) - 1, dev=5)
+
+    assert record.fingerprint == (5, -1, 7, 123)
+    assert record.fingerprint_columns() == {
+        "file_dev": 5,
+        "file_inode": -1,
+        "file_size": 7,
+        "file_mtime_ns": 123,
+    }
+
+
+def test_stored_checksum_only_while_fingerprint_matches(tmp_path):
+    f = tmp_path / "a.txt"
+    f.write_text("hello")
+    entry = SimpleNamespace(
+        checksum="abc", file_dev=None, file_inode=None, file_size=5, file_mtime_ns=None
+    )
+
+    # Rows without a fingerprint never qualify
+    assert stored_checksum(entry, f.stat()) is None
+
+    set_fingerprint(entry, f.stat())
+    assert stored_checksum(entry, f.stat()) == "abc"
+
+    st = f.stat()
+    os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 1000))
+    assert stored_checksum(entry, f.stat()) is None
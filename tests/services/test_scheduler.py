@@ -1,6 +1,6 @@
 import pytest
 import time
-from unittest.mock import MagicMock
+from unittest.mock import ANY, MagicMock
 
 from app.models import RequestNonce, MonitoredPath, ColdStorageLocation, FileInventory, StorageType
 from app.services.scheduler import (
@@ -64,6 +64,55 @@ class TestSchedulerService:
         scan_path_job_func(path.id)
         assert mock_process.called
 
+    def test_scan_path_job_leaves_calling_thread_priority(
+        self, db_session, monitored_path_factory, monkeypatch
+    ):
+        """Manual scans run on request threads, which must keep their priority."""
+        path = monitored_path_factory("Priority Job Path", "/tmp/hot_priority_job")
+
+        from app.services import io_budget
+        from app.services.file_workflow_service import file_workflow_service
+
+        mock_priority = MagicMock()
+        monkeypatch.setattr(io_budget, "_set_io_priority", mock_priority)
+        monkeypatch.setattr(io_budget.os, "nice", mock_priority)
+        monkeypatch.setattr(io_budget.settings, "background_io_priority", "idle")
+        monkeypatch.setattr(io_budget.settings, "background_nice", 10)
+        monkeypatch.setattr(
+            file_workflow_service, "process_path", MagicMock(return_value={"errors": []})
+        )
+
+        scan_path_job_func(path.id, full_scan=True)
+        assert not mock_priority.called
+
+    def test_scan_path_job_watched_path(self, db_session, monitored_path_factory, monkeypatch):
+        """Watched paths only scan their unwatched subtrees until reconciliation is due."""
+        path = monitored_path_factory("Watched Job Path", "/tmp/hot_watched_job")
+
+        from app.services.file_workflow_service import file_workflow_service
+        from app.services.path_watcher import path_watch_manager
+
+        mock_process = MagicMock(return_value={"files_moved": 0, "errors": []})
+        mock_changes = MagicMock(return_value={"errors": []})
+        monkeypatch.setattr(file_workflow_service, "process_path", mock_process)
+        monkeypatch.setattr(file_workflow_service, "process_changes", mock_changes)
+
+        monkeypatch.setattr(path_watch_manager, "plan_scheduled_scan", MagicMock(return_value=[]))
+        scan_path_job_func(path.id)
+        assert not mock_process.called
+        assert not mock_changes.called
+
+        monkeypatch.setattr(
+            path_watch_manager, "plan_scheduled_scan", MagicMock(return_value=["/tmp/hot_watched_job/a"])
+        )
+        scan_path_job_func(path.id)
+        mock_changes.assert_called_once_with(ANY, ANY, rescan_dirs=["/tmp/hot_watched_job/a"])
+        assert not mock_process.called
+
+        # Manual scans always run in full
+        scan_path_job_func(path.id, full_scan=True)
+        assert mock_process.called
+
     def test_encrypt_location_job(self, db_session, storage_location, file_inventory_factory, monkeypatch):
         """Test the bulk encryption job function."""
         # Setup files in location
@@ -0,0 +1,243 @@
+import pytest
+from sqlalchemy import select
+
+from app.models import (
+    FileInventory,
+    FileTag,
+    Operator,
+    StorageType,
+    TagRule,
+    TagRuleCriterionType,
+)
+from app.services.tag_rule_jobs import (
+    RuleSpec,
+    TagRuleJobManager,
+    TagRuleRetagger,
+    rule_predicate,
+)
+from app.services.tag_rule_service import TagRuleService
+
+RULES = [
+    (TagRuleCriterionType.EXTENSION, Operator.EQ, "LOG"),
+    (TagRuleCriterionType.EXTENSION, Operator.CONTAINS, "t"),
+    (TagRuleCriterionType.EXTENSION, Operator.GT, "txt"),
+    (TagRuleCriterionType.PATH_PATTERN, Operator.MATCHES, "/data/logs/*"),
+    (TagRuleCriterionType.PATH_PATTERN, Operator.MATCHES, "*/report-?.*"),
+    (TagRuleCriterionType.PATH_PATTERN, Operator.MATCHES, "*/[ab]*"),
+    (TagRuleCriterionType.PATH_PATTERN, Operator.REGEX, r"\d{4}-\d{2}"),
+    (TagRuleCriterionType.PATH_PATTERN, Operator.CONTAINS, "backup"),
+    (TagRuleCriterionType.MIME_TYPE, Operator.EQ, "TEXT/PLAIN"),
+    (TagRuleCriterionType.MIME_TYPE, Operator.MATCHES, "image/*"),
+    (TagRuleCriterionType.MIME_TYPE, Operator.MATCHES, "application/x_*"),
+    (TagRuleCriterionType.MIME_TYPE, Operator.MATCHES, "application/*+json"),
+    (TagRuleCriterionType.MIME_TYPE, Operator.CONTAINS, "json"),
+    (TagRuleCriterionType.SIZE, Operator.GTE, "1KB"),
+    (TagRuleCriterionType.SIZE, Operator.LT, "lots"),
+    (TagRuleCriterionType.NAME_PATTERN, Operator.MATCHES, "*.log"),
+    (TagRuleCriterionType.NAME_PATTERN, Operator.MATCHES, "a*"),
+    (TagRuleCriterionType.NAME_PATTERN, Operator.CONTAINS, "data"),
+    (TagRuleCriterionType.NAME_PATTERN, Operator.REGEX, r"^report-\d"),
+]
+
+FILES = [
+    ("/data/logs/app.LOG", ".LOG", "text/plain", 2048),
+    ("/data/logs/archive/old.log", ".log", "text/plain", 10),
+    ("/data/logs/debug.log", ".log", "text/plain", 20),
+    ("/data/2023-01-01/report-7.txt", ".txt", "text/plain", 1024),
+    ("/mnt/backup/a/config.json", ".json", "application/ld+json", 512),
+    ("/photos/ax/IMG.PNG", ".png", "image/png", 4096),
+    ("/data/misc/README", None, "application/x_custom", 0),
+    ("/data/misc/metadata.bin", ".bin", None, 99),
+]
+
+
+@pytest.fixture
+def inventory(db_session, monitored_path_factory, tmp_path):
+    path = monitored_path_factory("Retag", str(tmp_path))
+    files = []
+    for file_path, extension, mime_type, size in FILES:
+        inv = FileInventory(
+            path_id=path.id,
+            file_path=file_path,
+            file_extension=extension,
+            mime_type=mime_type,
+            file_size=size,
+            file_mtime=path.created_at,
+            storage_type=StorageType.HOT,
+        )
+        db_session.add(inv)
+        files.append(inv)
+    db_session.commit()
+    return files
+
+
+def make_rule(db_session, tag, criterion_type, operator, value, enabled=True):
+    rule = TagRule(
+        tag_id=tag.id,
+        criterion_type=criterion_type,
+        operator=operator,
+        value=value,
+        enabled=enabled,
+    )
+    db_session.add(rule)
+    db_session.commit()
+    return rule
+
+
+def tagged_paths(db_session, tag):
+    return {
+        file_path
+        for (file_path,) in db_session.query(FileInventory.file_path)
+        .join(FileTag, FileTag.file_id == FileInventory.id)
+        .filter(FileTag.tag_id == tag.id)
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("criterion_type,operator,value", RULES)
+def test_rule_predicate_agrees_with_evaluate_rule(
+    db_session, inventory, create_tag, criterion_type, operator, value
+):
+    """Exact predicates select the matching rows; inexact ones never miss one."""
+    tag = create_tag("Parity")
+    rule = make_rule(db_session, tag, criterion_type, operator, value)
+    service = TagRuleService(db_session)
+    expected = {f.file_path for f in inventory if service.evaluate_rule(rule, f)}
+
+    predicate, exact = rule_predicate(rule)
+    if predicate is None:
+        assert not exact
+        return
+    selected = set(
+        db_session.execute(select(FileInventory.file_path).where(predicate)).scalars()
+    )
+    if exact:
+        assert selected == expected
+    else:
+        assert selected >= expected
+
+    # Adding through either path tags exactly the matching files
+    TagRuleRetagger(db_session).rule_changed(None, RuleSpec.of(rule))
+    assert tagged_paths(db_session, tag) == expected
+
+
+@pytest.mark.unit
+def test_rule_predicate_exactness():
+    """Regex, bracket globs and name rules are checked in Python."""
+
+    def exact(criterion_type, operator, value):
+        return rule_predicate(
+            RuleSpec(1, 1, criterion_type, operator, value, enabled=True)
+        )[1]
+
+    assert exact(TagRuleCriterionType.EXTENSION, Operator.EQ, "pdf")
+    assert exact(TagRuleCriterionType.PATH_PATTERN, Operator.MATCHES, "/data/*")
+    assert exact(TagRuleCriterionType.SIZE, Operator.GT, "1GB")
+    assert not exact(TagRuleCriterionType.PATH_PATTERN, Operator.REGEX, ".*")
+    assert not exact(TagRuleCriterionType.PATH_PATTERN, Operator.MATCHES, "[a]*")
+    assert not exact(TagRuleCriterionType.NAME_PATTERN, Operator.MATCHES, "*.log")
+    assert not exact(TagRuleCriterionType.MIME_TYPE, Operator.MATCHES, "image/.*")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("chunk_size", [2, 5000])
+def test_edit_and_disable_remove_only_unjustified_auto_tags(
+    db_session, inventory, create_tag, monkeypatch, chunk_size
+):
+    """Manual tags and tags another enabled rule still justifies survive a rule change."""
+    monkeypatch.setattr(TagRuleRetagger, "CHUNK_SIZE", chunk_size)
+    logs = create_tag("Logs")
+    make_rule(db_session, logs, TagRuleCriterionType.NAME_PATTERN, Operator.CONTAINS, "app")
+    rule = make_rule(db_session, logs, TagRuleCriterionType.EXTENSION, Operator.EQ, "log")
+    retagger = TagRuleRetagger(db_session)
+    TagRuleService(db_session).apply_all_rules()
+    manual = next(f for f in inventory if f.file_path.endswith("old.log"))
+    db_session.query(FileTag).filter_by(file_id=manual.id).update({"tagged_by": "user"})
+    db_session.commit()
+    assert tagged_paths(db_session, logs) == {
+        "/data/logs/app.LOG",
+        "/data/logs/archive/old.log",
+        "/data/logs/debug.log",
+    }
+
+    # Edit: .log -> .txt
+    before = RuleSpec.of(rule)
+    rule.value = "txt"
+    db_session.commit()
+    stats = retagger.rule_changed(before, RuleSpec.of(rule))
+    assert stats == {"tags_added": 1, "tags_removed": 1}
+    assert tagged_paths(db_session, logs) == {
+        "/data/logs/app.LOG",  # still matched by the name rule
+        "/data/logs/archive/old.log",  # manual tag
+        "/data/2023-01-01/report-7.txt",
+    }
+
+    # Disable the name rule: its remaining auto tag goes
+    name_rule = (
+        db_session.query(TagRule)
+        .filter_by(criterion_type=TagRuleCriterionType.NAME_PATTERN)
+        .one()
+    )
+    before = RuleSpec.of(name_rule)
+    name_rule.enabled = False
+    db_session.commit()
+    stats = retagger.rule_changed(before, RuleSpec.of(name_rule))
+    assert stats == {"tags_added": 0, "tags_removed": 1}
+    assert tagged_paths(db_session, logs) == {
+        "/data/logs/archive/old.log",
+        "/data/2023-01-01/report-7.txt",
+    }
+
+    # Delete the extension rule: nothing else for the tag is enabled, one DELETE suffices
+    before = RuleSpec.of(rule)
+    db_session.delete(rule)
+    db_session.commit()
+    assert retagger.rule_changed(before, None) == {"tags_added": 0, "tags_removed": 1}
+    assert tagged_paths(db_session, logs) == {"/data/logs/archive/old.log"}
+
+    # Priority-only edits are a no-op
+    assert retagger.rule_changed(RuleSpec.of(name_rule), RuleSpec.of(name_rule)) == {
+        "tags_added": 0,
+        "tags_removed": 0,
+    }
+
+
+@pytest.mark.unit
+def test_job_manager_runs_rule_change_with_progress(
+    db_session, inventory, create_tag, monkeypatch
+):
+    manager = TagRuleJobManager()
+    monkeypatch.setattr(manager, "_ensure_worker", lambda: None)
+    monkeypatch.setattr(TagRuleRetagger, "CHUNK_SIZE", 3)
+    tag = create_tag("Regex")
+    rule = make_rule(db_session, tag, TagRuleCriterionType.PATH_PATTERN, Operator.REGEX, r"/data/")
+
+    assert manager.submit_rule_change("update", RuleSpec.of(rule), RuleSpec.of(rule)) is None
+    job_id = manager.submit_rule_change("create", None, RuleSpec.of(rule))
+    assert manager.get_job(job_id)["status"] == "pending"
+
+    manager._process(job_id, db_session)
+
+    job = manager.get_job(job_id)
+    assert job["status"] == "completed"
+    assert job["rule_id"] == rule.id
+    assert job["rows_total"] == job["rows_processed"] == len(FILES)
+    assert job["tags_added"] == 6
+    assert job["percent_complete"] == 100
+    assert manager.get_recent_jobs()[0]["job_id"] == job_id
+
+
+@pytest.mark.unit
+def test_job_manager_apply_all(db_session, inventory, create_tag, monkeypatch):
+    manager = TagRuleJobManager()
+    monkeypatch.setattr(manager, "_ensure_worker", lambda: None)
+    tag = create_tag("Large")
+    make_rule(db_session, tag, TagRuleCriterionType.SIZE, Operator.GT, "1000")
+
+    job_id = manager.submit_apply_all()
+    manager._process(job_id, db_session)
+
+    job = manager.get_job(job_id)
+    assert job["status"] == "completed"
+    assert job["action"] == "apply_all"
+    assert job["tags_added"] == 3
@@ -1,7 +1,7 @@
 import pytest
 
 from app.models import FileInventory, TagRule, TagRuleCriterionType, Operator, Tag, FileTag
-from app.services.tag_rule_service import TagRuleService
+from app.services.tag_rule_service import CompiledTagRules, TagRuleService
 
 
 @pytest.mark.unit
@@ -140,3 +140,79 @@ class TestTagRuleService:
             service._parse_size("not-a-size")
         with pytest.raises(ValueError, match="Invalid size format"):
             service._parse_size("10XX")
+
+
+RULES = [
+    (TagRuleCriterionType.EXTENSION, Operator.EQ, "txt"),
+    (TagRuleCriterionType.EXTENSION, Operator.MATCHES, ".LOG"),
+    (TagRuleCriterionType.EXTENSION, Operator.CONTAINS, "t"),
+    (TagRuleCriterionType.EXTENSION, Operator.GT, "txt"),
+    (TagRuleCriterionType.PATH_PATTERN, Operator.MATCHES, "*/logs/*.log"),
+    (TagRuleCriterionType.PATH_PATTERN, Operator.REGEX, r"\d{4}-\d{2}"),
+    (TagRuleCriterionType.PATH_PATTERN, Operator.REGEX, "[unclosed"),
+    (TagRuleCriterionType.PATH_PATTERN, Operator.CONTAINS, "backup"),
+    (TagRuleCriterionType.MIME_TYPE, Operator.EQ, "text/plain"),
+    (TagRuleCriterionType.MIME_TYPE, Operator.MATCHES, "image/*"),
+    (TagRuleCriterionType.MIME_TYPE, Operator.MATCHES, "IMAGE/PNG"),
+    (TagRuleCriterionType.MIME_TYPE, Operator.CONTAINS, "json"),
+    (TagRuleCriterionType.SIZE, Operator.GT, "1KB"),
+    (TagRuleCriterionType.SIZE, Operator.LTE, "0.5 MB"),
+    (TagRuleCriterionType.SIZE, Operator.EQ, "lots"),
+    (TagRuleCriterionType.NAME_PATTERN, Operator.MATCHES, "config_*"),
+    (TagRuleCriterionType.NAME_PATTERN, Operator.REGEX, r"^report-\d+"),
+    (TagRuleCriterionType.NAME_PATTERN, Operator.CONTAINS, "log"),
+]
+
+FILES = [
+    FileInventory(id=1, file_path="/var/logs/app.log", file_extension=".log", mime_type="text/plain", file_size=2048),
+    FileInventory(id=2, file_path="/data/2023-01-01/report-7.txt", file_extension=".TXT", mime_type="text/plain", file_size=100),
+    FileInventory(id=3, file_path="/mnt/backup/config_v1.json", file_extension=".json", mime_type="application/json", file_size=512 * 1024),
+    FileInventory(id=4, file_path="/photos/IMG.PNG", file_extension=".png", mime_type="image/png", file_size=None),
+    FileInventory(id=5, file_path="/misc/README", file_extension=None, mime_type=None, file_size=0),
+]
+
+
+@pytest.mark.unit
+class TestCompiledTagRules:
+    @pytest.mark.parametrize("criterion_type,operator,value", RULES)
+    def test_matches_evaluate_rule(self, db_session, criterion_type, operator, value):
+        """Compiled rules tag exactly the files evaluate_rule matches."""
+        rule = TagRule(id=1, tag_id=9, criterion_type=criterion_type, operator=operator, value=value, enabled=True)
+        service = TagRuleService(db_session)
+
+        expected = [(file.id, 9) for file in FILES if service.evaluate_rule(rule, file)]
+        assert CompiledTagRules([rule]).tags_for(FILES) == expected
+
+    def test_disabled_rules_and_shared_tags(self):
+        """Disabled rules are skipped and a tag is paired with a file once."""
+        rules = [
+            TagRule(id=1, tag_id=1, criterion_type=TagRuleCriterionType.EXTENSION, operator=Operator.EQ, value="log", enabled=True),
+            TagRule(id=2, tag_id=1, criterion_type=TagRuleCriterionType.NAME_PATTERN, operator=Operator.CONTAINS, value="app", enabled=True),
+            TagRule(id=3, tag_id=2, criterion_type=TagRuleCriterionType.SIZE, operator=Operator.GT, value="0", enabled=False),
+        ]
+        compiled = CompiledTagRules(rules)
+
+        assert len(compiled) == 2
+        assert compiled.tags_for(FILES) == [(1, 1)]
+
+    def test_apply_inserts_each_tag_once(self, db_session, file_inventory_factory, create_tag):
+        """Applying twice adds no duplicates, and existing manual tags are kept."""
+        text = create_tag("Text")
+        large = create_tag("Large")
+        db_session.add_all([
+            TagRule(tag_id=text.id, criterion_type=TagRuleCriterionType.EXTENSION, operator=Operator.EQ, value="txt", enabled=True, priority=1),
+            TagRule(tag_id=large.id, criterion_type=TagRuleCriterionType.SIZE, operator=Operator.GT, value="1MB", enabled=True),
+        ])
+        inv1 = file_inventory_factory(path="/tmp/bulk1.txt", file_extension=".txt", size=2 * 1024 * 1024)
+        inv2 = file_inventory_factory(path="/tmp/bulk2.jpg", file_extension=".jpg", size=10, path_name="p2")
+        db_session.add(FileTag(file_id=inv1.id, tag_id=text.id, tagged_by="user"))
+        db_session.commit()
+
+        compiled = CompiledTagRules.load(db_session)
+        assert compiled.apply(db_session, [inv1, inv2]) == 1
+        assert compiled.apply(db_session, [inv1, inv2]) == 0
+        db_session.commit()
+
+        tags = db_session.query(FileTag).filter_by(file_id=inv1.id).order_by(FileTag.tag_id).all()
+        assert [(t.tag_id, t.tagged_by) for t in tags] == [(text.id, "user"), (large.id, "auto-rule")]
+        assert db_session.query(FileTag).filter_by(file_id=inv2.id).count() == 0
@@ -0,0 +1,142 @@
+"""Tests for tree checksums and their stored segment digests."""
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config import settings
+from app.models import ChecksumSegments
+from app.services import tree_hash
+from app.services.checksum_verifier import ChecksumVerifier
+from app.services.file_mover import ChecksumMismatchError, CopyChecksum
+from app.services.hash_algorithms import algorithm_for_size, new_hash
+
+SEGMENT = 1024
+
+
+@pytest.fixture(autouse=True)
+def small_segments(monkeypatch):
+    monkeypatch.setattr(tree_hash, "SEGMENT_SIZE", SEGMENT)
+
+
+@pytest.fixture
+def store(db_session, monkeypatch):
+    store = tree_hash.SegmentStore(session_factory=lambda: db_session)
+    monkeypatch.setattr(tree_hash, "segment_store", store)
+    # Sessions from the factory are closed after each call
+    monkeypatch.setattr(db_session, "close", lambda: None)
+    return store
+
+
+def _data(size: int) -> bytes:
+    return bytes(i % 251 for i in range(size))
+
+
+@pytest.mark.parametrize("size", [0, 1, SEGMENT, SEGMENT + 1, 5 * SEGMENT - 7])
+def test_parallel_and_streaming_hashes_agree(tmp_path, size):
+    data = _data(size)
+    path = tmp_path / "f.bin"
+    path.write_bytes(data)
+
+    checksum, digests = tree_hash.hash_file(path, "sha256-tree")
+
+    assert checksum.startswith("sha256-tree:")
+    assert len(digests) == tree_hash.segment_count(size)
+    assert digests[0] == hashlib.sha256(data[:SEGMENT]).hexdigest()
+    streamed = new_hash("sha256-tree")
+    for i in range(0, size, 100):
+        streamed.update(data[i : i + 100])
+    assert streamed.segment_digests == digests
+    assert checksum == f"sha256-tree:{streamed.hexdigest()}"
+
+
+def test_root_depends_on_size(tmp_path):
+    # The empty segment digest of an empty file must not collide with a file of zeros
+    empty = tmp_path / "empty"
+    empty.write_bytes(b"")
+    zero = tmp_path / "zero"
+    zero.write_bytes(b"\0")
+    empty_checksum, _ = tree_hash.hash_file(empty, "sha256-tree")
+    zero_checksum, _ = tree_hash.hash_file(zero, "sha256-tree")
+    assert empty_checksum != zero_checksum
+
+
+def test_algorithm_for_size(monkeypatch):
+    monkeypatch.setattr(settings, "checksum_algorithm", "blake2b")
+    monkeypatch.setattr(settings, "checksum_tree_min_size_mb", 0)
+    assert algorithm_for_size(10 * 1024**3) == "blake2b"
+
+    monkeypatch.setattr(settings, "checksum_tree_min_size_mb", 1)
+    assert algorithm_for_size(1024**2 - 1) == "blake2b"
+    assert algorithm_for_size(1024**2) == "blake2b-tree"
+
+
+def test_large_files_get_tree_checksums(tmp_path, store, monkeypatch):
+    monkeypatch.setattr(settings, "checksum_tree_min_size_mb", 1)
+    path = tmp_path / "big.bin"
+    path.write_bytes(_data(1024**2))
+
+    checksum = ChecksumVerifier.calculate_checksum(path)
+
+    assert checksum.startswith("sha256-tree:")
+    assert len(store.load(checksum)) == 1024**2 // SEGMENT
+
+
+def test_corrupt_segments_are_located(tmp_path, store):
+    path = tmp_path / "f.bin"
+    data = bytearray(_data(4 * SEGMENT))
+    path.write_bytes(data)
+    checksum = ChecksumVerifier.calculate_checksum(path, "sha256-tree", use_cache=False)
+
+    data[2 * SEGMENT + 10] ^= 0xFF
+    path.write_bytes(data)
+
+    assert not ChecksumVerifier.verify_checksum(path, checksum)
+    assert ChecksumVerifier.find_corrupt_segments(path, checksum) == [2]
+    assert ChecksumVerifier.find_corrupt_segments(path, "sha256-tree:00") is None
+
+
+def test_copy_mismatch_names_segments(tmp_path, store):
+    data = _data(3 * SEGMENT)
+    path = tmp_path / "f.bin"
+    path.write_bytes(data)
+    checksum = ChecksumVerifier.calculate_checksum(path, "sha256-tree", use_cache=False)
+
+    copy_check = CopyChecksum(expected=checksum, read_back=False)
+    copy_check.update(data[:SEGMENT] + b"x" + data[SEGMENT + 1 :])
+
+    with pytest.raises(ChecksumMismatchError, match=r"segments \[1\]"):
+        copy_check.verify(tmp_path / "copy.bin")
+
+
+def test_copy_stores_segments(tmp_path, store):
+    data = _data(2 * SEGMENT + 3)
+    copy_check = CopyChecksum(algorithm="sha256-tree", read_back=False)
+    copy_check.update(data)
+
+    checksum = copy_check.verify(tmp_path / "copy.bin")
+
+    assert len(store.load(checksum)) == 3
+
+
+def test_verified_prefix():
+    assert tree_hash.verified_prefix(["a", "b", "c"], ["a", "b"]) == 2 * SEGMENT
+    assert tree_hash.verified_prefix(["a", "b", "c"], ["a", "x", "c"]) == SEGMENT
+    assert tree_hash.verified_prefix(["a"], []) == 0
+
+
+def test_prune_keeps_checksums_in_use(db_session, store, file_inventory_factory):
+    old = datetime.now(timezone.utc) - timedelta(days=400)
+    file_inventory_factory(checksum="sha256-tree:used")
+    for checksum in ("sha256-tree:used", "sha256-tree:unused"):
+        db_session.add(
+            ChecksumSegments(
+                checksum=checksum, segment_size=SEGMENT, digests=["00"], created_at=old
+            )
+        )
+    db_session.commit()
+
+    assert store.prune(db_session) == 1
+    assert store.load("sha256-tree:used") == ["00"]
+    assert store.load("sha256-tree:unused") is None